@@ -1,4 +1,3 @@
-import uuid
 from typing import Callable, Optional
 
 import jwt
@@ -8,14 +7,32 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from enums.user_role import UserRole
 from models.sql.user import UserModel
-from services.auth_service import decode_access_token, get_user_by_api_key
+from services.auth_service import get_user_by_access_token, get_user_by_api_key
 from services.database import get_async_session
+from services.profiling_service import PROFILER
 
 
 bearer_scheme = HTTPBearer(auto_error=False)
 api_key_scheme = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+async def _get_user_by_token_or_raise(session: AsyncSession, token: str) -> UserModel:
+    try:
+        user = await get_user_by_access_token(session, token)
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User inactive or not found",
+        )
+    return user
+
+
 async def get_current_user(
     request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
@@ -30,28 +47,7 @@ async def get_current_user(
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    try:
-        payload = decode_access_token(token)
-    except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    user = await session.get(UserModel, uuid.UUID(user_id))
-    if not user or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User inactive or not found",
-        )
-    return user
+    return await _get_user_by_token_or_raise(session, token)
 
 
 async def get_optional_user(
@@ -65,16 +61,9 @@ async def get_optional_user(
     if not token:
         return None
     try:
-        payload = decode_access_token(token)
+        return await get_user_by_access_token(session, token)
     except jwt.PyJWTError:
         return None
-    user_id = payload.get("sub")
-    if not user_id:
-        return None
-    user = await session.get(UserModel, uuid.UUID(user_id))
-    if not user or not user.is_active:
-        return None
-    return user
 
 
 async def get_current_user_or_api_key(
@@ -88,28 +77,7 @@ async def get_current_user_or_api_key(
 
     token_value = request.cookies.get("auth_token") or request.query_params.get("token")
     if token_value:
-        try:
-            payload = decode_access_token(token_value)
-        except jwt.PyJWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        user = await session.get(UserModel, uuid.UUID(user_id))
-        if not user or not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User inactive or not found",
-            )
-        return user
+        return await _get_user_by_token_or_raise(session, token_value)
 
     api_key_param = api_key or request.query_params.get("api_key")
     if api_key_param:
@@ -159,3 +127,14 @@ async def enforce_ppt_access(
             detail="Viewer role is read-only",
         )
     return user
+
+
+async def authorize_profiling(
+    user: UserModel = Depends(get_current_user_or_api_key),
+) -> None:
+    """Starts sampling the profile the request asked for, for admins only."""
+    profile = PROFILER.get_current_profile()
+    if profile is None or profile.activated:
+        return
+    await require_roles(UserRole.admin)(user)
+    PROFILER.activate(profile)
@@ -1,38 +1,136 @@
+import asyncio
 from contextlib import asynccontextmanager
 import logging
 import os
+from typing import List
 
 from fastapi import FastAPI
 
+from services.auth_cache_service import API_KEY_USAGE_RECORDER
 from services.database import create_db_and_tables
+from services.event_loop_stall_monitor import EVENT_LOOP_STALL_MONITOR
+from services.google_genai_client import GOOGLE_GENAI_CLIENTS
+from services.icon_finder_service import ICON_FINDER_SERVICE
+from services.metrics_service import EVENT_LOOP_LAG_MONITOR
+from services.openai_client import OPENAI_CLIENTS
+from services.startup_service import STARTUP_SERVICE, StartupService, StartupTask
 from services.template_service import template_service
-from utils.get_env import get_app_data_directory_env
+from services.token_usage_service import TOKEN_USAGE_RECORDER
+from services.tracing_service import TRACER
+from services.webhook_service import WEBHOOK_DELIVERY_WORKER
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_provider_check_ttl_seconds_env,
+    get_startup_tasks_done_env,
+)
 from utils.model_availability import (
     check_llm_and_image_provider_api_or_model_availability,
 )
+from utils.parsers import parse_bool_or_none
 
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PROVIDER_CHECK_TTL_SECONDS = 300
+
+
+async def seed_system_templates():
+    # Seed system templates (general, modern, etc.) on startup
+    count = await template_service.seed_system_templates()
+    if count > 0:
+        logger.info(f"Seeded {count} system templates")
+
+
+async def load_icon_index():
+    await asyncio.to_thread(ICON_FINDER_SERVICE.initialize)
+
+
+def get_deployment_startup_tasks() -> List[StartupTask]:
+    """
+    Tasks that only need to run once per deployment. The multi-worker
+    launcher runs them before forking, so the workers don't race each other
+    creating tables and seeding templates.
+    """
+    return [
+        StartupTask("database", create_db_and_tables),
+        StartupTask(
+            "system_templates",
+            seed_system_templates,
+            depends_on=["database"],
+            required=False,
+        ),
+    ]
+
+
+def get_startup_tasks(include_once_per_deployment: bool = True) -> List[StartupTask]:
+    """
+    Only the database gates startup and readiness. Template seeding waits on
+    the Next.js template list and the provider check on remote model listings,
+    so they run in the background and report their result on the readiness
+    endpoint. The provider check is refreshed per worker once its result is
+    older than its ttl.
+    """
+    tasks = []
+    if include_once_per_deployment:
+        tasks += get_deployment_startup_tasks()
+    tasks.append(
+        StartupTask(
+            "provider_check",
+            check_llm_and_image_provider_api_or_model_availability,
+            required=False,
+            ttl=get_provider_check_ttl_seconds_env()
+            or DEFAULT_PROVIDER_CHECK_TTL_SECONDS,
+        )
+    )
+    return tasks
+
+
+async def run_startup_tasks() -> StartupService:
+    """
+    Runs the once-per-deployment startup tasks to completion, for the
+    multi-worker launcher to run before forking the workers.
+    """
+    startup_service = StartupService()
+    await startup_service.run(get_deployment_startup_tasks())
+    return startup_service
+
 
 @asynccontextmanager
 async def app_lifespan(_: FastAPI):
     """
     Lifespan context manager for FastAPI application.
-    Initializes the application data directory, database, and seeds system templates.
+    Initializes the application data directory and runs the startup tasks.
+    Only the required ones, the database, are waited for before serving; the
+    slow optional ones keep running in the background.
 
     """
     os.makedirs(get_app_data_directory_env(), exist_ok=True)
-    await create_db_and_tables()
-    
-    # Seed system templates (general, modern, etc.) on startup
+
+    # The multi-worker launcher runs the deployment tasks before forking
+    startup_tasks_done = parse_bool_or_none(get_startup_tasks_done_env()) or False
+    STARTUP_SERVICE.start(
+        [
+            *get_startup_tasks(include_once_per_deployment=not startup_tasks_done),
+            # chromadb and ONNX Runtime are opened per worker
+            StartupTask("icon_index", load_icon_index, required=False),
+        ]
+    )
+    # The routers and workers below all need the database
     try:
-        count = await template_service.seed_system_templates()
-        if count > 0:
-            logger.info(f"Seeded {count} system templates")
-    except Exception as e:
-        logger.warning(f"Failed to seed system templates: {e}")
-    
-    await check_llm_and_image_provider_api_or_model_availability()
+        await STARTUP_SERVICE.wait_required()
+    except BaseException:
+        STARTUP_SERVICE.stop()
+        raise
+    WEBHOOK_DELIVERY_WORKER.start()
+    EVENT_LOOP_LAG_MONITOR.start()
+    EVENT_LOOP_STALL_MONITOR.start()
     yield
-
+    EVENT_LOOP_STALL_MONITOR.stop()
+    await EVENT_LOOP_LAG_MONITOR.stop()
+    STARTUP_SERVICE.stop()
+    await WEBHOOK_DELIVERY_WORKER.stop()
+    await API_KEY_USAGE_RECORDER.stop()
+    await TOKEN_USAGE_RECORDER.stop()
+    await GOOGLE_GENAI_CLIENTS.close()
+    await OPENAI_CLIENTS.close()
+    TRACER.shutdown()
@@ -1,11 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.lifespan import app_lifespan
-from api.middlewares import UserConfigEnvUpdateMiddleware
+from api.metrics import METRICS_ROUTER
+from api.middlewares import (
+    ProfilingMiddleware,
+    TracingMiddleware,
+    UserConfigEnvUpdateMiddleware,
+)
 from api.v1.ppt.router import API_V1_PPT_ROUTER
 from api.v1.auth.router import API_V1_AUTH_ROUTER
 from api.v1.webhook.router import API_V1_WEBHOOK_ROUTER
 from api.v1.mock.router import API_V1_MOCK_ROUTER
+from api.v1.health.router import API_V1_HEALTH_ROUTER
+from api.v1.profiling.router import API_V1_PROFILING_ROUTER
 
 
 app = FastAPI(lifespan=app_lifespan)
@@ -16,6 +23,9 @@ app.include_router(API_V1_AUTH_ROUTER)
 app.include_router(API_V1_PPT_ROUTER)
 app.include_router(API_V1_WEBHOOK_ROUTER)
 app.include_router(API_V1_MOCK_ROUTER)
+app.include_router(API_V1_HEALTH_ROUTER)
+app.include_router(API_V1_PROFILING_ROUTER)
+app.include_router(METRICS_ROUTER)
 
 # Middlewares
 origins = ["*"]
@@ -28,6 +38,8 @@ app.add_middleware(
 )
 
 app.add_middleware(UserConfigEnvUpdateMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(TracingMiddleware)
 
 from fastapi.staticfiles import StaticFiles
 import os
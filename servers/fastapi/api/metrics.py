@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Response
+
+from api.deps import require_roles
+from api.v1.ppt.endpoints.presentation import STREAM_SESSIONS
+from api.v1.ppt.endpoints.slide_to_html import TEMPLATE_IMPORT_SERVICE
+from enums.user_role import UserRole
+from services.database import async_session_maker
+from services.event_loop_stall_monitor import EVENT_LOOP_STALL_MONITOR
+from services.generation_queue_service import GenerationQueueService
+from services.metrics_service import (
+    METRICS,
+    PROMETHEUS_CONTENT_TYPE,
+    QUEUE_DEPTH,
+    STREAM_SESSIONS_ACTIVE,
+)
+from services.webhook_service import WebhookService
+
+METRICS_ROUTER = APIRouter(tags=["Metrics"])
+
+
+async def collect_queue_depths():
+    async with async_session_maker() as sql_session:
+        generation_tasks = await GenerationQueueService.get_depth(sql_session)
+        webhook_deliveries = await WebhookService.get_backlog(sql_session)
+
+    for status in ("pending", "processing"):
+        QUEUE_DEPTH.set(
+            generation_tasks.get(status, 0), queue="generation", status=status
+        )
+    for status in ("pending", "delivering"):
+        QUEUE_DEPTH.set(
+            webhook_deliveries.get(status, 0), queue="webhook", status=status
+        )
+    QUEUE_DEPTH.set(
+        await TEMPLATE_IMPORT_SERVICE.count_running(),
+        queue="template_import",
+        status="running",
+    )
+
+
+async def collect_stream_sessions():
+    STREAM_SESSIONS_ACTIVE.set(len(STREAM_SESSIONS))
+
+
+METRICS.add_collector(collect_queue_depths)
+METRICS.add_collector(collect_stream_sessions)
+
+
+@METRICS_ROUTER.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    await METRICS.collect()
+    return Response(METRICS.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@METRICS_ROUTER.get(
+    "/metrics/event-loop-stalls",
+    dependencies=[Depends(require_roles(UserRole.admin))],
+)
+async def get_event_loop_stalls():
+    return {
+        "enabled": EVENT_LOOP_STALL_MONITOR.enabled,
+        "threshold_ms": (
+            EVENT_LOOP_STALL_MONITOR.threshold * 1000
+            if EVENT_LOOP_STALL_MONITOR.enabled
+            else None
+        ),
+        "stalls": EVENT_LOOP_STALL_MONITOR.stalls,
+        "samples": EVENT_LOOP_STALL_MONITOR.get_samples(),
+    }
@@ -1,7 +1,13 @@
+from urllib.parse import parse_qs
+
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from services.profiling_service import PROFILE_HEADER, PROFILE_QUERY_PARAMETER, PROFILER
+from services.tracing_service import TRACER
 from utils.get_env import get_can_change_keys_env
+from utils.parsers import parse_bool_or_none
 from utils.user_config import update_env_with_user_config
 
 
@@ -14,3 +20,76 @@ class UserConfigEnvUpdateMiddleware(BaseHTTPMiddleware):
             except Exception:
                 pass
         return await call_next(request)
+
+
+class TracingMiddleware:
+    """
+    Runs each HTTP request in a server span that continues the trace of an
+    incoming ``traceparent`` header. Its sampled flag only forces sampling with
+    TRACE_TRUST_UPSTREAM_SAMPLING, for deployments behind a tracing proxy. The
+    span ends once the response, including a streamed body, has been sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not TRACER.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", []):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        # Only the path is recorded, query strings can carry tokens
+        with TRACER.start_span(
+            f"{scope['method']} {scope['path']}",
+            {"http.request.method": scope["method"], "url.path": scope["path"]},
+            traceparent=traceparent,
+            kind="server",
+            # Any client can send a sampled flag, so it is ignored by default
+            trust_sampled=TRACER.trust_upstream_sampling,
+        ) as span:
+
+            async def send_with_status(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.response.status_code", message["status"])
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+class ProfilingMiddleware:
+    """
+    Opens a profile for requests that ask for one with an ``X-Profile: true``
+    header or a ``profile=true`` query parameter. The profile covers the
+    streamed body and background tasks of the response as well, but only
+    samples once ``authorize_profiling`` has checked that the user is an admin.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def is_profiling_requested(scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == PROFILE_HEADER.encode("latin-1"):
+                return bool(parse_bool_or_none(value.decode("latin-1")))
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        values = query.get(PROFILE_QUERY_PARAMETER)
+        return bool(values and parse_bool_or_none(values[0]))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.is_profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        async with PROFILER.profile(
+            f"{scope['method']} {scope['path']}",
+            {"method": scope["method"], "path": scope["path"]},
+            active=False,
+        ):
+            await self.app(scope, receive, send)
@@ -18,6 +18,7 @@ from models.auth import (
 )
 from models.sql.api_key import ApiKeyModel
 from models.sql.user import UserModel
+from services.auth_cache_service import PRINCIPAL_CACHE
 from services.auth_service import authenticate_user, create_access_token, create_api_key, create_user
 from services.database import get_async_session
 from utils.datetime_utils import get_current_utc_datetime
@@ -174,6 +175,7 @@ async def update_user_role(
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    PRINCIPAL_CACHE.invalidate_user(user.id)
     return UserPublic(
         id=user.id,
         username=user.username,
@@ -255,6 +257,8 @@ async def list_api_keys(
             created_at=api_key.created_at,
             last_used_at=api_key.last_used_at,
             is_active=api_key.is_active,
+            llm_input_tokens=api_key.llm_input_tokens,
+            llm_output_tokens=api_key.llm_output_tokens,
         )
         for api_key in keys
     ]
@@ -287,3 +291,4 @@ async def revoke_api_key(
     api_key.revoked_at = get_current_utc_datetime()
     session.add(api_key)
     await session.commit()
+    PRINCIPAL_CACHE.invalidate_api_key(api_key.id)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Response
+
+from services.startup_service import STARTUP_SERVICE
+
+API_V1_HEALTH_ROUTER = APIRouter(prefix="/api/v1/health", tags=["Health"])
+
+
+@API_V1_HEALTH_ROUTER.get("/live")
+async def get_liveness():
+    return {"status": "alive"}
+
+
+@API_V1_HEALTH_ROUTER.get("/ready")
+async def get_readiness(response: Response):
+    # Never waits on a check, stale results are refreshed in the background
+    STARTUP_SERVICE.refresh_stale()
+    status = STARTUP_SERVICE.get_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
@@ -1,17 +1,35 @@
 
 import asyncio
+from contextlib import nullcontext
+from typing import Optional
 import uuid
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.deps import get_current_user_or_api_key
 from models.generate_presentation_request import GeneratePresentationRequest
 from models.sql.async_presentation_generation_status import (
     AsyncPresentationGenerationTaskModel,
 )
-from services.database import get_async_session
+from models.sql.presentation import PresentationModel
+from models.sql.user import UserModel
+from services.auth_service import create_access_token
+from services.database import async_session_maker, get_async_session
+from services.generation_queue_service import GenerationQueueService
 from services.presentation_service import PresentationService
+from services.profiling_service import PROFILER
+from services.token_usage_service import (
+    get_token_usage_api_key,
+    set_token_usage_api_key,
+)
+from services.tracing_service import TRACER
+from utils.custom_logger import setup_logger
+from utils.get_env import get_generation_queue_env
 from utils.get_layout_by_name import get_layout_by_name
+from utils.parsers import parse_bool_or_none
+
+logger = setup_logger(__name__)
 
 AUTOGENERATE_ROUTER = APIRouter(prefix="/presentation", tags=["Autogenerate"])
 
@@ -22,6 +40,7 @@ async def autogenerate_presentation(
     http_request: Request,
     background_tasks: BackgroundTasks,
     sql_session: AsyncSession = Depends(get_async_session),
+    user: UserModel = Depends(get_current_user_or_api_key),
 ):
     """
     Orchestrate the entire presentation generation flow suitable for agents.
@@ -74,28 +93,120 @@ async def autogenerate_presentation(
         or http_request.query_params.get("api_key")
     )
 
-    # 4. Define background task
-    async def run_autogeneration():
-         # We need a new session for the background task
-        async for session in get_async_session():
-            status = None
-            try:
-                # Re-fetch status to attach to new session
-                status = await session.get(AsyncPresentationGenerationTaskModel, presentation.id)
-                
-                # A. Generate Outlines
-                status.message = "Generating outlines..."
+    # An in-process generation runs in the profile of this request
+    profile = PROFILER.get_current_profile()
+    profiling = profile is not None and profile.activated
+    if profiling:
+        profile.metadata["presentation_id"] = str(presentation.id)
+
+    # 4. Hand the generation to the worker queue or run it in this process
+    if parse_bool_or_none(get_generation_queue_env()):
+        api_key_id = get_token_usage_api_key()
+        await GenerationQueueService.enqueue(
+            sql_session,
+            async_status,
+            {
+                "request": request.model_dump(mode="json"),
+                # Only the principal is stored, the worker signs its own token
+                "user_id": str(user.id),
+                # The worker counts the tokens it uses towards the same key
+                "api_key_id": str(api_key_id) if api_key_id else None,
+                # The worker continues the trace of this request
+                "traceparent": TRACER.get_traceparent(),
+                # The worker profiles the job in a profile of its own
+                "profile": profiling,
+            },
+        )
+        message = "Generation queued"
+    else:
+        background_tasks.add_task(
+            run_autogeneration,
+            presentation.id,
+            request,
+            auth_token,
+            api_key,
+            reraise=False,
+        )
+        message = "Generation started in background"
+
+    return {
+        "presentation_id": str(presentation.id),
+        "status": "pending",
+        "message": message,
+        "poll_url": f"/api/v1/ppt/presentation/status/{presentation.id}" # Assuming status endpoint exists or we rely on GET /presentation
+    }
+
+
+@TRACER.trace("presentation.autogenerate")
+async def run_autogeneration(
+    presentation_id: uuid.UUID,
+    request: GeneratePresentationRequest,
+    auth_token: Optional[str] = None,
+    api_key: Optional[str] = None,
+    reraise: bool = True,
+):
+    """
+    Runs the generation, resuming after the last stage a previous attempt
+    saved. Failures are recorded on the task status and raised again, so a
+    queued task is retried, unless ``reraise`` is off.
+    """
+    # We need a new session for the background task
+    async for session in get_async_session():
+        status = None
+        try:
+            # Re-fetch status to attach to new session
+            status = await session.get(
+                AsyncPresentationGenerationTaskModel, presentation_id
+            )
+            presentation = await session.get(PresentationModel, presentation_id)
+
+            # A retried queue task resumes after the last stage it saved
+            if presentation.structure:
+                status.message = "Generating slides and assets..."
+                status.status = "processing"
+                session.add(status)
+                await session.commit()
+
+                await PresentationService.run_full_generation_pipeline(
+                    session, presentation_id, async_status=status, export_as=None
+                )
+
+            elif request.pipelined and not presentation.outlines:
+                # Outlines, layout fetch and slide content overlap
+                status.message = "Generating outlines and slides..."
                 status.status = "processing"
                 session.add(status)
                 await session.commit()
-                
-                await PresentationService.generate_outlines(session, presentation.id)
-                
+
+                await PresentationService.run_pipelined_generation_pipeline(
+                    session,
+                    presentation_id,
+                    get_layout_by_name(
+                        request.template,
+                        ordered=request.ordered,
+                        auth_token=auth_token,
+                        api_key=api_key,
+                    ),
+                    async_status=status,
+                    export_as=None,
+                )
+            else:
+                # A. Generate Outlines
+                status.status = "processing"
+                if not presentation.outlines:
+                    status.message = "Generating outlines..."
+                    session.add(status)
+                    await session.commit()
+
+                    await PresentationService.generate_outlines(
+                        session, presentation_id
+                    )
+
                 # B. Prepare Structure
                 status.message = "Preparing structure..."
                 session.add(status)
                 await session.commit()
-                
+
                 layout_model = await get_layout_by_name(
                     request.template,
                     ordered=request.ordered,
@@ -103,38 +214,70 @@ async def autogenerate_presentation(
                     api_key=api_key,
                 )
                 await PresentationService.prepare_structure(
-                    session, presentation.id, layout_model
+                    session, presentation_id, layout_model
                 )
-                
+
                 # C. Run Full Pipeline (Content + Assets + Export)
                 status.message = "Generating slides and assets..."
                 session.add(status)
                 await session.commit()
-                
+
                 await PresentationService.run_full_generation_pipeline(
-                    session, 
-                    presentation.id, 
-                    async_status=status,
-                    export_as=None
+                    session, presentation_id, async_status=status, export_as=None
                 )
 
-            except Exception as e:
-                 # Error handling is largely done inside run_full_generation_pipeline 
-                 # but we catch top-level errors here for the earlier steps
-                 print(f"Autogeneration failed: {e}")
-                 # Ensure status is updated if not already
-                 if status and status.status != "error":
-                     status.status = "error"
-                     status.message = str(e)
-                     session.add(status)
-                     await session.commit()
+        except Exception as e:
+            # Error handling is largely done inside run_full_generation_pipeline
+            # but we catch top-level errors here for the earlier steps
+            logger.exception(f"Autogeneration failed for {presentation_id}")
+            # Ensure status is updated if not already
+            if status and status.status != "error":
+                status.status = "error"
+                status.message = str(e)
+                session.add(status)
+                await session.commit()
+            if reraise:
+                raise
+
 
-    # 5. Launch Background Task
-    background_tasks.add_task(run_autogeneration)
+async def get_user_auth_token(user_id: uuid.UUID) -> Optional[str]:
+    """
+    Signs a fresh access token for a queued task, so the request credentials
+    never have to be stored with it. None if the user was deactivated since.
+    """
+    async with async_session_maker() as session:
+        user = await session.get(UserModel, user_id)
+    if not user or not user.is_active:
+        return None
+    token, _ = create_access_token(user)
+    return token
 
-    return {
-        "presentation_id": str(presentation.id),
-        "status": "pending",
-        "message": "Generation started in background",
-        "poll_url": f"/api/v1/ppt/presentation/status/{presentation.id}" # Assuming status endpoint exists or we rely on GET /presentation
-    }
+
+async def run_queued_autogeneration(task: AsyncPresentationGenerationTaskModel):
+    payload = task.payload or {}
+    with TRACER.start_span(
+        "presentation.generate_queued",
+        {"presentation.id": str(task.id), "queue.attempt": task.attempts},
+        traceparent=payload.get("traceparent"),
+        kind="consumer",
+    ):
+        profile = (
+            PROFILER.profile(
+                "presentation.generate_queued", {"presentation_id": str(task.id)}
+            )
+            if payload.get("profile")
+            else nullcontext()
+        )
+        if payload.get("api_key_id"):
+            set_token_usage_api_key(uuid.UUID(payload["api_key_id"]))
+        auth_token = (
+            await get_user_auth_token(uuid.UUID(payload["user_id"]))
+            if payload.get("user_id")
+            else None
+        )
+        async with profile:
+            await run_autogeneration(
+                task.id,
+                GeneratePresentationRequest(**payload["request"]),
+                auth_token,
+            )
@@ -1,5 +1,7 @@
+import asyncio
 from http.client import HTTPException
 import os
+import shutil
 from typing import Annotated, List, Optional
 from fastapi import APIRouter, Body, File, UploadFile
 
@@ -13,6 +15,12 @@ from utils.validators import validate_files
 FILES_ROUTER = APIRouter(prefix="/files", tags=["Files"])
 
 
+def _write_upload(file: UploadFile, path: str):
+    # Uploads go up to 100 MB, so they are copied in chunks off the event loop
+    with open(path, "wb") as f:
+        shutil.copyfileobj(file.file, f)
+
+
 @FILES_ROUTER.post("/upload", response_model=List[str])
 async def upload_files(files: Optional[List[UploadFile]]):
     if not files:
@@ -28,9 +36,7 @@ async def upload_files(files: Optional[List[UploadFile]]):
             temp_path = TEMP_FILE_SERVICE.create_temp_file_path(
                 each_file.filename, temp_dir
             )
-            with open(temp_path, "wb") as f:
-                content = await each_file.read()
-                f.write(content)
+            await asyncio.to_thread(_write_upload, each_file, temp_path)
 
             temp_files.append(temp_path)
 
@@ -81,7 +87,6 @@ async def update_files(
     file_path: Annotated[str, Body()],
     file: Annotated[UploadFile, File()],
 ):
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
+    await asyncio.to_thread(_write_upload, file, file_path)
 
     return {"message": "File updated successfully"}
@@ -1,9 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, File, Query, UploadFile, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 
+from models.image_asset_summary import ImageAssetSummary
 from models.image_prompt import ImagePrompt
+from models.paginated_response import PaginatedResponse
 from models.sql.image_asset import ImageAsset
 from services.database import get_async_session
 from services.image_generation_service import ImageGenerationService
@@ -11,6 +13,13 @@ from utils.asset_directory_utils import get_images_directory
 import os
 import uuid
 from utils.file_utils import get_file_name_with_random_uuid
+from utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    apply_keyset_pagination,
+    get_page,
+    parse_fields,
+)
 
 IMAGES_ROUTER = APIRouter(prefix="/images", tags=["Images"])
 
@@ -103,3 +112,51 @@ async def delete_uploaded_image_by_id(
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete image: {str(e)}")
+
+
+IMAGE_ASSET_SUMMARY_FIELDS = list(ImageAssetSummary.model_fields)
+
+
+@IMAGES_ROUTER.get(
+    "/list",
+    response_model=PaginatedResponse[ImageAssetSummary],
+    response_model_exclude_unset=True,
+)
+async def list_images(
+    uploaded: bool = Query(False, description="List uploaded instead of generated images"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma separated fields to return, out of {', '.join(IMAGE_ASSET_SUMMARY_FIELDS)}",
+    ),
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Paginated version of /generated and /uploaded.
+    """
+    fields = parse_fields(fields, IMAGE_ASSET_SUMMARY_FIELDS, ["id"])
+
+    # id and created_at are always read for the cursor
+    query = select(
+        *[
+            getattr(ImageAsset, name)
+            for name in dict.fromkeys(["id", "created_at", *fields])
+        ]
+    ).where(ImageAsset.is_uploaded == uploaded)
+    query = apply_keyset_pagination(
+        query, ImageAsset.created_at, ImageAsset.id, limit, cursor
+    )
+
+    rows = (await sql_session.execute(query)).all()
+    rows, next_cursor = get_page(rows, limit, lambda row: (row.created_at, row.id))
+
+    return PaginatedResponse[ImageAssetSummary](
+        items=[
+            ImageAssetSummary(**{name: getattr(row, name) for name in fields})
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
@@ -19,6 +19,7 @@ from models.sse_response import (
 from services.temp_file_service import TEMP_FILE_SERVICE
 from services.database import get_async_session
 from services.documents_loader import DocumentsLoader
+from services.token_usage_service import track_token_usage
 from utils.llm_calls.generate_presentation_outlines import generate_ppt_outline
 from utils.json_repair import repair_json_string
 from utils.ppt_utils import get_presentation_title_from_outlines
@@ -40,7 +41,8 @@ async def stream_outlines(
 
     temp_dir = TEMP_FILE_SERVICE.create_temp_dir()
 
-    async def inner():
+    @track_token_usage()
+    async def inner(presentation_id: uuid.UUID):
         if presentation.outlines:
             logger.info(f"Outlines already exist for presentation {id}. Returning cached result.")
             yield SSECompleteResponse(
@@ -136,4 +138,4 @@ async def stream_outlines(
             key="presentation", value=presentation.model_dump(mode="json")
         ).to_string()
 
-    return StreamingResponse(inner(), media_type="text/event-stream")
+    return StreamingResponse(inner(id), media_type="text/event-stream")
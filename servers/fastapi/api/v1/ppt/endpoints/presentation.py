@@ -5,17 +5,20 @@ import json
 import math
 import os
 import random
+import time
 import traceback
 from urllib.parse import quote_plus
 from typing import Annotated, List, Literal, Optional, Tuple
 import dirtyjson
-from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Path, Request
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, HTTPException, Path, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
 from constants.presentation import DEFAULT_TEMPLATES
 from models.api_error_model import APIErrorModel
+from models.json_patch_operation import JsonPatchOperation
+from models.paginated_response import PaginatedResponse
 from models.presentation_and_path import PresentationPathAndEditPath
 from models.presentation_from_template import EditPresentationRequest
 from models.presentation_outline_model import (
@@ -27,6 +30,7 @@ from enums.verbosity import Verbosity
 from models.pptx_models import PptxPresentationModel
 from models.presentation_layout import PresentationLayoutModel
 from models.presentation_structure_model import PresentationStructureModel
+from models.presentation_summary import PresentationSummary
 from models.presentation_with_slides import (
     PresentationWithSlides,
 )
@@ -35,19 +39,37 @@ from models.sql.template import TemplateModel
 from utils.get_layout_by_name import get_layout_by_name
 from services.image_generation_service import ImageGenerationService
 from utils.dict_utils import deep_update
+from utils.json_patch import JsonPatchError, apply_json_patch
 from utils.export_utils import export_presentation
 from utils.llm_calls.generate_presentation_outlines import generate_ppt_outline
+from utils.slide_persistence import SLIDE_CONTENT_FIELDS, save_presentation_slides
+from utils.pagination_utils import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    apply_keyset_pagination,
+    get_page,
+    parse_fields,
+)
 from models.sql.slide import SlideModel
 from models.sse_response import SSECompleteResponse, SSEErrorResponse, SSEResponse
 
 from services.database import async_session_maker, get_async_session
+from services.generation_write_buffer import GenerationWriteBuffer
+from services.stream_event_log_service import STREAM_EVENT_LOG
+from services.stream_pubsub_service import STREAM_LOCK_SECONDS, STREAM_PUBSUB
 from services.temp_file_service import TEMP_FILE_SERVICE
+from services.token_usage_service import track_token_usage
 from models.sql.presentation import PresentationModel
 from services.pptx_presentation_creator import PptxPresentationCreator
 from models.sql.async_presentation_generation_status import (
     AsyncPresentationGenerationTaskModel,
 )
 from utils.asset_directory_utils import get_exports_directory, get_images_directory
+from utils.get_env import (
+    get_stream_session_max_bytes_env,
+    get_stream_session_ttl_seconds_env,
+    get_stream_sessions_max_bytes_env,
+)
 from utils.llm_calls.generate_presentation_structure import (
     generate_presentation_structure,
 )
@@ -73,25 +95,79 @@ logger = setup_logger(__name__)
 PRESENTATION_ROUTER = APIRouter(prefix="/presentation", tags=["Presentation"])
 
 
+# Late subscribers only need the last of these, so they replace the replay buffer
+FINAL_EVENT_PREFIXES = (
+    'event: response\ndata: {"type": "complete"',
+    'event: response\ndata: {"type": "error"',
+)
+# Chunks concatenate into the presentation json, so they can be folded together
+CHUNK_EVENT_PREFIX = 'event: response\ndata: {"type": "chunk"'
+# Keepalives only go to live subscribers
+PING_EVENT_PREFIX = "event: ping"
+STREAM_RELAY_RETRY_SECONDS = 1
+# Attempts to relay what is left once the stream is done, before giving up
+STREAM_RELAY_FINAL_ATTEMPTS = 5
+
+
+def _chunk_event(chunk: str) -> str:
+    return SSEResponse(
+        event="response", data=json.dumps({"type": "chunk", "chunk": chunk})
+    ).to_string()
+
+
+def _get_event_chunk(event: str) -> Optional[str]:
+    if not event.startswith(CHUNK_EVENT_PREFIX):
+        return None
+    data = event[len("event: response\ndata: ") :].rstrip("\n")
+    return json.loads(data)["chunk"]
+
+
 @dataclass
 class PresentationStreamSession:
     presentation_id: uuid.UUID
     subscribers: set[asyncio.Queue[tuple[int, str]]] = field(default_factory=set)
+    # Replay state: the chunks streamed so far folded into one snapshot, and
+    # the events published after it
+    snapshot: str = ""
+    # Event id and end offset in the snapshot of every folded chunk
+    snapshot_offsets: list[tuple[int, int]] = field(default_factory=list)
     buffer: list[tuple[int, str]] = field(default_factory=list)
+    buffer_bytes: int = 0
+    max_buffer_bytes: int = 8 * 1024 * 1024
     next_event_id: int = 0
     done: bool = False
+    completed: bool = False
+    finished_at: Optional[float] = None
     worker_task: Optional[asyncio.Task] = None
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
-
-    def publish(self, event: str):
-        self.next_event_id += 1
-        event_id = self.next_event_id
+    # Events waiting to be relayed to other processes or the event log
+    relay_backlog: Optional[list[tuple[int, Optional[str]]]] = None
+    relay_wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def publish(self, event: str, event_id: Optional[int] = None):
+        # Events relayed from another process keep their original ids
+        if event_id is None:
+            self.next_event_id += 1
+            event_id = self.next_event_id
+        else:
+            self.next_event_id = max(self.next_event_id, event_id)
         payload = (event_id, event)
 
-        self.buffer.append(payload)
-        # Keep a bounded replay buffer.
-        if len(self.buffer) > 1000:
-            self.buffer = self.buffer[-1000:]
+        if not event.startswith(PING_EVENT_PREFIX):
+            if event.startswith(FINAL_EVENT_PREFIXES):
+                self.snapshot = ""
+                self.snapshot_offsets = []
+                self.buffer = []
+                self.buffer_bytes = 0
+                self.completed = event.startswith(FINAL_EVENT_PREFIXES[0])
+            self.buffer.append(payload)
+            self.buffer_bytes += len(event)
+            if self.buffer_bytes > self.max_buffer_bytes:
+                self.compact()
+
+            if self.relay_backlog is not None:
+                self.relay_backlog.append(payload)
+                self.relay_wakeup.set()
 
         dead_subscribers = []
         for queue in self.subscribers:
@@ -103,28 +179,319 @@ class PresentationStreamSession:
         for queue in dead_subscribers:
             self.subscribers.discard(queue)
 
+    def compact(self):
+        """
+        Folds the leading chunk events of the buffer into the snapshot. Nothing
+        is dropped, a stream in progress stays over the budget if its chunks
+        alone are larger.
+        """
+        while self.buffer:
+            event_id, event = self.buffer[0]
+            chunk = _get_event_chunk(event)
+            if chunk is None:
+                break
+            self.buffer.pop(0)
+            self.snapshot += chunk
+            self.snapshot_offsets.append((event_id, len(self.snapshot)))
+            self.buffer_bytes += len(chunk) - len(event)
+
+    def get_replay_events(self, last_event_id: int) -> list[tuple[int, str]]:
+        """Events a subscriber that has seen up to ``last_event_id`` is missing."""
+        replay_events = []
+        if self.snapshot_offsets and self.snapshot_offsets[-1][0] > last_event_id:
+            # Only the part of the snapshot the subscriber has not seen yet
+            start = 0
+            for event_id, end in self.snapshot_offsets:
+                if event_id > last_event_id:
+                    break
+                start = end
+            replay_events.append(
+                (self.snapshot_offsets[-1][0], _chunk_event(self.snapshot[start:]))
+            )
+        replay_events.extend(
+            (event_id, event)
+            for event_id, event in self.buffer
+            if event_id > last_event_id
+        )
+        return replay_events
+
+    @property
+    def finished(self) -> bool:
+        return self.done or (
+            self.worker_task is not None and self.worker_task.done()
+        )
+
+    async def relay_events(self):
+        """
+        Forward published events to the pub/sub backend and event log until
+        done. Events that fail to send are kept and sent again with the next
+        ones, so a transient error never silently cuts off the followers.
+        """
+        pubsub_events: list[tuple[int, Optional[str]]] = []
+        log_events: list[tuple[int, Optional[str]]] = []
+        final_attempts = 0
+        while True:
+            await self.relay_wakeup.wait()
+            self.relay_wakeup.clear()
+            events, self.relay_backlog = self.relay_backlog, []
+            done = self.done
+            if done and final_attempts == 0:
+                events.append((self.next_event_id + 1, None))
+            if STREAM_PUBSUB.distributed:
+                pubsub_events += events
+            if STREAM_EVENT_LOG.enabled:
+                log_events += events
+
+            pubsub_events = await self._relay(STREAM_PUBSUB.publish, pubsub_events)
+            log_events = await self._relay(STREAM_EVENT_LOG.append, log_events)
+
+            if done:
+                final_attempts += 1
+                if not (pubsub_events or log_events):
+                    self.relay_backlog = None
+                    return
+                if final_attempts >= STREAM_RELAY_FINAL_ATTEMPTS:
+                    logger.error(
+                        f"Dropping {len(pubsub_events) + len(log_events)} "
+                        f"unrelayed stream events for {self.presentation_id}"
+                    )
+                    self.relay_backlog = None
+                    return
+            if pubsub_events or log_events:
+                await asyncio.sleep(STREAM_RELAY_RETRY_SECONDS)
+                self.relay_wakeup.set()
+
+    async def _relay(
+        self, send, events: list[tuple[int, Optional[str]]]
+    ) -> list[tuple[int, Optional[str]]]:
+        """Sends ``events`` with ``send``, returning the ones still to send."""
+        if not events:
+            return events
+        try:
+            await send(self.presentation_id, events)
+            return []
+        except Exception as e:
+            logger.warning(
+                f"Failed to relay {len(events)} stream events for "
+                f"{self.presentation_id}, retrying: {e}"
+            )
+            return events
+
+
+class PresentationStreamSessionRegistry:
+    """
+    Stream sessions of this process. Finished sessions stay around for a TTL
+    so reconnecting clients get the final snapshot instead of a new
+    generation. Over the global byte budget finished sessions are dropped and
+    replay buffers of running ones compacted into their snapshots.
+    """
+
+    def __init__(
+        self,
+        session_ttl: float = 300,
+        max_session_bytes: int = 8 * 1024 * 1024,
+        max_total_bytes: int = 256 * 1024 * 1024,
+        janitor_interval: float = 30,
+    ):
+        self.session_ttl = session_ttl
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self.janitor_interval = janitor_interval
+        self.sessions: dict[uuid.UUID, PresentationStreamSession] = {}
+        self.lock = asyncio.Lock()
+        self._janitor_task: Optional[asyncio.Task] = None
+
+    def __contains__(self, presentation_id: uuid.UUID) -> bool:
+        return presentation_id in self.sessions
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def get(self, presentation_id: uuid.UUID) -> Optional[PresentationStreamSession]:
+        return self.sessions.get(presentation_id)
+
+    async def get_or_create(
+        self, presentation_id: uuid.UUID
+    ) -> PresentationStreamSession:
+        if self._janitor_task is None or self._janitor_task.done():
+            self._janitor_task = asyncio.create_task(self.run_janitor())
+
+        async with self.lock:
+            session = self.sessions.get(presentation_id)
+            if session is None:
+                session = PresentationStreamSession(
+                    presentation_id=presentation_id,
+                    max_buffer_bytes=self.max_session_bytes,
+                )
+                self.sessions[presentation_id] = session
+            return session
+
+    async def discard(
+        self,
+        presentation_id: uuid.UUID,
+        session: Optional[PresentationStreamSession] = None,
+    ):
+        """Drops a finished session, or ``session`` if it is still the current one."""
+        async with self.lock:
+            current = self.sessions.get(presentation_id)
+            if current is None:
+                return
+            if (session is None and current.finished) or current is session:
+                self.sessions.pop(presentation_id)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(session.buffer_bytes for session in self.sessions.values())
+
+    async def evict(self, now: Optional[float] = None) -> int:
+        """Drops expired sessions and compacts replay buffers over the byte budget."""
+        now = time.monotonic() if now is None else now
+        async with self.lock:
+            expired = []
+            for presentation_id, session in self.sessions.items():
+                if not session.finished:
+                    continue
+                if session.finished_at is None:
+                    session.finished_at = now
+                elif now - session.finished_at >= self.session_ttl:
+                    expired.append(presentation_id)
+            for presentation_id in expired:
+                self.sessions.pop(presentation_id)
+
+            total_bytes = self.total_bytes
+            if total_bytes > self.max_total_bytes:
+                # Oldest finished sessions go first, then the largest buffers
+                # are compacted
+                finished = sorted(
+                    (
+                        session
+                        for session in self.sessions.values()
+                        if session.finished_at is not None
+                    ),
+                    key=lambda session: session.finished_at,
+                )
+                for session in finished:
+                    if total_bytes <= self.max_total_bytes:
+                        break
+                    self.sessions.pop(session.presentation_id)
+                    total_bytes -= session.buffer_bytes
+                    expired.append(session.presentation_id)
+
+                for session in sorted(
+                    self.sessions.values(),
+                    key=lambda session: session.buffer_bytes,
+                    reverse=True,
+                ):
+                    if total_bytes <= self.max_total_bytes:
+                        break
+                    buffer_bytes = session.buffer_bytes
+                    session.compact()
+                    total_bytes -= buffer_bytes - session.buffer_bytes
+
+            return len(expired)
+
+    async def run_janitor(self):
+        while self.sessions:
+            await asyncio.sleep(self.janitor_interval)
+            try:
+                n_evicted = await self.evict()
+                if n_evicted:
+                    logger.info(f"Evicted {n_evicted} stream sessions")
+            except Exception:
+                logger.exception("Failed to evict stream sessions")
+
 
-STREAM_SESSIONS: dict[uuid.UUID, PresentationStreamSession] = {}
-STREAM_SESSIONS_LOCK = asyncio.Lock()
+STREAM_SESSIONS = PresentationStreamSessionRegistry(
+    session_ttl=get_stream_session_ttl_seconds_env() or 300,
+    max_session_bytes=get_stream_session_max_bytes_env() or 8 * 1024 * 1024,
+    max_total_bytes=get_stream_sessions_max_bytes_env() or 256 * 1024 * 1024,
+)
+
+
+async def run_stream_session(stream_session: PresentationStreamSession):
+    """
+    Generate the stream in this process if it wins the generator lock for the
+    presentation, otherwise relay the events of the process that holds it.
+    """
+    id = stream_session.presentation_id
+    try:
+        if await STREAM_PUBSUB.acquire_generator_lock(id):
+            await run_stream_generation_with_lock(stream_session)
+            return
+
+        logger.info(f"Following stream generated by another process: {id}")
+        async for event_id, event in STREAM_PUBSUB.subscribe(
+            id, stream_session.next_event_id
+        ):
+            if event is None:
+                return
+            stream_session.publish(event, event_id)
+
+        # A reconnect will find the lock free and resume from the saved slides
+        logger.warning(f"Stream generator for {id} stopped without finishing")
+        stream_session.publish(
+            SSEErrorResponse(detail="Slide generation was interrupted").to_string()
+        )
+    except Exception:
+        logger.exception(f"Unexpected error relaying stream for presentation {id}")
+        stream_session.publish(
+            SSEErrorResponse(detail="Unexpected error during slide generation").to_string()
+        )
+    finally:
+        stream_session.done = True
 
 
-async def get_or_create_stream_session(
-    presentation_id: uuid.UUID,
-) -> PresentationStreamSession:
-    async with STREAM_SESSIONS_LOCK:
-        session = STREAM_SESSIONS.get(presentation_id)
-        if session is None:
-            session = PresentationStreamSession(presentation_id=presentation_id)
-            STREAM_SESSIONS[presentation_id] = session
-        return session
+async def run_stream_generation_with_lock(stream_session: PresentationStreamSession):
+    id = stream_session.presentation_id
+    # Ids start from the current time so a Last-Event-ID left over from an
+    # earlier stream of this presentation never hides events of a new one
+    stream_session.next_event_id = max(
+        stream_session.next_event_id, int(time.time() * 1000)
+    )
 
+    relay_task = None
+    if STREAM_PUBSUB.distributed or STREAM_EVENT_LOG.enabled:
+        # Relay events of an earlier stream were dropped with the lock
+        if STREAM_EVENT_LOG.enabled:
+            await STREAM_EVENT_LOG.reset(id)
+        stream_session.relay_backlog = []
+        relay_task = asyncio.create_task(stream_session.relay_events())
 
+    worker_task = asyncio.create_task(run_stream_generation_worker(stream_session))
+    try:
+        while True:
+            finished, _ = await asyncio.wait(
+                {worker_task}, timeout=STREAM_LOCK_SECONDS / 3
+            )
+            if finished:
+                break
+            if not await STREAM_PUBSUB.renew_generator_lock(id):
+                logger.warning(f"Lost stream generator lock for {id}, stopping")
+                worker_task.cancel()
+    finally:
+        if not worker_task.done():
+            worker_task.cancel()
+        await asyncio.gather(worker_task, return_exceptions=True)
+        if relay_task:
+            stream_session.done = True
+            stream_session.relay_wakeup.set()
+            try:
+                await relay_task
+            except Exception:
+                logger.exception(f"Failed to relay stream events for {id}")
+        await STREAM_PUBSUB.release_generator_lock(id)
+
+
+@track_token_usage("stream_session.presentation_id")
 async def run_stream_generation_worker(
     stream_session: PresentationStreamSession,
 ):
     id = stream_session.presentation_id
     try:
-        async with async_session_maker() as sql_session:
+        async with (
+            async_session_maker() as sql_session,
+            GenerationWriteBuffer() as write_buffer,
+        ):
             presentation = await sql_session.get(PresentationModel, id)
             if not presentation:
                 stream_session.publish(
@@ -144,6 +511,15 @@ async def run_stream_generation_worker(
                 )
                 return
 
+            # Slides of an earlier, interrupted stream are resumed
+            existing_slides = {
+                slide.index: slide
+                for slide in await sql_session.scalars(
+                    select(SlideModel).where(SlideModel.presentation == id)
+                )
+            }
+            # Writes go through the write buffer from here on
+            sql_session.expunge_all()
             image_generation_service = ImageGenerationService(get_images_directory())
 
             structure = presentation.get_structure()
@@ -151,6 +527,7 @@ async def run_stream_generation_worker(
             outline = presentation.get_presentation_outline()
 
             async_assets_generation_tasks = []
+            asset_slides: List[SlideModel] = []
             slides: List[SlideModel] = []
 
             logger.info(
@@ -166,19 +543,16 @@ async def run_stream_generation_worker(
             for i, slide_layout_index in enumerate(structure.slides):
                 slide_layout = layout.slides[slide_layout_index]
 
-                existing_slide = await sql_session.scalar(
-                    select(SlideModel).where(
-                        SlideModel.presentation == id, SlideModel.index == i
-                    )
-                )
+                existing_slide = existing_slides.get(i)
 
                 if existing_slide:
                     if str(existing_slide.layout) != str(slide_layout.id):
                         logger.info(
                             f"Slide {i+1} layout mismatch (DB: {existing_slide.layout}, Expected: {slide_layout.id}). Regenerating."
                         )
-                        await sql_session.delete(existing_slide)
-                        await sql_session.commit()
+                        write_buffer.execute(
+                            delete(SlideModel).where(SlideModel.id == existing_slide.id)
+                        )
                         existing_slide = None
                     else:
                         logger.info(f"Found existing slide {i+1} (Resume)")
@@ -195,6 +569,7 @@ async def run_stream_generation_worker(
                                     image_generation_service, slide
                                 )
                             )
+                            asset_slides.append(slide)
 
                         stream_session.publish(
                             SSEResponse(
@@ -257,13 +632,12 @@ async def run_stream_generation_worker(
 
                 process_slide_add_placeholder_assets(slide)
 
-                sql_session.add(slide)
-                await sql_session.commit()
-                await sql_session.refresh(slide)
+                write_buffer.add(slide)
 
                 async_assets_generation_tasks.append(
                     process_slide_and_fetch_assets(image_generation_service, slide)
                 )
+                asset_slides.append(slide)
 
                 logger.debug(f"Yielding slide {i+1}")
                 stream_session.publish(
@@ -289,22 +663,26 @@ async def run_stream_generation_worker(
                 generated_assets.extend(assets_list)
             logger.info("Asset generation finished")
 
-            for slide in slides:
-                slide.content = dict(slide.content)
-
             valid_slide_ids = [s.id for s in slides]
-            await sql_session.execute(
+            write_buffer.execute(
                 delete(SlideModel).where(
                     SlideModel.presentation == id,
                     SlideModel.id.notin_(valid_slide_ids),
                 )
             )
-            await sql_session.commit()
-
-            sql_session.add(presentation)
-            sql_session.add_all(slides)
-            sql_session.add_all(generated_assets)
-            await sql_session.commit()
+            # Asset urls were filled into the content in place
+            for slide in asset_slides:
+                write_buffer.add(slide, modified=["content"])
+            write_buffer.add_all(generated_assets)
+            await write_buffer.flush()
+            if write_buffer.dropped_writes:
+                # A resumed stream regenerates the slides that were not saved
+                stream_session.publish(
+                    SSEErrorResponse(
+                        detail="Failed to save the generated slides"
+                    ).to_string()
+                )
+                return
 
             response = PresentationWithSlides(
                 **presentation.model_dump(),
@@ -327,6 +705,21 @@ async def run_stream_generation_worker(
         stream_session.done = True
 
 
+def _with_event_id(event: str, event_id: int) -> str:
+    return f"id: {event_id}\n{event}"
+
+
+def _get_last_event_id(http_request: Request) -> int:
+    # Browsers send the header on reconnect, other clients may use the query
+    last_event_id = http_request.headers.get(
+        "Last-Event-ID"
+    ) or http_request.query_params.get("last_event_id")
+    try:
+        return max(int(last_event_id), 0) if last_event_id else 0
+    except ValueError:
+        return 0
+
+
 def _extract_auth_context(http_request: Request) -> Tuple[Optional[str], Optional[str]]:
     authorization_header = http_request.headers.get("Authorization")
     auth_token = None
@@ -378,6 +771,62 @@ async def get_all_presentations(sql_session: AsyncSession = Depends(get_async_se
     return presentations_with_slides
 
 
+PRESENTATION_SUMMARY_FIELDS = list(PresentationSummary.model_fields)
+
+
+@PRESENTATION_ROUTER.get(
+    "/list",
+    response_model=PaginatedResponse[PresentationSummary],
+    response_model_exclude_unset=True,
+)
+async def list_presentations(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page"
+    ),
+    fields: Optional[str] = Query(
+        None,
+        description=f"Comma separated fields to return, out of {', '.join(PRESENTATION_SUMMARY_FIELDS)}",
+    ),
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Paginated, lightweight version of /all. Only the requested columns are
+    read, and the first slide is joined only when first_slide is requested.
+    """
+    fields = parse_fields(fields, PRESENTATION_SUMMARY_FIELDS, ["id"])
+    column_names = [field for field in fields if field != "first_slide"]
+
+    # id and created_at are always read for the cursor
+    query = select(
+        *[
+            getattr(PresentationModel, name)
+            for name in dict.fromkeys(["id", "created_at", *column_names])
+        ]
+    )
+    if "first_slide" in fields:
+        query = query.add_columns(SlideModel).outerjoin(
+            SlideModel,
+            (SlideModel.presentation == PresentationModel.id) & (SlideModel.index == 0),
+        )
+    query = apply_keyset_pagination(
+        query, PresentationModel.created_at, PresentationModel.id, limit, cursor
+    )
+
+    rows = (await sql_session.execute(query)).all()
+    rows, next_cursor = get_page(rows, limit, lambda row: (row.created_at, row.id))
+
+    items = []
+    for row in rows:
+        item = {name: getattr(row, name) for name in column_names}
+        if "first_slide" in fields:
+            first_slide = row.SlideModel
+            item["first_slide"] = first_slide.model_dump() if first_slide else None
+        items.append(PresentationSummary(**item))
+
+    return PaginatedResponse[PresentationSummary](items=items, next_cursor=next_cursor)
+
+
 @PRESENTATION_ROUTER.get("/{id}", response_model=PresentationWithSlides)
 async def get_presentation(
     id: uuid.UUID, sql_session: AsyncSession = Depends(get_async_session)
@@ -406,6 +855,8 @@ async def delete_presentation(
 
     await sql_session.delete(presentation)
     await sql_session.commit()
+    await STREAM_SESSIONS.discard(id)
+    await STREAM_EVENT_LOG.delete(id)
     logger.info(f"Deleted presentation: {id}")
 
 
@@ -458,6 +909,9 @@ async def prepare_presentation(
     if not outlines:
         raise HTTPException(status_code=400, detail="Outlines are required")
 
+    # A new structure makes the snapshot of an earlier stream stale
+    await STREAM_SESSIONS.discard(presentation_id)
+
     return await PresentationService.prepare_structure(
         sql_session, presentation_id, layout, outlines, title
     )
@@ -474,26 +928,45 @@ async def stream_presentation(
     if not presentation:
         raise HTTPException(status_code=404, detail="Presentation not found")
 
-    stream_session = await get_or_create_stream_session(id)
+    last_event_id = _get_last_event_id(http_request)
+
+    # Catch up from the event log once the in-memory session is gone
+    if last_event_id and STREAM_EVENT_LOG.enabled and id not in STREAM_SESSIONS:
+        logged_events = await STREAM_EVENT_LOG.get_events_after(id, last_event_id)
+        if logged_events is not None:
+            logger.info(f"Resuming stream {id} from event log after {last_event_id}")
+            return StreamingResponse(
+                (_with_event_id(event, event_id) for event_id, event in logged_events),
+                media_type="text/event-stream",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "X-Accel-Buffering": "no",
+                },
+            )
+
+    stream_session = await STREAM_SESSIONS.get_or_create(id)
 
     async with stream_session.lock:
         if not stream_session.done and (
             stream_session.worker_task is None or stream_session.worker_task.done()
         ):
             stream_session.worker_task = asyncio.create_task(
-                run_stream_generation_worker(stream_session)
+                run_stream_session(stream_session)
             )
 
     subscriber_queue: asyncio.Queue[tuple[int, str]] = asyncio.Queue(maxsize=256)
     stream_session.subscribers.add(subscriber_queue)
-    replay_events = list(stream_session.buffer)
+    replay_events = stream_session.get_replay_events(last_event_id)
 
     async def inner():
         try:
-            last_replayed_event_id = replay_events[-1][0] if replay_events else 0
+            last_replayed_event_id = (
+                replay_events[-1][0] if replay_events else last_event_id
+            )
 
-            for _, event in replay_events:
-                yield event
+            for event_id, event in replay_events:
+                yield _with_event_id(event, event_id)
 
             while True:
                 if await http_request.is_disconnected():
@@ -509,7 +982,7 @@ async def stream_presentation(
                     if event_id <= last_replayed_event_id:
                         continue
                     last_replayed_event_id = event_id
-                    yield event
+                    yield _with_event_id(event, event_id)
                 except asyncio.TimeoutError:
                     # Keep client-side EventSource alive while waiting for new events.
                     yield SSEResponse(
@@ -518,11 +991,14 @@ async def stream_presentation(
                     ).to_string()
         finally:
             stream_session.subscribers.discard(subscriber_queue)
-            if stream_session.done and not stream_session.subscribers:
-                async with STREAM_SESSIONS_LOCK:
-                    current = STREAM_SESSIONS.get(id)
-                    if current is stream_session:
-                        STREAM_SESSIONS.pop(id, None)
+            # Only completed streams are worth keeping for reconnects, a new
+            # request after an error should try generating again
+            if (
+                stream_session.done
+                and not stream_session.completed
+                and not stream_session.subscribers
+            ):
+                await STREAM_SESSIONS.discard(id, stream_session)
 
     return StreamingResponse(
         inner(),
@@ -562,12 +1038,11 @@ async def update_presentation(
             slide.presentation = uuid.UUID(slide.presentation)
             slide.id = uuid.UUID(slide.id)
 
-        await sql_session.execute(
-            delete(SlideModel).where(SlideModel.presentation == presentation.id)
-        )
-        sql_session.add_all(slides)
+        # Autosave usually changes a single slide, so only the diff is written
+        await save_presentation_slides(sql_session, presentation.id, slides)
 
     await sql_session.commit()
+    await STREAM_SESSIONS.discard(id)
 
     return PresentationWithSlides(
         **presentation.model_dump(),
@@ -575,6 +1050,49 @@ async def update_presentation(
     )
 
 
+@PRESENTATION_ROUTER.patch("/update/slide", response_model=SlideModel)
+async def update_presentation_slide(
+    id: Annotated[uuid.UUID, Body()],
+    operations: Annotated[List[JsonPatchOperation], Body()],
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Partially updates a single slide with JSON patch operations. Paths are
+    relative to the slide, e.g. /content/title or /speaker_note.
+    """
+    slide = await sql_session.get(SlideModel, id)
+    if not slide:
+        raise HTTPException(status_code=404, detail="Slide not found")
+
+    slide_fields = {key: getattr(slide, key) for key in SLIDE_CONTENT_FIELDS}
+    try:
+        patched_fields = apply_json_patch(
+            slide_fields,
+            [operation.model_dump(exclude_unset=True) for operation in operations],
+        )
+    except JsonPatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    unknown_fields = set(patched_fields) - set(SLIDE_CONTENT_FIELDS)
+    if unknown_fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Slide fields can not be added: {', '.join(sorted(unknown_fields))}",
+        )
+    for key in SLIDE_CONTENT_FIELDS:
+        if key not in patched_fields:
+            raise HTTPException(
+                status_code=400, detail=f"Slide field can not be removed: {key}"
+            )
+        if patched_fields[key] != slide_fields[key]:
+            setattr(slide, key, patched_fields[key])
+
+    await sql_session.commit()
+    await STREAM_SESSIONS.discard(slide.presentation)
+
+    return slide
+
+
 @PRESENTATION_ROUTER.post("/export/pptx", response_model=str)
 async def export_presentation_as_pptx(
     pptx_model: Annotated[PptxPresentationModel, Body()],
@@ -7,6 +7,7 @@ from models.sql.presentation import PresentationModel
 from models.sql.slide import SlideModel
 from services.database import get_async_session
 from services.image_generation_service import ImageGenerationService
+from services.token_usage_service import token_usage_scope
 from utils.asset_directory_utils import get_images_directory
 from utils.llm_calls.edit_slide import get_edited_slide_content
 from utils.llm_calls.edit_slide_html import get_edited_slide_html
@@ -32,13 +33,14 @@ async def edit_slide(
         raise HTTPException(status_code=404, detail="Presentation not found")
 
     presentation_layout = presentation.get_layout()
-    slide_layout = await get_slide_layout_from_prompt(
-        prompt, presentation_layout, slide
-    )
+    with token_usage_scope(presentation.id):
+        slide_layout = await get_slide_layout_from_prompt(
+            prompt, presentation_layout, slide
+        )
 
-    edited_slide_content = await get_edited_slide_content(
-        prompt, slide, presentation.language, slide_layout
-    )
+        edited_slide_content = await get_edited_slide_content(
+            prompt, slide, presentation.language, slide_layout
+        )
 
     image_generation_service = ImageGenerationService(get_images_directory())
 
@@ -77,7 +79,8 @@ async def edit_slide_html(
     if not html_to_edit:
         raise HTTPException(status_code=400, detail="No HTML to edit")
 
-    edited_slide_html = await get_edited_slide_html(prompt, html_to_edit)
+    with token_usage_scope(slide.presentation):
+        edited_slide_html = await get_edited_slide_html(prompt, html_to_edit)
 
     # Always assign a new unique id to the slide
     # This is to ensure that the nextjs can track slide updates
@@ -1,17 +1,18 @@
 import os
 import base64
 from datetime import datetime
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import re
 from uuid import UUID
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Depends
+from fastapi import APIRouter, HTTPException, File, UploadFile, Form, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
-from openai import APIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete, func
 from utils.asset_directory_utils import get_images_directory
 from services.database import get_async_session
+from services.openai_client import OPENAI_CLIENTS
+from services.template_layout_cache import TEMPLATE_LAYOUT_CACHE
 from models.sql.presentation_layout_code import PresentationLayoutCodeModel
 from .prompts import (
     GENERATE_HTML_SYSTEM_PROMPT,
@@ -19,6 +20,12 @@ from .prompts import (
     HTML_EDIT_SYSTEM_PROMPT,
 )
 from models.sql.template import TemplateModel
+from models.template_import_job import TemplateImportJobStatus, TemplateImportSlide
+from services.template_import_service import (
+    TEMPLATE_IMPORT_SERVICE,
+    TemplateImportJob,
+)
+from api.v1.ppt.endpoints.pptx_slides import SlideData
 
 
 # Create separate routers for each functionality
@@ -28,6 +35,7 @@ HTML_EDIT_ROUTER = APIRouter(prefix="/html-edit", tags=["html-edit"])
 LAYOUT_MANAGEMENT_ROUTER = APIRouter(
     prefix="/template-management", tags=["template-management"]
 )
+TEMPLATE_IMPORT_ROUTER = APIRouter(prefix="/template-import", tags=["template-import"])
 
 
 # Request/Response models for slide-to-html endpoint
@@ -129,6 +137,15 @@ class TemplateInfo(BaseModel):
     created_at: Optional[datetime] = None
 
 
+# Request models for the batched template import
+class TemplateImportRequest(BaseModel):
+    slides: List[SlideData]  # Slides returned by /pptx-slides/process
+
+
+class TemplateImportRetryRequest(BaseModel):
+    slide_numbers: Optional[List[int]] = None  # Defaults to every slide not done
+
+
 async def generate_html_from_slide(
     base64_image: str,
     media_type: str,
@@ -152,14 +169,13 @@ async def generate_html_from_slide(
     Raises:
         HTTPException: If API call fails or no content is generated
     """
+    from openai import APIError
+
     print(
         f"Generating HTML from slide image and XML using OpenAI GPT-5 Responses API..."
     )
     try:
-        client = OpenAI(
-            api_key=api_key,
-            base_url=os.getenv("TEMPLATE_API_BASE"),
-        )
+        client = OPENAI_CLIENTS.get(api_key, os.getenv("TEMPLATE_API_BASE"))
 
         # Compose input for Responses API. Include system prompt, image (separate), OXML and optional fonts text.
         data_url = f"data:{media_type};base64,{base64_image}"
@@ -181,7 +197,7 @@ async def generate_html_from_slide(
         ]
 
         print("Making Responses API request for HTML generation...")
-        response = client.responses.create(
+        response = await client.responses.create(
             model=os.getenv("TEMPLATE_MODEL", "gpt-5"),
             input=input_payload,
             reasoning={"effort": "high"},
@@ -250,11 +266,10 @@ async def generate_react_component_from_html(
     Raises:
         HTTPException: If API call fails or no content is generated
     """
+    from openai import APIError
+
     try:
-        client = OpenAI(
-            api_key=api_key,
-            base_url=os.getenv("TEMPLATE_API_BASE"),
-        )
+        client = OPENAI_CLIENTS.get(api_key, os.getenv("TEMPLATE_API_BASE"))
 
         print("Making Responses API request for React component generation...")
 
@@ -269,7 +284,7 @@ async def generate_react_component_from_html(
             {"role": "user", "content": content_parts},
         ]
 
-        response = client.responses.create(
+        response = await client.responses.create(
             model=os.getenv("TEMPLATE_MODEL", "gpt-5"),
             input=input_payload,
             reasoning={"effort": "minimal"},
@@ -363,11 +378,10 @@ async def edit_html_with_images(
     Raises:
         HTTPException: If API call fails or no content is generated
     """
+    from openai import APIError
+
     try:
-        client = OpenAI(
-            api_key=api_key,
-            base_url=os.getenv("TEMPLATE_API_BASE"),
-        )
+        client = OPENAI_CLIENTS.get(api_key, os.getenv("TEMPLATE_API_BASE"))
 
         print("Making Responses API request for HTML editing...")
 
@@ -394,7 +408,7 @@ async def edit_html_with_images(
             {"role": "user", "content": content_parts},
         ]
 
-        response = client.responses.create(
+        response = await client.responses.create(
             model=os.getenv("TEMPLATE_MODEL", "gpt-5"),
             input=input_payload,
             reasoning={"effort": "low"},
@@ -444,6 +458,81 @@ async def edit_html_with_images(
             )
 
 
+IMAGE_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+
+def resolve_image_path(image_path: str) -> str:
+    """Resolves an image URL served by the app to its path on disk."""
+    if image_path.startswith("/app_data/images/"):
+        # Remove the /app_data/images/ prefix and join with actual images directory
+        relative_path = image_path[len("/app_data/images/") :]
+        return os.path.join(get_images_directory(), relative_path)
+    if image_path.startswith("/static/"):
+        relative_path = image_path[len("/static/") :]
+        return os.path.join("static", relative_path)
+    # Assume it's already a full path or relative to images directory
+    if os.path.isabs(image_path):
+        return image_path
+    return os.path.join(get_images_directory(), image_path)
+
+
+def read_image_as_base64(image_path: str) -> Optional[Tuple[str, str]]:
+    """Returns the base64 data and media type of an image, or None if it is missing."""
+    actual_image_path = resolve_image_path(image_path)
+    if not os.path.exists(actual_image_path):
+        return None
+
+    with open(actual_image_path, "rb") as image_file:
+        base64_image = base64.b64encode(image_file.read()).decode("utf-8")
+    file_extension = os.path.splitext(actual_image_path)[1].lower()
+    return base64_image, IMAGE_MEDIA_TYPES.get(file_extension, "image/png")
+
+
+async def convert_slide_image_to_html(
+    image_path: str,
+    xml_content: str,
+    api_key: str,
+    fonts: Optional[List[str]] = None,
+) -> str:
+    image = read_image_as_base64(image_path)
+    if image is None:
+        raise HTTPException(
+            status_code=404, detail=f"Image file not found: {image_path}"
+        )
+    base64_image, media_type = image
+
+    html_content = await generate_html_from_slide(
+        base64_image=base64_image,
+        media_type=media_type,
+        xml_content=xml_content,
+        api_key=api_key,
+        fonts=fonts,
+    )
+    return html_content.replace("```html", "").replace("```", "")
+
+
+async def convert_html_to_react_component(
+    html_content: str, api_key: str, image_path: Optional[str] = None
+) -> str:
+    # The image only gives visual context, so a missing one is skipped
+    image = read_image_as_base64(image_path) if image_path else None
+    base64_image, media_type = image or (None, None)
+
+    react_component = await generate_react_component_from_html(
+        html_content=html_content,
+        api_key=api_key,
+        image_base64=base64_image,
+        media_type=media_type,
+    )
+    return react_component.replace("```tsx", "").replace("```", "")
+
+
 # ENDPOINT 1: Slide to HTML conversion
 @SLIDE_TO_HTML_ROUTER.post("/", response_model=SlideToHtmlResponse)
 async def convert_slide_to_html(request: SlideToHtmlRequest):
@@ -464,58 +553,10 @@ async def convert_slide_to_html(request: SlideToHtmlRequest):
                 status_code=500, detail="TEMPLATE_API_KEY environment variable not set"
             )
 
-        # Resolve image path to actual file system path
-        image_path = request.image
-
-        # Handle different path formats
-        if image_path.startswith("/app_data/images/"):
-            # Remove the /app_data/images/ prefix and join with actual images directory
-            relative_path = image_path[len("/app_data/images/") :]
-            actual_image_path = os.path.join(get_images_directory(), relative_path)
-        elif image_path.startswith("/static/"):
-            # Handle static files
-            relative_path = image_path[len("/static/") :]
-            actual_image_path = os.path.join("static", relative_path)
-        else:
-            # Assume it's already a full path or relative to images directory
-            if os.path.isabs(image_path):
-                actual_image_path = image_path
-            else:
-                actual_image_path = os.path.join(get_images_directory(), image_path)
-
-        # Check if image file exists
-        if not os.path.exists(actual_image_path):
-            raise HTTPException(
-                status_code=404, detail=f"Image file not found: {image_path}"
-            )
-
-        # Read and encode image to base64
-        with open(actual_image_path, "rb") as image_file:
-            image_content = image_file.read()
-        base64_image = base64.b64encode(image_content).decode("utf-8")
-
-        # Determine media type from file extension
-        file_extension = os.path.splitext(actual_image_path)[1].lower()
-        media_type_map = {
-            ".png": "image/png",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".gif": "image/gif",
-            ".webp": "image/webp",
-        }
-        media_type = media_type_map.get(file_extension, "image/png")
-
-        # Generate HTML using the extracted function
-        html_content = await generate_html_from_slide(
-            base64_image=base64_image,
-            media_type=media_type,
-            xml_content=request.xml,
-            api_key=api_key,
-            fonts=request.fonts,
+        html_content = await convert_slide_image_to_html(
+            request.image, request.xml, api_key, request.fonts
         )
 
-        html_content = html_content.replace("```html", "").replace("```", "")
-
         return SlideToHtmlResponse(success=True, html=html_content)
 
     except HTTPException:
@@ -553,45 +594,10 @@ async def convert_html_to_react(request: HtmlToReactRequest):
         if not request.html or not request.html.strip():
             raise HTTPException(status_code=400, detail="HTML content cannot be empty")
 
-        # Optionally resolve image and encode to base64
-        image_b64 = None
-        media_type = None
-        if request.image:
-            image_path = request.image
-            if image_path.startswith("/app_data/images/"):
-                relative_path = image_path[len("/app_data/images/") :]
-                actual_image_path = os.path.join(get_images_directory(), relative_path)
-            elif image_path.startswith("/static/"):
-                relative_path = image_path[len("/static/") :]
-                actual_image_path = os.path.join("static", relative_path)
-            else:
-                actual_image_path = (
-                    image_path
-                    if os.path.isabs(image_path)
-                    else os.path.join(get_images_directory(), image_path)
-                )
-            if os.path.exists(actual_image_path):
-                with open(actual_image_path, "rb") as f:
-                    image_b64 = base64.b64encode(f.read()).decode("utf-8")
-                ext = os.path.splitext(actual_image_path)[1].lower()
-                media_type = {
-                    ".png": "image/png",
-                    ".jpg": "image/jpeg",
-                    ".jpeg": "image/jpeg",
-                    ".gif": "image/gif",
-                    ".webp": "image/webp",
-                }.get(ext, "image/png")
-
-        # Convert HTML to React component
-        react_component = await generate_react_component_from_html(
-            html_content=request.html,
-            api_key=api_key,
-            image_base64=image_b64,
-            media_type=media_type,
+        react_component = await convert_html_to_react_component(
+            request.html, api_key, request.image
         )
 
-        react_component = react_component.replace("```tsx", "").replace("```", "")
-
         return HtmlToReactResponse(
             success=True,
             react_component=react_component,
@@ -793,6 +799,7 @@ async def save_layouts(
             saved_count += 1
 
         await session.commit()
+        TEMPLATE_LAYOUT_CACHE.invalidate()
 
         return SaveLayoutsResponse(
             success=True,
@@ -1054,6 +1061,7 @@ async def create_template(
                 )
             )
         await session.commit()
+        TEMPLATE_LAYOUT_CACHE.invalidate()
 
         # Read back
         template = await session.get(TemplateModel, request.id)
@@ -1093,5 +1101,114 @@ async def delete_template(
             )
         )
         await session.commit()
+        TEMPLATE_LAYOUT_CACHE.invalidate()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete template")
+
+
+def _get_template_api_key() -> str:
+    api_key = os.getenv("TEMPLATE_API_KEY")
+    if not api_key:
+        raise HTTPException(
+            status_code=500, detail="TEMPLATE_API_KEY environment variable not set"
+        )
+    return api_key
+
+
+async def _get_template_import_job_or_404(id: UUID) -> TemplateImportJob:
+    job = await TEMPLATE_IMPORT_SERVICE.get_job(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Template import not found")
+    return job
+
+
+async def _start_template_import(
+    job: TemplateImportJob, slide_numbers: Optional[List[int]] = None
+):
+    api_key = _get_template_api_key()
+
+    async def convert_to_html(slide: TemplateImportSlide) -> str:
+        return await convert_slide_image_to_html(
+            slide.screenshot_url, slide.xml_content, api_key, slide.normalized_fonts
+        )
+
+    async def convert_to_react(slide: TemplateImportSlide) -> str:
+        return await convert_html_to_react_component(
+            slide.html, api_key, slide.screenshot_url
+        )
+
+    await TEMPLATE_IMPORT_SERVICE.start(
+        job, convert_to_html, convert_to_react, slide_numbers
+    )
+
+
+# ENDPOINT 4: Batched slide to HTML to React conversion of a whole template
+@TEMPLATE_IMPORT_ROUTER.post(
+    "/", response_model=TemplateImportJobStatus, status_code=202
+)
+async def start_template_import(request: TemplateImportRequest):
+    """
+    Starts converting every slide of a processed PPTX to HTML and then to a
+    React component, concurrently. Follow the progress on /{id}/stream.
+    """
+    if not request.slides:
+        raise HTTPException(status_code=400, detail="Slides are required")
+    _get_template_api_key()
+
+    job = await TEMPLATE_IMPORT_SERVICE.create_job(
+        TemplateImportSlide(**slide.model_dump()) for slide in request.slides
+    )
+    await _start_template_import(job)
+    return job.get_status()
+
+
+@TEMPLATE_IMPORT_ROUTER.get("/{id}", response_model=TemplateImportJobStatus)
+async def get_template_import(id: UUID):
+    return (await _get_template_import_job_or_404(id)).get_status()
+
+
+@TEMPLATE_IMPORT_ROUTER.post("/{id}/retry", response_model=TemplateImportJobStatus)
+async def retry_template_import(id: UUID, request: TemplateImportRetryRequest):
+    """
+    Converts again the slides that are not done, keeping the HTML of slides
+    that only failed on the React step.
+    """
+    job = await _get_template_import_job_or_404(id)
+    await _start_template_import(job, request.slide_numbers)
+    return job.get_status()
+
+
+@TEMPLATE_IMPORT_ROUTER.get("/{id}/stream")
+async def stream_template_import(id: UUID, http_request: Request):
+    """
+    Streams slide events as each slide progresses, with its partial results,
+    and a complete event with the job status once all slides are processed.
+    Reconnects resume after the Last-Event-ID header or last_event_id query.
+    """
+    job = await _get_template_import_job_or_404(id)
+
+    last_event_id = http_request.headers.get(
+        "Last-Event-ID"
+    ) or http_request.query_params.get("last_event_id")
+    try:
+        last_event_id = max(int(last_event_id), 0) if last_event_id else 0
+    except ValueError:
+        last_event_id = 0
+
+    async def inner():
+        async for event_id, event in TEMPLATE_IMPORT_SERVICE.subscribe(
+            job.id, last_event_id
+        ):
+            if await http_request.is_disconnected():
+                break
+            yield event if event_id is None else f"id: {event_id}\n{event}"
+
+    return StreamingResponse(
+        inner(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
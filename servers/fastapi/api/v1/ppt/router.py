@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
 
-from api.deps import enforce_ppt_access
+from api.deps import authorize_profiling, enforce_ppt_access
 
-from api.v1.ppt.endpoints.slide_to_html import SLIDE_TO_HTML_ROUTER, HTML_TO_REACT_ROUTER, HTML_EDIT_ROUTER, LAYOUT_MANAGEMENT_ROUTER
+from api.v1.ppt.endpoints.slide_to_html import SLIDE_TO_HTML_ROUTER, HTML_TO_REACT_ROUTER, HTML_EDIT_ROUTER, LAYOUT_MANAGEMENT_ROUTER, TEMPLATE_IMPORT_ROUTER
 from api.v1.ppt.endpoints.presentation import PRESENTATION_ROUTER
 from api.v1.ppt.endpoints.anthropic import ANTHROPIC_ROUTER
 from api.v1.ppt.endpoints.google import GOOGLE_ROUTER
@@ -23,7 +23,7 @@ from api.v1.ppt.endpoints.templates import TEMPLATES_ROUTER
 
 API_V1_PPT_ROUTER = APIRouter(
     prefix="/api/v1/ppt",
-    dependencies=[Depends(enforce_ppt_access)],
+    dependencies=[Depends(enforce_ppt_access), Depends(authorize_profiling)],
 )
 
 API_V1_PPT_ROUTER.include_router(FILES_ROUTER)
@@ -36,6 +36,7 @@ API_V1_PPT_ROUTER.include_router(SLIDE_TO_HTML_ROUTER)
 API_V1_PPT_ROUTER.include_router(HTML_TO_REACT_ROUTER)
 API_V1_PPT_ROUTER.include_router(HTML_EDIT_ROUTER)
 API_V1_PPT_ROUTER.include_router(LAYOUT_MANAGEMENT_ROUTER)
+API_V1_PPT_ROUTER.include_router(TEMPLATE_IMPORT_ROUTER)
 API_V1_PPT_ROUTER.include_router(IMAGES_ROUTER)
 API_V1_PPT_ROUTER.include_router(ICONS_ROUTER)
 API_V1_PPT_ROUTER.include_router(OLLAMA_ROUTER)
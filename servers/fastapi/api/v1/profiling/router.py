@@ -0,0 +1,35 @@
+import asyncio
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import FileResponse
+
+from api.deps import require_roles
+from enums.user_role import UserRole
+from services.profiling_service import PROFILER
+
+API_V1_PROFILING_ROUTER = APIRouter(
+    prefix="/api/v1/profiles",
+    tags=["Profiling"],
+    dependencies=[Depends(require_roles(UserRole.admin))],
+)
+
+
+@API_V1_PROFILING_ROUTER.get("", response_model=List[dict])
+async def list_profiles(limit: int = Query(default=20, ge=1, le=100)):
+    """
+    Recent profiles of requests made with an ``X-Profile: true`` header or a
+    ``profile=true`` query parameter, newest first.
+    """
+    return await asyncio.to_thread(PROFILER.list_profiles, limit)
+
+
+@API_V1_PROFILING_ROUTER.get("/{profile_id}")
+async def get_profile(profile_id: str = Path(...)):
+    """The folded stacks of a profile, for flamegraph.pl or speedscope."""
+    path = PROFILER.get_profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        path, media_type="text/plain", filename=f"{profile_id}.folded"
+    )
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from enums.webhook_event import WebhookEvent
 from models.sql.webhook_subscription import WebhookSubscription
 from services.database import get_async_session
+from services.webhook_service import WEBHOOK_DELIVERY_WORKER, WebhookService
 
 API_V1_WEBHOOK_ROUTER = APIRouter(
     prefix="/api/v1/webhook",
@@ -20,6 +21,13 @@ API_V1_WEBHOOK_ROUTER = APIRouter(
 class SubscribeToWebhookRequest(BaseModel):
     url: str = Field(description="The URL to send the webhook to")
     secret: Optional[str] = Field(None, description="The secret to use for the webhook")
+    send_secret_as_bearer: bool = Field(
+        False,
+        description=(
+            "Also send the secret as a bearer token, for receivers that do not "
+            "verify the X-Webhook-Signature header"
+        ),
+    )
     event: WebhookEvent = Field(description="The event to subscribe to")
 
 
@@ -37,6 +45,7 @@ async def subscribe_to_webhook(
     webhook_subscription = WebhookSubscription(
         url=body.url,
         secret=body.secret,
+        send_secret_as_bearer=body.send_secret_as_bearer,
         event=body.event,
     )
     sql_session.add(webhook_subscription)
@@ -58,3 +67,13 @@ async def unsubscribe_to_webhook(
 
     await sql_session.delete(webhook_subscription)
     await sql_session.commit()
+
+
+@API_V1_WEBHOOK_ROUTER.get("/metrics")
+async def get_webhook_metrics(
+    sql_session: AsyncSession = Depends(get_async_session),
+):
+    return {
+        "worker": WEBHOOK_DELIVERY_WORKER.metrics.to_dict(),
+        "backlog": await WebhookService.get_backlog(sql_session),
+    }
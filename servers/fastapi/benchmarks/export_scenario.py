@@ -0,0 +1,56 @@
+"""
+Generates decks, then measures exporting them. Only the exports are timed,
+the peak RSS covers generation as well.
+
+    python -m benchmarks.export_scenario --decks 20 --concurrency 4 --format pptx
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.harness import (
+    BenchmarkReport,
+    DeckTimer,
+    finish,
+    get_argument_parser,
+    run_benchmark_server,
+    run_decks,
+)
+
+
+async def main(args: argparse.Namespace):
+    report = BenchmarkReport(
+        f"export_{args.format}", args.decks, args.concurrency, args.slides
+    )
+    async with run_benchmark_server(args, report) as client:
+        presentation_ids = []
+
+        async def generate_deck(_: DeckTimer):
+            presentation_id = await client.generate(args.slides)
+            await client.wait_for_generation(presentation_id)
+            presentation_ids.append(presentation_id)
+
+        print(f"Generating {args.decks} decks to export...")
+        setup_report = BenchmarkReport(
+            "generate", args.decks, args.concurrency, args.slides
+        )
+        await run_decks(setup_report, generate_deck, args.timeout)
+        report.decks = len(presentation_ids)
+        report.errors += setup_report.errors
+        remaining_ids = iter(presentation_ids)
+
+        async def export_deck(_: DeckTimer):
+            await client.request(
+                "POST",
+                "/api/v1/ppt/presentation/export",
+                json={"id": next(remaining_ids), "export_as": args.format},
+            )
+
+        await run_decks(report, export_deck, args.timeout)
+    finish(args, report)
+
+
+if __name__ == "__main__":
+    parser = get_argument_parser(__doc__)
+    parser.add_argument("--format", choices=("pptx", "pdf"), default="pptx")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,43 @@
+"""
+Generates decks through /presentation/generate and polls each until its
+slides and assets are done.
+
+    python -m benchmarks.generate_scenario --decks 20 --concurrency 4
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.harness import (
+    BenchmarkReport,
+    DeckTimer,
+    finish,
+    get_argument_parser,
+    run_benchmark_server,
+    run_decks,
+)
+
+
+async def main(args: argparse.Namespace):
+    report = BenchmarkReport("generate", args.decks, args.concurrency, args.slides)
+    async with run_benchmark_server(args, report) as client:
+
+        async def run_deck(timer: DeckTimer):
+            presentation_id = await client.generate(
+                args.slides, pipelined=args.pipelined
+            )
+            timer.mark("accepted")
+            await client.wait_for_generation(presentation_id)
+
+        await run_decks(report, run_deck, args.timeout)
+    finish(args, report)
+
+
+if __name__ == "__main__":
+    parser = get_argument_parser(__doc__)
+    parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Generate slides while outlines are still streaming",
+    )
+    asyncio.run(main(parser.parse_args()))
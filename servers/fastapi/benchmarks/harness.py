@@ -0,0 +1,391 @@
+"""
+Runs the backend against fake LLM and image providers and a Next.js stub, so
+scenarios measure the throughput of this service alone and run offline.
+"""
+
+import argparse
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+import json
+import math
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from aiohttp import ClientSession, ClientTimeout
+
+from benchmarks.nextjs_stub import BENCHMARK_LAYOUT, NextjsStub
+
+FASTAPI_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_USERNAME = "benchmark"
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+def get_argument_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--decks", type=int, default=20, help="Decks to generate")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Decks in flight at a time"
+    )
+    parser.add_argument("--slides", type=int, default=8, help="Slides per deck")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Worker processes of the server"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database of the server, a new SQLite database by default",
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.5, help="Seconds to first token"
+    )
+    parser.add_argument(
+        "--llm-tokens-per-second", type=float, default=100.0, help="Decoding speed"
+    )
+    parser.add_argument(
+        "--llm-failure-rate", type=float, default=0.0, help="Share of failed LLM calls"
+    )
+    parser.add_argument(
+        "--image-latency", type=float, default=2.0, help="Seconds per image"
+    )
+    parser.add_argument(
+        "--image-failure-rate",
+        type=float,
+        default=0.0,
+        help="Share of failed image generations",
+    )
+    parser.add_argument(
+        "--pdf-latency", type=float, default=1.0, help="Seconds per PDF render"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=600.0, help="Seconds before a deck fails"
+    )
+    parser.add_argument(
+        "--json", dest="json_path", default=None, help="Also write the report here"
+    )
+    return parser
+
+
+def get_percentile(values: List[float], percentile: float) -> Optional[float]:
+    """Nearest rank percentile, the value that ``percentile`` % of values don't exceed."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def get_peak_rss_mb() -> float:
+    """Peak resident memory of the server processes that have exited."""
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+@dataclass
+class BenchmarkReport:
+    scenario: str
+    decks: int
+    concurrency: int
+    slides: int
+    succeeded: int = 0
+    failed: int = 0
+    duration_seconds: float = 0.0
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    peak_rss_mb: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def decks_per_minute(self) -> float:
+        if not self.duration_seconds:
+            return 0.0
+        return self.succeeded / self.duration_seconds * 60
+
+    def get_summary(self) -> dict:
+        return {
+            "scenario": self.scenario,
+            "decks": self.decks,
+            "concurrency": self.concurrency,
+            "slides": self.slides,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "decks_per_minute": round(self.decks_per_minute, 2),
+            "latency_seconds": {
+                name: {
+                    f"p{percentile}": get_percentile(values, percentile)
+                    for percentile in (50, 95, 99)
+                }
+                for name, values in self.latencies.items()
+            },
+            "peak_rss_mb": (
+                round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None
+            ),
+            # The first few are enough to see what went wrong
+            "errors": self.errors[:5],
+        }
+
+    def print(self):
+        summary = self.get_summary()
+        print("-" * 60)
+        print(
+            f"{self.scenario}: {self.succeeded}/{self.decks} decks, "
+            f"{self.slides} slides each, concurrency {self.concurrency}"
+        )
+        print(f"  duration        {summary['duration_seconds']:.1f} s")
+        print(f"  throughput      {summary['decks_per_minute']:.2f} decks/min")
+        for name, percentiles in summary["latency_seconds"].items():
+            values = "  ".join(
+                f"{key} {value:.2f} s" if value is not None else f"{key} -"
+                for key, value in percentiles.items()
+            )
+            print(f"  {name:<15} {values}")
+        if self.peak_rss_mb is not None:
+            print(f"  peak RSS        {self.peak_rss_mb:.1f} MB")
+        for error in summary["errors"]:
+            print(f"  error           {error}")
+        print("-" * 60)
+
+    def write(self, path: str):
+        with open(path, "w") as file:
+            json.dump({**self.get_summary(), "raw": asdict(self)}, file, indent=2)
+
+
+class DeckTimer:
+    """Records how long named steps of one deck took since the deck started."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, time.perf_counter() - self.started_at)
+
+
+def _get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BenchmarkServer:
+    """
+    The backend in a subprocess with the fake providers selected, so its peak
+    memory can be read once it exits and the load generator doesn't compete
+    with it for the event loop.
+    """
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.directory = tempfile.mkdtemp(prefix="presenton-benchmark-")
+        self.app_data_directory = os.path.join(self.directory, "app_data")
+        self.port = _get_free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.nextjs_stub = NextjsStub(
+            self.url, os.path.join(self.directory, "exports"), args.pdf_latency
+        )
+        self.token: Optional[str] = None
+        self._process: Optional[subprocess.Popen] = None
+
+    def get_env(self, nextjs_url: str) -> Dict[str, str]:
+        database_url = self.args.database_url or (
+            f"sqlite:///{os.path.join(self.directory, 'benchmark.db')}"
+        )
+        return {
+            **os.environ,
+            "LLM": "fake",
+            "IMAGE_PROVIDER": "fake",
+            "DISABLE_IMAGE_GENERATION": "false",
+            "FAKE_LLM_LATENCY_SECONDS": str(self.args.llm_latency),
+            "FAKE_LLM_TOKENS_PER_SECOND": str(self.args.llm_tokens_per_second),
+            "FAKE_LLM_FAILURE_RATE": str(self.args.llm_failure_rate),
+            "FAKE_IMAGE_LATENCY_SECONDS": str(self.args.image_latency),
+            "FAKE_IMAGE_FAILURE_RATE": str(self.args.image_failure_rate),
+            "NEXTJS_API_URL": nextjs_url,
+            "DATABASE_URL": database_url,
+            "APP_DATA_DIRECTORY": self.app_data_directory,
+            "TEMP_DIRECTORY": os.path.join(self.directory, "temp"),
+            "USER_CONFIG_PATH": os.path.join(self.directory, "userConfig.json"),
+            "JWT_SECRET": "benchmark-secret",
+            "CAN_CHANGE_KEYS": "true",
+        }
+
+    async def start(self):
+        nextjs_url = await self.nextjs_stub.start()
+        os.makedirs(self.app_data_directory, exist_ok=True)
+        self._process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "api.main:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--workers",
+                str(self.args.workers),
+                "--log-level",
+                "warning",
+            ],
+            cwd=FASTAPI_DIRECTORY,
+            env=self.get_env(nextjs_url),
+        )
+        await self._wait_until_ready()
+        self.token = await self._login()
+
+    async def _wait_until_ready(self, timeout: float = 120.0):
+        deadline = time.monotonic() + timeout
+        async with ClientSession() as session:
+            while time.monotonic() < deadline:
+                if self._process.poll() is not None:
+                    raise RuntimeError("Server exited before it was ready")
+                try:
+                    async with session.get(f"{self.url}/api/v1/health/ready") as response:
+                        if response.status == 200:
+                            return
+                except OSError:
+                    pass
+                await asyncio.sleep(0.25)
+        raise RuntimeError(f"Server was not ready after {timeout} seconds")
+
+    async def _login(self) -> str:
+        credentials = {"username": BENCHMARK_USERNAME, "password": BENCHMARK_PASSWORD}
+        async with ClientSession() as session:
+            # The first user is a superadmin
+            async with session.post(
+                f"{self.url}/api/v1/auth/register", json=credentials
+            ) as response:
+                if response.status not in (201, 409):
+                    raise RuntimeError(f"Register failed: {await response.text()}")
+            async with session.post(
+                f"{self.url}/api/v1/auth/login", json=credentials
+            ) as response:
+                response.raise_for_status()
+                return (await response.json())["access_token"]
+
+    async def stop(self) -> Optional[float]:
+        """Stops the server and returns its peak RSS in megabytes."""
+        peak_rss_mb = None
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                await asyncio.to_thread(self._process.wait, 30)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                await asyncio.to_thread(self._process.wait)
+            peak_rss_mb = get_peak_rss_mb()
+        await self.nextjs_stub.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+        return peak_rss_mb
+
+
+class BenchmarkClient:
+    def __init__(self, session: ClientSession, url: str):
+        self.session = session
+        self.url = url
+
+    async def request(self, method: str, path: str, **kwargs) -> dict:
+        async with self.session.request(method, f"{self.url}{path}", **kwargs) as response:
+            if response.status >= 400:
+                raise RuntimeError(
+                    f"{method} {path} returned {response.status}: {await response.text()}"
+                )
+            return await response.json()
+
+    async def stream_events(self, path: str) -> AsyncIterator[dict]:
+        """Yields the data of each server-sent event of a stream."""
+        async with self.session.get(f"{self.url}{path}") as response:
+            if response.status >= 400:
+                raise RuntimeError(
+                    f"GET {path} returned {response.status}: {await response.text()}"
+                )
+            async for line in response.content:
+                line = line.decode("utf-8").strip()
+                if line.startswith("data: "):
+                    yield json.loads(line[len("data: ") :])
+
+    async def generate(self, n_slides: int, **request) -> str:
+        response = await self.request(
+            "POST",
+            "/api/v1/ppt/presentation/generate",
+            json={
+                "content": "Quarterly business review for a growing software company",
+                "n_slides": n_slides,
+                "language": "English",
+                "template": BENCHMARK_LAYOUT["name"],
+                **request,
+            },
+        )
+        return response["presentation_id"]
+
+    async def wait_for_generation(
+        self, presentation_id: str, poll_interval: float = 0.25
+    ):
+        while True:
+            status = await self.request(
+                "GET", f"/api/v1/ppt/presentation/status/{presentation_id}"
+            )
+            if status["status"] == "completed":
+                return
+            if status["status"] == "error":
+                raise RuntimeError(f"Generation failed: {status.get('message')}")
+            await asyncio.sleep(poll_interval)
+
+
+async def run_decks(
+    report: BenchmarkReport,
+    run_deck: Callable[[DeckTimer], Awaitable[None]],
+    timeout: float,
+):
+    """Runs ``report.decks`` decks, ``report.concurrency`` at a time, and records their timings."""
+    semaphore = asyncio.Semaphore(report.concurrency)
+
+    async def run_one():
+        async with semaphore:
+            timer = DeckTimer()
+            try:
+                await asyncio.wait_for(run_deck(timer), timeout)
+            except Exception as e:
+                report.failed += 1
+                report.errors.append(f"{type(e).__name__}: {e}")
+                return
+            timer.mark("deck")
+            report.succeeded += 1
+            for name, seconds in timer.marks.items():
+                report.latencies.setdefault(name, []).append(seconds)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(run_one() for _ in range(report.decks)))
+    report.duration_seconds = time.perf_counter() - started_at
+
+
+@asynccontextmanager
+async def run_benchmark_server(
+    args: argparse.Namespace, report: BenchmarkReport
+) -> AsyncIterator[BenchmarkClient]:
+    server = BenchmarkServer(args)
+    try:
+        await server.start()
+        async with ClientSession(
+            headers={"Authorization": f"Bearer {server.token}"},
+            timeout=ClientTimeout(total=None, sock_read=args.timeout),
+        ) as session:
+            yield BenchmarkClient(session, server.url)
+    finally:
+        report.peak_rss_mb = await server.stop()
+
+
+def finish(args: argparse.Namespace, report: BenchmarkReport):
+    report.print()
+    if args.json_path:
+        report.write(args.json_path)
+    if report.failed and not report.succeeded:
+        sys.exit(1)
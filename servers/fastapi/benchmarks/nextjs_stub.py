@@ -0,0 +1,238 @@
+"""
+A stand-in for the Next.js endpoints the backend calls during generation and
+export, so benchmarks run without a browser or a network. Templates resolve to
+a small layout group, PPTX models are built from the slides of the presentation
+and PDF export waits for ``pdf_latency`` like a headless render would.
+"""
+
+import asyncio
+import os
+from typing import List, Optional
+import uuid
+
+from aiohttp import ClientSession, web
+
+BENCHMARK_LAYOUT = {
+    "name": "general",
+    "ordered": False,
+    "slides": [
+        {
+            "id": "general:title-slide",
+            "name": "Title Slide",
+            "description": "A title with a short subtitle",
+            "json_schema": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string", "minLength": 10, "maxLength": 60},
+                    "subtitle": {"type": "string", "minLength": 20, "maxLength": 120},
+                },
+                "required": ["title", "subtitle"],
+            },
+        },
+        {
+            "id": "general:bullet-points",
+            "name": "Bullet Points",
+            "description": "A title with a few bullet points",
+            "json_schema": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string", "minLength": 10, "maxLength": 60},
+                    "bullets": {
+                        "type": "array",
+                        "minItems": 3,
+                        "maxItems": 5,
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "heading": {
+                                    "type": "string",
+                                    "minLength": 5,
+                                    "maxLength": 40,
+                                },
+                                "description": {
+                                    "type": "string",
+                                    "minLength": 40,
+                                    "maxLength": 150,
+                                },
+                            },
+                            "required": ["heading", "description"],
+                        },
+                    },
+                },
+                "required": ["title", "bullets"],
+            },
+        },
+        {
+            "id": "general:image-and-text",
+            "name": "Image and Text",
+            "description": "A title and a paragraph next to an image",
+            "json_schema": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string", "minLength": 10, "maxLength": 60},
+                    "description": {
+                        "type": "string",
+                        "minLength": 100,
+                        "maxLength": 300,
+                    },
+                    "image": {
+                        "type": "object",
+                        "properties": {
+                            "__image_url__": {"type": "string", "format": "uri"},
+                            "__image_prompt__": {
+                                "type": "string",
+                                "minLength": 10,
+                                "maxLength": 50,
+                            },
+                        },
+                        "required": ["__image_url__", "__image_prompt__"],
+                    },
+                },
+                "required": ["title", "description", "image"],
+            },
+        },
+    ],
+}
+
+SLIDE_WIDTH = 1280
+SLIDE_HEIGHT = 720
+
+
+def _get_strings(content: object) -> List[str]:
+    if isinstance(content, str):
+        return [content]
+    if isinstance(content, dict):
+        return [
+            text
+            for key, value in content.items()
+            if not key.startswith("__")
+            for text in _get_strings(value)
+        ]
+    if isinstance(content, list):
+        return [text for value in content for text in _get_strings(value)]
+    return []
+
+
+def _get_image_urls(content: object) -> List[str]:
+    if isinstance(content, dict):
+        urls = [content["__image_url__"]] if content.get("__image_url__") else []
+        return urls + [
+            url for value in content.values() for url in _get_image_urls(value)
+        ]
+    if isinstance(content, list):
+        return [url for value in content for url in _get_image_urls(value)]
+    return []
+
+
+def get_pptx_model(presentation: dict) -> dict:
+    """A PPTX model with a text box per text field and a picture per image."""
+    slides = []
+    for slide in presentation.get("slides", []):
+        content = slide.get("content") or {}
+        texts = _get_strings(content)
+        shapes = [
+            {
+                "shape_type": "textbox",
+                "position": {
+                    "left": 40,
+                    "top": 40 + index * 60,
+                    "width": 720,
+                    "height": 50,
+                },
+                "paragraphs": [{"text": text}],
+            }
+            for index, text in enumerate(texts[:10])
+        ]
+        shapes += [
+            {
+                "shape_type": "picture",
+                "position": {"left": 800, "top": 120, "width": 440, "height": 480},
+                "clip": True,
+                "object_fit": {"fit": "cover"},
+                "picture": {"is_network": False, "path": url},
+            }
+            for url in _get_image_urls(content)
+            if os.path.isfile(url)
+        ]
+        slides.append({"shapes": shapes, "note": content.get("__speaker_note__")})
+    return {"name": presentation.get("title"), "slides": slides}
+
+
+class NextjsStub:
+    def __init__(self, backend_url: str, export_directory: str, pdf_latency: float):
+        self.backend_url = backend_url
+        self.export_directory = export_directory
+        self.pdf_latency = pdf_latency
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[ClientSession] = None
+
+    def get_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/templates", self.get_templates)
+        app.router.add_get("/api/template", self.get_template)
+        app.router.add_get(
+            "/api/presentation_to_pptx_model", self.get_presentation_to_pptx_model
+        )
+        app.router.add_post("/api/export-as-pdf", self.export_as_pdf)
+        return app
+
+    async def start(self) -> str:
+        self._session = ClientSession()
+        self._runner = web.AppRunner(self.get_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+        if self._session is not None:
+            await self._session.close()
+
+    async def get_templates(self, _: web.Request) -> web.Response:
+        return web.json_response(
+            [
+                {
+                    "templateID": BENCHMARK_LAYOUT["name"],
+                    "templateName": BENCHMARK_LAYOUT["name"],
+                    "files": [],
+                    "settings": {
+                        "description": "Benchmark layouts",
+                        "ordered": False,
+                        "default": True,
+                    },
+                }
+            ]
+        )
+
+    async def get_template(self, _: web.Request) -> web.Response:
+        return web.json_response(BENCHMARK_LAYOUT)
+
+    async def get_presentation_to_pptx_model(self, request: web.Request) -> web.Response:
+        # Next.js renders the presentation with the credentials of the export
+        presentation_id = request.query["id"]
+        async with self._session.get(
+            f"{self.backend_url}/api/v1/ppt/presentation/{presentation_id}",
+            headers={
+                key: value
+                for key, value in request.headers.items()
+                if key.lower() in ("authorization", "x-api-key", "traceparent")
+            },
+        ) as response:
+            if response.status != 200:
+                return web.Response(status=response.status, text=await response.text())
+            presentation = await response.json()
+        return web.json_response(get_pptx_model(presentation))
+
+    async def export_as_pdf(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        await asyncio.sleep(self.pdf_latency)
+        os.makedirs(self.export_directory, exist_ok=True)
+        path = os.path.join(self.export_directory, f"{body.get('title') or uuid.uuid4()}.pdf")
+        with open(path, "wb") as file:
+            file.write(b"%PDF-1.4\n%%EOF\n")
+        return web.json_response({"path": path})
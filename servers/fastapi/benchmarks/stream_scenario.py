@@ -0,0 +1,82 @@
+"""
+Drives the interactive flow: streams the outlines of a new presentation,
+prepares its structure and streams the slides until the stream completes.
+
+    python -m benchmarks.stream_scenario --decks 20 --concurrency 4
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.harness import (
+    BenchmarkClient,
+    BenchmarkReport,
+    DeckTimer,
+    finish,
+    get_argument_parser,
+    run_benchmark_server,
+    run_decks,
+)
+from benchmarks.nextjs_stub import BENCHMARK_LAYOUT
+
+
+async def stream_until_complete(
+    client: BenchmarkClient, path: str, timer: DeckTimer, first_chunk_mark: str
+) -> dict:
+    async for event in client.stream_events(path):
+        match event.get("type"):
+            case "chunk":
+                timer.mark(first_chunk_mark)
+            case "error":
+                raise RuntimeError(event.get("detail"))
+            case "complete":
+                return event["presentation"]
+    raise RuntimeError(f"Stream {path} ended before completing")
+
+
+async def main(args: argparse.Namespace):
+    report = BenchmarkReport("stream", args.decks, args.concurrency, args.slides)
+    async with run_benchmark_server(args, report) as client:
+
+        async def run_deck(timer: DeckTimer):
+            presentation = await client.request(
+                "POST",
+                "/api/v1/ppt/presentation/create",
+                json={
+                    "content": "Quarterly business review for a growing software company",
+                    "n_slides": args.slides,
+                    "language": "English",
+                },
+            )
+            presentation_id = presentation["id"]
+
+            presentation = await stream_until_complete(
+                client,
+                f"/api/v1/ppt/outlines/stream/{presentation_id}",
+                timer,
+                "first_outline",
+            )
+            timer.mark("outlines")
+
+            await client.request(
+                "POST",
+                "/api/v1/ppt/presentation/prepare",
+                json={
+                    "presentation_id": presentation_id,
+                    "outlines": presentation["outlines"]["slides"],
+                    "layout": BENCHMARK_LAYOUT,
+                },
+            )
+            await stream_until_complete(
+                client,
+                f"/api/v1/ppt/presentation/stream/{presentation_id}",
+                timer,
+                "first_slide",
+            )
+
+        await run_decks(report, run_deck, args.timeout)
+    finish(args, report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(get_argument_parser(__doc__).parse_args()))
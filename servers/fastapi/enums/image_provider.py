@@ -10,3 +10,4 @@ class ImageProvider(Enum):
     GPT_IMAGE_1_5 = "gpt-image-1.5"
     CUSTOM_OPENAI = "custom_openai"
     COMFYUI = "comfyui"
+    FAKE = "fake"
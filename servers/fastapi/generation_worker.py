@@ -0,0 +1,67 @@
+import argparse
+import asyncio
+import signal
+
+from dotenv import load_dotenv
+
+
+async def main(concurrency: int | None, poll_interval: float):
+    # Imported after .env is loaded so the database settings are picked up
+    from api.v1.ppt.endpoints.autogenerate import run_queued_autogeneration
+    from services.database import create_db_and_tables
+    from services.event_loop_stall_monitor import EVENT_LOOP_STALL_MONITOR
+    from services.generation_queue_service import GenerationWorker
+    from services.token_usage_service import TOKEN_USAGE_RECORDER
+    from services.tracing_service import TRACER
+
+    await create_db_and_tables()
+
+    worker = GenerationWorker(
+        run_queued_autogeneration,
+        concurrency=concurrency,
+        poll_interval=poll_interval,
+    )
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, worker.stop)
+        except NotImplementedError:
+            # Windows event loops don't support signal handlers
+            pass
+
+    EVENT_LOOP_STALL_MONITOR.start()
+    await worker.run()
+    EVENT_LOOP_STALL_MONITOR.stop()
+    await TOKEN_USAGE_RECORDER.stop()
+    TRACER.shutdown()
+
+
+if __name__ == "__main__":
+    # Load .env from project root (2 levels up)
+    load_dotenv("../../.env")
+    parser = argparse.ArgumentParser(
+        description="Run presentation generation workers for the durable queue"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum presentations generated at once by this process",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between queue polls when idle",
+    )
+    args = parser.parse_args()
+
+    print("Running startup tasks...")
+    try:
+        from utils.extract_icons import extract_icons
+        extract_icons()
+    except Exception as e:
+        print(f"Error extracting icons: {e}")
+
+    asyncio.run(main(args.concurrency, args.poll_interval))
@@ -17,11 +17,16 @@ if config.config_file_name is not None:
 from models.sql.presentation import PresentationModel
 from models.sql.slide import SlideModel
 from models.sql.template import TemplateModel
+from models.sql.template_import_job import TemplateImportJobModel
+from models.sql.template_import_event import TemplateImportEventModel
 from models.sql.image_asset import ImageAsset
 from models.sql.key_value import KeyValueSqlModel
 from models.sql.presentation_layout_code import PresentationLayoutCodeModel
 from models.sql.webhook_subscription import WebhookSubscription
+from models.sql.webhook_delivery import WebhookDeliveryModel
 from models.sql.async_presentation_generation_status import AsyncPresentationGenerationTaskModel
+from models.sql.presentation_stream_event import PresentationStreamEventModel
+from models.sql.presentation_stream_lock import PresentationStreamLockModel
 from models.sql.user import UserModel
 from models.sql.api_key import ApiKeyModel
 
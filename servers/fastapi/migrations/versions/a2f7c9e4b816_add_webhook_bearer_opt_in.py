@@ -0,0 +1,42 @@
+"""add_webhook_bearer_opt_in
+
+Revision ID: a2f7c9e4b816
+Revises: c5d1f8e3a7b4
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a2f7c9e4b816"
+down_revision: Union[str, Sequence[str], None] = "c5d1f8e3a7b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("webhook_subscriptions", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "send_secret_as_bearer",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.false(),
+            )
+        )
+    # Existing receivers were sent the bearer token, keep them working
+    op.execute(
+        sa.text(
+            "UPDATE webhook_subscriptions SET send_secret_as_bearer = :enabled "
+            "WHERE secret IS NOT NULL"
+        ).bindparams(enabled=True)
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("webhook_subscriptions", schema=None) as batch_op:
+        batch_op.drop_column("send_secret_as_bearer")
@@ -0,0 +1,62 @@
+"""add_webhook_deliveries_table
+
+Revision ID: b8d4f2a6c1e9
+Revises: f18c6d3e9a27
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+import db.types.guid
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8d4f2a6c1e9"
+down_revision: Union[str, Sequence[str], None] = "f18c6d3e9a27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "webhook_deliveries",
+        sa.Column("id", db.types.guid.GUID(), nullable=False),
+        sa.Column("subscription_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("event", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("lease_owner", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_status_code", sa.Integer(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_webhook_deliveries_available_at",
+        "webhook_deliveries",
+        ["available_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_webhook_deliveries_status_created_at",
+        "webhook_deliveries",
+        ["status", "created_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_webhook_deliveries_status_created_at", table_name="webhook_deliveries"
+    )
+    op.drop_index(
+        "ix_webhook_deliveries_available_at", table_name="webhook_deliveries"
+    )
+    op.drop_table("webhook_deliveries")
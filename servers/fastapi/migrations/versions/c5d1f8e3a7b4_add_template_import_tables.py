@@ -0,0 +1,57 @@
+"""add_template_import_tables
+
+Revision ID: c5d1f8e3a7b4
+Revises: e9c4a7b13f52
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+import db.types.guid
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d1f8e3a7b4"
+down_revision: Union[str, Sequence[str], None] = "e9c4a7b13f52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "template_import_jobs",
+        sa.Column("id", db.types.guid.GUID(), nullable=False),
+        sa.Column("slides", sa.JSON(), nullable=False),
+        sa.Column("lease_owner", sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_table(
+        "template_import_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_id", db.types.guid.GUID(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_template_import_events_job_id_event_id",
+        "template_import_events",
+        ["job_id", "event_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_template_import_events_job_id_event_id",
+        table_name="template_import_events",
+    )
+    op.drop_table("template_import_events")
+    op.drop_table("template_import_jobs")
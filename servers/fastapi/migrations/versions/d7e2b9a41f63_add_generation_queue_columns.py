@@ -0,0 +1,55 @@
+"""add_generation_queue_columns
+
+Revision ID: d7e2b9a41f63
+Revises: c3f8a12a4d9e
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7e2b9a41f63"
+down_revision: Union[str, Sequence[str], None] = "c3f8a12a4d9e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table(
+        "async_presentation_generation_tasks", schema=None
+    ) as batch_op:
+        batch_op.add_column(sa.Column("payload", sa.JSON(), nullable=True))
+        batch_op.add_column(
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column("available_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.add_column(sa.Column("lease_owner", sa.String(), nullable=True))
+        batch_op.add_column(
+            sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True)
+        )
+        batch_op.create_index(
+            "ix_async_presentation_generation_tasks_available_at",
+            ["available_at"],
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table(
+        "async_presentation_generation_tasks", schema=None
+    ) as batch_op:
+        batch_op.drop_index("ix_async_presentation_generation_tasks_available_at")
+        batch_op.drop_column("heartbeat_at")
+        batch_op.drop_column("lease_expires_at")
+        batch_op.drop_column("lease_owner")
+        batch_op.drop_column("available_at")
+        batch_op.drop_column("attempts")
+        batch_op.drop_column("payload")
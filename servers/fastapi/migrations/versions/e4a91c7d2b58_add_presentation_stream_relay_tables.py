@@ -0,0 +1,53 @@
+"""add_presentation_stream_relay_tables
+
+Revision ID: e4a91c7d2b58
+Revises: d7e2b9a41f63
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import db.types.guid
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a91c7d2b58"
+down_revision: Union[str, Sequence[str], None] = "d7e2b9a41f63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "presentation_stream_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("presentation_id", db.types.guid.GUID(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("event", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_presentation_stream_events_presentation_id"),
+        "presentation_stream_events",
+        ["presentation_id"],
+        unique=False,
+    )
+    op.create_table(
+        "presentation_stream_locks",
+        sa.Column("presentation_id", db.types.guid.GUID(), nullable=False),
+        sa.Column("owner", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("presentation_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("presentation_stream_locks")
+    op.drop_index(
+        op.f("ix_presentation_stream_events_presentation_id"),
+        table_name="presentation_stream_events",
+    )
+    op.drop_table("presentation_stream_events")
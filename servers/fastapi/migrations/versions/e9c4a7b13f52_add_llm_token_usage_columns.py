@@ -0,0 +1,46 @@
+"""add_llm_token_usage_columns
+
+Revision ID: e9c4a7b13f52
+Revises: b8d4f2a6c1e9
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e9c4a7b13f52"
+down_revision: Union[str, Sequence[str], None] = "b8d4f2a6c1e9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table_name in ("presentations", "api_keys"):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "llm_input_tokens",
+                    sa.Integer(),
+                    nullable=False,
+                    server_default="0",
+                )
+            )
+            batch_op.add_column(
+                sa.Column(
+                    "llm_output_tokens",
+                    sa.Integer(),
+                    nullable=False,
+                    server_default="0",
+                )
+            )
+
+
+def downgrade() -> None:
+    for table_name in ("api_keys", "presentations"):
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column("llm_output_tokens")
+            batch_op.drop_column("llm_input_tokens")
@@ -0,0 +1,76 @@
+"""add_hot_query_indexes
+
+Revision ID: f18c6d3e9a27
+Revises: e4a91c7d2b58
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f18c6d3e9a27"
+down_revision: Union[str, Sequence[str], None] = "e4a91c7d2b58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Composite indexes replace the single column ones they start with
+    op.create_index(
+        "ix_slides_presentation_index",
+        "slides",
+        ["presentation", "index"],
+        unique=False,
+    )
+    op.drop_index("ix_slides_presentation", table_name="slides")
+
+    op.create_index(
+        "ix_presentation_stream_events_presentation_id_event_id",
+        "presentation_stream_events",
+        ["presentation_id", "event_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_presentation_stream_events_presentation_id",
+        table_name="presentation_stream_events",
+    )
+
+    # Listings are paginated on (created_at, id), so id joins the indexes
+    op.create_index(
+        "ix_imageasset_is_uploaded_created_at_id",
+        "imageasset",
+        ["is_uploaded", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_presentations_created_at_id",
+        "presentations",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_presentations_created_at_id", table_name="presentations")
+    op.drop_index(
+        "ix_imageasset_is_uploaded_created_at_id", table_name="imageasset"
+    )
+
+    op.create_index(
+        "ix_presentation_stream_events_presentation_id",
+        "presentation_stream_events",
+        ["presentation_id"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_presentation_stream_events_presentation_id_event_id",
+        table_name="presentation_stream_events",
+    )
+
+    op.create_index(
+        "ix_slides_presentation", "slides", ["presentation"], unique=False
+    )
+    op.drop_index("ix_slides_presentation_index", table_name="slides")
@@ -51,3 +51,5 @@ class ApiKeyPublic(BaseModel):
     created_at: datetime
     last_used_at: Optional[datetime]
     is_active: bool
+    llm_input_tokens: int = 0
+    llm_output_tokens: int = 0
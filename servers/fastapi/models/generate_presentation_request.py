@@ -45,6 +45,10 @@ class GeneratePresentationRequest(BaseModel):
     export_as: Literal["pptx", "pdf"] = Field(
         default="pptx", description="Export format"
     )
+    pipelined: bool = Field(
+        default=False,
+        description="Start generating slides while outlines are still streaming (ordered templates only)",
+    )
     trigger_webhook: bool = Field(
         default=False, description="Whether to trigger subscribed webhooks"
     )
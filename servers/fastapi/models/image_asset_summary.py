@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from pydantic import BaseModel
+
+
+class ImageAssetSummary(BaseModel):
+    id: uuid.UUID
+    path: Optional[str] = None
+    is_uploaded: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    extras: Optional[dict] = None
@@ -0,0 +1,9 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+
+class JsonPatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace", "test"]
+    path: str
+    value: Any = None
@@ -1,6 +1,5 @@
 from typing import Any, List, Literal, Optional
 from pydantic import BaseModel
-from google.genai.types import Content as GoogleContent
 
 from models.llm_tool_call import AnthropicToolCall
 
@@ -27,7 +26,9 @@ class OpenAIAssistantMessage(LLMMessage):
 
 class GoogleAssistantMessage(LLMMessage):
     role: Literal["assistant"] = "assistant"
-    content: GoogleContent
+    # google.genai.types.Content, untyped so the Google SDK is only imported
+    # when Google is the selected provider
+    content: Any
 
 
 class AnthropicAssistantMessage(LLMMessage):
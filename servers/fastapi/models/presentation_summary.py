@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from pydantic import BaseModel
+
+from models.sql.slide import SlideModel
+
+
+class PresentationSummary(BaseModel):
+    """
+    Listing view of a presentation. Leaves out the layout, structure and
+    outlines JSON, and only carries the first slide for the thumbnail.
+    """
+
+    id: uuid.UUID
+    title: Optional[str] = None
+    content: Optional[str] = None
+    n_slides: Optional[int] = None
+    language: Optional[str] = None
+    tone: Optional[str] = None
+    verbosity: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    first_slide: Optional[SlideModel] = None
+
@@ -34,3 +34,6 @@ class ApiKeyModel(SQLModel, table=True):
         default=None,
         sa_column=Column(DateTime(timezone=True), nullable=True),
     )
+    # LLM tokens spent on requests made with the key
+    llm_input_tokens: int = Field(default=0)
+    llm_output_tokens: int = Field(default=0)
@@ -3,7 +3,7 @@ import secrets
 from typing import Optional
 import uuid
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, Column, DateTime, String
 from sqlmodel import Field, SQLModel
 
 
@@ -25,3 +25,22 @@ class AsyncPresentationGenerationTaskModel(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     data: Optional[dict] = Field(sa_column=Column(JSON), default=None)
+
+    # Durable queue bookkeeping, only set for tasks handed to generation workers
+    payload: Optional[dict] = Field(
+        sa_column=Column(JSON), default=None, exclude=True
+    )
+    attempts: int = Field(default=0)
+    available_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), nullable=True, index=True),
+    )
+    lease_owner: Optional[str] = Field(
+        default=None, sa_column=Column(String, nullable=True)
+    )
+    lease_expires_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    heartbeat_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import List, Optional
 import uuid
-from sqlalchemy import JSON, Column, DateTime, String
+from sqlalchemy import JSON, Column, DateTime, Index, String
 from sqlmodel import Boolean, Field, SQLModel
 
 from models.presentation_layout import PresentationLayoutModel
@@ -12,6 +12,10 @@ from utils.datetime_utils import get_current_utc_datetime
 
 class PresentationModel(SQLModel, table=True):
     __tablename__ = "presentations"
+    __table_args__ = (
+        # id breaks created_at ties for keyset pagination
+        Index("ix_presentations_created_at_id", "created_at", "id"),
+    )
 
     id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     content: str
@@ -22,7 +26,9 @@ class PresentationModel(SQLModel, table=True):
     outlines: Optional[dict] = Field(sa_column=Column(JSON), default=None)
     created_at: datetime = Field(
         sa_column=Column(
-            DateTime(timezone=True), nullable=False, default=get_current_utc_datetime
+            DateTime(timezone=True),
+            nullable=False,
+            default=get_current_utc_datetime,
         ),
     )
     updated_at: datetime = Field(
@@ -42,6 +48,9 @@ class PresentationModel(SQLModel, table=True):
     include_title_slide: bool = Field(sa_column=Column(Boolean), default=True)
     web_search: bool = Field(sa_column=Column(Boolean), default=False)
     template_font: Optional[str] = Field(sa_column=Column(String), default=None)
+    # LLM tokens spent on the presentation, written by the token usage recorder
+    llm_input_tokens: int = Field(default=0)
+    llm_output_tokens: int = Field(default=0)
 
     def get_new_presentation(self):
         return PresentationModel(
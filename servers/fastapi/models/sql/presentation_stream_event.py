@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Text
+from sqlmodel import Field, SQLModel
+
+from db.types.guid import GUID
+from utils.datetime_utils import get_current_utc_datetime
+
+
+class PresentationStreamEventModel(SQLModel, table=True):
+    __tablename__ = "presentation_stream_events"
+    __table_args__ = (
+        Index(
+            "ix_presentation_stream_events_presentation_id_event_id",
+            "presentation_id",
+            "event_id",
+        ),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    presentation_id: uuid.UUID = Field(
+        sa_column=Column(GUID, nullable=False)
+    )
+    event_id: int
+    # A row without an event marks the end of the stream
+    event: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=get_current_utc_datetime,
+    )
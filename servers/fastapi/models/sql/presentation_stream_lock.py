@@ -0,0 +1,17 @@
+from datetime import datetime
+import uuid
+
+from sqlalchemy import Column, DateTime, String
+from sqlmodel import Field, SQLModel
+
+from db.types.guid import GUID
+
+
+class PresentationStreamLockModel(SQLModel, table=True):
+    __tablename__ = "presentation_stream_locks"
+
+    presentation_id: uuid.UUID = Field(sa_column=Column(GUID, primary_key=True))
+    owner: str = Field(sa_column=Column(String, nullable=False))
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
@@ -1,15 +1,19 @@
 from typing import Optional
 import uuid
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlmodel import Field, Column, JSON, SQLModel
 
 
 class SlideModel(SQLModel, table=True):
     __tablename__ = "slides"
+    __table_args__ = (
+        # Also serves lookups by presentation alone
+        Index("ix_slides_presentation_index", "presentation", "index"),
+    )
 
     id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     presentation: uuid.UUID = Field(
-        sa_column=Column(ForeignKey("presentations.id", ondelete="CASCADE"), index=True)
+        sa_column=Column(ForeignKey("presentations.id", ondelete="CASCADE"))
     )
     layout_group: str
     layout: str
@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from sqlalchemy import Column, DateTime, Index, Text
+from sqlmodel import Field, SQLModel
+
+from db.types.guid import GUID
+from utils.datetime_utils import get_current_utc_datetime
+
+
+class TemplateImportEventModel(SQLModel, table=True):
+    __tablename__ = "template_import_events"
+    __table_args__ = (
+        Index("ix_template_import_events_job_id_event_id", "job_id", "event_id"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_id: uuid.UUID = Field(sa_column=Column(GUID, nullable=False))
+    event_id: int
+    event: str = Field(sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=get_current_utc_datetime,
+    )
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List, Optional
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime
+from sqlmodel import Field, SQLModel
+
+from db.types.guid import GUID
+from utils.datetime_utils import get_current_utc_datetime
+
+
+class TemplateImportJobModel(SQLModel, table=True):
+    """
+    A template import shared by every worker. Holds the slides with their
+    partial results, and a lease while a worker converts them.
+    """
+
+    __tablename__ = "template_import_jobs"
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        sa_column=Column(GUID, primary_key=True),
+    )
+    slides: List[dict] = Field(sa_column=Column(JSON, nullable=False))
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=get_current_utc_datetime,
+    )
+    updated_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=get_current_utc_datetime,
+    )
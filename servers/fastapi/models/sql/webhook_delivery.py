@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+import uuid
+
+from sqlalchemy import JSON, Column, DateTime, Index, Text
+from sqlmodel import Field, SQLModel
+
+from db.types.guid import GUID
+from utils.datetime_utils import get_current_utc_datetime
+
+
+class WebhookDeliveryModel(SQLModel, table=True):
+    """
+    Outbox row for one webhook event sent to one subscription. A row is due
+    for delivery while ``available_at`` is set, and keeps the result of the
+    last attempt once it is delivered or given up on.
+    """
+
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        Index("ix_webhook_deliveries_available_at", "available_at"),
+        Index("ix_webhook_deliveries_status_created_at", "status", "created_at"),
+    )
+
+    id: uuid.UUID = Field(
+        default_factory=uuid.uuid4,
+        sa_column=Column(GUID, primary_key=True),
+    )
+    subscription_id: str
+    event: str
+    payload: dict = Field(sa_column=Column(JSON, nullable=False))
+    # pending, delivering, delivered or failed
+    status: str = Field(default="pending")
+    attempts: int = Field(default=0)
+    available_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    last_status_code: Optional[int] = None
+    last_error: Optional[str] = Field(default=None, sa_column=Column(Text, nullable=True))
+    created_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+        default_factory=get_current_utc_datetime,
+    )
+    delivered_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
@@ -19,4 +19,6 @@ class WebhookSubscription(SQLModel, table=True):
     )
     url: str
     secret: Optional[str] = None
+    # Legacy receivers check the secret as a bearer token instead of the signature
+    send_secret_as_bearer: bool = False
     event: str = Field(index=True)
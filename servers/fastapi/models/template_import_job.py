@@ -0,0 +1,29 @@
+from typing import List, Literal, Optional
+import uuid
+
+from pydantic import BaseModel
+
+
+class TemplateImportSlide(BaseModel):
+    """
+    A slide of a template import, with the input from the PPTX processing
+    and the partial results of its slide to HTML to React conversion.
+    """
+
+    slide_number: int
+    screenshot_url: str
+    xml_content: str
+    normalized_fonts: List[str] = []
+    status: Literal["pending", "html", "react", "done", "failed"] = "pending"
+    html: Optional[str] = None
+    react_component: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TemplateImportJobStatus(BaseModel):
+    id: uuid.UUID
+    status: Literal["running", "done", "failed"]
+    total_slides: int
+    completed_slides: int
+    failed_slides: int
+    slides: List[TemplateImportSlide]
@@ -1,9 +1,190 @@
 import uvicorn
 import argparse
+import asyncio
+import multiprocessing
+import signal
+import time
+import traceback
 
 from dotenv import load_dotenv
 import os
 
+
+# Workers that exit sooner than this after starting are restarted with backoff
+WORKER_MIN_UPTIME_SECONDS = 10
+WORKER_MAX_RESTART_DELAY_SECONDS = 60
+
+
+def run_startup_tasks_once():
+    """
+    Runs the once-per-deployment startup work in the supervisor, the tables
+    and the system templates, so the workers don't race each other on it.
+    The provider check stays in the workers, which keep refreshing it.
+
+    Not everything heavy can be shared copy-on-write. chromadb and ONNX
+    Runtime start thread pools when the icon index is opened, and those
+    threads don't survive a fork, so a worker forked from a parent that had
+    opened it would hang on its first search. The index is therefore built
+    and the ONNX model downloaded once, in a spawned process, and every
+    worker opens the files on disk. System template layouts are served by
+    Next.js, which starts next to this server, so they can't be loaded
+    before forking either; each worker caches them in TEMPLATE_LAYOUT_CACHE.
+    """
+    icon_index_process = multiprocessing.get_context("spawn").Process(
+        target=prepare_icon_index
+    )
+    icon_index_process.start()
+    icon_index_process.join()
+
+    from api.lifespan import run_startup_tasks
+    from services.database import sql_engine
+
+    async def run():
+        try:
+            return await run_startup_tasks()
+        finally:
+            # Pooled connections must not be shared with the forked workers
+            await sql_engine.dispose()
+
+    startup_service = asyncio.run(run())
+    if not startup_service.ready:
+        raise SystemExit(f"Startup failed: {startup_service.get_status()['tasks']}")
+    os.environ["STARTUP_TASKS_DONE"] = "true"
+
+
+def prepare_icon_index():
+    from services.icon_finder_service import prepare_icon_index
+
+    prepare_icon_index()
+
+
+def reset_owner_ids():
+    """
+    The lease owner ids of these singletons were generated in the supervisor
+    when the app was imported, so every forked worker needs its own, or they
+    would all hold each other's stream locks and job leases.
+    """
+    import socket
+    import uuid
+
+    from services.stream_pubsub_service import STREAM_PUBSUB
+    from services.template_import_service import TEMPLATE_IMPORT_SERVICE
+    from services.webhook_service import WEBHOOK_DELIVERY_WORKER
+
+    for service, attribute in [
+        (STREAM_PUBSUB, "owner_id"),
+        (TEMPLATE_IMPORT_SERVICE, "owner_id"),
+        (WEBHOOK_DELIVERY_WORKER, "worker_id"),
+    ]:
+        setattr(
+            service,
+            attribute,
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}",
+        )
+
+
+def run_worker(config: uvicorn.Config, sock):
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    reset_owner_ids()
+    exit_code = 1
+    try:
+        server = uvicorn.Server(config)
+        server.run(sockets=[sock])
+        # uvicorn returns without starting when the lifespan startup fails
+        exit_code = 0 if server.started else 3
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(exit_code)
+
+
+def spawn_worker(config: uvicorn.Config, sock) -> int:
+    pid = os.fork()
+    if pid == 0:
+        run_worker(config, sock)
+    return pid
+
+
+def run_prefork_server(port: int, workers: int, log_level: str):
+    """
+    Imports the app once and forks the workers from it, so every worker shares
+    the loaded modules copy-on-write and accepts on the same listening socket.
+    Workers that die are replaced until the supervisor is asked to stop,
+    with a growing delay while they keep dying right after starting.
+    """
+    run_startup_tasks_once()
+
+    from api.main import app
+
+    config = uvicorn.Config(
+        app,
+        host="0.0.0.0",
+        port=port,
+        log_level=log_level,
+        loop="uvloop",
+        http="httptools",
+    )
+    sock = config.bind_socket()
+
+    # Start time of every running worker
+    worker_pids: dict[int, float] = {}
+    stopping = False
+    failed_restarts = 0
+
+    def stop(signum, _):
+        nonlocal stopping
+        stopping = True
+        for pid in worker_pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    for _ in range(workers):
+        worker_pids[spawn_worker(config, sock)] = time.monotonic()
+    print(f"Started {workers} workers on port {port}")
+
+    while worker_pids:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        started_at = worker_pids.pop(pid, None)
+        if stopping:
+            continue
+
+        exit_code = os.waitstatus_to_exitcode(status)
+        if started_at is not None and (
+            time.monotonic() - started_at < WORKER_MIN_UPTIME_SECONDS
+        ):
+            failed_restarts += 1
+        else:
+            failed_restarts = 0
+        delay = (
+            min(2 ** (failed_restarts - 1), WORKER_MAX_RESTART_DELAY_SECONDS)
+            if failed_restarts
+            else 0
+        )
+        print(
+            f"Worker {pid} exited with code {exit_code}, restarting it"
+            + (f" in {delay}s" if delay else "")
+        )
+        # Slept in short steps so a stop signal is not held up
+        restart_at = time.monotonic() + delay
+        while not stopping and time.monotonic() < restart_at:
+            time.sleep(max(0, min(0.5, restart_at - time.monotonic())))
+        if not stopping:
+            worker_pids[spawn_worker(config, sock)] = time.monotonic()
+
+    sock.close()
+
+
 if __name__ == "__main__":
     # Load .env from project root (2 levels up)
     load_dotenv("../../.env")
@@ -14,8 +195,21 @@ if __name__ == "__main__":
     parser.add_argument(
         "--reload", type=str, default="false", help="Reload the server on code changes"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY") or 1),
+        help="Number of worker processes, ignored when reloading",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=None,
+        help="Log level, defaults to debug when reloading and info otherwise",
+    )
     args = parser.parse_args()
     reload = args.reload == "true"
+    log_level = args.log_level or ("debug" if reload else "info")
     
     # Run icon extraction on startup
     print("Running startup tasks...")
@@ -24,11 +218,15 @@ if __name__ == "__main__":
         extract_icons()
     except Exception as e:
         print(f"Error extracting icons: {e}")
-    
-    uvicorn.run(
-        "api.main:app",
-        host="0.0.0.0",
-        port=args.port,
-        log_level="debug",
-        reload=reload,
-    )
+
+    if args.workers > 1 and not reload and hasattr(os, "fork"):
+        run_prefork_server(args.port, args.workers, log_level)
+    else:
+        uvicorn.run(
+            "api.main:app",
+            host="0.0.0.0",
+            port=args.port,
+            log_level=log_level,
+            reload=reload,
+            workers=None if reload else args.workers,
+        )
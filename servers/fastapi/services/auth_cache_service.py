@@ -0,0 +1,152 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import time
+from typing import Dict, Optional
+import uuid
+
+from sqlalchemy import update
+
+from models.sql.api_key import ApiKeyModel
+from models.sql.user import UserModel
+from services.database import async_session_maker
+from utils.custom_logger import setup_logger
+from utils.datetime_utils import get_current_utc_datetime
+from utils.get_env import (
+    get_api_key_usage_flush_seconds_env,
+    get_auth_cache_ttl_seconds_env,
+)
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class CachedPrincipal:
+    user: UserModel
+    expires_at: float
+    api_key_id: Optional[uuid.UUID] = None
+
+
+class PrincipalCache:
+    """
+    Short lived cache of authenticated users, keyed by the hash of the access
+    token or API key, so a request does not decode and look up its
+    credentials again. Entries are dropped when the user or API key changes
+    in this process, other workers see the change once the ttl has passed.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.entries: Dict[str, CachedPrincipal] = {}
+
+    def get(self, key: str) -> Optional[CachedPrincipal]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self.entries.pop(key, None)
+            return None
+        return entry
+
+    def set(
+        self,
+        key: str,
+        user: UserModel,
+        api_key_id: Optional[uuid.UUID] = None,
+        expires_at: Optional[datetime] = None,
+    ):
+        if self.ttl <= 0:
+            return
+        ttl = self.ttl
+        # An access token is never served from the cache after it expires
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - get_current_utc_datetime()).total_seconds())
+            if ttl <= 0:
+                return
+        self._evict_expired()
+        self.entries[key] = CachedPrincipal(
+            user=user, expires_at=time.monotonic() + ttl, api_key_id=api_key_id
+        )
+
+    def invalidate_user(self, user_id: uuid.UUID):
+        for key, entry in list(self.entries.items()):
+            if entry.user.id == user_id:
+                self.entries.pop(key, None)
+
+    def invalidate_api_key(self, api_key_id: uuid.UUID):
+        for key, entry in list(self.entries.items()):
+            if entry.api_key_id == api_key_id:
+                self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        for key, entry in list(self.entries.items()):
+            if entry.expires_at <= now:
+                self.entries.pop(key, None)
+
+
+class ApiKeyUsageRecorder:
+    """
+    Collects last_used_at of API keys in memory and writes them in one bulk
+    update every flush_interval, so requests made with an API key do not
+    commit on every read.
+    """
+
+    def __init__(self, flush_interval: float, session_maker=async_session_maker):
+        self.flush_interval = flush_interval
+        self.session_maker = session_maker
+        self.pending: Dict[uuid.UUID, datetime] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, api_key_id: uuid.UUID):
+        self.pending[api_key_id] = get_current_utc_datetime()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.run_flusher())
+
+    async def flush(self):
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        try:
+            async with self.session_maker() as sql_session:
+                await sql_session.execute(
+                    update(ApiKeyModel),
+                    [
+                        {"id": api_key_id, "last_used_at": last_used_at}
+                        for api_key_id, last_used_at in pending.items()
+                    ],
+                )
+                await sql_session.commit()
+        except BaseException:
+            # Newer usages recorded meanwhile win
+            self.pending = {**pending, **self.pending}
+            raise
+
+    async def run_flusher(self):
+        while self.pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write API key usage")
+
+    async def stop(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to write API key usage")
+
+
+_auth_cache_ttl = get_auth_cache_ttl_seconds_env()
+# A ttl of 0 disables the cache
+PRINCIPAL_CACHE = PrincipalCache(ttl=30 if _auth_cache_ttl is None else _auth_cache_ttl)
+API_KEY_USAGE_RECORDER = ApiKeyUsageRecorder(
+    flush_interval=get_api_key_usage_flush_seconds_env() or 60
+)
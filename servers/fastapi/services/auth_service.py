@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import hashlib
 import hmac
@@ -13,6 +14,8 @@ from sqlmodel import select
 from enums.user_role import UserRole
 from models.sql.api_key import ApiKeyModel
 from models.sql.user import UserModel
+from services.auth_cache_service import API_KEY_USAGE_RECORDER, PRINCIPAL_CACHE
+from services.token_usage_service import set_token_usage_api_key
 from utils.datetime_utils import get_current_utc_datetime
 from utils.get_env import (
     get_api_key_secret_env,
@@ -87,6 +90,43 @@ def hash_api_key(raw_key: str) -> str:
     return hmac.new(secret, raw_key.encode("utf-8"), hashlib.sha256).hexdigest()
 
 
+def _get_access_token_cache_key(token: str) -> str:
+    return "token:" + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def get_user_by_access_token(
+    session: AsyncSession, token: str
+) -> Optional[UserModel]:
+    """
+    Returns the active user of an access token, from the principal cache when
+    possible. Raises jwt.PyJWTError for invalid tokens. The user is detached
+    from the session, as it is shared with other requests while cached.
+    """
+    cache_key = _get_access_token_cache_key(token)
+    cached = PRINCIPAL_CACHE.get(cache_key)
+    if cached:
+        return cached.user
+
+    payload = decode_access_token(token)
+    user_id = payload.get("sub")
+    if not user_id:
+        raise jwt.InvalidTokenError("Token has no subject")
+    user = await session.get(UserModel, uuid.UUID(user_id))
+    if not user or not user.is_active:
+        return None
+    session.expunge(user)
+
+    expires_at = payload.get("exp")
+    PRINCIPAL_CACHE.set(
+        cache_key,
+        user,
+        expires_at=(
+            datetime.fromtimestamp(expires_at, timezone.utc) if expires_at else None
+        ),
+    )
+    return user
+
+
 async def authenticate_user(
     session: AsyncSession, username: str, password: str
 ) -> Optional[UserModel]:
@@ -96,7 +136,8 @@ async def authenticate_user(
     user = result.scalars().first()
     if not user or not user.is_active:
         return None
-    if not verify_password(password, user.password_hash):
+    # PBKDF2 takes tens of milliseconds, too long to hold the event loop
+    if not await asyncio.to_thread(verify_password, password, user.password_hash):
         return None
     return user
 
@@ -104,7 +145,7 @@ async def authenticate_user(
 async def create_user(
     session: AsyncSession, username: str, password: str, role: UserRole
 ) -> UserModel:
-    password_hash = hash_password(password)
+    password_hash = await asyncio.to_thread(hash_password, password)
     user = UserModel(username=username, password_hash=password_hash, role=role.value)
     session.add(user)
     await session.commit()
@@ -133,6 +174,13 @@ async def get_user_by_api_key(
     session: AsyncSession, raw_key: str
 ) -> Optional[UserModel]:
     key_hash = hash_api_key(raw_key)
+    cache_key = "api_key:" + key_hash
+    cached = PRINCIPAL_CACHE.get(cache_key)
+    if cached:
+        API_KEY_USAGE_RECORDER.record(cached.api_key_id)
+        set_token_usage_api_key(cached.api_key_id)
+        return cached.user
+
     result = await session.execute(
         select(ApiKeyModel).where(
             ApiKeyModel.key_hash == key_hash, ApiKeyModel.is_active == True
@@ -144,7 +192,10 @@ async def get_user_by_api_key(
     user = await session.get(UserModel, api_key.user_id)
     if not user or not user.is_active:
         return None
-    api_key.last_used_at = get_current_utc_datetime()
-    session.add(api_key)
-    await session.commit()
+    session.expunge(user)
+
+    PRINCIPAL_CACHE.set(cache_key, user, api_key_id=api_key.id)
+    # Written in bulk later instead of a commit per request
+    API_KEY_USAGE_RECORDER.record(api_key.id)
+    set_token_usage_api_key(api_key.id)
     return user
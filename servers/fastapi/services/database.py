@@ -15,19 +15,47 @@ from models.sql.image_asset import ImageAsset
 from models.sql.key_value import KeyValueSqlModel
 from models.sql.ollama_pull_status import OllamaPullStatus
 from models.sql.presentation import PresentationModel
+from models.sql.presentation_stream_event import PresentationStreamEventModel
+from models.sql.presentation_stream_lock import PresentationStreamLockModel
 from models.sql.slide import SlideModel
 from models.sql.presentation_layout_code import PresentationLayoutCodeModel
 from models.sql.template import TemplateModel
+from models.sql.template_import_event import TemplateImportEventModel
+from models.sql.template_import_job import TemplateImportJobModel
+from models.sql.webhook_delivery import WebhookDeliveryModel
 from models.sql.webhook_subscription import WebhookSubscription
 from models.sql.user import UserModel
 from models.sql.api_key import ApiKeyModel
-from utils.db_utils import get_database_url_and_connect_args
+from services.sqlite_write_queue import SQLiteSingleWriterSession
+from utils.db_utils import (
+    apply_sqlite_pragmas,
+    get_database_url_and_connect_args,
+    get_engine_connect_args,
+    get_engine_options,
+)
+from utils.get_env import get_sqlite_write_queue_env
+from utils.parsers import parse_bool_or_none
 
 
 database_url, connect_args = get_database_url_and_connect_args()
 
-sql_engine: AsyncEngine = create_async_engine(database_url, connect_args=connect_args)
-async_session_maker = async_sessionmaker(sql_engine, expire_on_commit=False)
+sql_engine: AsyncEngine = create_async_engine(
+    database_url,
+    connect_args={**connect_args, **get_engine_connect_args(database_url)},
+    **get_engine_options(database_url),
+)
+apply_sqlite_pragmas(sql_engine)
+
+# Writers queue up in process instead of contending for the SQLite lock
+use_sqlite_write_queue = (
+    sql_engine.dialect.name == "sqlite"
+    and parse_bool_or_none(get_sqlite_write_queue_env()) is not False
+)
+async_session_maker = async_sessionmaker(
+    sql_engine,
+    expire_on_commit=False,
+    class_=SQLiteSingleWriterSession if use_sqlite_write_queue else AsyncSession,
+)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -47,6 +75,7 @@ container_db_url = f"sqlite+aiosqlite:///{container_db_path}"
 container_db_engine: AsyncEngine = create_async_engine(
     container_db_url, connect_args={"check_same_thread": False}
 )
+apply_sqlite_pragmas(container_db_engine)
 container_db_async_session_maker = async_sessionmaker(
     container_db_engine, expire_on_commit=False
 )
@@ -70,8 +99,13 @@ async def create_db_and_tables():
                     ImageAsset.__table__,
                     PresentationLayoutCodeModel.__table__,
                     TemplateModel.__table__,
+                    TemplateImportJobModel.__table__,
+                    TemplateImportEventModel.__table__,
                     WebhookSubscription.__table__,
+                    WebhookDeliveryModel.__table__,
                     AsyncPresentationGenerationTaskModel.__table__,
+                    PresentationStreamEventModel.__table__,
+                    PresentationStreamLockModel.__table__,
                     UserModel.__table__,
                     ApiKeyModel.__table__,
                 ],
@@ -1,8 +1,7 @@
 import mimetypes
 from fastapi import HTTPException
 import os, asyncio
-from typing import List, Optional, Tuple
-import pdfplumber
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from constants.documents import (
     PDF_MIME_TYPES,
@@ -10,7 +9,10 @@ from constants.documents import (
     TEXT_MIME_TYPES,
     WORD_TYPES,
 )
-from services.docling_service import DoclingService
+from services.tracing_service import TRACER
+
+if TYPE_CHECKING:
+    from services.docling_service import DoclingService
 
 
 class DocumentsLoader:
@@ -18,11 +20,20 @@ class DocumentsLoader:
     def __init__(self, file_paths: List[str]):
         self._file_paths = file_paths
 
-        self.docling_service = DoclingService()
+        self._docling_service: Optional["DoclingService"] = None
 
         self._documents: List[str] = []
         self._images: List[List[str]] = []
 
+    @property
+    def docling_service(self) -> "DoclingService":
+        # docling pulls in torch and its models, so only load it for a parse
+        if self._docling_service is None:
+            from services.docling_service import DoclingService
+
+            self._docling_service = DoclingService()
+        return self._docling_service
+
     @property
     def documents(self):
         return self._documents
@@ -31,6 +42,7 @@ class DocumentsLoader:
     def images(self):
         return self._images
 
+    @TRACER.trace("documents.load")
     async def load_documents(
         self,
         temp_dir: Optional[str] = None,
@@ -52,16 +64,19 @@ class DocumentsLoader:
             imgs = []
 
             mime_type = mimetypes.guess_type(file_path)[0]
-            if mime_type in PDF_MIME_TYPES:
-                document, imgs = await self.load_pdf(
-                    file_path, load_text, load_images, temp_dir
-                )
-            elif mime_type in TEXT_MIME_TYPES:
-                document = await self.load_text(file_path)
-            elif mime_type in POWERPOINT_TYPES:
-                document = self.load_powerpoint(file_path)
-            elif mime_type in WORD_TYPES:
-                document = self.load_msword(file_path)
+            with TRACER.start_span(
+                "documents.parse", {"document.mime_type": str(mime_type)}
+            ):
+                if mime_type in PDF_MIME_TYPES:
+                    document, imgs = await self.load_pdf(
+                        file_path, load_text, load_images, temp_dir
+                    )
+                elif mime_type in TEXT_MIME_TYPES:
+                    document = await self.load_text(file_path)
+                elif mime_type in POWERPOINT_TYPES:
+                    document = self.load_powerpoint(file_path)
+                elif mime_type in WORD_TYPES:
+                    document = self.load_msword(file_path)
 
             documents.append(document)
             images.append(imgs)
@@ -99,6 +114,8 @@ class DocumentsLoader:
 
     @classmethod
     def get_page_images_from_pdf(cls, file_path: str, temp_dir: str) -> List[str]:
+        import pdfplumber
+
         with pdfplumber.open(file_path) as pdf:
             images = []
             for page in pdf.pages:
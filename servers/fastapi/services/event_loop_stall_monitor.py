@@ -0,0 +1,167 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Deque, List, Optional
+
+from services.metrics_service import EVENT_LOOP_STALL_SECONDS, EVENT_LOOP_STALLS
+from utils.custom_logger import setup_logger
+from utils.get_env import (
+    get_event_loop_stall_samples_env,
+    get_event_loop_stall_threshold_ms_env,
+)
+
+logger = setup_logger(__name__)
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MAX_SAMPLES = 50
+# Frames kept per sample, counted from the blocking call
+MAX_STACK_FRAMES = 30
+
+
+def _is_app_frame(frame: traceback.FrameSummary) -> bool:
+    filename = os.path.abspath(frame.filename)
+    return filename.startswith(APP_DIRECTORY + os.sep) and (
+        "site-packages" not in filename
+    )
+
+
+def _get_location(frame: traceback.FrameSummary) -> str:
+    filename = os.path.abspath(frame.filename)
+    if filename.startswith(APP_DIRECTORY + os.sep):
+        filename = os.path.relpath(filename, APP_DIRECTORY)
+    return f"{filename}:{frame.lineno} in {frame.name}"
+
+
+@dataclass
+class EventLoopStall:
+    """
+    A stretch of time in which the event loop ran no callbacks. ``location``
+    is the innermost frame of this codebase in the stack, the call that most
+    likely blocked, and ``stack`` ends with the frame that was running.
+    """
+
+    started_at: datetime
+    location: str
+    stack: List[str] = field(default_factory=list)
+    duration_seconds: Optional[float] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": (
+                round(self.duration_seconds * 1000, 1)
+                if self.duration_seconds is not None
+                else None
+            ),
+            "location": self.location,
+            "stack": self.stack,
+        }
+
+
+class EventLoopStallMonitor:
+    """
+    Watches an event loop from a thread. The thread schedules a callback on
+    the loop every ``threshold / 2`` seconds, and when the loop hasn't run it
+    after ``threshold`` seconds, the loop thread is busy with something that
+    doesn't yield, so its stack is captured. The stall is logged and counted
+    once the loop runs the callback, or the monitor is stopped. Disabled
+    without a threshold.
+    """
+
+    def __init__(
+        self,
+        threshold: Optional[float] = None,
+        max_samples: int = DEFAULT_MAX_SAMPLES,
+    ):
+        self.threshold = threshold
+        self.samples: Deque[EventLoopStall] = deque(maxlen=max_samples)
+        self.stalls = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.threshold)
+
+    def start(self):
+        """Starts watching the running event loop, call it from the loop's thread."""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="event-loop-stall-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(self.threshold * 2 if self.threshold else None)
+            self._thread = None
+
+    def get_samples(self) -> List[dict]:
+        """The most recent stalls, newest first."""
+        return [stall.to_dict() for stall in reversed(self.samples)]
+
+    def _capture_stall(self) -> EventLoopStall:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame)[-MAX_STACK_FRAMES:] if frame else []
+        app_frames = [each for each in stack if _is_app_frame(each)]
+        culprit = app_frames[-1] if app_frames else (stack[-1] if stack else None)
+        return EventLoopStall(
+            started_at=datetime.now(timezone.utc),
+            location=_get_location(culprit) if culprit else "unknown",
+            stack=[line.rstrip() for line in traceback.format_list(stack)],
+        )
+
+    def _run(self):
+        interval = self.threshold / 2
+        while not self._stopping.wait(interval):
+            called = threading.Event()
+            scheduled_at = time.perf_counter()
+            try:
+                self._loop.call_soon_threadsafe(called.set)
+            except RuntimeError:
+                # The loop was closed
+                return
+            # A loop that isn't running, like between two tests, isn't blocked
+            if called.wait(self.threshold) or not self._loop.is_running():
+                continue
+
+            stall = self._capture_stall()
+            # Stopping from the blocked loop ends the stall as well
+            while not (called.wait(interval) or self._stopping.is_set()):
+                pass
+            self._record(stall, time.perf_counter() - scheduled_at)
+
+    def _record(self, stall: EventLoopStall, duration: float):
+        stall.duration_seconds = duration
+        self.stalls += 1
+        self.samples.append(stall)
+        EVENT_LOOP_STALLS.inc(location=stall.location)
+        EVENT_LOOP_STALL_SECONDS.observe(duration)
+        logger.warning(
+            f"Event loop blocked for {duration * 1000:.0f} ms at {stall.location}\n"
+            + "\n".join(stall.stack)
+        )
+
+
+def _get_threshold() -> Optional[float]:
+    threshold_ms = get_event_loop_stall_threshold_ms_env()
+    return threshold_ms / 1000 if threshold_ms else None
+
+
+EVENT_LOOP_STALL_MONITOR = EventLoopStallMonitor(
+    threshold=_get_threshold(),
+    max_samples=get_event_loop_stall_samples_env() or DEFAULT_MAX_SAMPLES,
+)
@@ -0,0 +1,323 @@
+import asyncio
+from datetime import datetime, timezone
+import json
+import os
+import random
+import shutil
+from typing import AsyncGenerator, Optional
+import uuid
+
+from services.token_usage_service import count_tokens
+from utils.get_env import (
+    get_fake_image_failure_rate_env,
+    get_fake_image_latency_seconds_env,
+    get_fake_llm_failure_rate_env,
+    get_fake_llm_latency_seconds_env,
+    get_fake_llm_tokens_per_second_env,
+)
+
+# Time to first token and decoding speed of a typical hosted model
+DEFAULT_FAKE_LLM_LATENCY_SECONDS = 0.5
+DEFAULT_FAKE_LLM_TOKENS_PER_SECOND = 100.0
+DEFAULT_FAKE_IMAGE_LATENCY_SECONDS = 2.0
+DEFAULT_FAKE_TEXT_TOKENS = 200
+FAKE_STREAM_CHUNK_TOKENS = 8
+FAKE_IMAGE_PATH = "static/images/placeholder.jpg"
+
+FAKE_WORDS = (
+    "growth",
+    "market",
+    "strategy",
+    "customer",
+    "revenue",
+    "platform",
+    "team",
+    "roadmap",
+    "quarter",
+    "insight",
+    "product",
+    "launch",
+    "data",
+    "impact",
+    "scale",
+    "cost",
+    "risk",
+    "goal",
+    "design",
+    "research",
+)
+
+
+def _first_set(*values):
+    # Zero latency and zero failures are valid settings
+    return next(value for value in values if value is not None)
+
+
+class FakeProviderError(Exception):
+    """A failure injected by a fake provider."""
+
+
+def get_fake_text(
+    rng: random.Random,
+    min_length: Optional[int] = None,
+    max_length: Optional[int] = None,
+) -> str:
+    if min_length is not None and max_length is not None:
+        length = rng.randint(min_length, max(min_length, max_length))
+    elif min_length is not None:
+        length = min_length + rng.randint(0, 40)
+    elif max_length is not None:
+        length = min(max_length, rng.randint(20, 80))
+    else:
+        length = rng.randint(20, 80)
+
+    words = []
+    text_length = -1
+    while text_length < length:
+        word = rng.choice(FAKE_WORDS)
+        words.append(word)
+        text_length += len(word) + 1
+    text = " ".join(words)[:length]
+    # A word cut at a space would leave trailing whitespace
+    if text.endswith(" "):
+        text = text[:-1] + "."
+    return text.capitalize()
+
+
+def _resolve_ref(schema: dict, root: dict) -> dict:
+    ref = schema.get("$ref")
+    if not isinstance(ref, str) or not ref.startswith("#"):
+        return schema
+    resolved = root
+    for part in ref[1:].split("/"):
+        if part:
+            resolved = resolved.get(part, {})
+    # Keywords next to $ref apply as well
+    siblings = {key: value for key, value in schema.items() if key != "$ref"}
+    return {**resolved, **siblings}
+
+
+def _get_fake_number(schema: dict, rng: random.Random, is_integer: bool):
+    step = 1 if is_integer else 0.01
+    minimum = schema.get("minimum")
+    if minimum is None and schema.get("exclusiveMinimum") is not None:
+        minimum = schema["exclusiveMinimum"] + step
+    maximum = schema.get("maximum")
+    if maximum is None and schema.get("exclusiveMaximum") is not None:
+        maximum = schema["exclusiveMaximum"] - step
+
+    if minimum is not None and maximum is not None:
+        if is_integer:
+            return rng.randint(int(minimum), int(maximum))
+        return round(rng.uniform(minimum, maximum), 2)
+    if minimum is not None:
+        return int(minimum) if is_integer else minimum
+    if maximum is not None:
+        return min(int(maximum) if is_integer else maximum, 0)
+    # Unbounded indices, like the layouts of a structure, still vary
+    return rng.randint(0, 9) if is_integer else round(rng.uniform(0, 100), 2)
+
+
+def _get_fake_string(schema: dict, rng: random.Random) -> str:
+    match schema.get("format"):
+        case "date-time":
+            return datetime.now(timezone.utc).isoformat()
+        case "date":
+            return datetime.now(timezone.utc).date().isoformat()
+        case "email":
+            return "user@example.com"
+        case "uri" | "url":
+            return "https://example.com"
+        case "uuid":
+            return str(uuid.UUID(int=rng.getrandbits(128)))
+    return get_fake_text(rng, schema.get("minLength"), schema.get("maxLength"))
+
+
+def get_fake_value_for_schema(
+    schema: dict,
+    rng: Optional[random.Random] = None,
+    root: Optional[dict] = None,
+    depth: int = 0,
+):
+    """
+    Builds a value that validates against a JSON schema, with text from a
+    small vocabulary. Lengths, item counts and numbers respect the bounds of
+    the schema, so the content passes the same validation as real output.
+    """
+    rng = rng or random.Random()
+    root = root if root is not None else schema
+    schema = _resolve_ref(schema, root)
+    # Recursive schemas end in null once they get this deep
+    if depth > 16:
+        return None
+
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return rng.choice(schema["enum"])
+
+    if "allOf" in schema:
+        merged = {key: value for key, value in schema.items() if key != "allOf"}
+        for sub_schema in schema["allOf"]:
+            sub_schema = _resolve_ref(sub_schema, root)
+            merged["properties"] = {
+                **merged.get("properties", {}),
+                **sub_schema.get("properties", {}),
+            }
+            merged.update(
+                {key: value for key, value in sub_schema.items() if key != "properties"}
+            )
+        return get_fake_value_for_schema(merged, rng, root, depth + 1)
+
+    for keyword in ("anyOf", "oneOf"):
+        if keyword in schema:
+            options = [
+                option
+                for option in schema[keyword]
+                if _resolve_ref(option, root).get("type") != "null"
+            ]
+            if not options:
+                return None
+            return get_fake_value_for_schema(options[0], rng, root, depth + 1)
+
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        schema_type = next((each for each in schema_type if each != "null"), "null")
+    if schema_type is None:
+        if "properties" in schema:
+            schema_type = "object"
+        elif "items" in schema or "prefixItems" in schema:
+            schema_type = "array"
+        else:
+            schema_type = "string"
+
+    match schema_type:
+        case "object":
+            return {
+                name: get_fake_value_for_schema(property_schema, rng, root, depth + 1)
+                for name, property_schema in schema.get("properties", {}).items()
+            }
+        case "array":
+            if "prefixItems" in schema:
+                return [
+                    get_fake_value_for_schema(item_schema, rng, root, depth + 1)
+                    for item_schema in schema["prefixItems"]
+                ]
+            min_items = schema.get("minItems") or 0
+            max_items = schema.get("maxItems")
+            if max_items is None:
+                max_items = max(min_items, 3)
+            n_items = rng.randint(min(max(min_items, 1), max_items), max_items)
+            item_schema = schema.get("items") or {}
+            return [
+                get_fake_value_for_schema(item_schema, rng, root, depth + 1)
+                for _ in range(n_items)
+            ]
+        case "string":
+            return _get_fake_string(schema, rng)
+        case "integer":
+            return _get_fake_number(schema, rng, is_integer=True)
+        case "number":
+            return _get_fake_number(schema, rng, is_integer=False)
+        case "boolean":
+            return rng.random() < 0.5
+    return None
+
+
+class FakeLLMClient:
+    """
+    Stands in for an LLM provider in offline benchmarks. Each call waits for
+    the time to first token, fails at ``failure_rate``, then produces its
+    tokens at ``tokens_per_second``. Structured calls return content that
+    validates against the requested schema.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        failure_rate: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.latency = _first_set(
+            latency, get_fake_llm_latency_seconds_env(), DEFAULT_FAKE_LLM_LATENCY_SECONDS
+        )
+        self.tokens_per_second = (
+            tokens_per_second
+            or get_fake_llm_tokens_per_second_env()
+            or DEFAULT_FAKE_LLM_TOKENS_PER_SECOND
+        )
+        self.failure_rate = _first_set(failure_rate, get_fake_llm_failure_rate_env(), 0.0)
+        self.rng = rng or random.Random()
+
+    async def _start(self):
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise FakeProviderError("Simulated LLM provider failure")
+
+    def _get_text(self, max_tokens: Optional[int] = None) -> str:
+        n_tokens = min(max_tokens or DEFAULT_FAKE_TEXT_TOKENS, DEFAULT_FAKE_TEXT_TOKENS)
+        return get_fake_text(self.rng, n_tokens * 4, n_tokens * 4)
+
+    async def _respond(self, text: str) -> str:
+        await self._start()
+        await asyncio.sleep(count_tokens(text) / self.tokens_per_second)
+        return text
+
+    async def _stream(self, text: str) -> AsyncGenerator[str, None]:
+        await self._start()
+        chunk_length = FAKE_STREAM_CHUNK_TOKENS * 4
+        for start in range(0, len(text), chunk_length):
+            chunk = text[start : start + chunk_length]
+            await asyncio.sleep(count_tokens(chunk) / self.tokens_per_second)
+            yield chunk
+
+    async def generate(self, max_tokens: Optional[int] = None) -> str:
+        return await self._respond(self._get_text(max_tokens))
+
+    async def generate_structured(self, response_format: dict) -> dict:
+        content = get_fake_value_for_schema(response_format, self.rng)
+        await self._respond(json.dumps(content))
+        return content
+
+    def stream(self, max_tokens: Optional[int] = None) -> AsyncGenerator[str, None]:
+        return self._stream(self._get_text(max_tokens))
+
+    def stream_structured(self, response_format: dict) -> AsyncGenerator[str, None]:
+        return self._stream(
+            json.dumps(get_fake_value_for_schema(response_format, self.rng))
+        )
+
+
+class FakeImageGenerator:
+    """
+    Stands in for an image generation provider in offline benchmarks. Each
+    image takes ``latency`` seconds, fails at ``failure_rate`` and is a copy
+    of the placeholder image.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[float] = None,
+        failure_rate: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.latency = _first_set(
+            latency,
+            get_fake_image_latency_seconds_env(),
+            DEFAULT_FAKE_IMAGE_LATENCY_SECONDS,
+        )
+        self.failure_rate = _first_set(
+            failure_rate, get_fake_image_failure_rate_env(), 0.0
+        )
+        self.rng = rng or random.Random()
+
+    async def generate(self, output_directory: str) -> str:
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise FakeProviderError("Simulated image provider failure")
+
+        os.makedirs(output_directory, exist_ok=True)
+        image_path = os.path.join(output_directory, f"{uuid.uuid4()}.jpg")
+        await asyncio.to_thread(shutil.copyfile, FAKE_IMAGE_PATH, image_path)
+        return image_path
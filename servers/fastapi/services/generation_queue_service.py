@@ -0,0 +1,402 @@
+import asyncio
+from datetime import datetime, timedelta
+import os
+import socket
+from typing import Awaitable, Callable, Dict, Optional
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.api_error_model import APIErrorModel
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from services.database import async_session_maker, sql_engine
+from utils.custom_logger import setup_logger
+from utils.datetime_utils import get_current_utc_datetime
+from utils.get_env import (
+    get_generation_lease_seconds_env,
+    get_generation_max_attempts_env,
+    get_generation_worker_concurrency_env,
+)
+
+logger = setup_logger(__name__)
+
+DEFAULT_LEASE_SECONDS = 120
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_WORKER_CONCURRENCY = 2
+RETRY_BACKOFF_BASE_SECONDS = 10
+RETRY_BACKOFF_MAX_SECONDS = 600
+
+
+class GenerationQueueService:
+    """
+    Persistent queue on top of ``async_presentation_generation_tasks``.
+
+    A row is queued while ``available_at`` is set. Workers claim rows by taking
+    a lease that they keep alive with heartbeats; rows whose lease expires are
+    handed to another worker, so every task runs at least once.
+    """
+
+    # SQLite has no row locks, claims from one process are serialized here and
+    # the conditional update below keeps concurrent processes from double claiming
+    _claim_lock = asyncio.Lock()
+
+    @staticmethod
+    def get_lease_seconds() -> int:
+        return get_generation_lease_seconds_env() or DEFAULT_LEASE_SECONDS
+
+    @staticmethod
+    def get_max_attempts() -> int:
+        return get_generation_max_attempts_env() or DEFAULT_MAX_ATTEMPTS
+
+    @staticmethod
+    def supports_skip_locked() -> bool:
+        return sql_engine.dialect.name == "postgresql"
+
+    @staticmethod
+    async def enqueue(
+        sql_session: AsyncSession,
+        task: AsyncPresentationGenerationTaskModel,
+        payload: dict,
+    ):
+        task.status = "pending"
+        task.message = "Queued for generation"
+        task.payload = payload
+        task.attempts = 0
+        task.available_at = get_current_utc_datetime()
+        sql_session.add(task)
+        await sql_session.commit()
+
+    @classmethod
+    def _claimable_condition(cls, now: datetime):
+        Task = AsyncPresentationGenerationTaskModel
+        return and_(
+            Task.available_at.is_not(None),
+            Task.available_at <= now,
+            Task.attempts < cls.get_max_attempts(),
+            or_(
+                Task.status == "pending",
+                and_(Task.status == "processing", Task.lease_expires_at < now),
+            ),
+        )
+
+    @classmethod
+    async def claim(
+        cls, sql_session: AsyncSession, worker_id: str
+    ) -> Optional[AsyncPresentationGenerationTaskModel]:
+        if cls.supports_skip_locked():
+            return await cls._claim(sql_session, worker_id)
+
+        async with cls._claim_lock:
+            return await cls._claim(sql_session, worker_id)
+
+    @classmethod
+    async def _claim(
+        cls, sql_session: AsyncSession, worker_id: str
+    ) -> Optional[AsyncPresentationGenerationTaskModel]:
+        Task = AsyncPresentationGenerationTaskModel
+        now = get_current_utc_datetime()
+
+        query = (
+            select(Task.id)
+            .where(cls._claimable_condition(now))
+            .order_by(Task.available_at)
+            .limit(1)
+        )
+        if cls.supports_skip_locked():
+            query = query.with_for_update(skip_locked=True)
+
+        task_id = await sql_session.scalar(query)
+        if task_id is None:
+            await sql_session.rollback()
+            return None
+
+        result = await sql_session.execute(
+            update(Task)
+            .where(Task.id == task_id, cls._claimable_condition(now))
+            .values(
+                status="processing",
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=cls.get_lease_seconds()),
+                heartbeat_at=now,
+                attempts=Task.attempts + 1,
+                # Unlike the lease columns, updated_at is stored without a timezone
+                updated_at=datetime.now(),
+            )
+        )
+        await sql_session.commit()
+
+        # Another process claimed the row between the select and the update
+        if result.rowcount != 1:
+            return None
+
+        return await sql_session.get(Task, task_id, populate_existing=True)
+
+    @classmethod
+    async def heartbeat(
+        cls, sql_session: AsyncSession, task_id: uuid.UUID, worker_id: str
+    ) -> bool:
+        Task = AsyncPresentationGenerationTaskModel
+        now = get_current_utc_datetime()
+        result = await sql_session.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.lease_owner == worker_id)
+            .values(
+                lease_expires_at=now + timedelta(seconds=cls.get_lease_seconds()),
+                heartbeat_at=now,
+            )
+        )
+        await sql_session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def finish(sql_session: AsyncSession, task_id: uuid.UUID, worker_id: str):
+        # Payload holds the request and its principal, drop it once the task is done
+        Task = AsyncPresentationGenerationTaskModel
+        await sql_session.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.lease_owner == worker_id)
+            .values(
+                payload=None,
+                available_at=None,
+                lease_owner=None,
+                lease_expires_at=None,
+            )
+        )
+        await sql_session.commit()
+
+    @classmethod
+    async def retry(
+        cls,
+        sql_session: AsyncSession,
+        task: AsyncPresentationGenerationTaskModel,
+        worker_id: str,
+    ) -> bool:
+        """
+        Queues a failed task again after a backoff growing with its attempts.
+        Returns False, leaving the task as it is, once it has no attempts left.
+        """
+        if task.attempts >= cls.get_max_attempts():
+            return False
+
+        Task = AsyncPresentationGenerationTaskModel
+        delay = min(
+            RETRY_BACKOFF_BASE_SECONDS * 2 ** max(task.attempts - 1, 0),
+            RETRY_BACKOFF_MAX_SECONDS,
+        )
+        result = await sql_session.execute(
+            update(Task)
+            .where(Task.id == task.id, Task.lease_owner == worker_id)
+            .values(
+                status="pending",
+                message="Generation failed, retrying",
+                available_at=get_current_utc_datetime() + timedelta(seconds=delay),
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=datetime.now(),
+            )
+        )
+        await sql_session.commit()
+        return result.rowcount == 1
+
+    @staticmethod
+    async def release(sql_session: AsyncSession, task_id: uuid.UUID, worker_id: str):
+        # Interrupted by a shutdown, not a failure of the task itself
+        Task = AsyncPresentationGenerationTaskModel
+        await sql_session.execute(
+            update(Task)
+            .where(Task.id == task_id, Task.lease_owner == worker_id)
+            .values(
+                status="pending",
+                message="Queued for generation",
+                attempts=Task.attempts - 1,
+                available_at=get_current_utc_datetime(),
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=datetime.now(),
+            )
+        )
+        await sql_session.commit()
+
+    @classmethod
+    async def fail_exhausted(cls, sql_session: AsyncSession) -> int:
+        Task = AsyncPresentationGenerationTaskModel
+        now = get_current_utc_datetime()
+        max_attempts = cls.get_max_attempts()
+        error = APIErrorModel.from_exception(
+            HTTPException(
+                status_code=500,
+                detail=f"Presentation generation abandoned after {max_attempts} attempts",
+            )
+        )
+        result = await sql_session.execute(
+            update(Task)
+            .where(
+                Task.available_at.is_not(None),
+                Task.attempts >= max_attempts,
+                or_(
+                    Task.status == "pending",
+                    and_(Task.status == "processing", Task.lease_expires_at < now),
+                ),
+            )
+            .values(
+                status="error",
+                message="Presentation generation failed",
+                error=error.model_dump(mode="json"),
+                payload=None,
+                available_at=None,
+                lease_owner=None,
+                lease_expires_at=None,
+                updated_at=datetime.now(),
+            )
+        )
+        await sql_session.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def get_depth(sql_session: AsyncSession) -> Dict[str, int]:
+        """Counts the queued tasks by status, pending or processing."""
+        Task = AsyncPresentationGenerationTaskModel
+        rows = await sql_session.execute(
+            select(Task.status, func.count())
+            .where(Task.available_at.is_not(None))
+            .group_by(Task.status)
+        )
+        return {status: count for status, count in rows.all()}
+
+
+class GenerationWorker:
+    """
+    Claims queued generation tasks and runs them with ``handler``, keeping at
+    most ``concurrency`` tasks in flight.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[AsyncPresentationGenerationTaskModel], Awaitable[None]],
+        concurrency: Optional[int] = None,
+        poll_interval: float = 2.0,
+        worker_id: Optional[str] = None,
+    ):
+        self.handler = handler
+        self.concurrency = max(
+            1,
+            concurrency
+            or get_generation_worker_concurrency_env()
+            or DEFAULT_WORKER_CONCURRENCY,
+        )
+        self.poll_interval = poll_interval
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self._jobs: Dict[uuid.UUID, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def stop(self):
+        logger.info(f"Stopping generation worker {self.worker_id}")
+        self._stopping = True
+        self._wakeup.set()
+
+    async def run(self):
+        logger.info(
+            f"Generation worker {self.worker_id} started with concurrency {self.concurrency}"
+        )
+        reaped_at = 0.0
+        loop = asyncio.get_running_loop()
+
+        while not self._stopping:
+            try:
+                if loop.time() - reaped_at > GenerationQueueService.get_lease_seconds():
+                    async with async_session_maker() as sql_session:
+                        n_failed = await GenerationQueueService.fail_exhausted(
+                            sql_session
+                        )
+                    if n_failed:
+                        logger.warning(f"Marked {n_failed} exhausted tasks as failed")
+                    reaped_at = loop.time()
+
+                while len(self._jobs) < self.concurrency and not self._stopping:
+                    async with async_session_maker() as sql_session:
+                        task = await GenerationQueueService.claim(
+                            sql_session, self.worker_id
+                        )
+                    if not task:
+                        break
+                    logger.info(f"Claimed task {task.id} (attempt {task.attempts})")
+                    self._jobs[task.id] = asyncio.create_task(self._run_job(task))
+
+            except Exception as e:
+                logger.error(f"Error polling generation queue: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        # Hand unfinished tasks back to the queue
+        for job in self._jobs.values():
+            job.cancel()
+        if self._jobs:
+            await asyncio.gather(*self._jobs.values(), return_exceptions=True)
+        logger.info(f"Generation worker {self.worker_id} stopped")
+
+    async def _run_job(self, task: AsyncPresentationGenerationTaskModel):
+        handler_task = asyncio.create_task(self.handler(task))
+        heartbeat_task = asyncio.create_task(self._keep_lease(task.id, handler_task))
+        failed = False
+        try:
+            await handler_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            failed = True
+            logger.error(f"Task {task.id} failed on attempt {task.attempts}: {e}")
+        finally:
+            heartbeat_task.cancel()
+            if not handler_task.done():
+                handler_task.cancel()
+                await asyncio.gather(handler_task, return_exceptions=True)
+
+            try:
+                async with async_session_maker() as sql_session:
+                    if self._stopping and handler_task.cancelled():
+                        await GenerationQueueService.release(
+                            sql_session, task.id, self.worker_id
+                        )
+                    else:
+                        retried = failed and await GenerationQueueService.retry(
+                            sql_session, task, self.worker_id
+                        )
+                        if not retried:
+                            await GenerationQueueService.finish(
+                                sql_session, task.id, self.worker_id
+                            )
+            except Exception as e:
+                logger.error(f"Failed to update lease for task {task.id}: {e}")
+
+            self._jobs.pop(task.id, None)
+            self._wakeup.set()
+
+    async def _keep_lease(self, task_id: uuid.UUID, handler_task: asyncio.Task):
+        interval = GenerationQueueService.get_lease_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session_maker() as sql_session:
+                    owns_lease = await GenerationQueueService.heartbeat(
+                        sql_session, task_id, self.worker_id
+                    )
+            except Exception as e:
+                # Keep working, the lease only lapses after several missed beats
+                logger.warning(f"Heartbeat failed for task {task_id}: {e}")
+                continue
+
+            if not owns_lease:
+                logger.warning(f"Lost lease on task {task_id}, cancelling")
+                handler_task.cancel()
+                return
@@ -0,0 +1,166 @@
+import asyncio
+from typing import Any, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm.attributes import flag_modified
+
+from services.database import async_session_maker
+from utils.custom_logger import setup_logger
+from utils.get_env import (
+    get_slide_write_batch_size_env,
+    get_slide_write_flush_interval_ms_env,
+    get_slide_write_max_attempts_env,
+)
+
+logger = setup_logger(__name__)
+
+DEFAULT_FLUSH_INTERVAL_MS = 2000
+DEFAULT_BATCH_SIZE = 5
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class GenerationWriteBuffer:
+    """
+    Write-behind persistence for a generation session. Slides, assets and
+    statements are queued in order and written in a single transaction once
+    batch_size writes are pending or flush_interval has passed, instead of a
+    commit per slide. A crash loses at most the writes of the last window,
+    which a resumed stream regenerates.
+
+    A batch that fails max_attempts flushes in a row is written one write at
+    a time, and writes that still fail are dropped into dropped_writes, so a
+    write that can never succeed does not hold back the ones after it.
+
+    Instances are written from short lived sessions, so they must not be
+    attached to another session when they are queued.
+    """
+
+    def __init__(
+        self,
+        session_maker=async_session_maker,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        self.session_maker = session_maker
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else (get_slide_write_flush_interval_ms_env() or DEFAULT_FLUSH_INTERVAL_MS)
+            / 1000
+        )
+        self.batch_size = batch_size or get_slide_write_batch_size_env() or DEFAULT_BATCH_SIZE
+        self.max_attempts = (
+            max_attempts or get_slide_write_max_attempts_env() or DEFAULT_MAX_ATTEMPTS
+        )
+        self.n_flushes = 0
+        self.dropped_writes: List[Tuple[str, Any, Exception]] = []
+        self._failed_flushes = 0
+        self._pending: List[Tuple[str, Any, Tuple[str, ...]]] = []
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def __aenter__(self):
+        self._flush_task = asyncio.create_task(self._run_flush_loop())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # The loop is stopped instead of cancelled, as a commit cancelled
+        # midway can not tell whether its writes went through
+        self._closed = True
+        self._wakeup.set()
+        if self._flush_task:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        # Whatever was generated is kept for a resumed stream, even on errors
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to flush generation writes")
+            if exc_type is None:
+                raise
+
+    def _queue(self, operation: str, value: Any, modified: Tuple[str, ...] = ()):
+        self._pending.append((operation, value, modified))
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def add(self, instance: Any, modified: Iterable[str] = ()):
+        """
+        Queues an insert, or an update of a previously written instance.
+        Attributes in modified were changed in place, e.g. a JSON column.
+        They are flagged when the instance is flushed, as an earlier flush
+        still writing the instance would clear flags set now.
+        """
+        self._queue("add", instance, tuple(modified))
+
+    def add_all(self, instances: Iterable[Any]):
+        for instance in instances:
+            self.add(instance)
+
+    def execute(self, statement):
+        self._queue("execute", statement)
+
+    async def _write(self, operations: List[Tuple[str, Any, Tuple[str, ...]]]):
+        async with self.session_maker() as sql_session:
+            for operation, value, modified in operations:
+                if operation == "add":
+                    sql_session.add(value)
+                    for key in modified:
+                        flag_modified(value, key)
+                else:
+                    await sql_session.execute(value)
+            await sql_session.commit()
+
+    async def _write_one_by_one(
+        self, operations: List[Tuple[str, Any, Tuple[str, ...]]]
+    ):
+        for index, (operation, value, modified) in enumerate(operations):
+            try:
+                await self._write([(operation, value, modified)])
+            except Exception as e:
+                logger.error(
+                    f"Dropping generation write ({operation} {type(value).__name__}) "
+                    f"after {self.max_attempts} failed flushes: {e}"
+                )
+                self.dropped_writes.append((operation, value, e))
+            except BaseException:
+                self._pending = operations[index:] + self._pending
+                raise
+
+    async def flush(self):
+        async with self._lock:
+            if not self._pending:
+                return
+            operations, self._pending = self._pending, []
+            try:
+                await self._write(operations)
+            except Exception:
+                self._failed_flushes += 1
+                if self._failed_flushes < self.max_attempts:
+                    # Keep the writes for the next flush
+                    self._pending = operations + self._pending
+                    raise
+                self._failed_flushes = 0
+                await self._write_one_by_one(operations)
+            except BaseException:
+                self._pending = operations + self._pending
+                raise
+            else:
+                self._failed_flushes = 0
+            self.n_flushes += 1
+
+    async def _run_flush_loop(self):
+        while not self._closed:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush generation writes, retrying")
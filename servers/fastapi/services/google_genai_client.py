@@ -0,0 +1,43 @@
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from google import genai
+    from google.genai.client import AsyncClient
+
+
+class GoogleGenAIClients:
+    """
+    Shared Gemini clients, so requests reuse one client per API key instead
+    of building their own. Clients are kept per API key, as the key can be
+    changed from the settings at runtime. How much of the connection pool is
+    reused depends on the SDK release: recent ones keep an aiohttp session
+    per event loop, while older ones such as the 1.28 the lock pins open a
+    session per request and have no ``aclose``/``close`` to call.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Optional[str], "genai.Client"] = {}
+
+    def get(self, api_key: Optional[str] = None) -> "AsyncClient":
+        client = self._clients.get(api_key)
+        if client is None:
+            from google import genai
+
+            client = genai.Client(api_key=api_key)
+            self._clients[api_key] = client
+        return client.aio
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            # Missing from older SDK releases such as 1.28
+            aclose = getattr(client.aio, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+
+
+GOOGLE_GENAI_CLIENTS = GoogleGenAIClients()
@@ -1,16 +1,30 @@
 import asyncio
 import json
-import chromadb
-from chromadb.config import Settings
-from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+import threading
+from services.metrics_service import PIPELINE_STAGE_SECONDS
+from services.tracing_service import TRACER
 from utils.get_env import get_app_data_directory_env
 import os
 
 class IconFinderService:
     def __init__(self):
         self.collection_name = "icons"
+        self.collection = None
+        self._initialize_lock = threading.Lock()
+
+    def initialize(self):
+        # Loaded on first use so the server can fork workers before chromadb
+        # and ONNX Runtime start their threads
+        with self._initialize_lock:
+            if self.collection is not None:
+                return
+
+            self._initialize_client()
+
+    def _initialize_client(self):
+        import chromadb
+        from chromadb.config import Settings
 
-        
         app_data_dir = get_app_data_directory_env()
         chroma_path = os.path.join(app_data_dir, "chroma") if app_data_dir else "chroma"
         
@@ -22,6 +36,8 @@ class IconFinderService:
         print("Icons collection initialized.")
 
     def _initialize_icons_collection(self):
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
         app_data_dir = get_app_data_directory_env()
         chroma_path = os.path.join(app_data_dir, "chroma") if app_data_dir else "chroma"
 
@@ -53,7 +69,11 @@ class IconFinderService:
                 )
                 self.collection.add(documents=documents, ids=ids)
 
+    @PIPELINE_STAGE_SECONDS.time(stage="icon")
+    @TRACER.trace("icon.search")
     async def search_icons(self, query: str, k: int = 1):
+        if self.collection is None:
+            await asyncio.to_thread(self.initialize)
         result = await asyncio.to_thread(
             self.collection.query,
             query_texts=[query],
@@ -63,3 +83,7 @@ class IconFinderService:
 
 
 ICON_FINDER_SERVICE = IconFinderService()
+
+
+def prepare_icon_index():
+    ICON_FINDER_SERVICE.initialize()
@@ -4,12 +4,15 @@ import json
 import os
 import aiohttp
 from fastapi import HTTPException
-from google import genai
-from openai import NOT_GIVEN, AsyncOpenAI
 from models.image_prompt import ImagePrompt
 from models.sql.image_asset import ImageAsset
+from services.fake_provider_service import FakeImageGenerator
+from services.google_genai_client import GOOGLE_GENAI_CLIENTS
+from services.metrics_service import PIPELINE_STAGE_SECONDS
+from services.tracing_service import TRACER
 from utils.get_env import (
     get_dall_e_3_quality_env,
+    get_google_api_key_env,
     get_gpt_image_1_5_quality_env,
     get_pexels_api_key_env,
     get_image_gen_api_key_env,
@@ -29,6 +32,7 @@ from utils.image_provider import (
     is_dalle3_selected,
     is_comfyui_selected,
     is_custom_openai_selected,
+    is_fake_image_selected,
 )
 import uuid
 
@@ -64,11 +68,15 @@ class ImageGenerationService:
             return self.generate_image_comfyui
         elif is_custom_openai_selected():
             return self.generate_image_custom_openai
+        elif is_fake_image_selected():
+            return self.generate_image_fake
         return None
 
     def is_stock_provider_selected(self):
         return is_pixels_selected() or is_pixabay_selected()
 
+    @PIPELINE_STAGE_SECONDS.time(stage="image")
+    @TRACER.trace("image.generate")
     async def generate_image(self, prompt: ImagePrompt) -> str | ImageAsset:
         """
         Generates an image based on the provided prompt.
@@ -148,6 +156,8 @@ class ImageGenerationService:
         api_key: str | None = None,
         base_url: str | None = None,
     ) -> str:
+        from openai import NOT_GIVEN, AsyncOpenAI
+
         client = AsyncOpenAI(api_key=api_key, base_url=base_url)
 
         request_params = {
@@ -233,9 +243,8 @@ class ImageGenerationService:
         self, prompt: str, output_directory: str, model: str
     ) -> str:
         """Base method for Google image generation models."""
-        client = genai.Client()
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        client = GOOGLE_GENAI_CLIENTS.get(get_google_api_key_env())
+        response = await client.models.generate_content(
             model=model,
             contents=[prompt],
         )
@@ -289,6 +298,9 @@ class ImageGenerationService:
             image_url = data["hits"][0]["largeImageURL"]
             return image_url
 
+    async def generate_image_fake(self, prompt: str, output_directory: str) -> str:
+        return await FakeImageGenerator().generate(output_directory)
+
     async def generate_image_comfyui(self, prompt: str, output_directory: str) -> str:
         """
         Generate image using ComfyUI workflow API.
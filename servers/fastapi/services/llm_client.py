@@ -1,25 +1,8 @@
-import asyncio
+from contextlib import contextmanager
 import dirtyjson
 import json
-from typing import AsyncGenerator, List, Optional
+from typing import TYPE_CHECKING, AsyncGenerator, List, Optional
 from fastapi import HTTPException
-from openai import AsyncOpenAI
-from openai.types.chat.chat_completion_chunk import (
-    ChatCompletionChunk as OpenAIChatCompletionChunk,
-)
-from google import genai
-from google.genai.types import Content as GoogleContent, Part as GoogleContentPart
-from google.genai.types import (
-    GenerateContentConfig,
-    GoogleSearch,
-    ToolConfig as GoogleToolConfig,
-    FunctionCallingConfig as GoogleFunctionCallingConfig,
-    FunctionCallingConfigMode as GoogleFunctionCallingConfigMode,
-)
-from google.genai.types import Tool as GoogleTool
-from anthropic import AsyncAnthropic
-from anthropic.types import Message as AnthropicMessage
-from anthropic import MessageStreamEvent as AnthropicMessageStreamEvent
 from enums.llm_provider import LLMProvider
 from models.llm_message import (
     AnthropicAssistantMessage,
@@ -39,8 +22,18 @@ from models.llm_tool_call import (
     OpenAIToolCallFunction,
 )
 from models.llm_tools import LLMDynamicTool, LLMTool
+from services.fake_provider_service import FakeLLMClient
+from services.google_genai_client import GOOGLE_GENAI_CLIENTS
 from services.llm_tool_calls_handler import LLMToolCallsHandler
-from utils.async_iterator import iterator_to_async
+from services.metrics_service import LLM_REQUEST_SECONDS, LLM_TOKENS
+from services.token_usage_service import (
+    check_token_budget,
+    count_content_tokens,
+    count_message_tokens,
+    count_tokens,
+    record_token_usage,
+)
+from services.tracing_service import TRACER
 from utils.dummy_functions import do_nothing_async
 from utils.get_env import (
     get_anthropic_api_key_env,
@@ -55,11 +48,19 @@ from utils.get_env import (
 )
 from utils.llm_provider import get_llm_provider, get_model
 from utils.parsers import parse_bool_or_none
-from utils.schema_utils import (
-    ensure_strict_json_schema,
-    flatten_json_schema,
-    remove_titles_from_schema,
-)
+from utils.schema_cache import get_google_json_schema, get_strict_json_schema
+
+# Provider SDKs are imported by the methods of the selected provider only
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+    from anthropic import MessageStreamEvent as AnthropicMessageStreamEvent
+    from anthropic.types import Message as AnthropicMessage
+    from google.genai.client import AsyncClient as GoogleAsyncClient
+    from google.genai.types import Content as GoogleContent
+    from openai import AsyncOpenAI
+    from openai.types.chat.chat_completion_chunk import (
+        ChatCompletionChunk as OpenAIChatCompletionChunk,
+    )
 
 
 class LLMClient:
@@ -79,6 +80,7 @@ class LLMClient:
         if (
             self.llm_provider == LLMProvider.OLLAMA
             or self.llm_provider == LLMProvider.CUSTOM
+            or self.llm_provider == LLMProvider.FAKE
         ):
             return False
         return parse_bool_or_none(get_web_grounding_env()) or False
@@ -87,6 +89,71 @@ class LLMClient:
     def disable_thinking(self) -> bool:
         return parse_bool_or_none(get_disable_thinking_env()) or False
 
+    # ? Metrics
+    @contextmanager
+    def _observe_request(self, model: str, method: str):
+        provider = self.llm_provider.value
+        with (
+            LLM_REQUEST_SECONDS.time(provider=provider, model=model, method=method),
+            TRACER.start_span(
+                f"llm.{method}", {"llm.provider": provider, "llm.model": model}
+            ),
+        ):
+            yield
+
+    def _record_usage(
+        self,
+        model: str,
+        input_tokens: Optional[int],
+        output_tokens: Optional[int],
+        messages: Optional[List[LLMMessage]] = None,
+        output=None,
+    ):
+        # Usage the provider didn't report, like from some Ollama and custom
+        # servers, is estimated from the messages and the output
+        if input_tokens is None and messages is not None:
+            input_tokens = count_message_tokens(messages)
+        if output_tokens is None and output is not None:
+            output_tokens = count_content_tokens(output)
+
+        provider = self.llm_provider.value
+        if input_tokens:
+            LLM_TOKENS.inc(input_tokens, provider=provider, model=model, type="input")
+        if output_tokens:
+            LLM_TOKENS.inc(output_tokens, provider=provider, model=model, type="output")
+        record_token_usage(input_tokens or 0, output_tokens or 0)
+
+    @staticmethod
+    def estimate_input_tokens(
+        messages: List[LLMMessage],
+        response_format: Optional[dict] = None,
+        tools: Optional[List[dict]] = None,
+    ) -> int:
+        return (
+            count_message_tokens(messages)
+            + count_content_tokens(response_format)
+            + count_content_tokens(tools)
+        )
+
+    async def _observe_stream(
+        self,
+        stream: AsyncGenerator,
+        model: str,
+        method: str,
+        estimated_input_tokens: int,
+    ):
+        # Fails on the first chunk, before the request is sent
+        await check_token_budget(estimated_input_tokens)
+        with self._observe_request(model, method):
+            async for chunk in stream:
+                yield chunk
+
+    def _get_openai_stream_options(self) -> Optional[dict]:
+        # Custom servers may not support stream options, their usage is estimated
+        if self.llm_provider in (LLMProvider.OPENAI, LLMProvider.OLLAMA):
+            return {"include_usage": True}
+        return None
+
     # ? Clients
     def _get_client(self):
         match self.llm_provider:
@@ -100,6 +167,8 @@ class LLMClient:
                 return self._get_ollama_client()
             case LLMProvider.CUSTOM:
                 return self._get_custom_client()
+            case LLMProvider.FAKE:
+                return self._get_fake_client()
             case _:
                 raise HTTPException(
                     status_code=400,
@@ -112,6 +181,8 @@ class LLMClient:
                 status_code=400,
                 detail="OpenAI API Key is not set",
             )
+        from openai import AsyncOpenAI
+
         return AsyncOpenAI()
 
     def _get_google_client(self):
@@ -120,7 +191,7 @@ class LLMClient:
                 status_code=400,
                 detail="Google API Key is not set",
             )
-        return genai.Client()
+        return GOOGLE_GENAI_CLIENTS.get(get_google_api_key_env())
 
     def _get_anthropic_client(self):
         if not get_anthropic_api_key_env():
@@ -128,9 +199,13 @@ class LLMClient:
                 status_code=400,
                 detail="Anthropic API Key is not set",
             )
+        from anthropic import AsyncAnthropic
+
         return AsyncAnthropic()
 
     def _get_ollama_client(self):
+        from openai import AsyncOpenAI
+
         return AsyncOpenAI(
             base_url=(get_ollama_url_env() or "http://localhost:11434") + "/v1",
             api_key="ollama",
@@ -142,11 +217,16 @@ class LLMClient:
                 status_code=400,
                 detail="Custom LLM URL is not set",
             )
+        from openai import AsyncOpenAI
+
         return AsyncOpenAI(
             base_url=get_custom_llm_url_env(),
             api_key=get_custom_llm_api_key_env() or "null",
         )
 
+    def _get_fake_client(self):
+        return FakeLLMClient()
+
     # ? Prompts
     def _get_system_prompt(self, messages: List[LLMMessage]) -> str:
         for message in messages:
@@ -154,7 +234,12 @@ class LLMClient:
                 return message.content
         return ""
 
-    def _get_google_messages(self, messages: List[LLMMessage]) -> List[GoogleContent]:
+    def _get_google_messages(
+        self, messages: List[LLMMessage]
+    ) -> List["GoogleContent"]:
+        from google.genai.types import Content as GoogleContent
+        from google.genai.types import Part as GoogleContentPart
+
         contents = []
         for message in messages:
             if isinstance(message, LLMUserMessage):
@@ -205,6 +290,14 @@ class LLMClient:
             extra_body=extra_body,
         )
 
+        usage = response.usage
+        self._record_usage(
+            model,
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+            messages=messages,
+            output=response.choices[0].message if response.choices else None,
+        )
         if len(response.choices) == 0:
             return None
 
@@ -253,14 +346,16 @@ class LLMClient:
         max_tokens: Optional[int] = None,
         depth: int = 0,
     ) -> str | None:
-        client: genai.Client = self._client
+        from google.genai.types import GenerateContentConfig
+        from google.genai.types import Tool as GoogleTool
+
+        client: GoogleAsyncClient = self._client
 
         google_tools = None
         if tools:
             google_tools = [GoogleTool(function_declarations=[tool]) for tool in tools]
 
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        response = await client.models.generate_content(
             model=model,
             contents=self._get_google_messages(messages),
             config=GenerateContentConfig(
@@ -271,6 +366,14 @@ class LLMClient:
             ),
         )
 
+        usage = response.usage_metadata
+        self._record_usage(
+            model,
+            usage.prompt_token_count if usage else None,
+            usage.candidates_token_count if usage else None,
+            messages=messages,
+            output=response.candidates[0].content if response.candidates else None,
+        )
         content = response.candidates[0].content
         response_parts = content.parts
 
@@ -333,6 +436,9 @@ class LLMClient:
             tools=tools,
             max_tokens=max_tokens or 4000,
         )
+        self._record_usage(
+            model, response.usage.input_tokens, response.usage.output_tokens
+        )
         text_content = None
         tool_calls: List[AnthropicToolCall] = []
         for content in response.content:
@@ -401,6 +507,17 @@ class LLMClient:
             depth=depth,
         )
 
+    async def _generate_fake(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+    ):
+        client: FakeLLMClient = self._client
+        content = await client.generate(max_tokens)
+        self._record_usage(model, count_message_tokens(messages), count_tokens(content))
+        return content
+
     async def generate(
         self,
         model: str,
@@ -409,38 +526,46 @@ class LLMClient:
         tools: Optional[List[type[LLMTool] | LLMDynamicTool]] = None,
     ):
         parsed_tools = self.tool_calls_handler.parse_tools(tools)
+        await check_token_budget(
+            self.estimate_input_tokens(messages, tools=parsed_tools)
+        )
 
         content = None
-        match self.llm_provider:
-            case LLMProvider.OPENAI:
-                content = await self._generate_openai(
-                    model=model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    tools=parsed_tools,
-                )
-            case LLMProvider.GOOGLE:
-                content = await self._generate_google(
-                    model=model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    tools=parsed_tools,
-                )
-            case LLMProvider.ANTHROPIC:
-                content = await self._generate_anthropic(
-                    model=model,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    tools=parsed_tools,
-                )
-            case LLMProvider.OLLAMA:
-                content = await self._generate_ollama(
-                    model=model, messages=messages, max_tokens=max_tokens
-                )
-            case LLMProvider.CUSTOM:
-                content = await self._generate_custom(
-                    model=model, messages=messages, max_tokens=max_tokens
-                )
+        with self._observe_request(model, "generate"):
+            match self.llm_provider:
+                case LLMProvider.OPENAI:
+                    content = await self._generate_openai(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        tools=parsed_tools,
+                    )
+                case LLMProvider.GOOGLE:
+                    content = await self._generate_google(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        tools=parsed_tools,
+                    )
+                case LLMProvider.ANTHROPIC:
+                    content = await self._generate_anthropic(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        tools=parsed_tools,
+                    )
+                case LLMProvider.OLLAMA:
+                    content = await self._generate_ollama(
+                        model=model, messages=messages, max_tokens=max_tokens
+                    )
+                case LLMProvider.CUSTOM:
+                    content = await self._generate_custom(
+                        model=model, messages=messages, max_tokens=max_tokens
+                    )
+                case LLMProvider.FAKE:
+                    content = await self._generate_fake(
+                        model=model, messages=messages, max_tokens=max_tokens
+                    )
         if content is None:
             raise HTTPException(
                 status_code=400,
@@ -468,11 +593,7 @@ class LLMClient:
             self.use_tool_calls_for_structured_output()
         )
         if strict and depth == 0:
-            response_schema = ensure_strict_json_schema(
-                response_schema,
-                path=(),
-                root=response_schema,
-            )
+            response_schema = get_strict_json_schema(response_schema)
         if use_tool_calls_for_structured_output and depth == 0:
             if all_tools is None:
                 all_tools = []
@@ -510,6 +631,14 @@ class LLMClient:
             extra_body=extra_body,
         )
 
+        usage = response.usage
+        self._record_usage(
+            model,
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+            messages=messages,
+            output=response.choices[0].message if response.choices else None,
+        )
         if len(response.choices) == 0:
             return None
 
@@ -575,7 +704,15 @@ class LLMClient:
         tools: Optional[List[dict]] = None,
         depth: int = 0,
     ) -> dict | None:
-        client: genai.Client = self._client
+        from google.genai.types import (
+            FunctionCallingConfig as GoogleFunctionCallingConfig,
+            FunctionCallingConfigMode as GoogleFunctionCallingConfigMode,
+            GenerateContentConfig,
+            Tool as GoogleTool,
+            ToolConfig as GoogleToolConfig,
+        )
+
+        client: GoogleAsyncClient = self._client
 
         google_tools = None
         if tools:
@@ -586,16 +723,13 @@ class LLMClient:
                         {
                             "name": "ResponseSchema",
                             "description": "Provide response to the user",
-                            "parameters": remove_titles_from_schema(
-                                flatten_json_schema(response_format)
-                            ),
+                            "parameters": get_google_json_schema(response_format),
                         }
                     ]
                 )
             )
 
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        response = await client.models.generate_content(
             model=model,
             contents=self._get_google_messages(messages),
             config=GenerateContentConfig(
@@ -616,6 +750,14 @@ class LLMClient:
             ),
         )
 
+        usage = response.usage_metadata
+        self._record_usage(
+            model,
+            usage.prompt_token_count if usage else None,
+            usage.candidates_token_count if usage else None,
+            messages=messages,
+            output=response.candidates[0].content if response.candidates else None,
+        )
         content = response.candidates[0].content
         response_parts = content.parts
         text_content = None
@@ -693,6 +835,9 @@ class LLMClient:
                 *(tools or []),
             ],
         )
+        self._record_usage(
+            model, response.usage.input_tokens, response.usage.output_tokens
+        )
         tool_calls: List[AnthropicToolCall] = []
         for content in response.content:
             if content.type == "tool_use":
@@ -773,6 +918,19 @@ class LLMClient:
             depth=depth,
         )
 
+    async def _generate_fake_structured(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+    ):
+        client: FakeLLMClient = self._client
+        content = await client.generate_structured(response_format)
+        self._record_usage(
+            model, count_message_tokens(messages), count_tokens(json.dumps(content))
+        )
+        return content
+
     async def generate_structured(
         self,
         model: str,
@@ -783,50 +941,60 @@ class LLMClient:
         max_tokens: Optional[int] = None,
     ) -> dict:
         parsed_tools = self.tool_calls_handler.parse_tools(tools)
+        await check_token_budget(
+            self.estimate_input_tokens(messages, response_format, parsed_tools)
+        )
 
         content = None
-        match self.llm_provider:
-            case LLMProvider.OPENAI:
-                content = await self._generate_openai_structured(
-                    model=model,
-                    messages=messages,
-                    response_format=response_format,
-                    strict=strict,
-                    tools=parsed_tools,
-                    max_tokens=max_tokens,
-                )
-            case LLMProvider.GOOGLE:
-                content = await self._generate_google_structured(
-                    model=model,
-                    messages=messages,
-                    response_format=response_format,
-                    tools=parsed_tools,
-                    max_tokens=max_tokens,
-                )
-            case LLMProvider.ANTHROPIC:
-                content = await self._generate_anthropic_structured(
-                    model=model,
-                    messages=messages,
-                    response_format=response_format,
-                    tools=parsed_tools,
-                    max_tokens=max_tokens,
-                )
-            case LLMProvider.OLLAMA:
-                content = await self._generate_ollama_structured(
-                    model=model,
-                    messages=messages,
-                    response_format=response_format,
-                    strict=strict,
-                    max_tokens=max_tokens,
-                )
-            case LLMProvider.CUSTOM:
-                content = await self._generate_custom_structured(
-                    model=model,
-                    messages=messages,
-                    response_format=response_format,
-                    strict=strict,
-                    max_tokens=max_tokens,
-                )
+        with self._observe_request(model, "generate_structured"):
+            match self.llm_provider:
+                case LLMProvider.OPENAI:
+                    content = await self._generate_openai_structured(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                        strict=strict,
+                        tools=parsed_tools,
+                        max_tokens=max_tokens,
+                    )
+                case LLMProvider.GOOGLE:
+                    content = await self._generate_google_structured(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                        tools=parsed_tools,
+                        max_tokens=max_tokens,
+                    )
+                case LLMProvider.ANTHROPIC:
+                    content = await self._generate_anthropic_structured(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                        tools=parsed_tools,
+                        max_tokens=max_tokens,
+                    )
+                case LLMProvider.OLLAMA:
+                    content = await self._generate_ollama_structured(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                        strict=strict,
+                        max_tokens=max_tokens,
+                    )
+                case LLMProvider.CUSTOM:
+                    content = await self._generate_custom_structured(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                        strict=strict,
+                        max_tokens=max_tokens,
+                    )
+                case LLMProvider.FAKE:
+                    content = await self._generate_fake_structured(
+                        model=model,
+                        messages=messages,
+                        response_format=response_format,
+                    )
         if content is None:
             raise HTTPException(
                 status_code=400,
@@ -851,6 +1019,8 @@ class LLMClient:
         current_id = None
         current_name = None
         current_arguments = None
+        usage = None
+        output_chunks: List[str] = []
         async for event in await client.chat.completions.create(
             model=model,
             messages=[message.model_dump() for message in messages],
@@ -858,13 +1028,18 @@ class LLMClient:
             tools=tools,
             extra_body=extra_body,
             stream=True,
+            stream_options=self._get_openai_stream_options(),
         ):
             event: OpenAIChatCompletionChunk = event
+            # Sent in a last chunk without choices
+            if event.usage:
+                usage = event.usage
             if not event.choices:
                 continue
 
             content_chunk = event.choices[0].delta.content
             if content_chunk:
+                output_chunks.append(content_chunk)
                 yield content_chunk
 
             tool_call_chunk = event.choices[0].delta.tool_calls
@@ -873,6 +1048,8 @@ class LLMClient:
                 tool_id = tool_call_chunk[0].id
                 tool_name = tool_call_chunk[0].function.name
                 tool_arguments = tool_call_chunk[0].function.arguments
+                if tool_arguments:
+                    output_chunks.append(tool_arguments)
 
                 if current_index != tool_index:
                     tool_calls.append(
@@ -897,6 +1074,14 @@ class LLMClient:
                     elif tool_arguments:
                         current_arguments += tool_arguments
 
+        self._record_usage(
+            model,
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+            messages=messages,
+            output="".join(output_chunks),
+        )
+
         if current_id is not None:
             tool_calls.append(
                 OpenAIToolCall(
@@ -940,7 +1125,10 @@ class LLMClient:
         max_tokens: Optional[int] = None,
         depth: int = 0,
     ) -> AsyncGenerator[str, None]:
-        client: genai.Client = self._client
+        from google.genai.types import GenerateContentConfig
+        from google.genai.types import Tool as GoogleTool
+
+        client: GoogleAsyncClient = self._client
 
         google_tools = None
         if tools:
@@ -948,7 +1136,8 @@ class LLMClient:
 
         generated_contents = []
         tool_calls: List[GoogleToolCall] = []
-        async for event in iterator_to_async(client.models.generate_content_stream)(
+        usage = None
+        async for event in await client.models.generate_content_stream(
             model=model,
             contents=self._get_google_messages(messages),
             config=GenerateContentConfig(
@@ -958,6 +1147,9 @@ class LLMClient:
                 max_output_tokens=max_tokens,
             ),
         ):
+            # Each chunk has the usage so far
+            if event.usage_metadata:
+                usage = event.usage_metadata
             if not (
                 event.candidates
                 and event.candidates[0].content
@@ -980,6 +1172,14 @@ class LLMClient:
                         )
                     )
 
+        self._record_usage(
+            model,
+            usage.prompt_token_count if usage else None,
+            usage.candidates_token_count if usage else None,
+            messages=messages,
+            output=generated_contents,
+        )
+
         if tool_calls:
             tool_call_messages = await self.tool_calls_handler.handle_tool_calls_google(
                 tool_calls
@@ -1044,6 +1244,13 @@ class LLMClient:
                         )
                     )
 
+            final_message: AnthropicMessage = await stream.get_final_message()
+            self._record_usage(
+                model,
+                final_message.usage.input_tokens,
+                final_message.usage.output_tokens,
+            )
+
         if tool_calls:
             tool_call_messages = (
                 await self.tool_calls_handler.handle_tool_calls_anthropic(tool_calls)
@@ -1095,6 +1302,19 @@ class LLMClient:
             depth=depth,
         )
 
+    async def _stream_fake(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        max_tokens: Optional[int] = None,
+    ):
+        client: FakeLLMClient = self._client
+        output_tokens = 0
+        async for chunk in client.stream(max_tokens):
+            output_tokens += count_tokens(chunk)
+            yield chunk
+        self._record_usage(model, count_message_tokens(messages), output_tokens)
+
     def stream(
         self,
         model: str,
@@ -1106,34 +1326,44 @@ class LLMClient:
 
         match self.llm_provider:
             case LLMProvider.OPENAI:
-                return self._stream_openai(
+                stream = self._stream_openai(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     tools=parsed_tools,
                 )
             case LLMProvider.GOOGLE:
-                return self._stream_google(
+                stream = self._stream_google(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     tools=parsed_tools,
                 )
             case LLMProvider.ANTHROPIC:
-                return self._stream_anthropic(
+                stream = self._stream_anthropic(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
                     tools=parsed_tools,
                 )
             case LLMProvider.OLLAMA:
-                return self._stream_ollama(
+                stream = self._stream_ollama(
                     model=model, messages=messages, max_tokens=max_tokens
                 )
             case LLMProvider.CUSTOM:
-                return self._stream_custom(
+                stream = self._stream_custom(
                     model=model, messages=messages, max_tokens=max_tokens
                 )
+            case LLMProvider.FAKE:
+                stream = self._stream_fake(
+                    model=model, messages=messages, max_tokens=max_tokens
+                )
+        return self._observe_stream(
+            stream,
+            model,
+            "stream",
+            self.estimate_input_tokens(messages, tools=parsed_tools),
+        )
 
     # ? Stream Structured Content
     async def _stream_openai_structured(
@@ -1156,11 +1386,7 @@ class LLMClient:
             self.use_tool_calls_for_structured_output()
         )
         if strict and depth == 0:
-            response_schema = ensure_strict_json_schema(
-                response_schema,
-                path=(),
-                root=response_schema,
-            )
+            response_schema = get_strict_json_schema(response_schema)
 
         if use_tool_calls_for_structured_output and depth == 0:
             if all_tools is None:
@@ -1182,6 +1408,8 @@ class LLMClient:
         current_id = None
         current_name = None
         current_arguments = None
+        usage = None
+        output_chunks: List[str] = []
 
         has_response_schema_tool_call = False
         async for event in await client.chat.completions.create(
@@ -1205,12 +1433,18 @@ class LLMClient:
             ),
             extra_body=extra_body,
             stream=True,
+            stream_options=self._get_openai_stream_options(),
         ):
             event: OpenAIChatCompletionChunk = event
+            # Sent in a last chunk without choices
+            if event.usage:
+                usage = event.usage
             if not event.choices:
                 continue
 
             content_chunk = event.choices[0].delta.content
+            if content_chunk:
+                output_chunks.append(content_chunk)
             if content_chunk and not use_tool_calls_for_structured_output:
                 yield content_chunk
 
@@ -1220,6 +1454,8 @@ class LLMClient:
                 tool_id = tool_call_chunk[0].id
                 tool_name = tool_call_chunk[0].function.name
                 tool_arguments = tool_call_chunk[0].function.arguments
+                if tool_arguments:
+                    output_chunks.append(tool_arguments)
 
                 if current_index != tool_index:
                     tool_calls.append(
@@ -1249,6 +1485,14 @@ class LLMClient:
                         yield tool_arguments
                     has_response_schema_tool_call = True
 
+        self._record_usage(
+            model,
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None,
+            messages=messages,
+            output="".join(output_chunks),
+        )
+
         if current_id is not None:
             tool_calls.append(
                 OpenAIToolCall(
@@ -1295,8 +1539,15 @@ class LLMClient:
         tools: Optional[List[dict]] = None,
         depth: int = 0,
     ) -> AsyncGenerator[str, None]:
+        from google.genai.types import (
+            FunctionCallingConfig as GoogleFunctionCallingConfig,
+            FunctionCallingConfigMode as GoogleFunctionCallingConfigMode,
+            GenerateContentConfig,
+            Tool as GoogleTool,
+            ToolConfig as GoogleToolConfig,
+        )
 
-        client: genai.Client = self._client
+        client: GoogleAsyncClient = self._client
 
         google_tools = None
         if tools:
@@ -1307,9 +1558,7 @@ class LLMClient:
                         {
                             "name": "ResponseSchema",
                             "description": "Provide response to the user",
-                            "parameters": remove_titles_from_schema(
-                                flatten_json_schema(response_format)
-                            ),
+                            "parameters": get_google_json_schema(response_format),
                         }
                     ]
                 )
@@ -1319,8 +1568,9 @@ class LLMClient:
 
         generated_contents = []
         tool_calls: List[GoogleToolCall] = []
+        usage = None
         has_response_schema_tool_call = False
-        async for event in iterator_to_async(client.models.generate_content_stream)(
+        async for event in await client.models.generate_content_stream(
             model=model,
             contents=parsed_messages,
             config=GenerateContentConfig(
@@ -1340,6 +1590,9 @@ class LLMClient:
                 max_output_tokens=max_tokens,
             ),
         ):
+            # Each chunk has the usage so far
+            if event.usage_metadata:
+                usage = event.usage_metadata
             if not (
                 event.candidates
                 and event.candidates[0].content
@@ -1367,6 +1620,14 @@ class LLMClient:
                         )
                     )
 
+        self._record_usage(
+            model,
+            usage.prompt_token_count if usage else None,
+            usage.candidates_token_count if usage else None,
+            messages=messages,
+            output=generated_contents,
+        )
+
         if tool_calls and not has_response_schema_tool_call:
             tool_call_messages = await self.tool_calls_handler.handle_tool_calls_google(
                 tool_calls
@@ -1454,6 +1715,13 @@ class LLMClient:
                         )
                     )
 
+            final_message: AnthropicMessage = await stream.get_final_message()
+            self._record_usage(
+                model,
+                final_message.usage.input_tokens,
+                final_message.usage.output_tokens,
+            )
+
         if tool_calls and not has_response_schema_tool_call:
             tool_call_messages = (
                 await self.tool_calls_handler.handle_tool_calls_anthropic(tool_calls)
@@ -1517,6 +1785,19 @@ class LLMClient:
             depth=depth,
         )
 
+    async def _stream_fake_structured(
+        self,
+        model: str,
+        messages: List[LLMMessage],
+        response_format: dict,
+    ):
+        client: FakeLLMClient = self._client
+        output_tokens = 0
+        async for chunk in client.stream_structured(response_format):
+            output_tokens += count_tokens(chunk)
+            yield chunk
+        self._record_usage(model, count_message_tokens(messages), output_tokens)
+
     def stream_structured(
         self,
         model: str,
@@ -1530,7 +1811,7 @@ class LLMClient:
 
         match self.llm_provider:
             case LLMProvider.OPENAI:
-                return self._stream_openai_structured(
+                stream = self._stream_openai_structured(
                     model=model,
                     messages=messages,
                     response_format=response_format,
@@ -1539,7 +1820,7 @@ class LLMClient:
                     max_tokens=max_tokens,
                 )
             case LLMProvider.GOOGLE:
-                return self._stream_google_structured(
+                stream = self._stream_google_structured(
                     model=model,
                     messages=messages,
                     response_format=response_format,
@@ -1547,7 +1828,7 @@ class LLMClient:
                     max_tokens=max_tokens,
                 )
             case LLMProvider.ANTHROPIC:
-                return self._stream_anthropic_structured(
+                stream = self._stream_anthropic_structured(
                     model=model,
                     messages=messages,
                     response_format=response_format,
@@ -1555,7 +1836,7 @@ class LLMClient:
                     max_tokens=max_tokens,
                 )
             case LLMProvider.OLLAMA:
-                return self._stream_ollama_structured(
+                stream = self._stream_ollama_structured(
                     model=model,
                     messages=messages,
                     response_format=response_format,
@@ -1563,13 +1844,25 @@ class LLMClient:
                     max_tokens=max_tokens,
                 )
             case LLMProvider.CUSTOM:
-                return self._stream_custom_structured(
+                stream = self._stream_custom_structured(
                     model=model,
                     messages=messages,
                     response_format=response_format,
                     strict=strict,
                     max_tokens=max_tokens,
                 )
+            case LLMProvider.FAKE:
+                stream = self._stream_fake_structured(
+                    model=model,
+                    messages=messages,
+                    response_format=response_format,
+                )
+        return self._observe_stream(
+            stream,
+            model,
+            "stream_structured",
+            self.estimate_input_tokens(messages, response_format, parsed_tools),
+        )
 
     # ? Web search
     async def _search_openai(self, query: str) -> str:
@@ -1586,12 +1879,14 @@ class LLMClient:
         return response.output_text
 
     async def _search_google(self, query: str) -> str:
-        client: genai.Client = self._client
+        from google.genai.types import GenerateContentConfig, GoogleSearch
+        from google.genai.types import Tool as GoogleTool
+
+        client: GoogleAsyncClient = self._client
         grounding_tool = GoogleTool(google_search=GoogleSearch())
         config = GenerateContentConfig(tools=[grounding_tool])
 
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        response = await client.models.generate_content(
             model=get_model(),
             contents=query,
             config=config,
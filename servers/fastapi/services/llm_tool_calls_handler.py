@@ -11,11 +11,7 @@ from models.llm_message import (
 )
 from models.llm_tool_call import AnthropicToolCall, GoogleToolCall, OpenAIToolCall
 from models.llm_tools import LLMDynamicTool, LLMTool, SearchWebTool
-from utils.schema_utils import (
-    ensure_strict_json_schema,
-    flatten_json_schema,
-    remove_titles_from_schema,
-)
+from utils.schema_cache import get_google_json_schema, get_strict_json_schema
 
 
 class LLMToolCallsHandler:
@@ -55,7 +51,13 @@ class LLMToolCallsHandler:
             self.dynamic_tools.append(tool)
 
         match self.client.llm_provider:
-            case LLMProvider.OPENAI | LLMProvider.OLLAMA | LLMProvider.CUSTOM:
+            # The fake provider never calls tools, the OpenAI format is as good as any
+            case (
+                LLMProvider.OPENAI
+                | LLMProvider.OLLAMA
+                | LLMProvider.CUSTOM
+                | LLMProvider.FAKE
+            ):
                 return self.parse_tool_openai(tool, strict)
             case LLMProvider.ANTHROPIC:
                 return self.parse_tool_anthropic(tool)
@@ -79,7 +81,7 @@ class LLMToolCallsHandler:
             parameters = tool.model_json_schema()
 
         if strict:
-            parameters = ensure_strict_json_schema(parameters, path=(), root=parameters)
+            parameters = get_strict_json_schema(parameters)
 
         return {
             "type": "function",
@@ -94,9 +96,7 @@ class LLMToolCallsHandler:
     def parse_tool_google(self, tool: type[LLMTool] | LLMDynamicTool):
         parsed = self.parse_tool_openai(tool)
         parsed["function"]["parameters"] = (
-            remove_titles_from_schema(
-                flatten_json_schema(parsed["function"]["parameters"])
-            )
+            get_google_json_schema(parsed["function"]["parameters"])
             if parsed["function"]["parameters"]
             else {}
         )
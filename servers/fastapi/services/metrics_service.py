@@ -0,0 +1,353 @@
+import asyncio
+from bisect import bisect_left
+import functools
+import inspect
+import math
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from utils.custom_logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Pipeline stages and LLM calls take from milliseconds to minutes
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+)
+EVENT_LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    labels = ",".join(
+        f'{name}="{_escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return f"{{{labels}}}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _get_key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} takes labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        self._values.clear()
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+            *self._render_samples(),
+        ]
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._get_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._get_key(labels), 0)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        self._values[self._get_key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._get_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._get_key(labels), 0)
+
+
+class HistogramTimer:
+    """
+    Observes the time spent in a ``with`` block, or in each call of the
+    decorated function, coroutine or async generator. ``status`` is set to
+    ``error`` when it raises, if the histogram has a status label.
+    """
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, object]):
+        self.histogram = histogram
+        self.labels = labels
+        self._started_at: Optional[float] = None
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        labels = self.labels
+        if "status" in self.histogram.labelnames:
+            is_error = exc_type is not None and issubclass(exc_type, Exception)
+            labels = {**labels, "status": "error" if is_error else "ok"}
+        self.histogram.observe(time.perf_counter() - self._started_at, **labels)
+
+    def __call__(self, func):
+        histogram, labels = self.histogram, self.labels
+
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                with HistogramTimer(histogram, labels):
+                    async for item in func(*args, **kwargs):
+                        yield item
+
+            return async_gen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with HistogramTimer(histogram, labels):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with HistogramTimer(histogram, labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._get_key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # Counts per bucket, then the sum and the count of all observations
+            state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._values[key] = state
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def time(self, **labels) -> HistogramTimer:
+        """
+        Times a block or a function. The ``status`` label, if the histogram
+        has one, is filled in when the block exits.
+        """
+        return HistogramTimer(self, labels)
+
+    def get_count(self, **labels) -> int:
+        state = self._values.get(self._get_key(labels))
+        return state[2] if state else 0
+
+    def get_sum(self, **labels) -> float:
+        state = self._values.get(self._get_key(labels))
+        return state[1] if state else 0.0
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        bucket_labelnames = (*self.labelnames, "le")
+        for key, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labelnames, (*key, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Process wide metrics in the Prometheus text format. Values that are
+    cheaper to read at scrape time, like queue depths, are set by collectors
+    that run before every render.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Callable[[], Awaitable[None]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Awaitable[None]]):
+        self.collectors.append(collector)
+
+    async def collect(self):
+        for collector in self.collectors:
+            try:
+                await collector()
+            except Exception as e:
+                # A failing collector leaves its gauges at the last value
+                logger.warning(f"Metrics collector {collector.__name__} failed: {e}")
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a task that sleeps for
+    ``interval``, which is the time callbacks had to wait for the loop.
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started_at - self.interval)
+            EVENT_LOOP_LAG_LAST_SECONDS.set(lag)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+
+METRICS = MetricsRegistry()
+
+PIPELINE_STAGE_SECONDS = METRICS.histogram(
+    "presenton_pipeline_stage_duration_seconds",
+    "Time spent in a stage of presentation generation or export.",
+    ("stage", "status"),
+)
+LLM_REQUEST_SECONDS = METRICS.histogram(
+    "presenton_llm_request_duration_seconds",
+    "Time spent in LLM calls, including tool call round trips and streaming.",
+    ("provider", "model", "method", "status"),
+)
+LLM_RETRIES = METRICS.counter(
+    "presenton_llm_retries_total",
+    "LLM calls made again after a failure or timeout.",
+    ("provider", "model"),
+)
+LLM_TOKENS = METRICS.counter(
+    "presenton_llm_tokens_total",
+    "Tokens reported by LLM providers.",
+    ("provider", "model", "type"),
+)
+QUEUE_DEPTH = METRICS.gauge(
+    "presenton_queue_depth",
+    "Background jobs waiting or running, by queue and status.",
+    ("queue", "status"),
+)
+STREAM_SESSIONS_ACTIVE = METRICS.gauge(
+    "presenton_stream_sessions_active",
+    "Presentation stream sessions held by this process.",
+)
+EVENT_LOOP_LAG_SECONDS = METRICS.histogram(
+    "presenton_event_loop_lag_seconds",
+    "How late the event loop woke up a sleeping task.",
+    buckets=EVENT_LOOP_LAG_BUCKETS,
+)
+EVENT_LOOP_LAG_LAST_SECONDS = METRICS.gauge(
+    "presenton_event_loop_lag_last_seconds",
+    "Event loop lag of the last measurement.",
+)
+EVENT_LOOP_STALLS = METRICS.counter(
+    "presenton_event_loop_stalls_total",
+    "Times the event loop was blocked past the stall threshold, by blocking call.",
+    ("location",),
+)
+EVENT_LOOP_STALL_SECONDS = METRICS.histogram(
+    "presenton_event_loop_stall_duration_seconds",
+    "How long the event loop was blocked in a stall.",
+    buckets=EVENT_LOOP_LAG_BUCKETS,
+)
+
+EVENT_LOOP_LAG_MONITOR = EventLoopLagMonitor()
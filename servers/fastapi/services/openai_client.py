@@ -0,0 +1,35 @@
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+class OpenAIClients:
+    """
+    Shared OpenAI clients for the template endpoints, so every slide call
+    reuses one httpx connection pool per API key and base URL instead of
+    opening a client of its own that is never closed.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[Optional[str], Optional[str]], "AsyncOpenAI"] = {}
+
+    def get(
+        self, api_key: Optional[str] = None, base_url: Optional[str] = None
+    ) -> "AsyncOpenAI":
+        client = self._clients.get((api_key, base_url))
+        if client is None:
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+            self._clients[(api_key, base_url)] = client
+        return client
+
+    async def close(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.close()
+
+
+OPENAI_CLIENTS = OpenAIClients()
@@ -34,6 +34,8 @@ from models.pptx_models import (
     PptxTextBoxModel,
     PptxTextRunModel,
 )
+from services.metrics_service import PIPELINE_STAGE_SECONDS
+from services.tracing_service import TRACER
 from utils.download_helpers import download_files
 from utils.image_utils import (
     clip_image,
@@ -134,6 +136,8 @@ class PptxPresentationCreator:
                     each_shape.picture.path = each_image_path
                     each_shape.picture.is_network = False
 
+    @PIPELINE_STAGE_SECONDS.time(stage="pptx_assembly")
+    @TRACER.trace("pptx.create")
     async def create_ppt(self):
         await self.fetch_network_assets()
 
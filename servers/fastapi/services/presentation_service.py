@@ -7,7 +7,7 @@ import traceback
 import uuid
 from datetime import datetime
 from urllib.parse import quote_plus
-from typing import List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Set
 
 import dirtyjson
 from fastapi import HTTPException
@@ -34,10 +34,11 @@ from models.sql.async_presentation_generation_status import (
 from models.sql.presentation import PresentationModel
 from models.sql.slide import SlideModel
 from models.sql.template import TemplateModel
-from services.concurrent_service import CONCURRENT_SERVICE
 from services.documents_loader import DocumentsLoader
 from services.image_generation_service import ImageGenerationService
 from services.temp_file_service import TEMP_FILE_SERVICE
+from services.token_usage_service import track_token_usage
+from services.tracing_service import TRACER
 from services.webhook_service import WebhookService
 from utils.asset_directory_utils import get_exports_directory, get_images_directory
 from utils.export_utils import export_presentation
@@ -50,6 +51,7 @@ from utils.llm_calls.generate_presentation_structure import (
 from utils.llm_calls.generate_slide_content import (
     get_slide_content_from_type_and_outline,
 )
+from utils.outline_stream_parser import SlideOutlineStreamParser
 from utils.ppt_utils import (
     get_presentation_title_from_outlines,
     select_toc_or_list_slide_layout_index,
@@ -62,6 +64,9 @@ from utils.custom_logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Slides whose content is generated at once, per batch or while streaming outlines
+SLIDE_CONTENT_BATCH_SIZE = 10
+
 
 class PresentationService:
     @staticmethod
@@ -110,8 +115,12 @@ class PresentationService:
         return presentation
 
     @staticmethod
+    @TRACER.trace("presentation.generate_outlines")
+    @track_token_usage()
     async def generate_outlines(
-        sql_session: AsyncSession, presentation_id: uuid.UUID
+        sql_session: AsyncSession,
+        presentation_id: uuid.UUID,
+        on_slide_outline: Optional[Callable[[int, SlideOutlineModel], None]] = None,
     ) -> PresentationModel:
         logger.info(f"Generating outlines for presentation: {presentation_id}")
         presentation = await sql_session.get(PresentationModel, presentation_id)
@@ -139,6 +148,7 @@ class PresentationService:
 
         logger.info(f"Generating outlines for {n_slides_to_generate} slides (LLM call)")
         presentation_outlines_text = ""
+        outline_stream_parser = SlideOutlineStreamParser() if on_slide_outline else None
         async for chunk in generate_ppt_outline(
             presentation.content,
             n_slides_to_generate,
@@ -155,6 +165,11 @@ class PresentationService:
                 raise chunk
             presentation_outlines_text += chunk
 
+            if outline_stream_parser:
+                for index, slide_outline in outline_stream_parser.feed(chunk):
+                    if index < n_slides_to_generate:
+                        on_slide_outline(index, slide_outline)
+
         try:
             presentation_outlines_json = dict(
                 dirtyjson.loads(presentation_outlines_text)
@@ -189,6 +204,8 @@ class PresentationService:
         return presentation
 
     @staticmethod
+    @TRACER.trace("presentation.prepare_structure")
+    @track_token_usage()
     async def prepare_structure(
         sql_session: AsyncSession,
         presentation_id: uuid.UUID,
@@ -229,7 +246,7 @@ class PresentationService:
         presentation_structure.slides = presentation_structure.slides[: len(outlines)]
         for index in range(total_outlines):
             random_slide_index = random.randint(0, total_slide_layouts - 1)
-            if index >= total_outlines:
+            if index >= len(presentation_structure.slides):
                 presentation_structure.slides.append(random_slide_index)
                 continue
             if presentation_structure.slides[index] >= total_slide_layouts:
@@ -283,13 +300,139 @@ class PresentationService:
         return presentation
 
     @staticmethod
+    @TRACER.trace("presentation.run_pipelined_generation_pipeline")
+    @track_token_usage()
+    async def run_pipelined_generation_pipeline(
+        sql_session: AsyncSession,
+        presentation_id: uuid.UUID,
+        layout_coroutine: Awaitable[PresentationLayoutModel],
+        async_status: Optional[AsyncPresentationGenerationTaskModel] = None,
+        export_as: Optional[str] = "pptx",
+    ):
+        """
+        Generate outlines, structure and slides with overlapping stages.
+
+        The layout is fetched while outlines are streaming. For ordered layouts,
+        slide content generation starts as soon as each outline is parsed.
+        Unordered layouts, whose structure is chosen from the full outline,
+        are generated once the outline stream has finished, and table of
+        contents slides after all the others. Both phases share one limit on
+        concurrent slide content calls.
+        """
+        logger.info(f"Starting pipelined generation for: {presentation_id}")
+        layout_task = asyncio.create_task(layout_coroutine)
+        streamed_slides: Dict[int, tuple[SlideOutlineModel, asyncio.Task]] = {}
+        slide_content_semaphore = asyncio.Semaphore(SLIDE_CONTENT_BATCH_SIZE)
+
+        async def generate_streamed_slide_content(
+            index: int, slide_outline: SlideOutlineModel
+        ) -> Optional[dict]:
+            layout = await layout_task
+            if not layout.ordered or index >= len(layout.slides):
+                return None
+            async with slide_content_semaphore:
+                return await get_slide_content_from_type_and_outline(
+                    layout.slides[index],
+                    slide_outline,
+                    presentation.language,
+                    presentation.tone,
+                    presentation.verbosity,
+                    presentation.instructions,
+                )
+
+        def on_slide_outline(index: int, slide_outline: SlideOutlineModel):
+            logger.debug(f"Outline {index + 1} received, starting slide generation")
+            streamed_slides[index] = (
+                slide_outline,
+                asyncio.create_task(
+                    generate_streamed_slide_content(index, slide_outline)
+                ),
+            )
+
+        try:
+            presentation = await sql_session.get(PresentationModel, presentation_id)
+            if not presentation:
+                raise HTTPException(status_code=404, detail="Presentation not found")
+
+            presentation = await PresentationService.generate_outlines(
+                sql_session, presentation_id, on_slide_outline=on_slide_outline
+            )
+            outlines = presentation.get_presentation_outline().slides
+            layout = await layout_task
+
+            presentation = await PresentationService.prepare_structure(
+                sql_session, presentation_id, layout, outlines=list(outlines)
+            )
+            structure = presentation.get_structure()
+
+            # Table of contents slides are inserted right after the title slide
+            # (see prepare_structure), content slides keep their relative order.
+            n_toc_slides = len(structure.slides) - len(outlines)
+            toc_offset = 1 if presentation.include_title_slide else 0
+            toc_positions = {i + toc_offset for i in range(n_toc_slides)}
+            content_positions = [
+                index
+                for index in range(len(structure.slides))
+                if index not in toc_positions
+            ]
+
+            slide_content_tasks: Dict[int, Awaitable[dict]] = {}
+            for index, (slide_outline, task) in streamed_slides.items():
+                is_reusable = (
+                    layout.ordered
+                    and index < len(outlines)
+                    and index < len(layout.slides)
+                    and outlines[index] == slide_outline
+                    and structure.slides[content_positions[index]] == index
+                )
+                if is_reusable:
+                    slide_content_tasks[content_positions[index]] = task
+                else:
+                    task.cancel()
+            logger.info(
+                f"Reusing {len(slide_content_tasks)} slides started while streaming outlines"
+            )
+        except Exception:
+            for _, task in streamed_slides.values():
+                task.cancel()
+            if not layout_task.done():
+                layout_task.cancel()
+            raise
+
+        return await PresentationService.run_full_generation_pipeline(
+            sql_session,
+            presentation_id,
+            async_status=async_status,
+            export_as=export_as,
+            slide_content_tasks=slide_content_tasks,
+            slide_content_semaphore=slide_content_semaphore,
+            deferred_positions=toc_positions,
+        )
+
+    @staticmethod
+    @TRACER.trace("presentation.run_full_generation_pipeline")
+    @track_token_usage()
     async def run_full_generation_pipeline(
         sql_session: AsyncSession,
         presentation_id: uuid.UUID,
         async_status: Optional[AsyncPresentationGenerationTaskModel] = None,
         export_as: Optional[str] = "pptx",
+        slide_content_tasks: Optional[Dict[int, Awaitable[dict]]] = None,
+        slide_content_semaphore: Optional[asyncio.Semaphore] = None,
+        deferred_positions: Optional[Set[int]] = None,
     ):
+        """
+        ``slide_content_tasks`` are slides whose content is already being
+        generated, ``slide_content_semaphore`` bounds the content calls made
+        here together with them, and ``deferred_positions`` are generated
+        after all other slides.
+        """
         logger.info(f"Starting full generation pipeline for: {presentation_id}")
+        slide_content_tasks = slide_content_tasks or {}
+        slide_content_semaphore = slide_content_semaphore or asyncio.Semaphore(
+            SLIDE_CONTENT_BATCH_SIZE
+        )
+        deferred_positions = deferred_positions or set()
         try:
             presentation = await sql_session.get(PresentationModel, presentation_id)
             if not presentation:
@@ -310,16 +453,9 @@ class PresentationService:
             async_assets_generation_tasks = []
             slides: List[SlideModel] = []
             
-            batch_size = 10
-            total_batches = (len(slide_layouts) + batch_size - 1) // batch_size
-            
-            for batch_idx, start in enumerate(range(0, len(slide_layouts), batch_size)):
-                end = min(start + batch_size, len(slide_layouts))
-                logger.info(f"Processing batch {batch_idx + 1}/{total_batches} (Slides {start}-{end-1})")
-                
-                # Generate contents for this batch concurrently
-                content_tasks = [
-                    get_slide_content_from_type_and_outline(
+            async def generate_slide_content(i: int) -> dict:
+                async with slide_content_semaphore:
+                    return await get_slide_content_from_type_and_outline(
                         slide_layouts[i],
                         outline.slides[i],
                         presentation.language,
@@ -327,15 +463,34 @@ class PresentationService:
                         presentation.verbosity,
                         presentation.instructions,
                     )
-                    for i in range(start, end)
+
+            positions = [
+                i for i in range(len(slide_layouts)) if i not in deferred_positions
+            ] + sorted(i for i in deferred_positions if i < len(slide_layouts))
+
+            batch_size = SLIDE_CONTENT_BATCH_SIZE
+            total_batches = (len(positions) + batch_size - 1) // batch_size
+            
+            for batch_idx, start in enumerate(range(0, len(positions), batch_size)):
+                batch_positions = positions[start : start + batch_size]
+                logger.info(f"Processing batch {batch_idx + 1}/{total_batches} (Slides {batch_positions})")
+                
+                # Generate contents for this batch concurrently, reusing slides
+                # already started by the pipelined flow
+                content_tasks = [
+                    (
+                        slide_content_tasks[i]
+                        if i in slide_content_tasks
+                        else generate_slide_content(i)
+                    )
+                    for i in batch_positions
                 ]
                 batch_contents: List[dict] = await asyncio.gather(*content_tasks)
                 logger.debug(f"Batch {batch_idx + 1}: Content generated")
                 
                 # Build slides for this batch
                 batch_slides: List[SlideModel] = []
-                for offset, slide_content in enumerate(batch_contents):
-                    i = start + offset
+                for i, slide_content in zip(batch_positions, batch_contents):
                     slide_layout = slide_layouts[i]
                     slide = SlideModel(
                         presentation=presentation_id,
@@ -357,6 +512,8 @@ class PresentationService:
                     for slide in batch_slides
                 ]
                 async_assets_generation_tasks.extend(asset_tasks)
+
+            slides.sort(key=lambda slide: slide.index)
             
             # --- Wait for all assets ---
             logger.info(f"Waiting for {len(async_assets_generation_tasks)} asset generation tasks...")
@@ -414,9 +571,7 @@ class PresentationService:
                 await sql_session.commit()
 
             # Webhook
-            CONCURRENT_SERVICE.run_task(
-                None,
-                WebhookService.send_webhook,
+            await WebhookService.send_webhook(
                 WebhookEvent.PRESENTATION_GENERATION_COMPLETED,
                 response.model_dump(mode="json"),
             )
@@ -426,6 +581,11 @@ class PresentationService:
 
         except Exception as e:
             logger.error(f"Error in generation pipeline: {e}")
+            for task in slide_content_tasks.values():
+                if isinstance(task, asyncio.Task):
+                    task.cancel()
+            # Ends the failed transaction so it no longer holds the write lock
+            await sql_session.rollback()
             if not isinstance(e, HTTPException):
                 traceback.print_exc()
                 e = HTTPException(status_code=500, detail="Presentation generation failed")
@@ -433,9 +593,7 @@ class PresentationService:
             api_error_model = APIErrorModel.from_exception(e)
             
             # Webhook Failure
-            CONCURRENT_SERVICE.run_task(
-                None,
-                WebhookService.send_webhook,
+            await WebhookService.send_webhook(
                 WebhookEvent.PRESENTATION_GENERATION_FAILED,
                 api_error_model.model_dump(mode="json"),
             )
@@ -0,0 +1,314 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import json
+import os
+import re
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import AsyncIterator, Dict, List, Optional, Set
+import uuid
+
+from utils.asset_directory_utils import get_profiles_directory
+from utils.custom_logger import setup_logger
+from utils.get_env import get_profiler_interval_ms_env, get_profiler_max_profiles_env
+
+logger = setup_logger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAMETER = "profile"
+DEFAULT_PROFILER_INTERVAL_MS = 10
+DEFAULT_MAX_PROFILES = 50
+# Leaf of the stack of a task that is waiting, so waits show up in the flamegraph
+AWAIT_FRAME = "[await]"
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+_CURRENT_PROFILE: ContextVar[Optional["Profile"]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def _get_frame_label(code: CodeType) -> str:
+    filename = os.path.abspath(code.co_filename)
+    if filename.startswith(APP_DIRECTORY + os.sep) and "site-packages" not in filename:
+        filename = os.path.relpath(filename, APP_DIRECTORY)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _get_awaited_frames(coro) -> List[FrameType]:
+    """The frames of a suspended coroutine and of everything it awaits, outermost first."""
+    frames = []
+    while coro is not None:
+        frame = (
+            getattr(coro, "cr_frame", None)
+            or getattr(coro, "gi_frame", None)
+            or getattr(coro, "ag_frame", None)
+        )
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = (
+            getattr(coro, "cr_await", None)
+            or getattr(coro, "gi_yieldfrom", None)
+            or getattr(coro, "ag_await", None)
+        )
+    return frames
+
+
+@dataclass(eq=False)
+class Profile:
+    """
+    Samples of the tasks of one request or background job. Tasks created
+    while the profile is current join it, so work spread over ``gather`` and
+    ``create_task`` is sampled as well. Stacks are stored folded, the format
+    of flamegraph.pl, speedscope and most other flamegraph viewers.
+    """
+
+    name: str
+    loop_thread_id: int
+    metadata: Dict[str, object] = field(default_factory=dict)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    ended_at: Optional[datetime] = None
+    # Only sampled, and saved, once allowed to
+    activated: bool = False
+    samples: Counter = field(default_factory=Counter)
+    n_samples: int = 0
+    tasks: Set[asyncio.Task] = field(default_factory=set)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def add_task(self, task: Optional[asyncio.Task]):
+        if task is not None and self.ended_at is None:
+            with self._lock:
+                self.tasks.add(task)
+
+    def sample(self, loop_frame: Optional[FrameType]):
+        # The frames running on the loop thread, innermost first
+        stack = []
+        while loop_frame is not None:
+            stack.append(loop_frame)
+            loop_frame = loop_frame.f_back
+        positions = {id(frame): index for index, frame in enumerate(stack)}
+
+        with self._lock:
+            self.tasks = {task for task in self.tasks if not task.done()}
+            for task in self.tasks:
+                coro = task.get_coro()
+                root = getattr(coro, "cr_frame", None)
+                if root is None:
+                    continue
+                if id(root) in positions:
+                    frames = stack[: positions[id(root)] + 1][::-1]
+                    labels = [_get_frame_label(frame.f_code) for frame in frames]
+                else:
+                    frames = _get_awaited_frames(coro)
+                    labels = [_get_frame_label(frame.f_code) for frame in frames]
+                    labels.append(AWAIT_FRAME)
+                self.samples[";".join(labels)] += 1
+            self.n_samples += 1
+
+    def end(self):
+        with self._lock:
+            self.ended_at = datetime.now(timezone.utc)
+            self.tasks.clear()
+
+    def to_folded(self) -> str:
+        with self._lock:
+            return "".join(
+                f"{stack} {count}\n" for stack, count in self.samples.most_common()
+            )
+
+    def to_dict(self) -> dict:
+        ended_at = self.ended_at or datetime.now(timezone.utc)
+        return {
+            "id": self.id,
+            "name": self.name,
+            "metadata": self.metadata,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(
+                (ended_at - self.started_at).total_seconds() * 1000, 1
+            ),
+            "samples": self.n_samples,
+        }
+
+
+class SamplingProfiler:
+    """
+    A wall clock sampling profiler for single requests and background jobs.
+    While a profile is active, a thread takes the stack of every task of the
+    profile each ``interval`` seconds: the frames on the loop thread for the
+    task that is running, and the chain of awaits for tasks that are waiting.
+    Nothing is sampled when no profile is active. The latest
+    ``max_profiles`` profiles are kept on disk.
+    """
+
+    def __init__(
+        self,
+        interval: float = DEFAULT_PROFILER_INTERVAL_MS / 1000,
+        max_profiles: int = DEFAULT_MAX_PROFILES,
+        directory: Optional[str] = None,
+    ):
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self._directory = directory
+        self._profiles: List[Profile] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            return get_profiles_directory()
+        os.makedirs(self._directory, exist_ok=True)
+        return self._directory
+
+    @staticmethod
+    def get_current_profile() -> Optional[Profile]:
+        return _CURRENT_PROFILE.get()
+
+    @staticmethod
+    def _install_task_factory(loop: asyncio.AbstractEventLoop):
+        previous = loop.get_task_factory()
+        if getattr(previous, "joins_current_profile", False):
+            return
+
+        def task_factory(loop, coro, **kwargs):
+            if previous is None:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            else:
+                task = previous(loop, coro, **kwargs)
+            context = kwargs.get("context")
+            profile = (
+                context.get(_CURRENT_PROFILE)
+                if context is not None
+                else _CURRENT_PROFILE.get()
+            )
+            if profile is not None:
+                profile.add_task(task)
+            return task
+
+        task_factory.joins_current_profile = True
+        loop.set_task_factory(task_factory)
+
+    @asynccontextmanager
+    async def profile(
+        self,
+        name: str,
+        metadata: Optional[Dict[str, object]] = None,
+        active: bool = True,
+    ) -> AsyncIterator[Profile]:
+        """
+        Profiles the current task and the tasks it creates. An inactive
+        profile only starts sampling once passed to ``activate``, and is
+        discarded if it never was.
+        """
+        self._install_task_factory(asyncio.get_running_loop())
+        profile = Profile(
+            name=name, loop_thread_id=threading.get_ident(), metadata=metadata or {}
+        )
+        profile.add_task(asyncio.current_task())
+        token = _CURRENT_PROFILE.set(profile)
+        if active:
+            self.activate(profile)
+        try:
+            yield profile
+        finally:
+            _CURRENT_PROFILE.reset(token)
+            with self._lock:
+                if profile in self._profiles:
+                    self._profiles.remove(profile)
+            profile.end()
+            if profile.activated:
+                try:
+                    await asyncio.to_thread(self.save, profile)
+                except Exception as e:
+                    logger.warning(f"Could not save profile {profile.id}: {e}")
+
+    def activate(self, profile: Profile):
+        if profile.activated or profile.ended_at is not None:
+            return
+        profile.activated = True
+        with self._lock:
+            self._profiles.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="sampling-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                profiles = list(self._profiles)
+
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames.get(profile.loop_thread_id))
+            del frames
+            time.sleep(self.interval)
+
+    def save(self, profile: Profile):
+        directory = self.directory
+        with open(os.path.join(directory, f"{profile.id}.folded"), "w") as file:
+            file.write(profile.to_folded())
+        with open(os.path.join(directory, f"{profile.id}.json"), "w") as file:
+            json.dump(
+                {**profile.to_dict(), "interval_ms": self.interval * 1000}, file
+            )
+        logger.info(f"Saved profile {profile.id} of {profile.name}")
+
+        # Older profiles make room for the new one
+        profiles = sorted(
+            (
+                os.path.join(directory, filename)
+                for filename in os.listdir(directory)
+                if filename.endswith(".json")
+            ),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for path in profiles[self.max_profiles :]:
+            for extension in (".json", ".folded"):
+                try:
+                    os.remove(os.path.splitext(path)[0] + extension)
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self, limit: int = DEFAULT_MAX_PROFILES) -> List[dict]:
+        """The saved profiles, newest first."""
+        profiles = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as file:
+                    profiles.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        profiles.sort(key=lambda each: each.get("started_at", ""), reverse=True)
+        return profiles[:limit]
+
+    def get_profile_path(self, profile_id: str) -> Optional[str]:
+        """The folded stacks of a saved profile, if there is one with this id."""
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.folded")
+        return path if os.path.isfile(path) else None
+
+
+PROFILER = SamplingProfiler(
+    interval=(get_profiler_interval_ms_env() or DEFAULT_PROFILER_INTERVAL_MS) / 1000,
+    max_profiles=get_profiler_max_profiles_env() or DEFAULT_MAX_PROFILES,
+)
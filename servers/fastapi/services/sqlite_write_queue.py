@@ -0,0 +1,152 @@
+import asyncio
+from contextlib import asynccontextmanager
+import weakref
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.db_utils import DEFAULT_SQLITE_BUSY_TIMEOUT_MS
+from utils.get_env import get_sqlite_busy_timeout_ms_env
+
+
+class SQLiteWriteQueue:
+    """
+    FIFO lock for SQLite write transactions of this process. SQLite allows a
+    single writer, and concurrent writers otherwise poll on busy_timeout and
+    can still fail with "database is locked" when they upgrade a read
+    transaction, so writers wait here in order instead.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self._locks.get(loop)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[loop] = lock
+        return lock
+
+    async def acquire(self):
+        try:
+            await asyncio.wait_for(self._get_lock().acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise OperationalError(
+                "SQLite write queue",
+                None,
+                TimeoutError("database is locked by another write transaction"),
+            )
+
+    def release(self):
+        self._get_lock().release()
+
+
+# Waiting longer than SQLite itself would means the queue is deadlocked
+SQLITE_WRITE_QUEUE = SQLiteWriteQueue(
+    timeout=(get_sqlite_busy_timeout_ms_env() or DEFAULT_SQLITE_BUSY_TIMEOUT_MS)
+    / 1000
+)
+
+
+class SQLiteSingleWriterSession(AsyncSession):
+    """
+    Takes the write queue before the first write of a transaction, whether it
+    is a DML statement or a flush of pending objects, and hands it over once
+    the transaction is committed, rolled back or the session is closed, or
+    right away when that first write fails. Read-only sessions never wait on
+    it.
+    """
+
+    write_queue = SQLITE_WRITE_QUEUE
+
+    _holds_write_lock = False
+
+    def _has_pending_writes(self) -> bool:
+        sync_session = self.sync_session
+        return bool(sync_session.new or sync_session.dirty or sync_session.deleted)
+
+    async def _acquire_write_lock(self) -> bool:
+        """Returns whether the lock was taken by this call."""
+        if self._holds_write_lock:
+            return False
+        await self.write_queue.acquire()
+        self._holds_write_lock = True
+        return True
+
+    def _release_write_lock(self):
+        if self._holds_write_lock:
+            self._holds_write_lock = False
+            self.write_queue.release()
+
+    async def _before_statement(self, statement=None) -> bool:
+        if getattr(statement, "is_dml", False) or (
+            self.autoflush and self._has_pending_writes()
+        ):
+            return await self._acquire_write_lock()
+        return False
+
+    @asynccontextmanager
+    async def _statement(self, statement=None):
+        acquired = await self._before_statement(statement)
+        try:
+            yield
+        except BaseException:
+            # Nothing was written before the failed statement, so writers
+            # queued behind it, e.g. a failure handler on the same task, only
+            # wait for SQLite itself until the transaction is rolled back
+            if acquired:
+                self._release_write_lock()
+            raise
+
+    async def execute(self, statement, *args, **kwargs):
+        async with self._statement(statement):
+            return await super().execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        async with self._statement(statement):
+            return await super().scalar(statement, *args, **kwargs)
+
+    async def stream(self, statement, *args, **kwargs):
+        async with self._statement(statement):
+            return await super().stream(statement, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        async with self._statement():
+            return await super().get(*args, **kwargs)
+
+    async def merge(self, *args, **kwargs):
+        async with self._statement():
+            return await super().merge(*args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        acquired = self._has_pending_writes() and await self._acquire_write_lock()
+        try:
+            await super().flush(*args, **kwargs)
+        except BaseException:
+            if acquired:
+                self._release_write_lock()
+            raise
+
+    async def commit(self):
+        if self._has_pending_writes():
+            await self._acquire_write_lock()
+        try:
+            await super().commit()
+        finally:
+            self._release_write_lock()
+
+    async def rollback(self):
+        try:
+            await super().rollback()
+        finally:
+            self._release_write_lock()
+
+    async def close(self):
+        try:
+            await super().close()
+        finally:
+            self._release_write_lock()
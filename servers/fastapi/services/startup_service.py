@@ -0,0 +1,161 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.custom_logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class StartupTask:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable],
+        depends_on: Optional[List[str]] = None,
+        required: bool = True,
+        ttl: Optional[float] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = depends_on or []
+        # Only required tasks gate readiness, the rest run in the background
+        self.required = required
+        # Tasks with a ttl are run again once their result is older than it
+        self.ttl = ttl
+
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.duration: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self.ttl is not None
+            and self.finished_at is not None
+            and time.monotonic() - self.finished_at > self.ttl
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "required": self.required,
+            "error": self.error,
+            "duration_ms": (
+                round(self.duration * 1000) if self.duration is not None else None
+            ),
+        }
+
+
+class StartupService:
+    """
+    Runs the startup tasks as a dependency graph: every task starts as soon as
+    the tasks it depends on are done, so independent tasks run concurrently.
+    A failing task is recorded instead of aborting startup, and the tasks that
+    depend on it are skipped.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, StartupTask] = {}
+        self._runner: Optional[asyncio.Future] = None
+        self._scheduled: Dict[str, asyncio.Task] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+
+    @property
+    def ready(self) -> bool:
+        return all(
+            task.status == "done" for task in self.tasks.values() if task.required
+        )
+
+    def get_status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "tasks": {name: task.to_dict() for name, task in self.tasks.items()},
+        }
+
+    async def _run_task(self, task: StartupTask, dependencies: List[asyncio.Task]):
+        if dependencies:
+            await asyncio.gather(*dependencies)
+
+        failed = [
+            name for name in task.depends_on if self.tasks[name].status != "done"
+        ]
+        if failed:
+            task.status = "skipped"
+            task.error = f"Depends on failed {', '.join(failed)}"
+            return
+
+        # A refreshed task keeps reporting its previous result until it finishes
+        if task.finished_at is None:
+            task.status = "running"
+        started_at = time.monotonic()
+        try:
+            await task.func()
+            task.status = "done"
+            task.error = None
+        except Exception as e:
+            task.status = "failed"
+            task.error = str(e)
+            logger.warning(f"Startup task {task.name} failed: {e}")
+        finally:
+            task.finished_at = time.monotonic()
+            task.duration = task.finished_at - started_at
+
+    def _schedule(self, tasks: List[StartupTask]) -> Dict[str, asyncio.Task]:
+        self.tasks = {task.name: task for task in tasks}
+        self._scheduled = {}
+        for task in tasks:
+            self._scheduled[task.name] = asyncio.create_task(
+                self._run_task(
+                    task, [self._scheduled[name] for name in task.depends_on]
+                )
+            )
+        return self._scheduled
+
+    async def run(self, tasks: List[StartupTask]):
+        """Runs ``tasks``, which must be listed after the tasks they depend on."""
+        await asyncio.gather(*self._schedule(tasks).values())
+
+    def start(self, tasks: List[StartupTask]):
+        # Scheduled right away so readiness never reports an empty graph
+        self._runner = asyncio.gather(*self._schedule(tasks).values())
+
+    async def wait_required(self):
+        """
+        Waits for the required tasks only, leaving the optional ones running
+        in the background. Raises if a required task did not succeed.
+        """
+        await asyncio.gather(
+            *(
+                self._scheduled[name]
+                for name, task in self.tasks.items()
+                if task.required and name in self._scheduled
+            )
+        )
+        failed = [
+            f"{name}: {task.error}"
+            for name, task in self.tasks.items()
+            if task.required and task.status != "done"
+        ]
+        if failed:
+            raise RuntimeError(f"Startup tasks failed: {'; '.join(failed)}")
+
+    def refresh_stale(self):
+        """Runs stale tasks again in the background, returning immediately."""
+        for name, task in self.tasks.items():
+            if not task.stale or name in self._refreshes:
+                continue
+            refresh = asyncio.create_task(self._run_task(task, []))
+            self._refreshes[name] = refresh
+            refresh.add_done_callback(lambda _, name=name: self._refreshes.pop(name))
+
+    def stop(self):
+        for runner in [self._runner, *self._refreshes.values()]:
+            if runner is not None and not runner.done():
+                runner.cancel()
+        self._runner = None
+        self._scheduled = {}
+
+
+STARTUP_SERVICE = StartupService()
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+from typing import List, Optional, Tuple
+import uuid
+
+from utils.asset_directory_utils import get_stream_logs_directory
+from utils.get_env import get_stream_event_log_env
+from utils.parsers import parse_bool_or_none
+
+
+class StreamEventLogService:
+    """
+    Append-only log of the SSE events of a presentation stream, one compact
+    JSON line per event and a final ``[id, null]`` line once the stream ends.
+    Lets a client resume with ``Last-Event-ID`` after the in-memory stream
+    session is gone, without generating the slides again.
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return parse_bool_or_none(get_stream_event_log_env()) or False
+
+    def _get_log_path(self, presentation_id: uuid.UUID) -> str:
+        return os.path.join(get_stream_logs_directory(), f"{presentation_id}.log")
+
+    def _read_events(
+        self, presentation_id: uuid.UUID
+    ) -> Optional[List[Tuple[int, Optional[str]]]]:
+        try:
+            with open(self._get_log_path(presentation_id), "r") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None
+
+        events = []
+        for line in lines:
+            try:
+                event_id, event = json.loads(line)
+            except ValueError:
+                # Partial line written by a process that died mid-append
+                break
+            events.append((event_id, event))
+        return events
+
+    def _reset(self, presentation_id: uuid.UUID):
+        with open(self._get_log_path(presentation_id), "w"):
+            pass
+
+    def _append(
+        self, presentation_id: uuid.UUID, events: List[Tuple[int, Optional[str]]]
+    ):
+        with open(self._get_log_path(presentation_id), "a") as f:
+            f.write(
+                "".join(
+                    json.dumps([event_id, event], separators=(",", ":")) + "\n"
+                    for event_id, event in events
+                )
+            )
+
+    def _delete(self, presentation_id: uuid.UUID):
+        try:
+            os.remove(self._get_log_path(presentation_id))
+        except FileNotFoundError:
+            pass
+
+    async def reset(self, presentation_id: uuid.UUID):
+        await asyncio.to_thread(self._reset, presentation_id)
+
+    async def append(
+        self, presentation_id: uuid.UUID, events: List[Tuple[int, Optional[str]]]
+    ):
+        await asyncio.to_thread(self._append, presentation_id, events)
+
+    async def get_events_after(
+        self, presentation_id: uuid.UUID, after_event_id: int
+    ) -> Optional[List[Tuple[int, str]]]:
+        """Returns the events after ``after_event_id`` if the stream completed."""
+        events = await asyncio.to_thread(self._read_events, presentation_id)
+        if not events or events[-1][1] is not None:
+            return None
+        return [
+            (event_id, event)
+            for event_id, event in events[:-1]
+            if event_id > after_event_id
+        ]
+
+    async def delete(self, presentation_id: uuid.UUID):
+        await asyncio.to_thread(self._delete, presentation_id)
+
+
+STREAM_EVENT_LOG = StreamEventLogService()
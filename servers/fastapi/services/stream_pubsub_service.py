@@ -0,0 +1,300 @@
+import asyncio
+from datetime import timedelta
+import os
+import socket
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+import uuid
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from models.sql.presentation_stream_event import PresentationStreamEventModel
+from models.sql.presentation_stream_lock import PresentationStreamLockModel
+from services.database import async_session_maker, sql_engine
+from utils.custom_logger import setup_logger
+from utils.datetime_utils import get_current_utc_datetime
+from utils.get_env import get_stream_pubsub_backend_env
+
+logger = setup_logger(__name__)
+
+STREAM_LOCK_SECONDS = 30
+STREAM_POLL_INTERVAL = 0.5
+# Relay rows older than this belong to streams nobody can still be following
+STREAM_EVENTS_RETENTION = timedelta(hours=1)
+
+STREAM_NOTIFY_CHANNEL = "presentation_stream"
+
+
+class InProcessStreamPubSub:
+    """
+    Default backend for a single process: local stream sessions are the only
+    subscribers, so nothing leaves the process and every lock is granted.
+    """
+
+    distributed = False
+
+    def __init__(self):
+        self.owner_id = (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+
+    async def publish(
+        self, presentation_id: uuid.UUID, events: List[Tuple[int, Optional[str]]]
+    ):
+        pass
+
+    async def subscribe(
+        self, presentation_id: uuid.UUID, after_event_id: int
+    ) -> AsyncIterator[Tuple[int, Optional[str]]]:
+        return
+        yield
+
+    async def acquire_generator_lock(self, presentation_id: uuid.UUID) -> bool:
+        return True
+
+    async def renew_generator_lock(self, presentation_id: uuid.UUID) -> bool:
+        return True
+
+    async def release_generator_lock(self, presentation_id: uuid.UUID):
+        pass
+
+
+class SQLPollingStreamPubSub(InProcessStreamPubSub):
+    """
+    Relays stream events through the ``presentation_stream_events`` table and
+    elects one generator per presentation with a lease in
+    ``presentation_stream_locks``. Subscribers poll for new rows, which is good
+    enough for SQLite deployments with a handful of local workers.
+    """
+
+    distributed = True
+
+    async def publish(
+        self, presentation_id: uuid.UUID, events: List[Tuple[int, Optional[str]]]
+    ):
+        async with async_session_maker() as sql_session:
+            sql_session.add_all(
+                [
+                    PresentationStreamEventModel(
+                        presentation_id=presentation_id,
+                        event_id=event_id,
+                        event=event,
+                    )
+                    for event_id, event in events
+                ]
+            )
+            await self._notify(sql_session, presentation_id)
+            await sql_session.commit()
+
+    async def _notify(self, sql_session, presentation_id: uuid.UUID):
+        pass
+
+    async def _wait_for_events(self, presentation_id: uuid.UUID):
+        await asyncio.sleep(STREAM_POLL_INTERVAL)
+
+    async def subscribe(
+        self, presentation_id: uuid.UUID, after_event_id: int
+    ) -> AsyncIterator[Tuple[int, Optional[str]]]:
+        """
+        Yields relayed events after ``after_event_id`` until the end of the
+        stream, or returns early once no process holds the generator lock.
+        """
+        idle_since = asyncio.get_running_loop().time()
+        while True:
+            async with async_session_maker() as sql_session:
+                rows = await sql_session.execute(
+                    select(
+                        PresentationStreamEventModel.event_id,
+                        PresentationStreamEventModel.event,
+                    )
+                    .where(
+                        PresentationStreamEventModel.presentation_id == presentation_id,
+                        PresentationStreamEventModel.event_id > after_event_id,
+                    )
+                    .order_by(PresentationStreamEventModel.event_id)
+                )
+                rows = rows.all()
+
+            for event_id, event in rows:
+                after_event_id = event_id
+                yield event_id, event
+                if event is None:
+                    return
+
+            now = asyncio.get_running_loop().time()
+            if rows:
+                idle_since = now
+            elif now - idle_since > STREAM_LOCK_SECONDS / 3:
+                if not await self.is_generator_alive(presentation_id):
+                    return
+                idle_since = now
+
+            await self._wait_for_events(presentation_id)
+
+    def _delete_stale_events(self, presentation_id: uuid.UUID):
+        return delete(PresentationStreamEventModel).where(
+            (PresentationStreamEventModel.presentation_id == presentation_id)
+            | (
+                PresentationStreamEventModel.created_at
+                < get_current_utc_datetime() - STREAM_EVENTS_RETENTION
+            )
+        )
+
+    async def is_generator_alive(self, presentation_id: uuid.UUID) -> bool:
+        async with async_session_maker() as sql_session:
+            lock = await sql_session.scalar(
+                select(PresentationStreamLockModel.owner).where(
+                    PresentationStreamLockModel.presentation_id == presentation_id,
+                    PresentationStreamLockModel.expires_at
+                    > get_current_utc_datetime(),
+                )
+            )
+            return lock is not None
+
+    async def acquire_generator_lock(self, presentation_id: uuid.UUID) -> bool:
+        """
+        Takes the generator lock and, in the same transaction, drops the relay
+        events of an earlier stream, so followers never read them as part of
+        the new one.
+        """
+        now = get_current_utc_datetime()
+        expires_at = now + timedelta(seconds=STREAM_LOCK_SECONDS)
+        async with async_session_maker() as sql_session:
+            try:
+                sql_session.add(
+                    PresentationStreamLockModel(
+                        presentation_id=presentation_id,
+                        owner=self.owner_id,
+                        expires_at=expires_at,
+                    )
+                )
+                await sql_session.flush()
+                await sql_session.execute(self._delete_stale_events(presentation_id))
+                await sql_session.commit()
+                return True
+            except IntegrityError:
+                await sql_session.rollback()
+
+            # Take over a lock that its owner stopped renewing
+            result = await sql_session.execute(
+                update(PresentationStreamLockModel)
+                .where(
+                    PresentationStreamLockModel.presentation_id == presentation_id,
+                    (PresentationStreamLockModel.expires_at < now)
+                    | (PresentationStreamLockModel.owner == self.owner_id),
+                )
+                .values(owner=self.owner_id, expires_at=expires_at)
+            )
+            if result.rowcount != 1:
+                await sql_session.rollback()
+                return False
+            await sql_session.execute(self._delete_stale_events(presentation_id))
+            await sql_session.commit()
+            return True
+
+    async def renew_generator_lock(self, presentation_id: uuid.UUID) -> bool:
+        async with async_session_maker() as sql_session:
+            result = await sql_session.execute(
+                update(PresentationStreamLockModel)
+                .where(
+                    PresentationStreamLockModel.presentation_id == presentation_id,
+                    PresentationStreamLockModel.owner == self.owner_id,
+                )
+                .values(
+                    expires_at=get_current_utc_datetime()
+                    + timedelta(seconds=STREAM_LOCK_SECONDS)
+                )
+            )
+            await sql_session.commit()
+            return result.rowcount == 1
+
+    async def release_generator_lock(self, presentation_id: uuid.UUID):
+        async with async_session_maker() as sql_session:
+            await sql_session.execute(
+                delete(PresentationStreamLockModel).where(
+                    PresentationStreamLockModel.presentation_id == presentation_id,
+                    PresentationStreamLockModel.owner == self.owner_id,
+                )
+            )
+            await sql_session.commit()
+
+
+class PostgresStreamPubSub(SQLPollingStreamPubSub):
+    """
+    Same relay table, but subscribers are woken by LISTEN/NOTIFY instead of
+    polling. Events stay in the table since NOTIFY payloads are capped at 8KB.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._waiters: Dict[uuid.UUID, Set[asyncio.Event]] = {}
+        self._listener_connection = None
+        self._listener_lock = asyncio.Lock()
+
+    async def _notify(self, sql_session, presentation_id: uuid.UUID):
+        await sql_session.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": STREAM_NOTIFY_CHANNEL, "payload": str(presentation_id)},
+        )
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            presentation_id = uuid.UUID(payload)
+        except ValueError:
+            return
+        for waiter in self._waiters.get(presentation_id, ()):
+            waiter.set()
+
+    async def _ensure_listener(self):
+        async with self._listener_lock:
+            if self._listener_connection is not None:
+                return
+            connection = await sql_engine.connect()
+            try:
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.add_listener(
+                    STREAM_NOTIFY_CHANNEL, self._on_notification
+                )
+            except Exception:
+                await connection.close()
+                raise
+            self._listener_connection = connection
+
+    async def _wait_for_events(self, presentation_id: uuid.UUID):
+        try:
+            await self._ensure_listener()
+        except Exception as e:
+            logger.warning(f"LISTEN unavailable, polling stream events: {e}")
+            await super()._wait_for_events(presentation_id)
+            return
+
+        waiter = asyncio.Event()
+        self._waiters.setdefault(presentation_id, set()).add(waiter)
+        try:
+            # The timeout covers notifications sent before the waiter existed
+            await asyncio.wait_for(waiter.wait(), STREAM_LOCK_SECONDS / 6)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            waiters = self._waiters.get(presentation_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    self._waiters.pop(presentation_id, None)
+
+
+def _create_stream_pubsub() -> InProcessStreamPubSub:
+    backend = (get_stream_pubsub_backend_env() or "memory").lower()
+    if backend == "postgres":
+        if sql_engine.dialect.name == "postgresql":
+            return PostgresStreamPubSub()
+        logger.warning(
+            "STREAM_PUBSUB_BACKEND=postgres needs a Postgres database, polling instead"
+        )
+        return SQLPollingStreamPubSub()
+    if backend == "sqlite":
+        return SQLPollingStreamPubSub()
+    return InProcessStreamPubSub()
+
+
+STREAM_PUBSUB = _create_stream_pubsub()
@@ -0,0 +1,466 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+import json
+import os
+import socket
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Iterable, List, Optional
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, or_, select, update
+
+from models.sql.template_import_event import TemplateImportEventModel
+from models.sql.template_import_job import TemplateImportJobModel
+from models.sse_response import SSECompleteResponse, SSEResponse
+from models.template_import_job import TemplateImportJobStatus, TemplateImportSlide
+from services.database import async_session_maker
+from utils.custom_logger import setup_logger
+from utils.datetime_utils import get_current_utc_datetime
+from utils.get_env import get_template_import_concurrency_env
+
+logger = setup_logger(__name__)
+
+DEFAULT_TEMPLATE_IMPORT_CONCURRENCY = 4
+TEMPLATE_IMPORT_JOB_TTL_SECONDS = 3600
+TEMPLATE_IMPORT_LEASE_SECONDS = 30
+TEMPLATE_IMPORT_POLL_INTERVAL = 0.5
+
+SlideConverter = Callable[[TemplateImportSlide], Awaitable[str]]
+
+
+def get_slide_event(slide: TemplateImportSlide) -> str:
+    return SSEResponse(
+        event="response",
+        # The OXML input is left out, the client already has it
+        data=json.dumps(
+            {"type": "slide", "slide": slide.model_dump(exclude={"xml_content"})}
+        ),
+    ).to_string()
+
+
+@dataclass
+class TemplateImportJob:
+    id: uuid.UUID
+    slides: Dict[int, TemplateImportSlide]
+    # Whether a worker held the lease of the job when it was loaded
+    leased: bool = False
+    last_event_id: int = 0
+    task: Optional[asyncio.Task] = None
+    _updated: asyncio.Event = field(default_factory=asyncio.Event)
+    _publish_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def running(self) -> bool:
+        if self.task is not None:
+            return not self.task.done()
+        return self.leased
+
+    def get_status(self) -> TemplateImportJobStatus:
+        slides = sorted(self.slides.values(), key=lambda slide: slide.slide_number)
+        completed_slides = sum(slide.status == "done" for slide in slides)
+        failed_slides = sum(slide.status == "failed" for slide in slides)
+        if self.running:
+            status = "running"
+        elif completed_slides == len(slides):
+            status = "done"
+        else:
+            status = "failed"
+        return TemplateImportJobStatus(
+            id=self.id,
+            status=status,
+            total_slides=len(slides),
+            completed_slides=completed_slides,
+            failed_slides=failed_slides,
+            slides=slides,
+        )
+
+    def dump_slides(self) -> List[dict]:
+        return [
+            slide.model_dump()
+            for slide in sorted(self.slides.values(), key=lambda s: s.slide_number)
+        ]
+
+    def notify(self):
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+
+class TemplateImportService:
+    """
+    Converts the slides of a PPTX template to HTML and then to React
+    components, all slides at once under a process wide concurrency limit,
+    since each conversion is a long reasoning call. Results are kept per
+    slide, so a retry only converts the slides, or the steps, that failed.
+
+    Jobs, slides and stream events live in the database, so any worker can
+    report, stream or retry a job. The worker converting a job holds a lease
+    on it, which expires if that worker dies.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_TEMPLATE_IMPORT_CONCURRENCY,
+        job_ttl: float = TEMPLATE_IMPORT_JOB_TTL_SECONDS,
+        session_maker=async_session_maker,
+    ):
+        self.concurrency = concurrency
+        self.job_ttl = job_ttl
+        self.session_maker = session_maker
+        self.owner_id = (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        # Jobs being converted by this process
+        self.jobs: Dict[uuid.UUID, TemplateImportJob] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @staticmethod
+    def _lease_alive():
+        return TemplateImportJobModel.lease_expires_at > get_current_utc_datetime()
+
+    async def get_job(self, job_id: uuid.UUID) -> Optional[TemplateImportJob]:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+
+        async with self.session_maker() as sql_session:
+            row = (
+                await sql_session.execute(
+                    select(
+                        TemplateImportJobModel.slides,
+                        TemplateImportJobModel.lease_owner.is_not(None)
+                        & self._lease_alive(),
+                    ).where(TemplateImportJobModel.id == job_id)
+                )
+            ).first()
+        if row is None:
+            return None
+
+        slides, leased = row
+        return TemplateImportJob(
+            id=job_id,
+            slides={
+                slide["slide_number"]: TemplateImportSlide(**slide) for slide in slides
+            },
+            leased=bool(leased),
+        )
+
+    async def create_job(
+        self, slides: Iterable[TemplateImportSlide]
+    ) -> TemplateImportJob:
+        await self.evict()
+        job = TemplateImportJob(
+            id=uuid.uuid4(),
+            slides={slide.slide_number: slide for slide in slides},
+        )
+        async with self.session_maker() as sql_session:
+            sql_session.add(
+                TemplateImportJobModel(id=job.id, slides=job.dump_slides())
+            )
+            await sql_session.commit()
+        return job
+
+    async def evict(self):
+        """Deletes the jobs, and their events, not updated within the TTL."""
+        expired_before = get_current_utc_datetime() - timedelta(seconds=self.job_ttl)
+        async with self.session_maker() as sql_session:
+            job_ids = (
+                await sql_session.scalars(
+                    select(TemplateImportJobModel.id).where(
+                        TemplateImportJobModel.updated_at < expired_before,
+                        or_(
+                            TemplateImportJobModel.lease_owner.is_(None),
+                            ~self._lease_alive(),
+                        ),
+                    )
+                )
+            ).all()
+            if not job_ids:
+                return
+            await sql_session.execute(
+                delete(TemplateImportEventModel).where(
+                    TemplateImportEventModel.job_id.in_(job_ids)
+                )
+            )
+            await sql_session.execute(
+                delete(TemplateImportJobModel).where(
+                    TemplateImportJobModel.id.in_(job_ids)
+                )
+            )
+            await sql_session.commit()
+
+    async def count_running(self) -> int:
+        async with self.session_maker() as sql_session:
+            return await sql_session.scalar(
+                select(func.count()).where(
+                    TemplateImportJobModel.lease_owner.is_not(None),
+                    self._lease_alive(),
+                )
+            )
+
+    async def start(
+        self,
+        job: TemplateImportJob,
+        convert_to_html: SlideConverter,
+        convert_to_react: SlideConverter,
+        slide_numbers: Optional[List[int]] = None,
+    ):
+        """Converts the slides of the job that are not done yet, or only ``slide_numbers``."""
+        if job.running or not await self._acquire_lease(job):
+            raise HTTPException(
+                status_code=409, detail="Template import is already running"
+            )
+
+        slides = [
+            slide
+            for slide in job.slides.values()
+            if slide.status != "done"
+            and (slide_numbers is None or slide.slide_number in slide_numbers)
+        ]
+        for slide in slides:
+            slide.status = "pending"
+            slide.error = None
+        await self._save(job)
+
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(
+            self._run_job(job, slides, convert_to_html, convert_to_react)
+        )
+
+    async def _acquire_lease(self, job: TemplateImportJob) -> bool:
+        now = get_current_utc_datetime()
+        async with self.session_maker() as sql_session:
+            result = await sql_session.execute(
+                update(TemplateImportJobModel)
+                .where(
+                    TemplateImportJobModel.id == job.id,
+                    or_(
+                        TemplateImportJobModel.lease_owner.is_(None),
+                        TemplateImportJobModel.lease_expires_at < now,
+                    ),
+                )
+                .values(
+                    lease_owner=self.owner_id,
+                    lease_expires_at=now
+                    + timedelta(seconds=TEMPLATE_IMPORT_LEASE_SECONDS),
+                )
+            )
+            # Events of earlier runs, possibly on another worker, keep their ids
+            job.last_event_id = (
+                await sql_session.scalar(
+                    select(func.max(TemplateImportEventModel.event_id)).where(
+                        TemplateImportEventModel.job_id == job.id
+                    )
+                )
+                or 0
+            )
+            await sql_session.commit()
+            return result.rowcount == 1
+
+    async def _renew_lease(self, job: TemplateImportJob):
+        """Returns once another worker has taken the job over."""
+        while True:
+            await asyncio.sleep(TEMPLATE_IMPORT_LEASE_SECONDS / 3)
+            try:
+                async with self.session_maker() as sql_session:
+                    result = await sql_session.execute(
+                        update(TemplateImportJobModel)
+                        .where(
+                            TemplateImportJobModel.id == job.id,
+                            TemplateImportJobModel.lease_owner == self.owner_id,
+                        )
+                        .values(
+                            lease_expires_at=get_current_utc_datetime()
+                            + timedelta(seconds=TEMPLATE_IMPORT_LEASE_SECONDS)
+                        )
+                    )
+                    await sql_session.commit()
+            except Exception as e:
+                logger.warning(f"Failed to renew template import {job.id} lease: {e}")
+                continue
+            if result.rowcount == 0:
+                logger.warning(
+                    f"Template import {job.id} lease was taken over, stopping the job"
+                )
+                return
+
+    async def _save(self, job: TemplateImportJob, event: Optional[str] = None):
+        """Stores the slides of the job and appends ``event`` to its stream."""
+        async with job._publish_lock:
+            async with self.session_maker() as sql_session:
+                if event is not None:
+                    job.last_event_id += 1
+                    sql_session.add(
+                        TemplateImportEventModel(
+                            job_id=job.id, event_id=job.last_event_id, event=event
+                        )
+                    )
+                await sql_session.execute(
+                    update(TemplateImportJobModel)
+                    .where(TemplateImportJobModel.id == job.id)
+                    .values(
+                        slides=job.dump_slides(),
+                        updated_at=get_current_utc_datetime(),
+                    )
+                )
+                await sql_session.commit()
+        job.notify()
+
+    async def _release(self, job: TemplateImportJob):
+        async with self.session_maker() as sql_session:
+            await sql_session.execute(
+                update(TemplateImportJobModel)
+                .where(
+                    TemplateImportJobModel.id == job.id,
+                    TemplateImportJobModel.lease_owner == self.owner_id,
+                )
+                .values(lease_owner=None, lease_expires_at=None)
+            )
+            await sql_session.commit()
+
+    async def _run_job(
+        self,
+        job: TemplateImportJob,
+        slides: List[TemplateImportSlide],
+        convert_to_html: SlideConverter,
+        convert_to_react: SlideConverter,
+    ):
+        run_task = asyncio.current_task()
+        renew_lease_task = asyncio.create_task(self._renew_lease(job))
+        # The worker that took the job over writes its events from now on
+        renew_lease_task.add_done_callback(
+            lambda task: task.cancelled() or run_task.cancel()
+        )
+        lease_lost = False
+        try:
+            await asyncio.gather(
+                *[
+                    self._convert_slide(job, slide, convert_to_html, convert_to_react)
+                    for slide in slides
+                ]
+            )
+        except asyncio.CancelledError:
+            if not renew_lease_task.done() or renew_lease_task.cancelled():
+                raise
+            lease_lost = True
+        finally:
+            renew_lease_task.cancel()
+            try:
+                if not lease_lost:
+                    await self._save(
+                        job,
+                        SSECompleteResponse(
+                            key="job", value=job.get_status().model_dump(mode="json")
+                        ).to_string(),
+                    )
+                    await self._release(job)
+            finally:
+                self.jobs.pop(job.id, None)
+                job.notify()
+
+    async def _convert_slide(
+        self,
+        job: TemplateImportJob,
+        slide: TemplateImportSlide,
+        convert_to_html: SlideConverter,
+        convert_to_react: SlideConverter,
+    ):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with self._semaphore:
+            try:
+                # The HTML of an earlier attempt is kept when only React failed
+                if slide.html is None:
+                    slide.status = "html"
+                    await self._save(job, get_slide_event(slide))
+                    slide.html = await convert_to_html(slide)
+
+                slide.status = "react"
+                await self._save(job, get_slide_event(slide))
+                slide.react_component = await convert_to_react(slide)
+                slide.status = "done"
+            except Exception as e:
+                logger.warning(
+                    f"Template import {job.id} failed on slide {slide.slide_number}: {e}"
+                )
+                slide.status = "failed"
+                slide.error = e.detail if isinstance(e, HTTPException) else str(e)
+            await self._save(job, get_slide_event(slide))
+
+    async def _is_running(self, job_id: uuid.UUID) -> bool:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.running
+        async with self.session_maker() as sql_session:
+            return bool(
+                await sql_session.scalar(
+                    select(func.count()).where(
+                        TemplateImportJobModel.id == job_id,
+                        TemplateImportJobModel.lease_owner.is_not(None),
+                        self._lease_alive(),
+                    )
+                )
+            )
+
+    async def subscribe(
+        self, job_id: uuid.UUID, last_event_id: int = 0, ping_interval: float = 15.0
+    ) -> AsyncGenerator[tuple[Optional[int], str], None]:
+        """
+        Yields the events after ``last_event_id`` and then the live ones until
+        the job stops, with ping events without an id while slides convert.
+        Jobs converted by another worker are polled for new events.
+        """
+        loop = asyncio.get_running_loop()
+        idle_since = loop.time()
+        while True:
+            job = self.jobs.get(job_id)
+            updated = job._updated if job is not None else None
+            # Checked before reading, so the events of a run that just ended are read
+            running = await self._is_running(job_id)
+
+            async with self.session_maker() as sql_session:
+                rows = (
+                    await sql_session.execute(
+                        select(
+                            TemplateImportEventModel.event_id,
+                            TemplateImportEventModel.event,
+                        )
+                        .where(
+                            TemplateImportEventModel.job_id == job_id,
+                            TemplateImportEventModel.event_id > last_event_id,
+                        )
+                        .order_by(TemplateImportEventModel.event_id)
+                    )
+                ).all()
+            for event_id, event in rows:
+                last_event_id = event_id
+                yield event_id, event
+
+            if not running:
+                return
+
+            now = loop.time()
+            if rows:
+                idle_since = now
+            elif now - idle_since >= ping_interval:
+                idle_since = now
+                yield None, SSEResponse(
+                    event="ping",
+                    data=json.dumps({"type": "ping", "status": "alive"}),
+                ).to_string()
+
+            timeout = max(ping_interval - (now - idle_since), 0)
+            if updated is None:
+                await asyncio.sleep(min(TEMPLATE_IMPORT_POLL_INTERVAL, timeout))
+                continue
+            try:
+                await asyncio.wait_for(updated.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+_template_import_concurrency = get_template_import_concurrency_env()
+TEMPLATE_IMPORT_SERVICE = TemplateImportService(
+    concurrency=_template_import_concurrency or DEFAULT_TEMPLATE_IMPORT_CONCURRENCY
+)
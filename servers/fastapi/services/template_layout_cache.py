@@ -0,0 +1,80 @@
+import asyncio
+from dataclasses import dataclass
+import time
+from typing import Awaitable, Callable, Dict, Hashable
+
+from models.presentation_layout import PresentationLayoutModel
+from utils.get_env import get_template_layout_cache_ttl_seconds_env
+
+
+@dataclass
+class CachedLayout:
+    layout: PresentationLayoutModel
+    version: int
+    expires_at: float
+
+
+class TemplateLayoutCache:
+    """
+    In-process cache of resolved template layouts. Every template change in
+    this process bumps the version, which drops all cached layouts at once,
+    and entries also expire after ttl so changes made by other workers or to
+    the Next.js templates are picked up. Concurrent misses for the same key
+    share a single load.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self.entries: Dict[Hashable, CachedLayout] = {}
+        self._loads: Dict[Hashable, asyncio.Future] = {}
+
+    def invalidate(self):
+        self.version += 1
+        self.entries.clear()
+
+    async def get_or_load(
+        self, key: Hashable, load: Callable[[], Awaitable[PresentationLayoutModel]]
+    ) -> PresentationLayoutModel:
+        entry = self.entries.get(key)
+        if (
+            entry
+            and entry.version == self.version
+            and entry.expires_at > time.monotonic()
+        ):
+            # Callers adjust the layout they get, e.g. its ordered flag
+            return entry.layout.model_copy(deep=True)
+
+        version = self.version
+        load_key = (key, version)
+        future = self._loads.get(load_key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(key, version, load))
+            self._loads[load_key] = future
+            future.add_done_callback(lambda _: self._loads.pop(load_key, None))
+
+        # A cancelled caller does not cancel the load for the others
+        layout = await asyncio.shield(future)
+        return layout.model_copy(deep=True)
+
+    async def _load(
+        self,
+        key: Hashable,
+        version: int,
+        load: Callable[[], Awaitable[PresentationLayoutModel]],
+    ) -> PresentationLayoutModel:
+        layout = await load()
+        if self.ttl > 0 and version == self.version:
+            self.entries[key] = CachedLayout(
+                layout=layout.model_copy(deep=True),
+                version=version,
+                expires_at=time.monotonic() + self.ttl,
+            )
+        return layout
+
+
+_template_layout_cache_ttl = get_template_layout_cache_ttl_seconds_env()
+# A ttl of 0 disables the cache
+TEMPLATE_LAYOUT_CACHE = TemplateLayoutCache(
+    ttl=300 if _template_layout_cache_ttl is None else _template_layout_cache_ttl
+)
@@ -14,6 +14,8 @@ from sqlmodel import select
 
 from models.sql.template import TemplateModel
 from services.database import async_session_maker
+from services.template_layout_cache import TEMPLATE_LAYOUT_CACHE
+from services.tracing_service import TRACER
 
 
 logger = logging.getLogger(__name__)
@@ -154,6 +156,7 @@ class TemplateService:
             session.add(template)
             await session.commit()
             await session.refresh(template)
+            TEMPLATE_LAYOUT_CACHE.invalidate()
             logger.info(f"Created custom template: {slug} (id={template.id})")
             return template
 
@@ -197,6 +200,7 @@ class TemplateService:
             session.add(template)
             await session.commit()
             await session.refresh(template)
+            TEMPLATE_LAYOUT_CACHE.invalidate()
             logger.info(f"Updated custom template: {template.slug} (id={template.id})")
             return template
 
@@ -219,6 +223,7 @@ class TemplateService:
 
             await session.delete(template)
             await session.commit()
+            TEMPLATE_LAYOUT_CACHE.invalidate()
             logger.info(f"Deleted custom template: {template.slug} (id={template_id})")
 
     async def seed_system_templates(self) -> int:
@@ -235,7 +240,9 @@ class TemplateService:
         try:
             # Fetch template info from Next.js API
             async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{nextjs_url}/api/templates")
+                response = await client.get(
+                    f"{nextjs_url}/api/templates", headers=TRACER.inject_headers()
+                )
                 response.raise_for_status()
                 templates_from_fs = response.json()
         except Exception as e:
@@ -312,6 +319,7 @@ class TemplateService:
                 count += 1
 
             await session.commit()
+            TEMPLATE_LAYOUT_CACHE.invalidate()
 
         logger.info(f"Seeded {count} system templates")
         return count
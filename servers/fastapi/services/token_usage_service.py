@@ -0,0 +1,393 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import functools
+import inspect
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+import uuid
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import select, update
+
+from models.llm_message import LLMMessage
+from models.sql.api_key import ApiKeyModel
+from models.sql.presentation import PresentationModel
+from services.database import async_session_maker
+from utils.custom_logger import setup_logger
+from utils.get_env import (
+    get_llm_max_input_tokens_env,
+    get_presentation_token_budget_env,
+    get_token_usage_flush_seconds_env,
+)
+
+logger = setup_logger(__name__)
+
+# Characters per token of most BPE tokenizers for English text
+CHARACTERS_PER_TOKEN = 4
+
+_API_KEY_ID: ContextVar[Optional[uuid.UUID]] = ContextVar(
+    "token_usage_api_key_id", default=None
+)
+_CURRENT_SCOPE: ContextVar[Optional["TokenUsageScope"]] = ContextVar(
+    "token_usage_scope", default=None
+)
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Estimates tokens at four characters per token, like most BPE tokenizers."""
+    if not text:
+        return 0
+    return (len(text) + CHARACTERS_PER_TOKEN - 1) // CHARACTERS_PER_TOKEN
+
+
+def count_content_tokens(content) -> int:
+    """Estimates the tokens of text, or of anything else as it is sent, as JSON."""
+    if content is None:
+        return 0
+    if isinstance(content, str):
+        return count_tokens(content)
+    if isinstance(content, (list, tuple)):
+        return sum(count_content_tokens(each) for each in content)
+    if isinstance(content, BaseModel):
+        return count_tokens(content.model_dump_json(exclude_none=True))
+    return count_tokens(json.dumps(content, default=str))
+
+
+def count_message_tokens(messages: List[LLMMessage]) -> int:
+    return sum(
+        count_content_tokens(getattr(message, "content", None))
+        + count_content_tokens(getattr(message, "tool_calls", None))
+        for message in messages
+    )
+
+
+class TokenBudgetExceededError(HTTPException):
+    """Raised before a request to the LLM that would go over a token budget."""
+
+
+@dataclass(eq=False)
+class TokenUsageScope:
+    """
+    The LLM calls made for one presentation, by one request or background
+    job. Usage recorded in the scope counts towards the presentation, and
+    towards the API key the request was made with.
+    """
+
+    presentation_id: Optional[uuid.UUID]
+    api_key_id: Optional[uuid.UUID] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    # Tokens the presentation had used before the scope, loaded for budgets
+    previous_tokens: Optional[int] = None
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    async def get_presentation_tokens(self) -> int:
+        """All tokens the presentation used, including the ones of this scope."""
+        if self.presentation_id is None:
+            return self.tokens
+        async with self._lock:
+            if self.previous_tokens is None:
+                stored = await TOKEN_USAGE_RECORDER.get_presentation_tokens(
+                    self.presentation_id
+                )
+                self.previous_tokens = max(stored - self.tokens, 0)
+        return self.previous_tokens + self.tokens
+
+
+def get_token_usage_api_key() -> Optional[uuid.UUID]:
+    return _API_KEY_ID.get()
+
+
+def set_token_usage_api_key(api_key_id: Optional[uuid.UUID]):
+    """Counts the LLM usage of the current request towards an API key."""
+    _API_KEY_ID.set(api_key_id)
+
+
+def _get_scope(
+    presentation_id: Optional[uuid.UUID], api_key_id: Optional[uuid.UUID] = None
+) -> TokenUsageScope:
+    # Nested pipeline stages of the same presentation share one scope
+    current = _CURRENT_SCOPE.get()
+    if current is not None and current.presentation_id == presentation_id:
+        return current
+    return TokenUsageScope(
+        presentation_id=presentation_id,
+        api_key_id=api_key_id or _API_KEY_ID.get(),
+    )
+
+
+@contextmanager
+def token_usage_scope(
+    presentation_id: Optional[uuid.UUID],
+    api_key_id: Optional[uuid.UUID] = None,
+) -> Iterator[TokenUsageScope]:
+    """Counts the LLM usage of the block towards a presentation."""
+    scope = _get_scope(presentation_id, api_key_id)
+    token = _CURRENT_SCOPE.set(scope)
+    try:
+        yield scope
+    finally:
+        _CURRENT_SCOPE.reset(token)
+
+
+def _get_argument(func, args, kwargs, argument: str):
+    name, *attributes = argument.split(".")
+    value = inspect.signature(func).bind_partial(*args, **kwargs).arguments.get(name)
+    for attribute in attributes:
+        value = getattr(value, attribute, None)
+    return value
+
+
+def track_token_usage(argument: str = "presentation_id"):
+    """
+    Runs each call of the decorated coroutine or async generator in a token
+    usage scope of the presentation passed as ``argument``, which can be an
+    attribute path like ``stream_session.presentation_id``.
+    """
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                scope = _get_scope(_get_argument(func, args, kwargs, argument))
+                generator = func(*args, **kwargs)
+                try:
+                    while True:
+                        # Current only while the generator runs, not in the
+                        # code consuming it between items
+                        token = _CURRENT_SCOPE.set(scope)
+                        try:
+                            item = await generator.__anext__()
+                        except StopAsyncIteration:
+                            return
+                        finally:
+                            _CURRENT_SCOPE.reset(token)
+                        yield item
+                finally:
+                    await generator.aclose()
+
+            return async_gen_wrapper
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            presentation_id = _get_argument(func, args, kwargs, argument)
+            with token_usage_scope(presentation_id):
+                return await func(*args, **kwargs)
+
+        return async_wrapper
+
+    return decorator
+
+
+def record_token_usage(input_tokens: int, output_tokens: int):
+    scope = _CURRENT_SCOPE.get()
+    presentation_id = None
+    api_key_id = _API_KEY_ID.get()
+    if scope is not None:
+        scope.input_tokens += input_tokens
+        scope.output_tokens += output_tokens
+        presentation_id = scope.presentation_id
+        api_key_id = scope.api_key_id or api_key_id
+    TOKEN_USAGE_RECORDER.record(
+        presentation_id, api_key_id, input_tokens, output_tokens
+    )
+
+
+async def get_available_input_tokens() -> Optional[int]:
+    """
+    The most input tokens the next request may have under the configured
+    budgets, or None without a limit.
+    """
+    limits = []
+    max_input_tokens = get_llm_max_input_tokens_env()
+    if max_input_tokens:
+        limits.append(max_input_tokens)
+
+    budget = get_presentation_token_budget_env()
+    scope = _CURRENT_SCOPE.get()
+    if budget and scope is not None and scope.presentation_id is not None:
+        limits.append(budget - await scope.get_presentation_tokens())
+    return max(min(limits), 0) if limits else None
+
+
+async def check_token_budget(estimated_input_tokens: int):
+    """Fails before a request whose input would go over a token budget."""
+    max_input_tokens = get_llm_max_input_tokens_env()
+    if max_input_tokens and estimated_input_tokens > max_input_tokens:
+        raise TokenBudgetExceededError(
+            status_code=413,
+            detail=(
+                f"LLM request of about {estimated_input_tokens} tokens exceeds "
+                f"the limit of {max_input_tokens} input tokens"
+            ),
+        )
+
+    budget = get_presentation_token_budget_env()
+    scope = _CURRENT_SCOPE.get()
+    if not budget or scope is None or scope.presentation_id is None:
+        return
+    used_tokens = await scope.get_presentation_tokens()
+    if used_tokens + estimated_input_tokens > budget:
+        raise TokenBudgetExceededError(
+            status_code=429,
+            detail=(
+                f"Presentation has used {used_tokens} of its {budget} token "
+                f"budget, not enough for a request of about "
+                f"{estimated_input_tokens} tokens"
+            ),
+        )
+
+
+async def trim_to_token_budget(
+    text: Optional[str], reserved_tokens: int = 0
+) -> Optional[str]:
+    """
+    Cuts text to the input tokens left under the budgets, after
+    ``reserved_tokens`` for the rest of the request.
+    """
+    available_tokens = await get_available_input_tokens()
+    if not text or available_tokens is None:
+        return text
+    allowed_tokens = max(available_tokens - reserved_tokens, 0)
+    if count_tokens(text) <= allowed_tokens:
+        return text
+    logger.warning(
+        f"Trimmed text of about {count_tokens(text)} tokens to {allowed_tokens} "
+        "tokens to fit the token budget"
+    )
+    return text[: allowed_tokens * CHARACTERS_PER_TOKEN]
+
+
+class TokenUsageRecorder:
+    """
+    Collects the LLM tokens used per presentation and per API key in memory,
+    and adds them to the stored totals every flush_interval, so LLM calls do
+    not commit on every response.
+    """
+
+    def __init__(self, flush_interval: float, session_maker=async_session_maker):
+        self.flush_interval = flush_interval
+        self.session_maker = session_maker
+        self.pending_presentations: Dict[uuid.UUID, Tuple[int, int]] = {}
+        self.pending_api_keys: Dict[uuid.UUID, Tuple[int, int]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.pending_presentations or self.pending_api_keys)
+
+    @staticmethod
+    def _add(
+        pending: Dict[uuid.UUID, Tuple[int, int]],
+        key: uuid.UUID,
+        input_tokens: int,
+        output_tokens: int,
+    ):
+        previous_input, previous_output = pending.get(key, (0, 0))
+        pending[key] = (previous_input + input_tokens, previous_output + output_tokens)
+
+    def record(
+        self,
+        presentation_id: Optional[uuid.UUID],
+        api_key_id: Optional[uuid.UUID],
+        input_tokens: int,
+        output_tokens: int,
+    ):
+        if not (input_tokens or output_tokens):
+            return
+        if presentation_id is not None:
+            self._add(
+                self.pending_presentations, presentation_id, input_tokens, output_tokens
+            )
+        if api_key_id is not None:
+            self._add(self.pending_api_keys, api_key_id, input_tokens, output_tokens)
+        if self.has_pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.run_flusher())
+
+    async def get_presentation_tokens(self, presentation_id: uuid.UUID) -> int:
+        """The stored tokens of a presentation, with the ones not written yet."""
+        async with self.session_maker() as sql_session:
+            stored = await sql_session.scalar(
+                select(
+                    PresentationModel.llm_input_tokens
+                    + PresentationModel.llm_output_tokens
+                ).where(PresentationModel.id == presentation_id)
+            )
+        return (stored or 0) + sum(
+            self.pending_presentations.get(presentation_id, (0, 0))
+        )
+
+    async def flush(self):
+        if not self.has_pending:
+            return
+        presentations, self.pending_presentations = self.pending_presentations, {}
+        api_keys, self.pending_api_keys = self.pending_api_keys, {}
+        try:
+            async with self.session_maker() as sql_session:
+                # Increments, so usage from other workers isn't overwritten
+                for presentation_id, (input_tokens, output_tokens) in (
+                    presentations.items()
+                ):
+                    await sql_session.execute(
+                        update(PresentationModel)
+                        .where(PresentationModel.id == presentation_id)
+                        .values(
+                            llm_input_tokens=PresentationModel.llm_input_tokens
+                            + input_tokens,
+                            llm_output_tokens=PresentationModel.llm_output_tokens
+                            + output_tokens,
+                            # Spending tokens doesn't edit the presentation
+                            updated_at=PresentationModel.updated_at,
+                        )
+                    )
+                for api_key_id, (input_tokens, output_tokens) in api_keys.items():
+                    await sql_session.execute(
+                        update(ApiKeyModel)
+                        .where(ApiKeyModel.id == api_key_id)
+                        .values(
+                            llm_input_tokens=ApiKeyModel.llm_input_tokens
+                            + input_tokens,
+                            llm_output_tokens=ApiKeyModel.llm_output_tokens
+                            + output_tokens,
+                        )
+                    )
+                await sql_session.commit()
+        except BaseException:
+            for key, usage in presentations.items():
+                self._add(self.pending_presentations, key, *usage)
+            for key, usage in api_keys.items():
+                self._add(self.pending_api_keys, key, *usage)
+            raise
+
+    async def run_flusher(self):
+        while self.has_pending:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write LLM token usage")
+
+    async def stop(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        self._flush_task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to write LLM token usage")
+
+
+TOKEN_USAGE_RECORDER = TokenUsageRecorder(
+    flush_interval=get_token_usage_flush_seconds_env() or 5
+)
@@ -0,0 +1,365 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+from utils.custom_logger import setup_logger
+from utils.get_env import (
+    get_trace_export_directory_env,
+    get_trace_export_max_bytes_env,
+    get_trace_export_retention_days_env,
+    get_trace_sample_rate_env,
+    get_trace_trust_upstream_sampling_env,
+)
+from utils.parsers import parse_bool_or_none
+
+logger = setup_logger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+SERVICE_NAME = "presenton-backend"
+DEFAULT_TRACE_EXPORT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_TRACE_EXPORT_RETENTION_DAYS = 7
+
+
+@dataclass
+class Span:
+    """
+    A span in the OpenTelemetry data model. Spans of unsampled traces are
+    kept only to carry the trace context and are never exported.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    sampled: bool = True
+    kind: str = "internal"
+    attributes: Dict[str, object] = field(default_factory=dict)
+    start_time_unix_nano: int = field(default_factory=time.time_ns)
+    end_time_unix_nano: Optional[int] = None
+    status: str = "unset"
+    status_message: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def set_attribute(self, key: str, value: object):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        """The span as an OTLP JSON span, with the attributes as a plain object."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_time_unix_nano,
+            "endTimeUnixNano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": {"code": self.status},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def parse_traceparent(traceparent: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """Returns the trace id, the parent span id and the sampled flag of a W3C traceparent."""
+    if not traceparent:
+        return None
+    parts = traceparent.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    _, trace_id, span_id, flags = parts
+    try:
+        int(trace_id, 16)
+        int(span_id, 16)
+        sampled = bool(int(flags, 16) & 1)
+    except ValueError:
+        return None
+    if trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, sampled
+
+
+class JsonLinesSpanExporter:
+    """
+    Appends finished spans to a JSON lines file per day. Spans are written
+    from a background thread, so exporting never blocks the event loop.
+    A file over ``max_file_bytes`` is rotated to ``.1``, replacing the
+    previous one, and files older than ``retention_days`` are deleted, so
+    the export stays within about two files per retained day.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_file_bytes: int = DEFAULT_TRACE_EXPORT_MAX_BYTES,
+        retention_days: int = DEFAULT_TRACE_EXPORT_RETENTION_DAYS,
+    ):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes
+        self.retention_days = retention_days
+        self._queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pruned_day: Optional[str] = None
+
+    def get_directory(self) -> str:
+        if self.directory is None:
+            from utils.asset_directory_utils import get_traces_directory
+
+            self.directory = get_traces_directory()
+        os.makedirs(self.directory, exist_ok=True)
+        return self.directory
+
+    def get_path(self, day: Optional[datetime] = None) -> str:
+        day = day or datetime.now(timezone.utc)
+        return os.path.join(self.get_directory(), f"spans-{day:%Y-%m-%d}.jsonl")
+
+    def export(self, span: Span):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._run, name="span-exporter", daemon=True
+                    )
+                    self._thread.start()
+        self._queue.put(span.to_dict())
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            # Everything queued meanwhile goes out in the same write
+            while not self._queue.empty():
+                spans.append(self._queue.get())
+
+            stop = None in spans
+            lines = [json.dumps(span, default=str) for span in spans if span is not None]
+            if lines:
+                try:
+                    path = self.get_path()
+                    self._rotate(path)
+                    with open(path, "a", encoding="utf-8") as file:
+                        file.write("\n".join(lines) + "\n")
+                except Exception as e:
+                    logger.warning(f"Failed to export {len(lines)} spans: {e}")
+            if stop:
+                return
+
+    def _rotate(self, path: str):
+        if os.path.exists(path) and os.path.getsize(path) >= self.max_file_bytes:
+            os.replace(path, f"{path}.1")
+
+        # Old days are pruned once per day
+        today = os.path.basename(path)
+        if self._pruned_day == today:
+            return
+        self._pruned_day = today
+        oldest_kept = os.path.basename(
+            self.get_path(
+                datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+            )
+        )
+        for name in os.listdir(self.get_directory()):
+            if name.startswith("spans-") and name[: len(oldest_kept)] < oldest_kept:
+                os.remove(os.path.join(self.get_directory(), name))
+
+    def shutdown(self, timeout: float = 5.0):
+        """Writes the spans queued so far and stops the export thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """
+    Records spans for a sample of traces. The current span lives in a
+    context variable, so tasks created under a span, including
+    ``asyncio.to_thread`` calls and FastAPI background tasks, are part of its
+    trace. Whether a trace is sampled is decided once, at its root span.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        exporter: Optional[JsonLinesSpanExporter] = None,
+        trust_upstream_sampling: bool = False,
+    ):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        # Whether the sampled flag of incoming requests can force sampling
+        self.trust_upstream_sampling = trust_upstream_sampling
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 and self.exporter is not None
+
+    def get_current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def get_traceparent(self) -> Optional[str]:
+        span = _current_span.get()
+        return span.traceparent if span else None
+
+    def inject_headers(self, headers: Optional[dict] = None) -> dict:
+        """Adds the traceparent of the current span to the headers of an outbound request."""
+        headers = {} if headers is None else headers
+        traceparent = self.get_traceparent()
+        if traceparent:
+            headers[TRACEPARENT_HEADER] = traceparent
+        return headers
+
+    def set_attribute(self, key: str, value: object):
+        span = _current_span.get()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, object]] = None,
+        traceparent: Optional[str] = None,
+        kind: str = "internal",
+        activate: bool = True,
+        trust_sampled: bool = True,
+    ) -> Iterator[Optional[Span]]:
+        """
+        Runs the block in a new span, a child of the current span or of
+        ``traceparent``, which continues a trace from another process. The
+        span is the current span in the block unless ``activate`` is false.
+        Unless ``trust_sampled``, the sampled flag of ``traceparent`` is
+        ignored and the trace is sampled at the local rate.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        remote_parent = parse_traceparent(traceparent)
+        if remote_parent is not None:
+            trace_id, parent_span_id, sampled = remote_parent
+            # Trusted upstream sampling decisions are honored, and local roots
+            # can add to them
+            sampled = (trust_sampled and sampled) or random.random() < self.sample_rate
+        elif parent is not None:
+            trace_id, parent_span_id, sampled = (
+                parent.trace_id,
+                parent.span_id,
+                parent.sampled,
+            )
+        else:
+            trace_id = f"{random.getrandbits(128):032x}"
+            parent_span_id = None
+            sampled = random.random() < self.sample_rate
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=f"{random.getrandbits(64):016x}",
+            parent_span_id=parent_span_id,
+            sampled=sampled,
+            kind=kind,
+            attributes=dict(attributes) if sampled and attributes else {},
+        )
+        token = _current_span.set(span) if activate else None
+        try:
+            yield span
+        except Exception as e:
+            span.status = "error"
+            span.status_message = str(e) or type(e).__name__
+            span.set_attribute("exception.type", type(e).__name__)
+            raise
+        finally:
+            if token is not None:
+                _current_span.reset(token)
+            if sampled:
+                span.end_time_unix_nano = time.time_ns()
+                if span.status == "unset":
+                    span.status = "ok"
+                self.exporter.export(span)
+
+    def trace(self, name: str, **attributes):
+        """Runs each call of the decorated function, coroutine or async generator in a span."""
+
+        def decorator(func):
+            if inspect.isasyncgenfunction(func):
+
+                @functools.wraps(func)
+                async def async_gen_wrapper(*args, **kwargs):
+                    # The span is current only while the generator runs, not
+                    # in the code consuming it between items
+                    with self.start_span(name, attributes, activate=False) as span:
+                        generator = func(*args, **kwargs)
+                        try:
+                            while True:
+                                token = _current_span.set(span) if span else None
+                                try:
+                                    item = await generator.__anext__()
+                                except StopAsyncIteration:
+                                    return
+                                finally:
+                                    if token is not None:
+                                        _current_span.reset(token)
+                                yield item
+                        finally:
+                            await generator.aclose()
+
+                return async_gen_wrapper
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.start_span(name, attributes):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.start_span(name, attributes):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+TRACER = Tracer(
+    sample_rate=min(1.0, max(0.0, get_trace_sample_rate_env() or 0.0)),
+    exporter=JsonLinesSpanExporter(
+        get_trace_export_directory_env(),
+        max_file_bytes=get_trace_export_max_bytes_env()
+        or DEFAULT_TRACE_EXPORT_MAX_BYTES,
+        retention_days=get_trace_export_retention_days_env()
+        or DEFAULT_TRACE_EXPORT_RETENTION_DAYS,
+    ),
+    trust_upstream_sampling=parse_bool_or_none(
+        get_trace_trust_upstream_sampling_env()
+    )
+    or False,
+)
@@ -1,55 +1,464 @@
 import asyncio
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+import hashlib
+import hmac
+import json
+import os
+import random
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import uuid
+
 import aiohttp
-from sqlmodel import select
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from enums.webhook_event import WebhookEvent
+from models.sql.webhook_delivery import WebhookDeliveryModel
 from models.sql.webhook_subscription import WebhookSubscription
-from services.database import get_async_session
+from services.database import async_session_maker
+from utils.custom_logger import setup_logger
+from utils.datetime_utils import get_current_utc_datetime
+from utils.get_env import (
+    get_webhook_delivery_concurrency_env,
+    get_webhook_endpoint_concurrency_env,
+    get_webhook_max_attempts_env,
+    get_webhook_timeout_seconds_env,
+)
+
+logger = setup_logger(__name__)
+
+DEFAULT_WEBHOOK_TIMEOUT_SECONDS = 10
+DEFAULT_WEBHOOK_MAX_ATTEMPTS = 8
+DEFAULT_WEBHOOK_DELIVERY_CONCURRENCY = 32
+DEFAULT_WEBHOOK_ENDPOINT_CONCURRENCY = 4
+WEBHOOK_BACKOFF_BASE_SECONDS = 5
+WEBHOOK_BACKOFF_MAX_SECONDS = 3600
+WEBHOOK_DELIVERED_RETENTION = timedelta(days=7)
+# Other client errors will not go away on their own, so they are not retried
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429}
 
 
 class WebhookService:
+    """
+    Outbox of webhook deliveries on top of ``webhook_deliveries``.
+
+    Events are written as one row per subscription and delivered by
+    ``WebhookDeliveryWorker``, which claims due rows with a lease, so
+    deliveries survive restarts and every one is attempted at least once.
+    """
+
+    # SQLite has no row locks, claims from one process are serialized here and
+    # the conditional update below keeps concurrent processes from double claiming
+    _claim_lock = asyncio.Lock()
+
+    @staticmethod
+    def get_timeout_seconds() -> float:
+        return get_webhook_timeout_seconds_env() or DEFAULT_WEBHOOK_TIMEOUT_SECONDS
+
+    @staticmethod
+    def get_max_attempts() -> int:
+        return get_webhook_max_attempts_env() or DEFAULT_WEBHOOK_MAX_ATTEMPTS
+
+    @classmethod
+    def get_lease_seconds(cls) -> float:
+        # Deliveries can wait for a slot of their endpoint before sending
+        return max(60, cls.get_timeout_seconds() * 6)
+
+    @staticmethod
+    def get_retry_delay_seconds(attempts: int) -> float:
+        delay = min(
+            WEBHOOK_BACKOFF_MAX_SECONDS,
+            WEBHOOK_BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0),
+        )
+        # Up to 20% jitter, so retries of one outage are spread out
+        return delay * random.uniform(0.8, 1.0)
+
+    @staticmethod
+    def sign(secret: str, timestamp: int, body: bytes) -> str:
+        signature = hmac.new(
+            secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256
+        ).hexdigest()
+        return f"sha256={signature}"
 
     @classmethod
     async def send_webhook(cls, event: WebhookEvent, data: dict):
-        async for sql_session in get_async_session():
-            webhook_subscriptions = await sql_session.scalars(
-                select(WebhookSubscription).where(
+        """Queues ``data`` for every subscription of ``event``."""
+        try:
+            async with async_session_maker() as sql_session:
+                n_deliveries = await cls.enqueue(sql_session, event, data)
+        except Exception as e:
+            logger.error(f"Failed to queue webhook {event.value}: {e}")
+            return
+
+        if n_deliveries:
+            WEBHOOK_DELIVERY_WORKER.wakeup()
+
+    @staticmethod
+    async def enqueue(sql_session: AsyncSession, event: WebhookEvent, data: dict) -> int:
+        subscription_ids = list(
+            await sql_session.scalars(
+                select(WebhookSubscription.id).where(
                     WebhookSubscription.event == event.value
                 )
             )
-            webhook_subscriptions = list(webhook_subscriptions)
-            if not webhook_subscriptions:
-                return
+        )
+        if not subscription_ids:
+            return 0
 
-            async_tasks = []
-            for webhook_subscription in webhook_subscriptions:
-                async_tasks.append(
-                    cls.send_request_to_webhook(webhook_subscription, data)
+        now = get_current_utc_datetime()
+        sql_session.add_all(
+            [
+                WebhookDeliveryModel(
+                    subscription_id=subscription_id,
+                    event=event.value,
+                    payload=data,
+                    available_at=now,
+                    created_at=now,
                 )
+                for subscription_id in subscription_ids
+            ]
+        )
+        await sql_session.commit()
+        return len(subscription_ids)
 
-            await asyncio.gather(*async_tasks)
+    @staticmethod
+    def _claimable_condition(now):
+        # Claimed rows are due again once their lease runs out, and finished
+        # rows have no due time, so one index on it serves the claim
+        return and_(
+            WebhookDeliveryModel.available_at.is_not(None),
+            WebhookDeliveryModel.available_at <= now,
+        )
 
-            break
+    @classmethod
+    async def claim(
+        cls, sql_session: AsyncSession, worker_id: str, limit: int
+    ) -> List[Tuple[WebhookDeliveryModel, Optional[WebhookSubscription]]]:
+        if sql_session.bind.dialect.name == "postgresql":
+            return await cls._claim(sql_session, worker_id, limit)
+
+        async with cls._claim_lock:
+            return await cls._claim(sql_session, worker_id, limit)
+
+    @classmethod
+    async def _claim(
+        cls, sql_session: AsyncSession, worker_id: str, limit: int
+    ) -> List[Tuple[WebhookDeliveryModel, Optional[WebhookSubscription]]]:
+        Delivery = WebhookDeliveryModel
+        now = get_current_utc_datetime()
+
+        query = (
+            select(Delivery.id)
+            .where(cls._claimable_condition(now))
+            .order_by(Delivery.available_at)
+            .limit(limit)
+        )
+        if sql_session.bind.dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+
+        delivery_ids = list(await sql_session.scalars(query))
+        if not delivery_ids:
+            await sql_session.rollback()
+            return []
+
+        lease_expires_at = now + timedelta(seconds=cls.get_lease_seconds())
+        await sql_session.execute(
+            update(Delivery)
+            .where(Delivery.id.in_(delivery_ids), cls._claimable_condition(now))
+            .values(
+                status="delivering",
+                attempts=Delivery.attempts + 1,
+                available_at=lease_expires_at,
+                lease_owner=worker_id,
+                lease_expires_at=lease_expires_at,
+            )
+        )
+        await sql_session.commit()
+
+        # Rows claimed by another process between the select and the update are left out
+        rows = await sql_session.execute(
+            select(Delivery, WebhookSubscription)
+            .outerjoin(
+                WebhookSubscription,
+                WebhookSubscription.id == Delivery.subscription_id,
+            )
+            .where(
+                Delivery.id.in_(delivery_ids),
+                Delivery.status == "delivering",
+                Delivery.lease_owner == worker_id,
+            )
+            .execution_options(populate_existing=True)
+        )
+        return [(delivery, subscription) for delivery, subscription in rows.all()]
 
     @classmethod
-    async def send_request_to_webhook(
-        cls, subscription: WebhookSubscription, data: dict
+    async def finish(
+        cls,
+        sql_session: AsyncSession,
+        delivery: WebhookDeliveryModel,
+        worker_id: str,
+        status_code: Optional[int] = None,
+        error: Optional[str] = None,
+        retry: bool = False,
+    ) -> str:
+        """Records the result of an attempt and returns the new status of the delivery."""
+        now = get_current_utc_datetime()
+        if error is None:
+            values = {"status": "delivered", "available_at": None, "delivered_at": now}
+        elif retry and delivery.attempts < cls.get_max_attempts():
+            values = {
+                "status": "pending",
+                "available_at": now
+                + timedelta(seconds=cls.get_retry_delay_seconds(delivery.attempts)),
+            }
+        else:
+            values = {"status": "failed", "available_at": None}
+
+        await sql_session.execute(
+            update(WebhookDeliveryModel)
+            .where(
+                WebhookDeliveryModel.id == delivery.id,
+                WebhookDeliveryModel.lease_owner == worker_id,
+            )
+            .values(
+                **values,
+                lease_owner=None,
+                lease_expires_at=None,
+                last_status_code=status_code,
+                last_error=error,
+            )
+        )
+        await sql_session.commit()
+        return values["status"]
+
+    @staticmethod
+    async def purge_delivered(sql_session: AsyncSession) -> int:
+        result = await sql_session.execute(
+            delete(WebhookDeliveryModel).where(
+                WebhookDeliveryModel.status == "delivered",
+                WebhookDeliveryModel.created_at
+                < get_current_utc_datetime() - WEBHOOK_DELIVERED_RETENTION,
+            )
+        )
+        await sql_session.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def get_backlog(sql_session: AsyncSession) -> Dict[str, int]:
+        rows = await sql_session.execute(
+            select(WebhookDeliveryModel.status, func.count()).group_by(
+                WebhookDeliveryModel.status
+            )
+        )
+        return {status: count for status, count in rows.all()}
+
+
+@dataclass
+class WebhookDeliveryMetrics:
+    delivered: int = 0
+    retried: int = 0
+    failed: int = 0
+    in_flight: int = 0
+    latency_seconds_total: float = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class WebhookDeliveryWorker:
+    """
+    Claims due webhook deliveries and sends them, with at most
+    ``concurrency`` deliveries in flight and ``endpoint_concurrency`` per
+    receiving host, so a slow receiver can not hold every slot.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        endpoint_concurrency: Optional[int] = None,
+        poll_interval: float = 5.0,
+        worker_id: Optional[str] = None,
+        session_maker=async_session_maker,
     ):
+        self.concurrency = max(
+            1,
+            concurrency
+            or get_webhook_delivery_concurrency_env()
+            or DEFAULT_WEBHOOK_DELIVERY_CONCURRENCY,
+        )
+        self.endpoint_concurrency = max(
+            1,
+            endpoint_concurrency
+            or get_webhook_endpoint_concurrency_env()
+            or DEFAULT_WEBHOOK_ENDPOINT_CONCURRENCY,
+        )
+        self.poll_interval = poll_interval
+        self.worker_id = (
+            worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        )
+        self.session_maker = session_maker
+        self.metrics = WebhookDeliveryMetrics()
+        self._deliveries: Dict[uuid.UUID, asyncio.Task] = {}
+        self._endpoint_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self.run())
+
+    def wakeup(self):
+        self._wakeup.set()
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def run(self):
+        logger.info(
+            f"Webhook delivery worker {self.worker_id} started with concurrency {self.concurrency}"
+        )
+        self._http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=WebhookService.get_timeout_seconds())
+        )
+        purged_at = 0.0
+        loop = asyncio.get_running_loop()
+
+        try:
+            while not self._stopping:
+                self._wakeup.clear()
+                try:
+                    if loop.time() - purged_at > 3600:
+                        async with self.session_maker() as sql_session:
+                            await WebhookService.purge_delivered(sql_session)
+                        purged_at = loop.time()
+
+                    await self.claim_and_deliver()
+                except Exception as e:
+                    logger.error(f"Error polling webhook deliveries: {e}")
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            # Deliveries in flight end within the request timeout
+            if self._deliveries:
+                await asyncio.gather(
+                    *self._deliveries.values(), return_exceptions=True
+                )
+        finally:
+            await self._http_session.close()
+            self._http_session = None
+            logger.info(f"Webhook delivery worker {self.worker_id} stopped")
+
+    async def claim_and_deliver(self) -> int:
+        free_slots = self.concurrency - len(self._deliveries)
+        if free_slots <= 0:
+            return 0
 
+        async with self.session_maker() as sql_session:
+            claimed = await WebhookService.claim(sql_session, self.worker_id, free_slots)
+        for delivery, subscription in claimed:
+            self._deliveries[delivery.id] = asyncio.create_task(
+                self._deliver(delivery, subscription)
+            )
+        return len(claimed)
+
+    def _get_endpoint_semaphore(self, url: str) -> asyncio.Semaphore:
+        endpoint = urlsplit(url).netloc
+        semaphore = self._endpoint_semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.endpoint_concurrency)
+            self._endpoint_semaphores[endpoint] = semaphore
+        return semaphore
+
+    async def _send(
+        self, delivery: WebhookDeliveryModel, subscription: WebhookSubscription
+    ) -> Tuple[Optional[int], Optional[str], bool]:
+        """Returns the status code, the error if the attempt failed and whether to retry."""
+        body = json.dumps(delivery.payload).encode("utf-8")
+        timestamp = int(time.time())
         headers = {
             "Content-Type": "application/json",
+            "X-Webhook-Id": str(delivery.id),
+            "X-Webhook-Event": delivery.event,
+            "X-Webhook-Timestamp": str(timestamp),
         }
         if subscription.secret:
-            headers["Authorization"] = f"Bearer {subscription.secret}"
+            if subscription.send_secret_as_bearer:
+                headers["Authorization"] = f"Bearer {subscription.secret}"
+            headers["X-Webhook-Signature"] = WebhookService.sign(
+                subscription.secret, timestamp, body
+            )
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    subscription.url,
-                    json=data,
-                    headers=headers,
-                ) as _:
-                    pass
+            async with self._get_endpoint_semaphore(subscription.url):
+                async with self._http_session.post(
+                    subscription.url, data=body, headers=headers
+                ) as response:
+                    if response.status < 300:
+                        return response.status, None, False
+                    return (
+                        response.status,
+                        f"Receiver responded with {response.status}",
+                        response.status >= 500
+                        or response.status in RETRYABLE_STATUS_CODES,
+                    )
+        except asyncio.TimeoutError:
+            return None, "Request timed out", True
+        except aiohttp.ClientError as e:
+            return None, f"{type(e).__name__}: {e}", True
+
+    async def _deliver(
+        self,
+        delivery: WebhookDeliveryModel,
+        subscription: Optional[WebhookSubscription],
+    ):
+        self.metrics.in_flight += 1
+        started_at = time.perf_counter()
+        try:
+            if subscription is None:
+                status_code, error, retry = None, "Subscription was removed", False
+            else:
+                status_code, error, retry = await self._send(delivery, subscription)
+            self.metrics.latency_seconds_total += time.perf_counter() - started_at
 
+            async with self.session_maker() as sql_session:
+                status = await WebhookService.finish(
+                    sql_session,
+                    delivery,
+                    self.worker_id,
+                    status_code=status_code,
+                    error=error,
+                    retry=retry,
+                )
+            if status == "delivered":
+                self.metrics.delivered += 1
+            elif status == "pending":
+                self.metrics.retried += 1
+            else:
+                self.metrics.failed += 1
+                logger.warning(
+                    f"Webhook delivery {delivery.id} failed after {delivery.attempts} attempts: {error}"
+                )
         except Exception as e:
-            print(f"Error sending request to webhook {subscription.id}: {e}")
-            pass
+            # The lease runs out and another attempt picks the delivery up
+            logger.error(f"Error delivering webhook {delivery.id}: {e}")
+        finally:
+            self.metrics.in_flight -= 1
+            self._deliveries.pop(delivery.id, None)
+            self._wakeup.set()
+
+
+WEBHOOK_DELIVERY_WORKER = WebhookDeliveryWorker()
@@ -0,0 +1,109 @@
+import functools
+import inspect
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from services.event_loop_stall_monitor import EventLoopStallMonitor
+
+
+def _get_stall_threshold():
+    # Set EVENT_LOOP_STALL_FAIL_MS to fail async tests that block the loop
+    value = os.getenv("EVENT_LOOP_STALL_FAIL_MS")
+    return float(value) / 1000 if value else None
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "allow_event_loop_stall: the test blocks the event loop on purpose",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    threshold = _get_stall_threshold()
+    test_function = getattr(item, "obj", None)
+    if (
+        not threshold
+        or item.get_closest_marker("asyncio") is None
+        or item.get_closest_marker("allow_event_loop_stall") is not None
+        or not inspect.iscoroutinefunction(test_function)
+    ):
+        return (yield)
+
+    monitor = EventLoopStallMonitor(threshold=threshold)
+
+    @functools.wraps(test_function)
+    async def watched_test_function(*args, **kwargs):
+        monitor.start()
+        try:
+            return await test_function(*args, **kwargs)
+        finally:
+            monitor.stop()
+
+    item.obj = watched_test_function
+    try:
+        result = yield
+    finally:
+        item.obj = test_function
+
+    if monitor.samples:
+        stall = monitor.samples[0]
+        pytest.fail(
+            f"Event loop blocked {monitor.stalls} time(s), for "
+            f"{stall.duration_seconds * 1000:.0f} ms at {stall.location}\n"
+            + "\n".join(stall.stack),
+            pytrace=False,
+        )
+    return result
+
+
+@pytest.fixture
+def database_url(request, tmp_path):
+    """
+    URL of a test database holding the ``TABLES`` of the test module, a fresh
+    SQLite file by default. Parametrize it indirectly with ``"postgres"`` to
+    run on the database at TEST_POSTGRES_URL instead.
+    """
+    if getattr(request, "param", "sqlite") == "postgres":
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+    else:
+        url = f"sqlite:///{tmp_path / 'test.db'}"
+
+    tables = request.module.TABLES
+    engine = create_engine(url)
+    # A shared database can hold tables left over by an interrupted run
+    SQLModel.metadata.drop_all(engine, tables=tables)
+    SQLModel.metadata.create_all(engine, tables=tables)
+    try:
+        yield url
+    finally:
+        SQLModel.metadata.drop_all(engine, tables=tables)
+        engine.dispose()
+
+
+@pytest.fixture
+def async_database_url(database_url):
+    return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1).replace(
+        "postgresql://", "postgresql+asyncpg://", 1
+    )
+
+
+@pytest_asyncio.fixture
+async def session_maker(async_database_url):
+    """
+    Session maker on the test database. Its ``engine`` has not connected yet,
+    so tests can still add connect listeners.
+    """
+    engine = create_async_engine(async_database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    session_maker.engine = engine
+    yield session_maker
+    await engine.dispose()
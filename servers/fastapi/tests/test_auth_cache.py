@@ -0,0 +1,140 @@
+from datetime import timedelta
+import threading
+
+import pytest
+from sqlalchemy import event
+
+from enums.user_role import UserRole
+from models.sql.api_key import ApiKeyModel
+from models.sql.user import UserModel
+from services import auth_service
+from services.auth_cache_service import ApiKeyUsageRecorder, PrincipalCache
+from utils.datetime_utils import get_current_utc_datetime
+
+TABLES = [UserModel.__table__, ApiKeyModel.__table__]
+
+
+@pytest.fixture
+def session_maker(session_maker, monkeypatch):
+    monkeypatch.setenv("JWT_SECRET", "test-secret-" + "x" * 32)
+    monkeypatch.setattr(auth_service, "PRINCIPAL_CACHE", PrincipalCache(ttl=30))
+    monkeypatch.setattr(
+        auth_service,
+        "API_KEY_USAGE_RECORDER",
+        ApiKeyUsageRecorder(flush_interval=60, session_maker=session_maker),
+    )
+
+    session_maker.statements = []
+    event.listen(
+        session_maker.engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: session_maker.statements.append(
+            statement.split(" ")[0].upper()
+        ),
+    )
+    return session_maker
+
+
+async def create_user_and_key(session_maker):
+    async with session_maker() as sql_session:
+        user = await auth_service.create_user(
+            sql_session, "editor", "password", UserRole.editor
+        )
+        raw_key, api_key = await auth_service.create_api_key(sql_session, user.id)
+    session_maker.statements.clear()
+    return user, raw_key, api_key
+
+
+class TestApiKeyFastPath:
+    @pytest.mark.asyncio
+    async def test_cached_api_key_skips_database(self, session_maker):
+        user, raw_key, api_key = await create_user_and_key(session_maker)
+
+        for _ in range(3):
+            async with session_maker() as sql_session:
+                authenticated = await auth_service.get_user_by_api_key(
+                    sql_session, raw_key
+                )
+            assert authenticated.id == user.id
+
+        # Only the first request looks up the key and user, none of them write
+        assert session_maker.statements == ["SELECT", "SELECT"]
+
+        await auth_service.API_KEY_USAGE_RECORDER.stop()
+        assert session_maker.statements[2:] == ["UPDATE"]
+        async with session_maker() as sql_session:
+            stored_key = await sql_session.get(ApiKeyModel, api_key.id)
+        assert stored_key.last_used_at is not None
+
+    @pytest.mark.asyncio
+    async def test_revoked_api_key_is_invalidated(self, session_maker):
+        _, raw_key, api_key = await create_user_and_key(session_maker)
+        async with session_maker() as sql_session:
+            assert await auth_service.get_user_by_api_key(sql_session, raw_key)
+
+            stored_key = await sql_session.get(ApiKeyModel, api_key.id)
+            stored_key.is_active = False
+            await sql_session.commit()
+            auth_service.PRINCIPAL_CACHE.invalidate_api_key(api_key.id)
+
+            assert await auth_service.get_user_by_api_key(sql_session, raw_key) is None
+        await auth_service.API_KEY_USAGE_RECORDER.stop()
+
+
+class TestAccessTokenFastPath:
+    @pytest.mark.asyncio
+    async def test_cached_token_skips_database(self, session_maker):
+        user, _, _ = await create_user_and_key(session_maker)
+        token, _ = auth_service.create_access_token(user)
+
+        for _ in range(3):
+            async with session_maker() as sql_session:
+                authenticated = await auth_service.get_user_by_access_token(
+                    sql_session, token
+                )
+            assert authenticated.id == user.id
+        assert session_maker.statements == ["SELECT"]
+
+        auth_service.PRINCIPAL_CACHE.invalidate_user(user.id)
+        async with session_maker() as sql_session:
+            await auth_service.get_user_by_access_token(sql_session, token)
+        assert session_maker.statements == ["SELECT", "SELECT"]
+
+    def test_entry_never_outlives_token(self):
+        principal_cache = PrincipalCache(ttl=30)
+        user = UserModel(username="viewer", password_hash="")
+
+        principal_cache.set(
+            "expired", user, expires_at=get_current_utc_datetime() - timedelta(seconds=1)
+        )
+        principal_cache.set(
+            "valid", user, expires_at=get_current_utc_datetime() + timedelta(hours=1)
+        )
+
+        assert principal_cache.get("expired") is None
+        assert principal_cache.get("valid").user is user
+
+
+class TestPasswordHashing:
+    @pytest.mark.asyncio
+    async def test_password_is_verified_off_the_event_loop(
+        self, session_maker, monkeypatch
+    ):
+        await create_user_and_key(session_maker)
+        threads = []
+        verify_password = auth_service.verify_password
+
+        def record_thread(password, stored_hash):
+            threads.append(threading.current_thread())
+            return verify_password(password, stored_hash)
+
+        monkeypatch.setattr(auth_service, "verify_password", record_thread)
+        async with session_maker() as sql_session:
+            assert await auth_service.authenticate_user(
+                sql_session, "editor", "password"
+            )
+            assert not await auth_service.authenticate_user(
+                sql_session, "editor", "wrong"
+            )
+
+        assert threading.main_thread() not in threads
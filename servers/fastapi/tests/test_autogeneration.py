@@ -3,16 +3,24 @@ from unittest.mock import patch, AsyncMock, MagicMock
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI, BackgroundTasks
+from api.deps import get_current_user_or_api_key
 from api.v1.ppt.endpoints.autogenerate import AUTOGENERATE_ROUTER
 from models.presentation_layout import PresentationLayoutModel
 from models.presentation_structure_model import PresentationStructureModel
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
 from models.sql.presentation import PresentationModel
+from models.sql.user import UserModel
 import uuid
 
+USER = UserModel(username="editor", password_hash="", role="editor")
+
 @pytest.fixture
 def app():
     app = FastAPI()
     app.include_router(AUTOGENERATE_ROUTER, prefix="/api/v1/ppt")
+    app.dependency_overrides[get_current_user_or_api_key] = lambda: USER
     return app
 
 @pytest.fixture
@@ -26,6 +34,7 @@ def mock_presentation_service():
         mock.generate_outlines = AsyncMock()
         mock.prepare_structure = AsyncMock()
         mock.run_full_generation_pipeline = AsyncMock()
+        mock.run_pipelined_generation_pipeline = AsyncMock()
         yield mock
 
 @pytest.fixture
@@ -43,7 +52,17 @@ def mock_get_layout_by_name():
 def mock_db_session():
     with patch("api.v1.ppt.endpoints.autogenerate.get_async_session") as mock:
         session = AsyncMock()
-        mock.return_value = session
+        session.add = MagicMock()
+        status = AsyncPresentationGenerationTaskModel(status="pending")
+        presentation = PresentationModel(content="Test Content", n_slides=5)
+        session.get.side_effect = lambda model, _: (
+            status if model is AsyncPresentationGenerationTaskModel else presentation
+        )
+
+        async def session_generator():
+            yield session
+
+        mock.side_effect = session_generator
         yield session
 
 class TestAutogenerationAPI:
@@ -77,6 +96,98 @@ class TestAutogenerationAPI:
         # We cannot easily verify background tasks execution in TestClient without more setup,
         # but we verified the endpoint returned 200 and called the first service method.
 
+    def test_autogenerate_pipelined(
+        self, client, mock_presentation_service, mock_db_session, mock_get_layout_by_name
+    ):
+        presentation_id = uuid.uuid4()
+        mock_presentation_service.create_presentation.return_value = PresentationModel(
+            id=presentation_id, content="Test Content", n_slides=5
+        )
+
+        response = client.post(
+            "/api/v1/ppt/presentation/generate",
+            json={
+                "content": "Generate a presentation about testing",
+                "n_slides": 5,
+                "language": "English",
+                "template": "general",
+                "pipelined": True,
+            }
+        )
+
+        assert response.status_code == 200
+        mock_presentation_service.run_pipelined_generation_pipeline.assert_called_once()
+        mock_presentation_service.generate_outlines.assert_not_called()
+        mock_presentation_service.prepare_structure.assert_not_called()
+
+    def test_autogenerate_resumes_from_saved_structure(
+        self, client, mock_presentation_service, mock_db_session, mock_get_layout_by_name
+    ):
+        presentation_id = uuid.uuid4()
+        mock_presentation_service.create_presentation.return_value = PresentationModel(
+            id=presentation_id, content="Test Content", n_slides=5
+        )
+        # A retried queue task finds outlines and structure already saved
+        mock_db_session.get.side_effect = lambda model, _: (
+            AsyncPresentationGenerationTaskModel(status="processing")
+            if model is AsyncPresentationGenerationTaskModel
+            else PresentationModel(
+                content="Test Content",
+                n_slides=5,
+                outlines={"slides": []},
+                structure={"slides": []},
+            )
+        )
+
+        response = client.post(
+            "/api/v1/ppt/presentation/generate",
+            json={
+                "content": "Generate a presentation about testing",
+                "n_slides": 5,
+                "template": "general",
+            }
+        )
+
+        assert response.status_code == 200
+        mock_presentation_service.generate_outlines.assert_not_called()
+        mock_presentation_service.prepare_structure.assert_not_called()
+        mock_presentation_service.run_full_generation_pipeline.assert_called_once()
+
+    def test_autogenerate_queued(
+        self, client, mock_presentation_service, mock_db_session, mock_get_layout_by_name
+    ):
+        presentation_id = uuid.uuid4()
+        mock_presentation_service.create_presentation.return_value = PresentationModel(
+            id=presentation_id, content="Test Content", n_slides=5
+        )
+
+        with patch(
+            "api.v1.ppt.endpoints.autogenerate.get_generation_queue_env",
+            return_value="true",
+        ), patch(
+            "api.v1.ppt.endpoints.autogenerate.GenerationQueueService"
+        ) as mock_queue:
+            mock_queue.enqueue = AsyncMock()
+            response = client.post(
+                "/api/v1/ppt/presentation/generate",
+                json={
+                    "content": "Generate a presentation about testing",
+                    "n_slides": 5,
+                    "template": "general",
+                },
+                headers={"Authorization": "Bearer secret-token"},
+            )
+
+        assert response.status_code == 200
+        mock_queue.enqueue.assert_called_once()
+        payload = mock_queue.enqueue.call_args.args[2]
+        assert payload["request"]["content"] == "Generate a presentation about testing"
+        # The worker signs its own token for the user, no credentials are stored
+        assert payload["user_id"] == str(USER.id)
+        assert "secret-token" not in str(payload)
+        # Queued tasks are left to the generation workers
+        mock_presentation_service.generate_outlines.assert_not_called()
+
     def test_autogenerate_invalid_input(self, client):
         response = client.post(
             "/api/v1/ppt/presentation/generate",
@@ -97,3 +208,32 @@ class TestAutogenerationAPI:
         # we treat the main happy path test as sufficient for the *wiring*,
         # and rely on PresentationService tests (if we wrote them) for the *logic*.
         pass
+
+    @pytest.mark.asyncio
+    async def test_failure_is_recorded_and_raised_for_retry(
+        self, mock_presentation_service, mock_db_session, mock_get_layout_by_name
+    ):
+        from api.v1.ppt.endpoints.autogenerate import run_autogeneration
+        from models.generate_presentation_request import GeneratePresentationRequest
+
+        mock_presentation_service.generate_outlines.side_effect = RuntimeError(
+            "LLM unavailable"
+        )
+        status = AsyncPresentationGenerationTaskModel(status="pending")
+        mock_db_session.get.side_effect = lambda model, _: (
+            status
+            if model is AsyncPresentationGenerationTaskModel
+            else PresentationModel(content="Test Content", n_slides=5)
+        )
+        request = GeneratePresentationRequest(content="Test Content", n_slides=5)
+
+        with pytest.raises(RuntimeError):
+            await run_autogeneration(uuid.uuid4(), request)
+
+        assert status.status == "error"
+        assert status.message == "LLM unavailable"
+
+        # The in-process background path only records the failure
+        status.status = "pending"
+        await run_autogeneration(uuid.uuid4(), request, reraise=False)
+        assert status.status == "error"
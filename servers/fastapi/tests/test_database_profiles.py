@@ -0,0 +1,137 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from models.sql.key_value import KeyValueSqlModel
+from services.sqlite_write_queue import SQLiteSingleWriterSession, SQLiteWriteQueue
+from utils.db_utils import apply_sqlite_pragmas, get_engine_options
+
+WRITERS = 16
+COMMITS_PER_WRITER = 10
+TABLES = [KeyValueSqlModel.__table__]
+
+
+@pytest.fixture
+def sqlite_engine(session_maker, monkeypatch):
+    monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "2000")
+    apply_sqlite_pragmas(session_maker.engine)
+    return session_maker.engine
+
+
+async def run_writers(session_maker):
+    """
+    Every writer reads before writing in the same transaction, the pattern
+    that makes concurrent SQLite writers fail instead of waiting.
+    """
+
+    async def writer(index: int):
+        for commit in range(COMMITS_PER_WRITER):
+            async with session_maker() as sql_session:
+                await sql_session.scalar(select(func.count(KeyValueSqlModel.id)))
+                sql_session.add(
+                    KeyValueSqlModel(key=f"{index}-{commit}", value={"i": commit})
+                )
+                await sql_session.commit()
+
+    await asyncio.gather(*[writer(index) for index in range(WRITERS)])
+
+
+class TestSQLiteProfile:
+    @pytest.mark.asyncio
+    async def test_pragmas_are_applied(self, sqlite_engine):
+        async with sqlite_engine.connect() as conn:
+            assert (await conn.scalar(text("PRAGMA journal_mode"))) == "wal"
+            # NORMAL
+            assert (await conn.scalar(text("PRAGMA synchronous"))) == 1
+            assert (await conn.scalar(text("PRAGMA busy_timeout"))) == 2000
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_all_commit_with_write_queue(
+        self, sqlite_engine, monkeypatch
+    ):
+        monkeypatch.setattr(
+            SQLiteSingleWriterSession, "write_queue", SQLiteWriteQueue(timeout=5)
+        )
+        session_maker = async_sessionmaker(
+            sqlite_engine, expire_on_commit=False, class_=SQLiteSingleWriterSession
+        )
+
+        await run_writers(session_maker)
+        rows = WRITERS * COMMITS_PER_WRITER
+
+        async with session_maker() as sql_session:
+            count = await sql_session.scalar(select(func.count(KeyValueSqlModel.id)))
+        assert count == rows
+
+    @pytest.mark.asyncio
+    async def test_write_queue_is_released_on_rollback(self, sqlite_engine, monkeypatch):
+        write_queue = SQLiteWriteQueue(timeout=0.5)
+        monkeypatch.setattr(SQLiteSingleWriterSession, "write_queue", write_queue)
+        session_maker = async_sessionmaker(
+            sqlite_engine, expire_on_commit=False, class_=SQLiteSingleWriterSession
+        )
+
+        async with session_maker() as sql_session:
+            sql_session.add(KeyValueSqlModel(key="rolled-back", value={}))
+            await sql_session.flush()
+            assert sql_session._holds_write_lock
+            await sql_session.rollback()
+            assert not sql_session._holds_write_lock
+
+        # Read-only sessions never take the queue
+        async with session_maker() as sql_session:
+            await sql_session.execute(select(KeyValueSqlModel))
+            assert not sql_session._holds_write_lock
+
+        async with session_maker() as sql_session:
+            sql_session.add(KeyValueSqlModel(key="committed", value={}))
+            await sql_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_write_queue_is_released_when_the_first_write_fails(
+        self, sqlite_engine, monkeypatch
+    ):
+        write_queue = SQLiteWriteQueue(timeout=0.5)
+        monkeypatch.setattr(SQLiteSingleWriterSession, "write_queue", write_queue)
+        session_maker = async_sessionmaker(
+            sqlite_engine, expire_on_commit=False, class_=SQLiteSingleWriterSession
+        )
+        existing_id = uuid.uuid4()
+        async with session_maker() as sql_session:
+            sql_session.add(KeyValueSqlModel(id=existing_id, key="existing", value={}))
+            await sql_session.commit()
+
+        async with session_maker() as failed_session:
+            with pytest.raises(IntegrityError):
+                await failed_session.execute(
+                    insert(KeyValueSqlModel).values(id=existing_id, key="duplicate", value={})
+                )
+            assert not failed_session._holds_write_lock
+            # SQLite keeps its own lock until the failed transaction ends
+            await failed_session.rollback()
+
+            # A failure handler on the same task writes before the session closes
+            async with session_maker() as sql_session:
+                sql_session.add(KeyValueSqlModel(key="failure-handler", value={}))
+                await sql_session.commit()
+
+
+class TestPostgresProfile:
+    def test_pool_options_from_env(self, monkeypatch):
+        monkeypatch.setenv("DATABASE_POOL_SIZE", "5")
+        monkeypatch.setenv("DATABASE_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("DATABASE_POOL_PRE_PING", "false")
+
+        options = get_engine_options("postgresql+asyncpg://localhost/presenton")
+
+        assert options["pool_size"] == 5
+        assert options["max_overflow"] == 0
+        assert options["pool_pre_ping"] is False
+        assert options["pool_recycle"] == 1800
+
+    def test_sqlite_keeps_default_pool(self):
+        assert get_engine_options("sqlite+aiosqlite:///presenton.db") == {}
@@ -0,0 +1,49 @@
+import asyncio
+import time
+
+import pytest
+
+from services.event_loop_stall_monitor import EventLoopStallMonitor
+from services.metrics_service import EVENT_LOOP_STALLS
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+@pytest.mark.allow_event_loop_stall
+async def test_blocking_call_is_reported_with_its_stack():
+    monitor = EventLoopStallMonitor(threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    block_the_loop(0.2)
+    await asyncio.sleep(0.05)
+    monitor.stop()
+
+    assert monitor.stalls == 1
+    stall = monitor.samples[0]
+    assert stall.duration_seconds >= 0.15
+    assert stall.location.startswith("tests/test_event_loop_stall_monitor.py:")
+    assert stall.location.endswith("in block_the_loop")
+    assert "test_blocking_call_is_reported_with_its_stack" in "\n".join(stall.stack)
+    assert EVENT_LOOP_STALLS.get(location=stall.location) >= 1
+    assert monitor.get_samples()[0]["location"] == stall.location
+
+
+@pytest.mark.asyncio
+async def test_awaiting_does_not_stall_the_loop():
+    monitor = EventLoopStallMonitor(threshold=0.05)
+    monitor.start()
+    for _ in range(10):
+        await asyncio.sleep(0.02)
+    monitor.stop()
+    assert monitor.stalls == 0
+
+
+@pytest.mark.asyncio
+async def test_monitor_is_disabled_without_a_threshold():
+    monitor = EventLoopStallMonitor()
+    monitor.start()
+    assert not monitor.enabled
+    assert monitor._thread is None
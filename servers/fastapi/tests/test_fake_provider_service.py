@@ -0,0 +1,96 @@
+import json
+import os
+import random
+from typing import List, Literal, Optional
+from unittest.mock import patch
+
+from pydantic import BaseModel, Field
+import pytest
+
+from enums.llm_provider import LLMProvider
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from services import llm_client as llm_client_module
+from services.fake_provider_service import (
+    FakeImageGenerator,
+    FakeLLMClient,
+    FakeProviderError,
+    get_fake_value_for_schema,
+)
+from services.llm_client import LLMClient
+from services.metrics_service import LLM_TOKENS
+from utils.get_dynamic_models import get_presentation_outline_model_with_n_slides
+
+MESSAGES = [
+    LLMSystemMessage(content="You are a helpful assistant"),
+    LLMUserMessage(content="Write a deck about quarterly growth"),
+]
+
+
+class Chart(BaseModel):
+    kind: Literal["bar", "line", "pie"]
+    values: List[float] = Field(min_length=2, max_length=4)
+
+
+class SlideContent(BaseModel):
+    title: str = Field(min_length=10, max_length=40)
+    bullets: List[str] = Field(min_length=3, max_length=3)
+    chart: Optional[Chart] = None
+    emphasis: int = Field(ge=1, le=3)
+    opacity: float = Field(gt=0, lt=1)
+
+
+class TestFakeValueForSchema:
+    @pytest.mark.parametrize("seed", range(20))
+    def test_values_validate_against_the_schema(self, seed):
+        rng = random.Random(seed)
+        content = get_fake_value_for_schema(SlideContent.model_json_schema(), rng)
+        slide = SlideContent.model_validate(content)
+        assert slide.chart is not None
+
+        outline_model = get_presentation_outline_model_with_n_slides(5)
+        outline = outline_model.model_validate(
+            get_fake_value_for_schema(outline_model.model_json_schema(), rng)
+        )
+        assert len(outline.slides) == 5
+
+
+class TestFakeLLMClient:
+    @pytest.mark.asyncio
+    async def test_llm_client_streams_structured_content_and_records_usage(self):
+        with patch.object(
+            llm_client_module, "get_llm_provider", return_value=LLMProvider.FAKE
+        ):
+            client = LLMClient()
+        client._client = FakeLLMClient(latency=0, tokens_per_second=1e6)
+        schema = SlideContent.model_json_schema()
+        output_before = LLM_TOKENS.get(provider="fake", model="fake", type="output")
+
+        chunks = [
+            chunk
+            async for chunk in client.stream_structured("fake", MESSAGES, schema)
+        ]
+
+        assert len(chunks) > 1
+        SlideContent.model_validate(json.loads("".join(chunks)))
+        assert LLM_TOKENS.get(
+            provider="fake", model="fake", type="output"
+        ) - output_before == sum((len(chunk) + 3) // 4 for chunk in chunks)
+
+    @pytest.mark.asyncio
+    async def test_failures_are_injected(self):
+        client = FakeLLMClient(latency=0, failure_rate=1.0)
+        with pytest.raises(FakeProviderError):
+            await client.generate()
+
+        client = FakeLLMClient(latency=0, tokens_per_second=1e6, failure_rate=0.0)
+        assert await client.generate(max_tokens=10)
+
+
+@pytest.mark.asyncio
+async def test_fake_image_generator_writes_an_image(tmp_path):
+    image_path = await FakeImageGenerator(latency=0).generate(str(tmp_path))
+    assert os.path.dirname(image_path) == str(tmp_path)
+    assert os.path.getsize(image_path) > 0
+
+    with pytest.raises(FakeProviderError):
+        await FakeImageGenerator(latency=0, failure_rate=1.0).generate(str(tmp_path))
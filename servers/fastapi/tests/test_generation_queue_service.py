@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.sql.async_presentation_generation_status import (
+    AsyncPresentationGenerationTaskModel,
+)
+from services.generation_queue_service import GenerationQueueService
+from utils.datetime_utils import get_current_utc_datetime
+
+TABLES = [AsyncPresentationGenerationTaskModel.__table__]
+
+pytestmark = pytest.mark.parametrize(
+    "database_url", ["sqlite", "postgres"], indirect=True
+)
+
+
+@pytest.fixture
+def session_maker(session_maker, monkeypatch):
+    # Claim with SKIP LOCKED on Postgres, like the app does with its engine
+    is_postgres = session_maker.engine.dialect.name == "postgresql"
+    monkeypatch.setattr(
+        GenerationQueueService, "supports_skip_locked", staticmethod(lambda: is_postgres)
+    )
+    return session_maker
+
+
+async def enqueue_task(session_maker) -> AsyncPresentationGenerationTaskModel:
+    async with session_maker() as sql_session:
+        # Naive like the column, Postgres rejects timezone aware values for it
+        now = datetime.now()
+        task = AsyncPresentationGenerationTaskModel(
+            status="pending", created_at=now, updated_at=now
+        )
+        await GenerationQueueService.enqueue(
+            sql_session, task, {"request": {"content": "Queued"}}
+        )
+        return task
+
+
+async def expire_lease(session_maker, task_id):
+    async with session_maker() as sql_session:
+        task = await sql_session.get(AsyncPresentationGenerationTaskModel, task_id)
+        task.lease_expires_at = get_current_utc_datetime() - timedelta(seconds=1)
+        await sql_session.commit()
+
+
+class TestGenerationQueueService:
+    @pytest.mark.asyncio
+    async def test_task_is_claimed_once(self, session_maker):
+        queued = await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            task = await GenerationQueueService.claim(sql_session, "worker-a")
+            assert task.id == queued.id
+            assert task.status == "processing"
+            assert task.attempts == 1
+            assert task.payload == {"request": {"content": "Queued"}}
+
+            assert await GenerationQueueService.claim(sql_session, "worker-b") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, session_maker):
+        queued = await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            await GenerationQueueService.claim(sql_session, "worker-a")
+        await expire_lease(session_maker, queued.id)
+
+        async with session_maker() as sql_session:
+            task = await GenerationQueueService.claim(sql_session, "worker-b")
+            assert task.lease_owner == "worker-b"
+            assert task.attempts == 2
+
+            # The crashed worker can no longer extend or finish the task
+            assert not await GenerationQueueService.heartbeat(
+                sql_session, queued.id, "worker-a"
+            )
+            assert await GenerationQueueService.heartbeat(
+                sql_session, queued.id, "worker-b"
+            )
+
+    @pytest.mark.asyncio
+    async def test_finish_clears_payload_and_lease(self, session_maker):
+        queued = await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            await GenerationQueueService.claim(sql_session, "worker-a")
+            await GenerationQueueService.finish(sql_session, queued.id, "worker-a")
+            task = await sql_session.get(
+                AsyncPresentationGenerationTaskModel, queued.id, populate_existing=True
+            )
+            assert task.payload is None
+            assert task.lease_owner is None
+            assert task.available_at is None
+
+    @pytest.mark.asyncio
+    async def test_release_requeues_without_spending_attempt(self, session_maker):
+        queued = await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            await GenerationQueueService.claim(sql_session, "worker-a")
+            await GenerationQueueService.release(sql_session, queued.id, "worker-a")
+
+            task = await GenerationQueueService.claim(sql_session, "worker-b")
+            assert task.id == queued.id
+            assert task.attempts == 1
+
+    @pytest.mark.asyncio
+    async def test_exhausted_task_is_failed(self, session_maker, monkeypatch):
+        monkeypatch.setenv("GENERATION_MAX_ATTEMPTS", "1")
+        queued = await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            await GenerationQueueService.claim(sql_session, "worker-a")
+        await expire_lease(session_maker, queued.id)
+
+        async with session_maker() as sql_session:
+            assert await GenerationQueueService.claim(sql_session, "worker-b") is None
+            assert await GenerationQueueService.fail_exhausted(sql_session) == 1
+
+            task = await sql_session.get(
+                AsyncPresentationGenerationTaskModel, queued.id, populate_existing=True
+            )
+            assert task.status == "error"
+            assert task.payload is None
+
+    @pytest.mark.asyncio
+    async def test_failed_task_is_retried_after_backoff(self, session_maker):
+        queued = await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            task = await GenerationQueueService.claim(sql_session, "worker-a")
+            assert await GenerationQueueService.retry(sql_session, task, "worker-a")
+
+            # Not claimable until the backoff has passed
+            assert await GenerationQueueService.claim(sql_session, "worker-b") is None
+            task = await sql_session.get(
+                AsyncPresentationGenerationTaskModel, queued.id, populate_existing=True
+            )
+            assert task.status == "pending"
+            assert task.lease_owner is None
+            task.available_at = get_current_utc_datetime() - timedelta(seconds=1)
+            await sql_session.commit()
+
+            task = await GenerationQueueService.claim(sql_session, "worker-b")
+            assert task.attempts == 2
+
+    @pytest.mark.asyncio
+    async def test_last_attempt_is_not_retried(self, session_maker, monkeypatch):
+        monkeypatch.setenv("GENERATION_MAX_ATTEMPTS", "1")
+        await enqueue_task(session_maker)
+
+        async with session_maker() as sql_session:
+            task = await GenerationQueueService.claim(sql_session, "worker-a")
+            assert not await GenerationQueueService.retry(sql_session, task, "worker-a")
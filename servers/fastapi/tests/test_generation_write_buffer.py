@@ -0,0 +1,239 @@
+import asyncio
+from functools import partial
+import uuid
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event, select
+
+from models.sql.presentation import PresentationModel
+from models.sql.slide import SlideModel
+from services.generation_write_buffer import GenerationWriteBuffer
+
+PRESENTATION_ID = uuid.UUID(int=1)
+PLACEHOLDER_URL = "/static/images/placeholder.jpg"
+TABLES = [PresentationModel.__table__, SlideModel.__table__]
+
+
+@pytest_asyncio.fixture
+async def session_maker(session_maker):
+    async with session_maker() as sql_session:
+        sql_session.add(
+            PresentationModel(
+                id=PRESENTATION_ID, content="Prompt", n_slides=10, language="English"
+            )
+        )
+        await sql_session.commit()
+
+    session_maker.commits = []
+    event.listen(
+        session_maker.engine.sync_engine,
+        "commit",
+        lambda conn: session_maker.commits.append(1),
+    )
+    return session_maker
+
+
+def make_slide(index: int) -> SlideModel:
+    return SlideModel(
+        presentation=PRESENTATION_ID,
+        layout_group="general",
+        layout="general:title",
+        index=index,
+        content={"image": {"__image_url__": PLACEHOLDER_URL}},
+        html_content=None,
+        properties=None,
+    )
+
+
+async def get_slides(session_maker):
+    async with session_maker() as sql_session:
+        return list(
+            await sql_session.scalars(select(SlideModel).order_by(SlideModel.index))
+        )
+
+
+class TestGenerationWriteBuffer:
+    @pytest.mark.asyncio
+    async def test_writes_are_batched_by_count(self, session_maker):
+        async with GenerationWriteBuffer(
+            session_maker, flush_interval=60, batch_size=5
+        ) as write_buffer:
+            for index in range(10):
+                write_buffer.add(make_slide(index))
+                await asyncio.sleep(0)
+
+        assert len(await get_slides(session_maker)) == 10
+        assert write_buffer.n_flushes == 2
+        assert len(session_maker.commits) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_are_flushed_on_interval(self, session_maker):
+        async with GenerationWriteBuffer(
+            session_maker, flush_interval=0.01, batch_size=100
+        ) as write_buffer:
+            write_buffer.add(make_slide(0))
+            await asyncio.sleep(0.1)
+            # Persisted before the generation session ends
+            assert len(await get_slides(session_maker)) == 1
+
+    @pytest.mark.asyncio
+    async def test_pending_writes_survive_an_error(self, session_maker):
+        with pytest.raises(RuntimeError):
+            async with GenerationWriteBuffer(
+                session_maker, flush_interval=60, batch_size=100
+            ) as write_buffer:
+                write_buffer.add(make_slide(0))
+                raise RuntimeError("slide generation failed")
+
+        assert len(await get_slides(session_maker)) == 1
+
+    @pytest.mark.asyncio
+    async def test_in_place_updates_and_statements(self, session_maker):
+        slides = [make_slide(index) for index in range(3)]
+        async with GenerationWriteBuffer(
+            session_maker, flush_interval=60, batch_size=100
+        ) as write_buffer:
+            write_buffer.add_all(slides)
+            await write_buffer.flush()
+
+            slides[0].content["image"]["__image_url__"] = "/app_data/images/1.jpg"
+            write_buffer.add(slides[0], modified=["content"])
+            write_buffer.execute(delete(SlideModel).where(SlideModel.index == 2))
+
+        stored_slides = await get_slides(session_maker)
+        assert [slide.index for slide in stored_slides] == [0, 1]
+        assert stored_slides[0].content["image"]["__image_url__"] == (
+            "/app_data/images/1.jpg"
+        )
+
+    @pytest.mark.asyncio
+    async def test_in_place_update_queued_during_a_flush(self, session_maker):
+        slide = make_slide(0)
+        write_buffer = GenerationWriteBuffer(
+            session_maker, flush_interval=60, batch_size=100
+        )
+
+        def update_slide(conn, cursor, statement, *args):
+            # While the insert of the slide is still being written
+            if not statement.startswith("INSERT") or (
+                slide.content["image"]["__image_url__"] != PLACEHOLDER_URL
+            ):
+                return
+            slide.content["image"]["__image_url__"] = "/app_data/images/1.jpg"
+            write_buffer.add(slide, modified=["content"])
+
+        event.listen(
+            session_maker.engine.sync_engine, "after_cursor_execute", update_slide
+        )
+        write_buffer.add(slide)
+        await write_buffer.flush()
+        await write_buffer.flush()
+
+        stored_slides = await get_slides(session_maker)
+        assert stored_slides[0].content["image"]["__image_url__"] == (
+            "/app_data/images/1.jpg"
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_writes(self, session_maker):
+        write_buffer = GenerationWriteBuffer(
+            session_maker, flush_interval=60, batch_size=100
+        )
+        slide = make_slide(0)
+        duplicate = make_slide(1)
+        duplicate.id = slide.id
+        write_buffer.add(slide)
+        write_buffer.add(duplicate)
+
+        with pytest.raises(Exception):
+            await write_buffer.flush()
+
+        assert len(write_buffer._pending) == 2
+        assert await get_slides(session_maker) == []
+
+    @pytest.mark.asyncio
+    async def test_write_that_keeps_failing_is_dropped(self, session_maker):
+        write_buffer = GenerationWriteBuffer(
+            session_maker, flush_interval=60, batch_size=100, max_attempts=2
+        )
+        slide = make_slide(0)
+        duplicate = make_slide(1)
+        duplicate.id = slide.id
+        write_buffer.add(slide)
+        write_buffer.add(duplicate)
+
+        with pytest.raises(Exception):
+            await write_buffer.flush()
+        write_buffer.add(make_slide(2))
+        await write_buffer.flush()
+
+        assert write_buffer._pending == []
+        [(operation, value, _)] = write_buffer.dropped_writes
+        assert (operation, value) == ("add", duplicate)
+        assert [slide.index for slide in await get_slides(session_maker)] == [0, 2]
+
+
+class TestStreamGenerationWorker:
+    @pytest.mark.asyncio
+    async def test_slides_are_written_in_batches_with_assets(
+        self, session_maker, tmp_path
+    ):
+        from api.v1.ppt.endpoints import presentation as presentation_endpoints
+
+        async with session_maker() as sql_session:
+            presentation = await sql_session.get(PresentationModel, PRESENTATION_ID)
+            presentation.layout = {
+                "name": "general",
+                "slides": [{"id": "general:title", "json_schema": {}}],
+            }
+            presentation.structure = {"slides": [0] * 6}
+            presentation.outlines = {
+                "slides": [{"content": f"Slide {i}"} for i in range(6)]
+            }
+            await sql_session.commit()
+
+        async def get_slide_content(*args, **kwargs):
+            return {"title": "Title", "image": {"__image_prompt__": "a cat"}}
+
+        async def fetch_assets(image_generation_service, slide):
+            slide.content["image"]["__image_url__"] = f"/images/{slide.index}.jpg"
+            return []
+
+        stream_session = presentation_endpoints.PresentationStreamSession(
+            presentation_id=PRESENTATION_ID
+        )
+        with (
+            patch.object(presentation_endpoints, "async_session_maker", session_maker),
+            patch.object(
+                presentation_endpoints,
+                "GenerationWriteBuffer",
+                partial(GenerationWriteBuffer, session_maker, 60, 3),
+            ),
+            patch.object(
+                presentation_endpoints,
+                "get_slide_content_from_type_and_outline",
+                get_slide_content,
+            ),
+            patch.object(
+                presentation_endpoints, "process_slide_and_fetch_assets", fetch_assets
+            ),
+            patch.object(presentation_endpoints, "ImageGenerationService"),
+            patch.object(
+                presentation_endpoints,
+                "get_images_directory",
+                lambda: str(tmp_path),
+            ),
+        ):
+            session_maker.commits.clear()
+            await presentation_endpoints.run_stream_generation_worker(stream_session)
+
+        assert "presentation" in stream_session.buffer[-1][1]
+        # At most two batches of generated slides and one with the assets,
+        # instead of a commit per slide and a rewrite of all slides
+        assert len(session_maker.commits) <= 3
+        stored_slides = await get_slides(session_maker)
+        assert [slide.content["image"]["__image_url__"] for slide in stored_slides] == [
+            f"/images/{index}.jpg" for index in range(6)
+        ]
@@ -0,0 +1,117 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from enums.llm_provider import LLMProvider
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from services import llm_client as llm_client_module
+from services.google_genai_client import GoogleGenAIClients
+from services.llm_client import LLMClient
+from services.metrics_service import LLM_TOKENS
+
+MESSAGES = [
+    LLMSystemMessage(content="You are a helpful assistant"),
+    LLMUserMessage(content="Hello"),
+]
+
+
+def make_event(text: str):
+    part = SimpleNamespace(text=text, function_call=None)
+    return SimpleNamespace(
+        candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))],
+        usage_metadata=SimpleNamespace(prompt_token_count=12, candidates_token_count=3),
+    )
+
+
+class FakeGoogleModels:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.cancelled = False
+
+    async def generate_content(self, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return make_event("Hi there")
+
+    async def generate_content_stream(self, **kwargs):
+        async def stream():
+            for text in ["Hi", " there"]:
+                await asyncio.sleep(0)
+                yield make_event(text)
+
+        return stream()
+
+
+def make_client(models: FakeGoogleModels) -> LLMClient:
+    with (
+        patch.object(
+            llm_client_module, "get_llm_provider", return_value=LLMProvider.GOOGLE
+        ),
+        patch.object(llm_client_module, "get_google_api_key_env", return_value="key"),
+        patch.object(
+            llm_client_module.GOOGLE_GENAI_CLIENTS,
+            "get",
+            return_value=SimpleNamespace(models=models),
+        ),
+    ):
+        return LLMClient()
+
+
+class TestGoogleGenAIClients:
+    @pytest.mark.asyncio
+    async def test_client_is_shared_per_api_key(self):
+        clients = GoogleGenAIClients()
+
+        first = clients.get("key-a")
+        assert clients.get("key-a") is first
+        assert clients.get("key-b") is not first
+
+        await clients.close()
+        assert clients.get("key-a") is not first
+        await clients.close()
+
+    @pytest.mark.asyncio
+    async def test_close_skips_sdk_releases_without_close(self):
+        clients = GoogleGenAIClients()
+        # google-genai 1.28 has neither AsyncClient.aclose nor Client.close
+        clients._clients["key"] = SimpleNamespace(aio=SimpleNamespace())
+
+        await clients.close()
+
+        assert clients._clients == {}
+
+
+class TestGoogleLLMClient:
+    @pytest.mark.asyncio
+    async def test_generate_awaits_native_async_client(self):
+        client = make_client(FakeGoogleModels())
+        input_tokens = LLM_TOKENS.get(provider="google", model="gemini", type="input")
+
+        assert await client._generate_google("gemini", MESSAGES) == "Hi there"
+        assert (
+            LLM_TOKENS.get(provider="google", model="gemini", type="input")
+            == input_tokens + 12
+        )
+
+    @pytest.mark.asyncio
+    async def test_stream_reads_native_async_stream(self):
+        client = make_client(FakeGoogleModels())
+
+        chunks = [chunk async for chunk in client._stream_google("gemini", MESSAGES)]
+
+        assert chunks == ["Hi", " there"]
+
+    @pytest.mark.asyncio
+    async def test_timeout_cancels_the_request(self):
+        models = FakeGoogleModels(delay=10)
+        client = make_client(models)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client._generate_google("gemini", MESSAGES), 0.05)
+
+        assert models.cancelled
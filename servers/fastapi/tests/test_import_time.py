@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+FASTAPI_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous so slow CI machines don't flake, but far below the several
+# seconds it took while every provider SDK was imported eagerly
+API_MAIN_IMPORT_BUDGET_SECONDS = 5.0
+
+PROVIDER_SDKS = ["openai", "anthropic", "google.genai"]
+DEFERRED_MODULES = PROVIDER_SDKS + ["chromadb", "docling", "pdfplumber"]
+
+
+def import_times(code: str, **env) -> Dict[str, int]:
+    """
+    Runs ``code`` in a fresh interpreter with ``-X importtime`` and returns
+    the cumulative import time of every imported module in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=FASTAPI_DIR,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, module = line.split("|")
+        cumulative = cumulative.strip()
+        if cumulative.isdigit():
+            times[module.strip()] = int(cumulative)
+    return times
+
+
+def print_report(title: str, times: Dict[str, int], limit: int = 15):
+    print(f"\n{title}")
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)
+    for module, cumulative in slowest[:limit]:
+        print(f"{cumulative / 1000:10.1f} ms  {module}")
+
+
+class TestImportTime:
+    def test_api_main_stays_within_budget(self, tmp_path):
+        times = import_times(
+            "import api.main", APP_DATA_DIRECTORY=str(tmp_path)
+        )
+        print_report("api.main import time", times)
+
+        assert [module for module in DEFERRED_MODULES if module in times] == []
+        assert times["api.main"] / 1_000_000 < API_MAIN_IMPORT_BUDGET_SECONDS
+
+    @pytest.mark.parametrize(
+        "provider,sdk,env",
+        [
+            ("openai", "openai", {"OPENAI_API_KEY": "test"}),
+            ("anthropic", "anthropic", {"ANTHROPIC_API_KEY": "test"}),
+            ("google", "google.genai", {"GOOGLE_API_KEY": "test"}),
+        ],
+    )
+    def test_only_selected_provider_sdk_is_imported(
+        self, tmp_path, provider, sdk, env
+    ):
+        times = import_times(
+            "from services.llm_client import LLMClient; LLMClient()",
+            APP_DATA_DIRECTORY=str(tmp_path),
+            LLM=provider,
+            **env,
+        )
+
+        assert [module for module in PROVIDER_SDKS if module in times] == [sdk]
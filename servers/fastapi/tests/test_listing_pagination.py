@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta, timezone
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session
+
+from api.v1.ppt.endpoints.images import IMAGES_ROUTER
+from api.v1.ppt.endpoints.presentation import PRESENTATION_ROUTER
+from models.sql.image_asset import ImageAsset
+from models.sql.presentation import PresentationModel
+from models.sql.slide import SlideModel
+from services.database import get_async_session
+
+TABLES = [PresentationModel.__table__, SlideModel.__table__, ImageAsset.__table__]
+
+CREATED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def client(database_url, async_database_url):
+    sync_engine = create_engine(database_url)
+    with Session(sync_engine) as session:
+        for index in range(5):
+            presentation = PresentationModel(
+                id=uuid.UUID(int=index + 1),
+                content=f"Prompt {index}",
+                n_slides=3,
+                language="English",
+                title=f"Presentation {index}",
+                # Three presentations share a timestamp, so id has to break ties
+                created_at=CREATED_AT + timedelta(minutes=min(index, 2)),
+                layout={"name": "general", "slides": []},
+                outlines={"slides": []},
+            )
+            session.add(presentation)
+            session.add(
+                SlideModel(
+                    presentation=presentation.id,
+                    layout_group="general",
+                    layout="general:title",
+                    index=0,
+                    content={"title": presentation.title},
+                    html_content=None,
+                    properties=None,
+                )
+            )
+            session.add(
+                ImageAsset(
+                    path=f"/images/{index}.png",
+                    is_uploaded=index % 2 == 0,
+                    created_at=CREATED_AT + timedelta(minutes=index),
+                )
+            )
+        session.commit()
+    sync_engine.dispose()
+
+    engine = create_async_engine(async_database_url)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_test_session():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(PRESENTATION_ROUTER, prefix="/api/v1/ppt")
+    app.include_router(IMAGES_ROUTER, prefix="/api/v1/ppt")
+    app.dependency_overrides[get_async_session] = get_test_session
+    with TestClient(app) as client:
+        yield client
+
+
+def get_all_pages(client, url, **params):
+    pages = []
+    cursor = None
+    while True:
+        response = client.get(url, params={**params, "cursor": cursor} if cursor else params)
+        assert response.status_code == 200, response.text
+        pages.append(response.json()["items"])
+        cursor = response.json()["next_cursor"]
+        if not cursor:
+            return pages
+
+
+class TestPresentationListing:
+    def test_pages_match_unpaginated_listing(self, client):
+        all_presentations = client.get("/api/v1/ppt/presentation/all").json()
+        pages = get_all_pages(client, "/api/v1/ppt/presentation/list", limit=2)
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        listed = [item for page in pages for item in page]
+        assert [item["id"] for item in listed] == [
+            presentation["id"] for presentation in all_presentations
+        ]
+        assert listed[0]["first_slide"]["content"] == {"title": listed[0]["title"]}
+        assert "layout" not in listed[0]
+        assert "outlines" not in listed[0]
+
+    def test_field_projection(self, client):
+        response = client.get(
+            "/api/v1/ppt/presentation/list", params={"fields": "title"}
+        )
+
+        assert response.status_code == 200
+        for item in response.json()["items"]:
+            assert set(item) == {"id", "title"}
+
+    def test_invalid_fields_and_cursor_are_rejected(self, client):
+        url = "/api/v1/ppt/presentation/list"
+        assert client.get(url, params={"fields": "layout"}).status_code == 400
+        assert client.get(url, params={"cursor": "not-a-cursor"}).status_code == 400
+        assert client.get(url, params={"limit": 0}).status_code == 422
+
+
+class TestImageListing:
+    @pytest.mark.parametrize("uploaded,legacy_url", [(False, "generated"), (True, "uploaded")])
+    def test_pages_match_unpaginated_listing(self, client, uploaded, legacy_url):
+        all_images = client.get(f"/api/v1/ppt/images/{legacy_url}").json()
+        pages = get_all_pages(
+            client,
+            "/api/v1/ppt/images/list",
+            uploaded=uploaded,
+            limit=1,
+            fields="path",
+        )
+
+        listed = [item for page in pages for item in page]
+        assert [item["path"] for item in listed] == [image["path"] for image in all_images]
+        assert all(set(item) == {"id", "path"} for item in listed)
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import pytest
+
+from services.metrics_service import (
+    EVENT_LOOP_LAG_SECONDS,
+    EventLoopLagMonitor,
+    MetricsRegistry,
+)
+
+
+class TestMetricsRegistry:
+    def test_renders_prometheus_text_format(self):
+        registry = MetricsRegistry()
+        requests = registry.counter(
+            "test_requests_total", "Requests.", ("provider", "model")
+        )
+        depth = registry.gauge("test_queue_depth", "Queue depth.", ("queue",))
+        requests.inc(provider="openai", model='gpt "4"')
+        requests.inc(2, provider="openai", model='gpt "4"')
+        depth.set(3, queue="generation")
+
+        text = registry.render()
+        assert "# TYPE test_requests_total counter" in text
+        assert 'test_requests_total{provider="openai",model="gpt \\"4\\""} 3.0' in text
+        assert 'test_queue_depth{queue="generation"} 3.0' in text
+        assert text.endswith("\n")
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "test_duration_seconds", "Durations.", ("stage",), buckets=(0.1, 1)
+        )
+        for value in (0.05, 0.1, 0.5, 2):
+            histogram.observe(value, stage="outline")
+
+        text = registry.render()
+        assert 'test_duration_seconds_bucket{stage="outline",le="0.1"} 2' in text
+        assert 'test_duration_seconds_bucket{stage="outline",le="1.0"} 3' in text
+        assert 'test_duration_seconds_bucket{stage="outline",le="+Inf"} 4' in text
+        assert 'test_duration_seconds_sum{stage="outline"} 2.65' in text
+        assert 'test_duration_seconds_count{stage="outline"} 4' in text
+
+    def test_labels_must_match(self):
+        counter = MetricsRegistry().counter("test_total", "Test.", ("provider",))
+        with pytest.raises(ValueError):
+            counter.inc(model="gpt-4")
+
+    @pytest.mark.asyncio
+    async def test_timer_decorates_coroutines_and_async_generators(self):
+        histogram = MetricsRegistry().histogram(
+            "test_stage_seconds", "Stages.", ("stage", "status")
+        )
+
+        @histogram.time(stage="outline")
+        async def stream_outline():
+            for chunk in ("a", "b"):
+                yield chunk
+
+        @histogram.time(stage="slide_content")
+        async def generate_slide(fail: bool):
+            if fail:
+                raise RuntimeError("LLM failed")
+            return {}
+
+        assert [chunk async for chunk in stream_outline()] == ["a", "b"]
+        await generate_slide(False)
+        with pytest.raises(RuntimeError):
+            await generate_slide(True)
+
+        assert histogram.get_count(stage="outline", status="ok") == 1
+        assert histogram.get_count(stage="slide_content", status="ok") == 1
+        assert histogram.get_count(stage="slide_content", status="error") == 1
+
+    @pytest.mark.asyncio
+    async def test_collectors_run_before_render(self):
+        registry = MetricsRegistry()
+        sessions = registry.gauge("test_sessions", "Sessions.")
+
+        async def collect_sessions():
+            sessions.set(2)
+
+        async def broken_collector():
+            raise RuntimeError("Database is down")
+
+        registry.add_collector(broken_collector)
+        registry.add_collector(collect_sessions)
+        await registry.collect()
+        assert "test_sessions 2.0" in registry.render()
+
+
+@pytest.mark.asyncio
+@pytest.mark.allow_event_loop_stall
+async def test_event_loop_lag_is_measured():
+    lag_before = EVENT_LOOP_LAG_SECONDS.get_sum()
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    # Blocks the loop, so the monitor wakes up late
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+    assert EVENT_LOOP_LAG_SECONDS.get_sum() - lag_before >= 0.05
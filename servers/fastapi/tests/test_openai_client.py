@@ -0,0 +1,19 @@
+import pytest
+
+from services.openai_client import OpenAIClients
+
+
+class TestOpenAIClients:
+    @pytest.mark.asyncio
+    async def test_client_is_shared_per_api_key_and_base_url(self):
+        clients = OpenAIClients()
+
+        first = clients.get("key-a")
+        assert clients.get("key-a") is first
+        assert clients.get("key-b") is not first
+        assert clients.get("key-a", "http://localhost:8000/v1") is not first
+
+        await clients.close()
+        assert first.is_closed()
+        assert clients.get("key-a") is not first
+        await clients.close()
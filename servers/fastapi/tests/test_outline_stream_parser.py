@@ -0,0 +1,46 @@
+import json
+
+from models.presentation_outline_model import SlideOutlineModel
+from utils.outline_stream_parser import SlideOutlineStreamParser
+
+
+def _feed_in_chunks(parser: SlideOutlineStreamParser, text: str, chunk_size: int):
+    parsed = []
+    for start in range(0, len(text), chunk_size):
+        parsed.extend(parser.feed(text[start : start + chunk_size]))
+    return parsed
+
+
+class TestSlideOutlineStreamParser:
+    def test_emits_slides_as_their_objects_close(self):
+        parser = SlideOutlineStreamParser()
+
+        assert parser.feed('{"slides": [{"content": "# Intro"}') == [
+            (0, SlideOutlineModel(content="# Intro"))
+        ]
+        assert parser.feed(', {"content": "# Deta') == []
+        assert parser.feed('ils"}]}') == [(1, SlideOutlineModel(content="# Details"))]
+
+    def test_handles_braces_and_escapes_inside_strings(self):
+        outline = {
+            "slides": [
+                {"content": 'Use {braces} and [brackets] with "quotes"'},
+                {"content": "Backslash \\\\ and }]"},
+            ]
+        }
+        text = json.dumps(outline)
+
+        for chunk_size in (1, 3, 7, len(text)):
+            parsed = _feed_in_chunks(SlideOutlineStreamParser(), text, chunk_size)
+            assert [index for index, _ in parsed] == [0, 1]
+            assert [each.content for _, each in parsed] == [
+                slide["content"] for slide in outline["slides"]
+            ]
+
+    def test_malformed_slide_keeps_following_indices(self):
+        parser = SlideOutlineStreamParser()
+        parsed = parser.feed(
+            '{"slides": [{"title": "missing content"}, {"content": "Second"}]}'
+        )
+
+        assert parsed == [(1, SlideOutlineModel(content="Second"))]
@@ -0,0 +1,300 @@
+import asyncio
+import inspect
+from typing import List, Optional
+from unittest.mock import AsyncMock
+import uuid
+
+from fastapi import HTTPException
+import pytest
+
+from models.presentation_layout import PresentationLayoutModel, SlideLayoutModel
+from models.presentation_outline_model import (
+    PresentationOutlineModel,
+    SlideOutlineModel,
+)
+from models.presentation_structure_model import PresentationStructureModel
+from models.sql.presentation import PresentationModel
+from services import presentation_service
+from services.presentation_service import (
+    SLIDE_CONTENT_BATCH_SIZE,
+    PresentationService,
+)
+
+
+def make_outlines(n: int) -> List[SlideOutlineModel]:
+    return [SlideOutlineModel(content=f"Slide {i}") for i in range(1, n + 1)]
+
+
+def make_layout(n: int, ordered: bool = True) -> PresentationLayoutModel:
+    return PresentationLayoutModel(
+        name="general",
+        ordered=ordered,
+        slides=[
+            SlideLayoutModel(id=f"layout-{i}", json_schema={}) for i in range(n)
+        ],
+    )
+
+
+class FakeSession:
+    def __init__(self, presentation: Optional[PresentationModel]):
+        self.presentation = presentation
+        self.added = []
+
+    async def get(self, model, id):
+        return self.presentation
+
+    async def execute(self, statement):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    def add_all(self, instances):
+        self.added.extend(instances)
+
+
+class FakePipeline:
+    """
+    Stands in for the stages around the pipelined flow: streams
+    ``streamed_outlines``, then stores ``outlines`` and a structure with
+    ``n_toc_slides`` table of contents slides after the title slide.
+    """
+
+    def __init__(
+        self,
+        outlines: List[SlideOutlineModel],
+        streamed_outlines: Optional[List[SlideOutlineModel]] = None,
+        n_toc_slides: int = 0,
+        fail_structure: bool = False,
+        content_delay: Optional[float] = 0,
+    ):
+        self.outlines = outlines
+        self.streamed_outlines = streamed_outlines or outlines
+        self.n_toc_slides = n_toc_slides
+        self.fail_structure = fail_structure
+        self.content_delay = content_delay
+        self.content_tasks: List[asyncio.Task] = []
+        self.generated_outlines: List[str] = []
+        self.running = 0
+        self.max_running = 0
+        self.deferred_positions = None
+
+    async def generate_outlines(self, sql_session, presentation_id, on_slide_outline):
+        for index, slide_outline in enumerate(self.streamed_outlines):
+            on_slide_outline(index, slide_outline)
+            await asyncio.sleep(0)
+        sql_session.presentation.outlines = PresentationOutlineModel(
+            slides=self.outlines
+        ).model_dump(mode="json")
+        return sql_session.presentation
+
+    async def prepare_structure(self, sql_session, presentation_id, layout, outlines):
+        if self.fail_structure:
+            raise HTTPException(status_code=500, detail="Structure failed")
+        toc_layout_index = len(layout.slides) - 1
+        slides = list(range(len(outlines)))
+        outlines = list(outlines)
+        for i in range(self.n_toc_slides):
+            slides.insert(1 + i, toc_layout_index)
+            outlines.insert(1 + i, SlideOutlineModel(content="Table of Contents"))
+        presentation = sql_session.presentation
+        presentation.outlines = PresentationOutlineModel(slides=outlines).model_dump(
+            mode="json"
+        )
+        presentation.set_layout(layout)
+        presentation.set_structure(PresentationStructureModel(slides=slides))
+        return presentation
+
+    async def run_full_generation_pipeline(
+        self,
+        sql_session,
+        presentation_id,
+        async_status,
+        export_as,
+        slide_content_tasks,
+        slide_content_semaphore,
+        deferred_positions,
+    ):
+        self.deferred_positions = deferred_positions
+        return {
+            position: await task for position, task in slide_content_tasks.items()
+        }
+
+    async def get_slide_content(self, slide_layout, slide_outline, *args):
+        self.content_tasks.append(asyncio.current_task())
+        self.generated_outlines.append(slide_outline.content)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            if self.content_delay is None:
+                await asyncio.Event().wait()
+            await asyncio.sleep(self.content_delay)
+            return {"layout": slide_layout.id, "outline": slide_outline.content}
+        finally:
+            self.running -= 1
+
+
+class FakeImageGenerationService:
+    def __init__(self, output_directory: str):
+        pass
+
+
+@pytest.fixture
+def run_pipeline(monkeypatch):
+    async def run(pipeline: FakePipeline, layout, full_pipeline: bool = False):
+        monkeypatch.setattr(
+            PresentationService, "generate_outlines", pipeline.generate_outlines
+        )
+        monkeypatch.setattr(
+            PresentationService, "prepare_structure", pipeline.prepare_structure
+        )
+        if full_pipeline:
+            monkeypatch.setattr(
+                presentation_service,
+                "ImageGenerationService",
+                FakeImageGenerationService,
+            )
+            monkeypatch.setattr(
+                presentation_service.WebhookService, "send_webhook", AsyncMock()
+            )
+        else:
+            monkeypatch.setattr(
+                PresentationService,
+                "run_full_generation_pipeline",
+                pipeline.run_full_generation_pipeline,
+            )
+        monkeypatch.setattr(
+            presentation_service,
+            "get_slide_content_from_type_and_outline",
+            pipeline.get_slide_content,
+        )
+
+        async def get_layout():
+            return layout
+
+        presentation = PresentationModel(
+            content="Quarterly growth", n_slides=5, language="English"
+        )
+        return await PresentationService.run_pipelined_generation_pipeline(
+            FakeSession(presentation), presentation.id, get_layout(), export_as=None
+        )
+
+    return run
+
+
+class TestPipelinedGeneration:
+    @pytest.mark.asyncio
+    async def test_streamed_slides_are_reused_after_toc_slides(self, run_pipeline):
+        outlines = make_outlines(4)
+        pipeline = FakePipeline(outlines, n_toc_slides=1)
+
+        contents = await run_pipeline(pipeline, make_layout(5))
+
+        # The table of contents takes position 1, content slides shift by one
+        assert sorted(contents) == [0, 2, 3, 4]
+        assert contents[0] == {"layout": "layout-0", "outline": "Slide 1"}
+        assert contents[2] == {"layout": "layout-1", "outline": "Slide 2"}
+        assert contents[4] == {"layout": "layout-3", "outline": "Slide 4"}
+        assert len(pipeline.content_tasks) == 4
+        assert pipeline.deferred_positions == {1}
+
+    @pytest.mark.asyncio
+    async def test_changed_outlines_are_not_reused(self, run_pipeline):
+        outlines = make_outlines(3)
+        streamed_outlines = [
+            outlines[0],
+            SlideOutlineModel(content="Slide 2, partially parsed"),
+            outlines[2],
+        ]
+        pipeline = FakePipeline(
+            outlines, streamed_outlines=streamed_outlines, content_delay=0.01
+        )
+
+        contents = await run_pipeline(pipeline, make_layout(3))
+
+        assert sorted(contents) == [0, 2]
+        assert pipeline.content_tasks[1].cancelled()
+
+    @pytest.mark.asyncio
+    async def test_unordered_layouts_generate_after_the_structure(
+        self, run_pipeline
+    ):
+        pipeline = FakePipeline(make_outlines(3))
+
+        contents = await run_pipeline(pipeline, make_layout(3, ordered=False))
+
+        assert contents == {}
+        assert pipeline.content_tasks == []
+
+    @pytest.mark.asyncio
+    async def test_streamed_slides_are_cancelled_on_failure(self, run_pipeline):
+        pipeline = FakePipeline(
+            make_outlines(3), fail_structure=True, content_delay=None
+        )
+
+        with pytest.raises(HTTPException):
+            await run_pipeline(pipeline, make_layout(3))
+        await asyncio.sleep(0)
+
+        assert len(pipeline.content_tasks) == 3
+        assert all(task.cancelled() for task in pipeline.content_tasks)
+
+    @pytest.mark.asyncio
+    async def test_streamed_slide_generation_is_bounded(self, run_pipeline):
+        n_slides = SLIDE_CONTENT_BATCH_SIZE + 5
+        pipeline = FakePipeline(make_outlines(n_slides), content_delay=0.01)
+
+        contents = await run_pipeline(pipeline, make_layout(n_slides))
+
+        assert len(contents) == n_slides
+        assert pipeline.max_running == SLIDE_CONTENT_BATCH_SIZE
+
+    @pytest.mark.asyncio
+    async def test_both_phases_share_the_limit_and_toc_comes_last(
+        self, run_pipeline
+    ):
+        n_slides = SLIDE_CONTENT_BATCH_SIZE + 5
+        outlines = make_outlines(n_slides)
+        # Half of the streamed slides change and are generated again in batches
+        streamed_outlines = [
+            SlideOutlineModel(content=f"{outline.content}, partially parsed")
+            if i % 2
+            else outline
+            for i, outline in enumerate(outlines)
+        ]
+        pipeline = FakePipeline(
+            outlines,
+            streamed_outlines=streamed_outlines,
+            n_toc_slides=1,
+            content_delay=0.01,
+        )
+
+        response = await run_pipeline(
+            pipeline, make_layout(n_slides + 1), full_pipeline=True
+        )
+
+        assert response.path is None
+        assert pipeline.max_running <= SLIDE_CONTENT_BATCH_SIZE
+        assert pipeline.generated_outlines[-1] == "Table of Contents"
+
+    @pytest.mark.asyncio
+    async def test_missing_presentation_cancels_the_layout_fetch(self):
+        async def get_layout():
+            await asyncio.Event().wait()
+
+        layout_coroutine = get_layout()
+        with pytest.raises(HTTPException) as error:
+            await PresentationService.run_pipelined_generation_pipeline(
+                FakeSession(None), uuid.uuid4(), layout_coroutine
+            )
+        await asyncio.sleep(0)
+
+        assert error.value.status_code == 404
+        # Closed by the cancelled task instead of left never awaited
+        assert inspect.getcoroutinestate(layout_coroutine) == inspect.CORO_CLOSED
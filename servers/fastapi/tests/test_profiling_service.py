@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import pytest
+
+from api.middlewares import ProfilingMiddleware
+from services.profiling_service import AWAIT_FRAME, SamplingProfiler
+
+
+def busy_work(seconds: float):
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        pass
+
+
+async def wait_for_provider():
+    await asyncio.sleep(0.1)
+
+
+async def handle_request():
+    await asyncio.gather(wait_for_provider(), wait_for_provider())
+    for _ in range(5):
+        busy_work(0.01)
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.allow_event_loop_stall
+async def test_profile_samples_running_and_waiting_tasks(tmp_path):
+    profiler = SamplingProfiler(interval=0.002, directory=str(tmp_path))
+
+    async with profiler.profile("POST /generate", {"path": "/generate"}) as profile:
+        await handle_request()
+
+    folded = (tmp_path / f"{profile.id}.folded").read_text().splitlines()
+    stacks = [line.rsplit(" ", 1)[0] for line in folded]
+    assert any(
+        "handle_request" in stack and stack.split(";")[-1].startswith("busy_work")
+        for stack in stacks
+    )
+    # Tasks created by gather join the profile
+    assert any(
+        stack.split(";")[0].startswith("wait_for_provider")
+        and stack.endswith(AWAIT_FRAME)
+        for stack in stacks
+    )
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in folded)
+
+    profiles = profiler.list_profiles()
+    assert [each["id"] for each in profiles] == [profile.id]
+    assert profiles[0]["samples"] > 0
+    assert profiles[0]["metadata"] == {"path": "/generate"}
+    assert profiler.get_profile_path(profile.id)
+
+
+@pytest.mark.asyncio
+async def test_profile_that_was_never_activated_is_discarded(tmp_path):
+    profiler = SamplingProfiler(interval=0.002, directory=str(tmp_path))
+
+    async with profiler.profile("GET /presentation", active=False) as profile:
+        await asyncio.sleep(0.02)
+
+    assert profile.n_samples == 0
+    assert profiler.list_profiles() == []
+    assert profiler._thread is None
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_pruned_and_ids_are_checked(tmp_path):
+    profiler = SamplingProfiler(interval=0.002, max_profiles=2, directory=str(tmp_path))
+    for _ in range(3):
+        async with profiler.profile("GET /presentation"):
+            await asyncio.sleep(0.01)
+
+    assert len(profiler.list_profiles()) == 2
+    assert len(list(tmp_path.glob("*.folded"))) == 2
+    assert profiler.get_profile_path("../../etc/passwd") is None
+
+
+def test_profiling_is_requested_by_header_or_query_parameter():
+    assert ProfilingMiddleware.is_profiling_requested(
+        {"headers": [(b"x-profile", b"true")], "query_string": b""}
+    )
+    assert ProfilingMiddleware.is_profiling_requested(
+        {"headers": [], "query_string": b"id=1&profile=true"}
+    )
+    assert not ProfilingMiddleware.is_profiling_requested(
+        {"headers": [(b"x-profile", b"false")], "query_string": b"profile=true"}
+    )
+    assert not ProfilingMiddleware.is_profiling_requested(
+        {"headers": [], "query_string": b"id=1"}
+    )
@@ -0,0 +1,179 @@
+from datetime import datetime, timezone
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from models.sql.api_key import ApiKeyModel
+from models.sql.image_asset import ImageAsset
+from models.sql.presentation import PresentationModel
+from models.sql.presentation_stream_event import PresentationStreamEventModel
+from models.sql.slide import SlideModel
+from models.sql.user import UserModel
+from models.sql.webhook_delivery import WebhookDeliveryModel
+from models.sql.webhook_subscription import WebhookSubscription
+from services.webhook_service import WebhookService
+from utils.pagination_utils import apply_keyset_pagination, encode_cursor
+
+TABLES = [
+    PresentationModel.__table__,
+    SlideModel.__table__,
+    ImageAsset.__table__,
+    WebhookSubscription.__table__,
+    UserModel.__table__,
+    ApiKeyModel.__table__,
+    PresentationStreamEventModel.__table__,
+    WebhookDeliveryModel.__table__,
+]
+
+PRESENTATION_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
+CURSOR = encode_cursor(datetime(2026, 1, 1, tzinfo=timezone.utc), PRESENTATION_ID)
+
+# The hot queries of the API, mirrored from the endpoints and services
+HOT_QUERIES = [
+    (
+        "stream resume slide lookup",
+        select(SlideModel).where(
+            SlideModel.presentation == PRESENTATION_ID, SlideModel.index == 2
+        ),
+        "ix_slides_presentation_index",
+    ),
+    (
+        "presentation slides",
+        select(SlideModel)
+        .where(SlideModel.presentation == PRESENTATION_ID)
+        .order_by(SlideModel.index),
+        "ix_slides_presentation_index",
+    ),
+    (
+        "generated images gallery",
+        select(ImageAsset)
+        .where(ImageAsset.is_uploaded == False)
+        .order_by(ImageAsset.created_at.desc()),
+        "ix_imageasset_is_uploaded_created_at_id",
+    ),
+    (
+        "uploaded images page",
+        apply_keyset_pagination(
+            select(ImageAsset.id, ImageAsset.created_at, ImageAsset.path).where(
+                ImageAsset.is_uploaded == True
+            ),
+            ImageAsset.created_at,
+            ImageAsset.id,
+            limit=50,
+            cursor=CURSOR,
+        ),
+        "ix_imageasset_is_uploaded_created_at_id",
+    ),
+    (
+        "presentation listing",
+        select(PresentationModel, SlideModel)
+        .outerjoin(
+            SlideModel,
+            (SlideModel.presentation == PresentationModel.id) & (SlideModel.index == 0),
+        )
+        .order_by(PresentationModel.created_at.desc()),
+        "ix_presentations_created_at_id",
+    ),
+    (
+        "presentation summaries page",
+        apply_keyset_pagination(
+            select(PresentationModel.id, PresentationModel.created_at, SlideModel)
+            .outerjoin(
+                SlideModel,
+                (SlideModel.presentation == PresentationModel.id)
+                & (SlideModel.index == 0),
+            ),
+            PresentationModel.created_at,
+            PresentationModel.id,
+            limit=50,
+            cursor=CURSOR,
+        ),
+        "ix_presentations_created_at_id",
+    ),
+    (
+        "presentation listing first slide",
+        select(PresentationModel, SlideModel)
+        .outerjoin(
+            SlideModel,
+            (SlideModel.presentation == PresentationModel.id) & (SlideModel.index == 0),
+        )
+        .order_by(PresentationModel.created_at.desc()),
+        "ix_slides_presentation_index",
+    ),
+    (
+        "webhook subscriptions by event",
+        select(WebhookSubscription).where(
+            WebhookSubscription.event == "presentation.generation.completed"
+        ),
+        "ix_webhook_subscriptions_event",
+    ),
+    (
+        "api key lookup",
+        select(ApiKeyModel).where(
+            ApiKeyModel.key_hash == "hash", ApiKeyModel.is_active == True
+        ),
+        "ix_api_keys_key_hash",
+    ),
+    (
+        "stream relay events",
+        select(PresentationStreamEventModel.event_id, PresentationStreamEventModel.event)
+        .where(
+            PresentationStreamEventModel.presentation_id == PRESENTATION_ID,
+            PresentationStreamEventModel.event_id > 10,
+        )
+        .order_by(PresentationStreamEventModel.event_id),
+        "ix_presentation_stream_events_presentation_id_event_id",
+    ),
+    (
+        "webhook delivery claim",
+        select(WebhookDeliveryModel.id)
+        .where(
+            WebhookService._claimable_condition(
+                datetime(2026, 1, 1, tzinfo=timezone.utc)
+            )
+        )
+        .order_by(WebhookDeliveryModel.available_at)
+        .limit(32),
+        "ix_webhook_deliveries_available_at",
+    ),
+]
+
+
+pytestmark = pytest.mark.parametrize(
+    "database_url", ["sqlite", "postgres"], indirect=True
+)
+
+
+@pytest.fixture
+def connection(database_url):
+    engine = create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                # Empty tables are cheaper to scan, so force the planner to
+                # show whether an index can serve the query at all
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            yield conn
+    finally:
+        engine.dispose()
+
+
+def explain(conn, statement) -> str:
+    sql = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    if conn.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+        return "\n".join(row[-1] for row in rows)
+    rows = conn.exec_driver_sql(f"EXPLAIN {sql}").all()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "statement,index_name",
+    [pytest.param(statement, index, id=name) for name, statement, index in HOT_QUERIES],
+)
+def test_hot_query_uses_index(connection, statement, index_name):
+    plan = explain(connection, statement)
+    assert index_name in plan, plan
+    # ORDER BY is served by the index instead of a sort on SQLite
+    assert "TEMP B-TREE" not in plan, plan
@@ -0,0 +1,126 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from models.presentation_layout import SlideLayoutModel
+from utils.get_dynamic_models import (
+    get_presentation_outline_model_with_n_slides,
+    get_presentation_structure_model_with_n_slides,
+)
+from utils.llm_calls import generate_slide_content
+from utils.schema_cache import (
+    SchemaCompilationCache,
+    get_google_json_schema,
+    get_strict_json_schema,
+)
+
+SLIDE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "maxLength": 40},
+        "image": {
+            "$ref": "#/$defs/Image",
+            "description": "Slide image",
+        },
+    },
+    "required": ["title", "image"],
+    "$defs": {
+        "Image": {
+            "title": "Image",
+            "type": "object",
+            "properties": {
+                "__image_url__": {"type": "string"},
+                "__image_prompt__": {"type": "string"},
+            },
+            "required": ["__image_url__", "__image_prompt__"],
+        }
+    },
+}
+
+
+class TestSchemaCompilationCache:
+    def test_compiles_once_per_schema_and_dialect(self):
+        cache = SchemaCompilationCache()
+        compile = lambda schema: {**schema, "compiled": True}
+
+        first = cache.get_or_compile(SLIDE_SCHEMA, "strict", compile, "general:1")
+        second = cache.get_or_compile(
+            {**SLIDE_SCHEMA}, "strict", compile, "general:1"
+        )
+        assert first is second
+        assert cache.n_compiles == 1
+
+        cache.get_or_compile(SLIDE_SCHEMA, "google", compile, "general:1")
+        cache.get_or_compile(
+            {**SLIDE_SCHEMA, "required": ["title"]}, "strict", compile, "general:1"
+        )
+        assert cache.n_compiles == 3
+
+    def test_source_schema_is_not_mutated(self):
+        schema = {"type": "object", "properties": {"a": {"type": "string"}}}
+
+        strict_schema = get_strict_json_schema(schema)
+
+        assert strict_schema["additionalProperties"] is False
+        assert "additionalProperties" not in schema
+
+    def test_google_schema_is_flattened(self):
+        google_schema = get_google_json_schema(SLIDE_SCHEMA)
+
+        assert "$defs" not in google_schema
+        assert "title" not in google_schema["properties"]["image"]
+        assert "__image_url__" in google_schema["properties"]["image"]["properties"]
+
+    def test_least_recently_used_schema_is_evicted(self):
+        cache = SchemaCompilationCache(max_size=1)
+        compile = lambda schema: schema
+
+        cache.get_or_compile({"type": "string"}, "strict", compile)
+        cache.get_or_compile({"type": "number"}, "strict", compile)
+        cache.get_or_compile({"type": "string"}, "strict", compile)
+
+        assert cache.n_compiles == 3
+
+
+class TestSlideResponseSchema:
+    @pytest.mark.asyncio
+    async def test_slide_schema_is_built_once_per_layout(self):
+        layout = SlideLayoutModel(id="general:1", json_schema=SLIDE_SCHEMA)
+        client = AsyncMock()
+        client.generate_structured.return_value = {}
+
+        with (
+            patch.object(generate_slide_content, "LLMClient", return_value=client),
+            patch.object(generate_slide_content, "get_model", return_value="model"),
+            patch.object(
+                generate_slide_content,
+                "compile_slide_response_schema",
+                wraps=generate_slide_content.compile_slide_response_schema,
+            ) as compile_schema,
+        ):
+            for _ in range(5):
+                await generate_slide_content.get_slide_content_from_type_and_outline(
+                    layout, AsyncMock(content="Outline"), "English"
+                )
+
+        assert compile_schema.call_count == 1
+        response_format = client.generate_structured.call_args.kwargs[
+            "response_format"
+        ]
+        assert "__speaker_note__" in response_format["required"]
+        image = response_format["$defs"]["Image"]
+        assert "__image_url__" not in image["properties"]
+        assert image["required"] == ["__image_prompt__"]
+
+
+class TestDynamicModels:
+    def test_models_are_memoized_by_slide_count(self):
+        assert get_presentation_outline_model_with_n_slides(
+            5
+        ) is get_presentation_outline_model_with_n_slides(5)
+        assert get_presentation_structure_model_with_n_slides(
+            5
+        ) is get_presentation_structure_model_with_n_slides(5)
+        assert get_presentation_outline_model_with_n_slides(
+            5
+        ) is not get_presentation_outline_model_with_n_slides(6)
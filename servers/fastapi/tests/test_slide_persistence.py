@@ -0,0 +1,189 @@
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import Session
+
+from api.v1.ppt.endpoints.presentation import PRESENTATION_ROUTER
+from models.sql.presentation import PresentationModel
+from models.sql.slide import SlideModel
+from services.database import get_async_session
+from utils.json_patch import JsonPatchError, apply_json_patch
+
+TABLES = [PresentationModel.__table__, SlideModel.__table__]
+
+PRESENTATION_ID = uuid.UUID(int=1)
+
+
+class StatementRecorder:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.split(" ")[0])
+
+    def count(self, keyword: str) -> int:
+        return sum(
+            1 for statement in self.statements if statement.upper() == keyword
+        )
+
+
+@pytest.fixture
+def recorder():
+    return StatementRecorder()
+
+
+@pytest.fixture
+def client(database_url, async_database_url, recorder):
+    sync_engine = create_engine(database_url)
+    with Session(sync_engine) as session:
+        session.add(
+            PresentationModel(
+                id=PRESENTATION_ID, content="Prompt", n_slides=3, language="English"
+            )
+        )
+        for index in range(3):
+            session.add(
+                SlideModel(
+                    id=uuid.UUID(int=100 + index),
+                    presentation=PRESENTATION_ID,
+                    layout_group="general",
+                    layout="general:title",
+                    index=index,
+                    content={"title": f"Slide {index}", "bullets": ["a", "b"]},
+                    html_content=None,
+                    properties=None,
+                )
+            )
+        session.commit()
+    sync_engine.dispose()
+
+    engine = create_async_engine(async_database_url)
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_test_session():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(PRESENTATION_ROUTER, prefix="/api/v1/ppt")
+    app.dependency_overrides[get_async_session] = get_test_session
+    with TestClient(app) as client:
+        yield client
+
+
+def get_slides(client):
+    response = client.get(f"/api/v1/ppt/presentation/{PRESENTATION_ID}")
+    assert response.status_code == 200, response.text
+    return response.json()["slides"]
+
+
+class TestPresentationUpdate:
+    def test_autosave_writes_only_the_changed_slide(self, client, recorder):
+        slides = get_slides(client)
+        slides[1]["content"]["title"] = "Edited"
+        recorder.statements.clear()
+
+        response = client.patch(
+            "/api/v1/ppt/presentation/update",
+            json={"id": str(PRESENTATION_ID), "slides": slides},
+        )
+
+        assert response.status_code == 200, response.text
+        assert recorder.count("UPDATE") == 1
+        assert recorder.count("INSERT") == 0
+        assert recorder.count("DELETE") == 0
+        assert get_slides(client)[1]["content"]["title"] == "Edited"
+
+    def test_unchanged_slides_are_not_written(self, client, recorder):
+        slides = get_slides(client)
+        recorder.statements.clear()
+
+        response = client.patch(
+            "/api/v1/ppt/presentation/update",
+            json={"id": str(PRESENTATION_ID), "slides": slides},
+        )
+
+        assert response.status_code == 200, response.text
+        assert recorder.count("UPDATE") + recorder.count("INSERT") == 0
+        assert recorder.count("DELETE") == 0
+
+    def test_added_and_removed_slides(self, client, recorder):
+        slides = get_slides(client)
+        removed = slides.pop(0)
+        new_slide = {
+            **slides[-1],
+            "id": str(uuid.uuid4()),
+            "index": 3,
+            "content": {"title": "New"},
+        }
+        slides.append(new_slide)
+        recorder.statements.clear()
+
+        response = client.patch(
+            "/api/v1/ppt/presentation/update",
+            json={"id": str(PRESENTATION_ID), "slides": slides},
+        )
+
+        assert response.status_code == 200, response.text
+        assert recorder.count("INSERT") == 1
+        assert recorder.count("DELETE") == 1
+        assert recorder.count("UPDATE") == 0
+        stored_ids = [slide["id"] for slide in get_slides(client)]
+        assert removed["id"] not in stored_ids
+        assert new_slide["id"] in stored_ids
+
+
+class TestSlidePatch:
+    def test_patch_single_slide(self, client):
+        slide_id = get_slides(client)[0]["id"]
+
+        response = client.patch(
+            "/api/v1/ppt/presentation/update/slide",
+            json={
+                "id": slide_id,
+                "operations": [
+                    {"op": "test", "path": "/content/title", "value": "Slide 0"},
+                    {"op": "replace", "path": "/content/title", "value": "Patched"},
+                    {"op": "add", "path": "/content/bullets/-", "value": "c"},
+                    {"op": "replace", "path": "/speaker_note", "value": "Note"},
+                ],
+            },
+        )
+
+        assert response.status_code == 200, response.text
+        slide = get_slides(client)[0]
+        assert slide["content"] == {"title": "Patched", "bullets": ["a", "b", "c"]}
+        assert slide["speaker_note"] == "Note"
+
+    def test_invalid_patch_is_rejected(self, client):
+        slide_id = get_slides(client)[0]["id"]
+        url = "/api/v1/ppt/presentation/update/slide"
+
+        for operations in [
+            [{"op": "test", "path": "/content/title", "value": "Other"}],
+            [{"op": "replace", "path": "/content/missing", "value": 1}],
+            [{"op": "remove", "path": "/content"}],
+            [{"op": "add", "path": "/presentation", "value": "x"}],
+        ]:
+            response = client.patch(url, json={"id": slide_id, "operations": operations})
+            assert response.status_code == 400, operations
+
+        assert get_slides(client)[0]["content"]["title"] == "Slide 0"
+
+
+def test_failed_patch_leaves_document_unchanged():
+    document = {"items": [1, 2]}
+    with pytest.raises(JsonPatchError):
+        apply_json_patch(
+            document,
+            [
+                {"op": "remove", "path": "/items/0"},
+                {"op": "remove", "path": "/items/5"},
+            ],
+        )
+    assert document == {"items": [1, 2]}
@@ -0,0 +1,159 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from api.v1.health.router import API_V1_HEALTH_ROUTER
+from services.startup_service import STARTUP_SERVICE, StartupService, StartupTask
+
+
+class TestStartupService:
+    @pytest.mark.asyncio
+    async def test_independent_tasks_run_concurrently(self):
+        running = []
+        overlapped = asyncio.Event()
+
+        def make_task(name):
+            async def func():
+                running.append(name)
+                if len(running) == 2:
+                    overlapped.set()
+                await asyncio.wait_for(overlapped.wait(), 1)
+
+            return StartupTask(name, func)
+
+        startup_service = StartupService()
+        await startup_service.run([make_task("database"), make_task("templates")])
+
+        assert startup_service.ready
+        assert sorted(running) == ["database", "templates"]
+
+    @pytest.mark.asyncio
+    async def test_failed_task_skips_dependents_without_raising(self):
+        order = []
+
+        async def database():
+            raise RuntimeError("database is down")
+
+        async def templates():
+            order.append("templates")
+
+        async def provider_check():
+            order.append("provider_check")
+
+        startup_service = StartupService()
+        await startup_service.run(
+            [
+                StartupTask("database", database),
+                StartupTask("templates", templates, depends_on=["database"]),
+                StartupTask("provider_check", provider_check, required=False),
+            ]
+        )
+
+        tasks = startup_service.get_status()["tasks"]
+        assert not startup_service.ready
+        assert tasks["database"]["status"] == "failed"
+        assert tasks["database"]["error"] == "database is down"
+        assert tasks["templates"]["status"] == "skipped"
+        assert order == ["provider_check"]
+
+    @pytest.mark.asyncio
+    async def test_optional_task_failure_keeps_service_ready(self):
+        async def database():
+            pass
+
+        async def provider_check():
+            raise RuntimeError("model list unavailable")
+
+        startup_service = StartupService()
+        await startup_service.run(
+            [
+                StartupTask("database", database),
+                StartupTask("provider_check", provider_check, required=False),
+            ]
+        )
+
+        assert startup_service.ready
+
+    @pytest.mark.asyncio
+    async def test_stale_result_is_refreshed_in_background(self):
+        calls = []
+
+        async def provider_check():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("model list unavailable")
+
+        task = StartupTask("provider_check", provider_check, required=False, ttl=0)
+        startup_service = StartupService()
+        await startup_service.run([task])
+        assert task.status == "failed"
+
+        startup_service.refresh_stale()
+        # The previous result is reported until the refresh finishes
+        assert task.status == "failed"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert calls == [0, 1]
+        assert task.status == "done"
+        assert task.error is None
+
+    @pytest.mark.asyncio
+    async def test_wait_required_leaves_optional_tasks_running(self):
+        provider_check_started = asyncio.Event()
+
+        async def database():
+            await asyncio.sleep(0)
+
+        async def provider_check():
+            provider_check_started.set()
+            await asyncio.Event().wait()
+
+        startup_service = StartupService()
+        startup_service.start(
+            [
+                StartupTask("database", database),
+                StartupTask("provider_check", provider_check, required=False),
+            ]
+        )
+        await startup_service.wait_required()
+
+        assert startup_service.ready
+        assert provider_check_started.is_set()
+        assert startup_service.tasks["provider_check"].status == "running"
+        startup_service.stop()
+
+    @pytest.mark.asyncio
+    async def test_wait_required_raises_on_failed_task(self):
+        async def database():
+            raise RuntimeError("database is down")
+
+        startup_service = StartupService()
+        startup_service.start([StartupTask("database", database)])
+
+        with pytest.raises(RuntimeError, match="database is down"):
+            await startup_service.wait_required()
+        startup_service.stop()
+
+
+class TestHealthRouter:
+    def test_alive_before_ready(self):
+        app = FastAPI()
+        app.include_router(API_V1_HEALTH_ROUTER)
+        STARTUP_SERVICE.tasks = {"database": StartupTask("database", asyncio.sleep)}
+
+        with TestClient(app) as client:
+            assert client.get("/api/v1/health/live").status_code == 200
+
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 503
+            assert response.json()["tasks"]["database"]["status"] == "pending"
+
+            STARTUP_SERVICE.tasks["database"].status = "done"
+            response = client.get("/api/v1/health/ready")
+            assert response.status_code == 200
+            assert response.json()["ready"]
+
+        STARTUP_SERVICE.tasks = {}
@@ -0,0 +1,45 @@
+import uuid
+
+import pytest
+
+from services import stream_event_log_service
+from services.stream_event_log_service import StreamEventLogService
+
+
+@pytest.fixture
+def event_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        stream_event_log_service, "get_stream_logs_directory", lambda: str(tmp_path)
+    )
+    return StreamEventLogService()
+
+
+class TestStreamEventLogService:
+    @pytest.mark.asyncio
+    async def test_completed_stream_resumes_after_event_id(self, event_log):
+        presentation_id = uuid.uuid4()
+        await event_log.reset(presentation_id)
+        await event_log.append(presentation_id, [(10, "first"), (11, "second\n")])
+        await event_log.append(presentation_id, [(12, "third"), (13, None)])
+
+        assert await event_log.get_events_after(presentation_id, 10) == [
+            (11, "second\n"),
+            (12, "third"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_unfinished_stream_is_not_resumed(self, event_log):
+        presentation_id = uuid.uuid4()
+        await event_log.reset(presentation_id)
+        await event_log.append(presentation_id, [(10, "first")])
+
+        assert await event_log.get_events_after(presentation_id, 0) is None
+        assert await event_log.get_events_after(uuid.uuid4(), 0) is None
+
+    @pytest.mark.asyncio
+    async def test_reset_discards_previous_stream(self, event_log):
+        presentation_id = uuid.uuid4()
+        await event_log.append(presentation_id, [(10, "first"), (11, None)])
+        await event_log.reset(presentation_id)
+
+        assert await event_log.get_events_after(presentation_id, 0) is None
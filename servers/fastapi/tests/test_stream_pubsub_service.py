@@ -0,0 +1,92 @@
+import asyncio
+from datetime import timedelta
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from models.sql.presentation_stream_event import PresentationStreamEventModel
+from models.sql.presentation_stream_lock import PresentationStreamLockModel
+from services import stream_pubsub_service
+from services.stream_pubsub_service import SQLPollingStreamPubSub
+from utils.datetime_utils import get_current_utc_datetime
+
+TABLES = [
+    PresentationStreamEventModel.__table__,
+    PresentationStreamLockModel.__table__,
+]
+
+
+@pytest.fixture
+def session_maker(session_maker, monkeypatch):
+    monkeypatch.setattr(stream_pubsub_service, "async_session_maker", session_maker)
+    monkeypatch.setattr(stream_pubsub_service, "STREAM_POLL_INTERVAL", 0.01)
+    return session_maker
+
+
+class TestSQLPollingStreamPubSub:
+    @pytest.mark.asyncio
+    async def test_one_generator_per_presentation(self, session_maker):
+        presentation_id = uuid.uuid4()
+        first, second = SQLPollingStreamPubSub(), SQLPollingStreamPubSub()
+
+        assert await first.acquire_generator_lock(presentation_id)
+        assert not await second.acquire_generator_lock(presentation_id)
+        assert await first.renew_generator_lock(presentation_id)
+        assert not await second.renew_generator_lock(presentation_id)
+
+        await first.release_generator_lock(presentation_id)
+        assert await second.acquire_generator_lock(presentation_id)
+
+    @pytest.mark.asyncio
+    async def test_expired_lock_is_taken_over(self, session_maker):
+        presentation_id = uuid.uuid4()
+        first, second = SQLPollingStreamPubSub(), SQLPollingStreamPubSub()
+
+        assert await first.acquire_generator_lock(presentation_id)
+        async with session_maker() as sql_session:
+            await sql_session.execute(
+                update(PresentationStreamLockModel).values(
+                    expires_at=get_current_utc_datetime() - timedelta(seconds=1)
+                )
+            )
+            await sql_session.commit()
+
+        assert await second.acquire_generator_lock(presentation_id)
+        assert not await first.renew_generator_lock(presentation_id)
+
+    @pytest.mark.asyncio
+    async def test_subscriber_receives_events_until_end(self, session_maker):
+        presentation_id = uuid.uuid4()
+        generator, follower = SQLPollingStreamPubSub(), SQLPollingStreamPubSub()
+        await generator.acquire_generator_lock(presentation_id)
+        await generator.publish(presentation_id, [(1, "first"), (2, "second")])
+
+        received = []
+
+        async def follow():
+            async for event_id, event in follower.subscribe(presentation_id, 1):
+                received.append((event_id, event))
+
+        follow_task = asyncio.create_task(follow())
+        await asyncio.sleep(0.05)
+        await generator.publish(presentation_id, [(3, "third"), (4, None)])
+        await asyncio.wait_for(follow_task, timeout=1)
+
+        assert received == [(2, "second"), (3, "third"), (4, None)]
+
+    @pytest.mark.asyncio
+    async def test_new_generator_drops_events_of_earlier_stream(self, session_maker):
+        presentation_id = uuid.uuid4()
+        generator, follower = SQLPollingStreamPubSub(), SQLPollingStreamPubSub()
+        await generator.acquire_generator_lock(presentation_id)
+        await generator.publish(presentation_id, [(1, "old"), (2, None)])
+        await generator.release_generator_lock(presentation_id)
+
+        assert await follower.acquire_generator_lock(presentation_id)
+        await follower.publish(presentation_id, [(3, "new"), (4, None)])
+
+        received = [
+            event async for event in generator.subscribe(presentation_id, 0)
+        ]
+        assert received == [(3, "new"), (4, None)]
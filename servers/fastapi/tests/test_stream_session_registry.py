@@ -0,0 +1,134 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from api.v1.ppt.endpoints import presentation as presentation_module
+from api.v1.ppt.endpoints.presentation import PresentationStreamSessionRegistry
+from models.sse_response import SSECompleteResponse, SSEResponse
+
+
+def chunk_event(chunk: str) -> str:
+    return SSEResponse(
+        event="response", data=json.dumps({"type": "chunk", "chunk": chunk})
+    ).to_string()
+
+
+def replayed_text(events) -> str:
+    return "".join(
+        json.loads(event.split("data: ", 1)[1])["chunk"] for _, event in events
+    )
+
+
+class TestPresentationStreamSessionRegistry:
+    @pytest.mark.asyncio
+    async def test_complete_event_replaces_replay_buffer(self):
+        registry = PresentationStreamSessionRegistry()
+        session = await registry.get_or_create(uuid.uuid4())
+
+        session.publish(chunk_event("slide 1"))
+        session.publish(SSEResponse(event="ping", data="{}").to_string())
+        session.publish(chunk_event("slide 2"))
+        assert [event_id for event_id, _ in session.buffer] == [1, 3]
+
+        session.publish(
+            SSECompleteResponse(key="presentation", value={"id": "x"}).to_string()
+        )
+        assert len(session.buffer) == 1
+        assert session.buffer[0][0] == 4
+        assert session.completed
+
+    @pytest.mark.asyncio
+    async def test_session_over_budget_is_compacted_into_snapshot(self):
+        registry = PresentationStreamSessionRegistry(max_session_bytes=100)
+        session = await registry.get_or_create(uuid.uuid4())
+
+        chunks = ['{ "slides": [ '] + [f'{{"slide": "{i}"}}' for i in range(10)]
+        for chunk in chunks:
+            session.publish(chunk_event(chunk))
+
+        assert session.snapshot_offsets
+        assert len(session.buffer) < len(chunks)
+        # The opening chunk is never dropped
+        assert replayed_text(session.get_replay_events(0)) == "".join(chunks)
+        replay_events = session.get_replay_events(3)
+        assert replayed_text(replay_events) == "".join(chunks[3:])
+        assert replay_events[-1][0] == len(chunks)
+        assert session.get_replay_events(len(chunks)) == []
+
+    @pytest.mark.asyncio
+    async def test_finished_sessions_expire_after_ttl(self):
+        registry = PresentationStreamSessionRegistry(session_ttl=60)
+        finished = await registry.get_or_create(uuid.uuid4())
+        running = await registry.get_or_create(uuid.uuid4())
+        finished.done = True
+
+        assert await registry.evict(now=1000) == 0
+        assert await registry.evict(now=1059) == 0
+        assert await registry.evict(now=1060) == 1
+        assert finished.presentation_id not in registry
+        assert running.presentation_id in registry
+
+    @pytest.mark.asyncio
+    async def test_global_budget_evicts_finished_then_compacts(self):
+        registry = PresentationStreamSessionRegistry(max_total_bytes=500)
+        finished = await registry.get_or_create(uuid.uuid4())
+        running = await registry.get_or_create(uuid.uuid4())
+        for _ in range(5):
+            finished.publish(chunk_event("x" * 60))
+            running.publish(chunk_event("y" * 60))
+        finished.done = True
+
+        await registry.evict(now=0)
+
+        assert finished.presentation_id not in registry
+        assert registry.total_bytes <= 500
+
+        for _ in range(5):
+            running.publish(chunk_event("y" * 60))
+        await registry.evict(now=1)
+
+        # Running streams are compacted but keep every chunk
+        assert running.presentation_id in registry
+        assert running.buffer == []
+        assert registry.total_bytes == 600
+        assert replayed_text(running.get_replay_events(0)) == "y" * 600
+
+
+class FlakyPubSub:
+    distributed = True
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.published = []
+
+    async def publish(self, presentation_id, events):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database is locked")
+        self.published += events
+
+
+class TestStreamRelay:
+    @pytest.mark.asyncio
+    async def test_relay_keeps_going_after_publish_errors(self, monkeypatch):
+        pubsub = FlakyPubSub(failures=2)
+        monkeypatch.setattr(presentation_module, "STREAM_PUBSUB", pubsub)
+        monkeypatch.setattr(presentation_module, "STREAM_RELAY_RETRY_SECONDS", 0)
+        session = await PresentationStreamSessionRegistry().get_or_create(
+            uuid.uuid4()
+        )
+        session.relay_backlog = []
+        relay_task = asyncio.create_task(session.relay_events())
+
+        session.publish(chunk_event("slide 1"))
+        await asyncio.sleep(0.01)
+        session.publish(chunk_event("slide 2"))
+        session.done = True
+        session.relay_wakeup.set()
+        await asyncio.wait_for(relay_task, 1)
+
+        assert [event_id for event_id, _ in pubsub.published] == [1, 2, 3]
+        assert pubsub.published[-1][1] is None
+        assert session.relay_backlog is None
@@ -0,0 +1,280 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from api.v1.ppt.endpoints import slide_to_html
+from models.sql.template_import_event import TemplateImportEventModel
+from models.sql.template_import_job import TemplateImportJobModel
+from models.template_import_job import TemplateImportSlide
+from services import template_import_service
+from services.template_import_service import TemplateImportService
+
+TABLES = [TemplateImportJobModel.__table__, TemplateImportEventModel.__table__]
+
+
+def make_slides(n: int):
+    return [
+        TemplateImportSlide(
+            slide_number=i,
+            screenshot_url=f"/app_data/images/template/slide_{i}.png",
+            xml_content=f"<p:sld>{i}</p:sld>",
+        )
+        for i in range(1, n + 1)
+    ]
+
+
+class Concurrency:
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+
+class FakeConverter:
+    def __init__(
+        self,
+        prefix: str,
+        fail_on=(),
+        delay: float = 0,
+        concurrency: Concurrency = None,
+    ):
+        self.prefix = prefix
+        self.fail_on = set(fail_on)
+        self.delay = delay
+        self.calls = []
+        self.concurrency = concurrency or Concurrency()
+
+    async def __call__(self, slide: TemplateImportSlide) -> str:
+        self.calls.append(slide.slide_number)
+        self.concurrency.running += 1
+        self.concurrency.max_running = max(
+            self.concurrency.max_running, self.concurrency.running
+        )
+        try:
+            await asyncio.sleep(self.delay)
+            if slide.slide_number in self.fail_on:
+                raise RuntimeError(f"{self.prefix} failed")
+            return f"{self.prefix}-{slide.slide_number}"
+        finally:
+            self.concurrency.running -= 1
+
+
+class TestTemplateImportService:
+    @pytest.mark.asyncio
+    async def test_slides_convert_concurrently_under_limit(self, session_maker):
+        service = TemplateImportService(concurrency=3, session_maker=session_maker)
+        concurrency = Concurrency()
+        to_html = FakeConverter("html", delay=0.01, concurrency=concurrency)
+        to_react = FakeConverter("react", delay=0.01, concurrency=concurrency)
+
+        job = await service.create_job(make_slides(10))
+        await service.start(job, to_html, to_react)
+        await job.task
+
+        status = job.get_status()
+        assert status.status == "done"
+        assert status.completed_slides == 10
+        assert concurrency.max_running == 3
+        assert status.slides[4].react_component == "react-5"
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_failed_slides_only(self, session_maker):
+        service = TemplateImportService(concurrency=4, session_maker=session_maker)
+        to_html = FakeConverter("html", fail_on=[2])
+        to_react = FakeConverter("react", fail_on=[3])
+
+        job = await service.create_job(make_slides(4))
+        await service.start(job, to_html, to_react)
+        await job.task
+
+        status = job.get_status()
+        assert status.status == "failed"
+        assert status.failed_slides == 2
+        assert status.slides[1].error == "html failed"
+
+        to_html.fail_on.clear()
+        to_react.fail_on.clear()
+        to_html.calls.clear()
+        to_react.calls.clear()
+        await service.start(job, to_html, to_react)
+        await job.task
+
+        assert job.get_status().status == "done"
+        # Slide 3 kept its HTML and only converts to React again
+        assert to_html.calls == [2]
+        assert sorted(to_react.calls) == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_subscribers_replay_after_last_event_id(self, session_maker):
+        service = TemplateImportService(concurrency=2, session_maker=session_maker)
+        job = await service.create_job(make_slides(2))
+        await service.start(job, FakeConverter("html"), FakeConverter("react"))
+
+        events = [event async for event in service.subscribe(job.id)]
+        assert not job.running
+        assert [event_id for event_id, _ in events] == list(range(1, 8))
+        assert '"type": "complete"' in events[-1][1]
+
+        replayed = [
+            event async for event in service.subscribe(job.id, last_event_id=5)
+        ]
+        assert replayed == events[5:]
+
+    @pytest.mark.asyncio
+    async def test_other_workers_follow_and_retry_the_job(
+        self, session_maker, monkeypatch
+    ):
+        monkeypatch.setattr(template_import_service, "TEMPLATE_IMPORT_POLL_INTERVAL", 0)
+        worker_a = TemplateImportService(session_maker=session_maker)
+        worker_b = TemplateImportService(session_maker=session_maker)
+        to_react = FakeConverter("react", fail_on=[2], delay=0.05)
+
+        job = await worker_a.create_job(make_slides(2))
+        await worker_a.start(job, FakeConverter("html"), to_react)
+
+        remote_job = await worker_b.get_job(job.id)
+        assert remote_job.get_status().status == "running"
+        with pytest.raises(HTTPException) as error:
+            await worker_b.start(remote_job, FakeConverter("html"), to_react)
+        assert error.value.status_code == 409
+
+        # Worker B streams the events that worker A publishes
+        events = [event async for event in worker_b.subscribe(job.id)]
+        assert [event_id for event_id, _ in events] == list(range(1, 8))
+        assert '"type": "complete"' in events[-1][1]
+
+        remote_job = await worker_b.get_job(job.id)
+        status = remote_job.get_status()
+        assert status.status == "failed"
+        assert status.slides[1].html == "html-2"
+
+        to_react.fail_on.clear()
+        await worker_b.start(remote_job, FakeConverter("html"), to_react)
+        await remote_job.task
+
+        assert (await worker_a.get_job(job.id)).get_status().status == "done"
+        # Event ids continue after the ones of worker A
+        events = [event async for event in worker_a.subscribe(job.id, 7)]
+        assert [event_id for event_id, _ in events] == [8, 9, 10]
+
+    @pytest.mark.asyncio
+    async def test_job_stops_when_its_lease_is_taken_over(
+        self, session_maker, monkeypatch
+    ):
+        monkeypatch.setattr(template_import_service, "TEMPLATE_IMPORT_LEASE_SECONDS", 0.06)
+        service = TemplateImportService(session_maker=session_maker)
+        to_html = FakeConverter("html", delay=5)
+        job = await service.create_job(make_slides(1))
+        await service.start(job, to_html, FakeConverter("react"))
+        await asyncio.sleep(0)
+
+        async with session_maker() as sql_session:
+            await sql_session.execute(
+                update(TemplateImportJobModel)
+                .where(TemplateImportJobModel.id == job.id)
+                .values(lease_owner="worker-b")
+            )
+            await sql_session.commit()
+        await asyncio.wait_for(job.task, 1)
+
+        async with session_maker() as sql_session:
+            stored_job = await sql_session.get(TemplateImportJobModel, job.id)
+            events = list(await sql_session.scalars(select(TemplateImportEventModel)))
+        assert stored_job.lease_owner == "worker-b"
+        assert not any('"type": "complete"' in event.event for event in events)
+        assert job.id not in service.jobs
+
+    @pytest.mark.asyncio
+    async def test_jobs_are_evicted_after_ttl(self, session_maker):
+        service = TemplateImportService(job_ttl=0, session_maker=session_maker)
+        job = await service.create_job(make_slides(1))
+        await service.start(job, FakeConverter("html"), FakeConverter("react"))
+        await job.task
+
+        await service.create_job(make_slides(1))
+        assert await service.get_job(job.id) is None
+        assert [event async for event in service.subscribe(job.id)] == []
+
+
+class TestTemplateImportRouter:
+    def test_stream_reports_partial_results(self, monkeypatch, async_database_url):
+        monkeypatch.setenv("TEMPLATE_API_KEY", "test")
+        # Created here, the app runs on the event loop of the test client
+        engine = create_async_engine(async_database_url)
+        monkeypatch.setattr(
+            slide_to_html,
+            "TEMPLATE_IMPORT_SERVICE",
+            TemplateImportService(
+                session_maker=async_sessionmaker(engine, expire_on_commit=False)
+            ),
+        )
+        app = FastAPI()
+        app.include_router(slide_to_html.TEMPLATE_IMPORT_ROUTER, prefix="/api/v1/ppt")
+
+        async def convert_slide_image_to_html(image, xml, api_key, fonts):
+            return f"<div>{xml}</div>"
+
+        async def convert_html_to_react_component(html, api_key, image):
+            if "2" in html:
+                raise RuntimeError("React conversion failed")
+            return f"const Slide = () => {html}"
+
+        slides = [
+            {
+                "slide_number": slide.slide_number,
+                "screenshot_url": slide.screenshot_url,
+                "xml_content": slide.xml_content,
+                "normalized_fonts": [],
+            }
+            for slide in make_slides(2)
+        ]
+
+        with (
+            patch.object(
+                slide_to_html,
+                "convert_slide_image_to_html",
+                convert_slide_image_to_html,
+            ),
+            patch.object(
+                slide_to_html,
+                "convert_html_to_react_component",
+                convert_html_to_react_component,
+            ),
+            TestClient(app) as client,
+        ):
+            response = client.post(
+                "/api/v1/ppt/template-import/", json={"slides": slides}
+            )
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+
+            stream = client.get(f"/api/v1/ppt/template-import/{job_id}/stream")
+            events = [
+                json.loads(line[len("data: ") :])
+                for line in stream.text.splitlines()
+                if line.startswith("data: ")
+            ]
+            assert events[-1]["type"] == "complete"
+            assert events[-1]["job"]["completed_slides"] == 1
+            failed = [
+                event["slide"]
+                for event in events
+                if event["type"] == "slide" and event["slide"]["status"] == "failed"
+            ]
+            assert failed[0]["html"] == "<div><p:sld>2</p:sld></div>"
+            assert "xml_content" not in failed[0]
+
+            response = client.get(f"/api/v1/ppt/template-import/{job_id}")
+            assert response.json()["status"] == "failed"
+            assert response.json()["slides"][0]["react_component"]
+
+            response = client.post(
+                f"/api/v1/ppt/template-import/{job_id}/retry", json={}
+            )
+            assert response.status_code == 200
+            assert response.json()["status"] == "running"
@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from models.presentation_layout import PresentationLayoutModel, SlideLayoutModel
+from services.template_layout_cache import TemplateLayoutCache
+from utils import get_layout_by_name as get_layout_by_name_module
+
+
+def make_layout(name: str = "general") -> PresentationLayoutModel:
+    return PresentationLayoutModel(
+        name=name,
+        slides=[SlideLayoutModel(id=f"{name}:title", json_schema={"type": "object"})],
+    )
+
+
+class CountingLoader:
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return make_layout()
+
+
+class TestTemplateLayoutCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self):
+        cache = TemplateLayoutCache(ttl=60)
+        load = CountingLoader(delay=0.01)
+
+        layouts = await asyncio.gather(
+            *[cache.get_or_load(("general", None), load) for _ in range(20)]
+        )
+        await cache.get_or_load(("general", None), load)
+
+        assert load.calls == 1
+        assert all(layout.name == "general" for layout in layouts)
+
+    @pytest.mark.asyncio
+    async def test_callers_get_independent_copies(self):
+        cache = TemplateLayoutCache(ttl=60)
+        load = CountingLoader()
+
+        layout = await cache.get_or_load(("general", None), load)
+        layout.ordered = True
+        layout.slides[0].json_schema["type"] = "changed"
+
+        cached_layout = await cache.get_or_load(("general", None), load)
+        assert not cached_layout.ordered
+        assert cached_layout.slides[0].json_schema == {"type": "object"}
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_cached_and_in_flight_layouts(self):
+        cache = TemplateLayoutCache(ttl=60)
+        load = CountingLoader(delay=0.01)
+
+        await cache.get_or_load(("general", None), load)
+        cache.invalidate()
+        # Started before the template changed, so it is not cached
+        in_flight = asyncio.create_task(cache.get_or_load(("modern", None), load))
+        await asyncio.sleep(0)
+        cache.invalidate()
+        await in_flight
+
+        await cache.get_or_load(("general", None), load)
+        await cache.get_or_load(("modern", None), load)
+        assert load.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_and_errors_are_not_cached(self):
+        cache = TemplateLayoutCache(ttl=0.01)
+        load = CountingLoader()
+
+        await cache.get_or_load(("general", None), load)
+        await asyncio.sleep(0.02)
+        await cache.get_or_load(("general", None), load)
+        assert load.calls == 2
+
+        failing_load = AsyncMock(side_effect=RuntimeError("Next.js is down"))
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.get_or_load(("swift", None), failing_load)
+        assert failing_load.await_count == 2
+
+
+class TestGetLayoutByName:
+    @pytest.mark.asyncio
+    async def test_system_template_is_fetched_once(self):
+        system_template = SimpleNamespace(is_system=True, ordered=False, layouts=None)
+        with (
+            patch.object(
+                get_layout_by_name_module,
+                "TEMPLATE_LAYOUT_CACHE",
+                TemplateLayoutCache(ttl=60),
+            ),
+            patch.object(
+                get_layout_by_name_module.template_service,
+                "get_by_slug",
+                AsyncMock(return_value=system_template),
+            ) as get_by_slug,
+            patch.object(
+                get_layout_by_name_module,
+                "_fetch_layout_from_nextjs",
+                AsyncMock(return_value=make_layout()),
+            ) as fetch_layout,
+        ):
+            for _ in range(5):
+                layout = await get_layout_by_name_module.get_layout_by_name(
+                    "general", auth_token="token"
+                )
+            ordered_layout = await get_layout_by_name_module.get_layout_by_name(
+                "general", ordered=True
+            )
+
+        assert layout.name == "general"
+        # ordered is part of the key
+        assert get_by_slug.await_count == 2
+        assert fetch_layout.await_count == 2
+        assert ordered_layout.name == "general"
@@ -0,0 +1,214 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+import uuid
+
+from fastapi import HTTPException
+import pytest
+
+from enums.llm_provider import LLMProvider
+from models.llm_message import LLMSystemMessage, LLMUserMessage
+from models.sql.api_key import ApiKeyModel
+from models.sql.presentation import PresentationModel
+from services import llm_client as llm_client_module
+from services import token_usage_service
+from services.fake_provider_service import FakeLLMClient
+from services.llm_client import LLMClient
+from services.token_usage_service import (
+    TokenBudgetExceededError,
+    TokenUsageRecorder,
+    count_message_tokens,
+    record_token_usage,
+    set_token_usage_api_key,
+    token_usage_scope,
+)
+from utils.datetime_utils import get_current_utc_datetime
+from utils.llm_calls import generate_presentation_outlines
+
+MESSAGES = [
+    LLMSystemMessage(content="You are a helpful assistant"),
+    LLMUserMessage(content="Write a deck about quarterly growth"),
+]
+TABLES = [PresentationModel.__table__, ApiKeyModel.__table__]
+
+
+@pytest.fixture
+def session_maker(session_maker, monkeypatch):
+    monkeypatch.setattr(
+        token_usage_service,
+        "TOKEN_USAGE_RECORDER",
+        TokenUsageRecorder(flush_interval=60, session_maker=session_maker),
+    )
+    return session_maker
+
+
+async def create_presentation(session_maker, **kwargs) -> PresentationModel:
+    presentation = PresentationModel(
+        content="Quarterly growth",
+        n_slides=5,
+        language="English",
+        updated_at=get_current_utc_datetime() - timedelta(days=1),
+        **kwargs,
+    )
+    async with session_maker() as sql_session:
+        sql_session.add(presentation)
+        await sql_session.commit()
+    return presentation
+
+
+def get_llm_client(provider: LLMProvider = LLMProvider.FAKE, fake=None) -> LLMClient:
+    with patch.object(
+        llm_client_module, "get_llm_provider", return_value=LLMProvider.FAKE
+    ):
+        client = LLMClient()
+    client.llm_provider = provider
+    client._client = fake or FakeLLMClient(latency=0, tokens_per_second=1e6)
+    return client
+
+
+def get_openai_stream_client(chunks, usage=None):
+    """An OpenAI compatible client that streams chunks, then the usage if given."""
+    events = [
+        SimpleNamespace(
+            usage=None,
+            choices=[
+                SimpleNamespace(delta=SimpleNamespace(content=chunk, tool_calls=None))
+            ],
+        )
+        for chunk in chunks
+    ]
+    if usage:
+        events.append(SimpleNamespace(usage=usage, choices=[]))
+    requests = []
+
+    async def stream():
+        for event in events:
+            yield event
+
+    async def create(**kwargs):
+        requests.append(kwargs)
+        return stream()
+
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+    return client, requests
+
+
+class TestUsageCapture:
+    @pytest.mark.asyncio
+    async def test_stream_usage_is_estimated_when_not_reported(self, session_maker):
+        openai_client, requests = get_openai_stream_client(["x" * 40, "y" * 40])
+        client = get_llm_client(LLMProvider.CUSTOM, openai_client)
+
+        with token_usage_scope(uuid.uuid4()) as scope:
+            chunks = [chunk async for chunk in client.stream("model", MESSAGES)]
+
+        assert chunks == ["x" * 40, "y" * 40]
+        # Custom servers may reject stream options
+        assert requests[0]["stream_options"] is None
+        assert scope.input_tokens == count_message_tokens(MESSAGES)
+        assert scope.output_tokens == 20
+
+    @pytest.mark.asyncio
+    async def test_stream_usage_reported_by_the_provider_is_used(self, session_maker):
+        openai_client, requests = get_openai_stream_client(
+            ["x" * 40], SimpleNamespace(prompt_tokens=123, completion_tokens=45)
+        )
+        client = get_llm_client(LLMProvider.OPENAI, openai_client)
+
+        with token_usage_scope(uuid.uuid4()) as scope:
+            [chunk async for chunk in client.stream("model", MESSAGES)]
+
+        assert requests[0]["stream_options"] == {"include_usage": True}
+        assert (scope.input_tokens, scope.output_tokens) == (123, 45)
+
+
+class TestTokenUsageRecorder:
+    @pytest.mark.asyncio
+    async def test_usage_is_added_to_presentation_and_api_key(self, session_maker):
+        presentation = await create_presentation(session_maker, llm_input_tokens=10)
+        api_key = ApiKeyModel(key_hash="hash", user_id=uuid.uuid4())
+        async with session_maker() as sql_session:
+            sql_session.add(api_key)
+            await sql_session.commit()
+
+        set_token_usage_api_key(api_key.id)
+        with token_usage_scope(presentation.id):
+            record_token_usage(100, 20)
+            record_token_usage(50, 5)
+        await token_usage_service.TOKEN_USAGE_RECORDER.stop()
+
+        async with session_maker() as sql_session:
+            stored_presentation = await sql_session.get(
+                PresentationModel, presentation.id
+            )
+            stored_key = await sql_session.get(ApiKeyModel, api_key.id)
+        assert stored_presentation.llm_input_tokens == 160
+        assert stored_presentation.llm_output_tokens == 25
+        # Spending tokens doesn't count as an edit
+        assert stored_presentation.updated_at.replace(tzinfo=None) == (
+            presentation.updated_at.replace(tzinfo=None)
+        )
+        assert (stored_key.llm_input_tokens, stored_key.llm_output_tokens) == (150, 25)
+
+
+class TestTokenBudgets:
+    @pytest.mark.asyncio
+    async def test_exhausted_presentation_budget_fails_before_the_request(
+        self, session_maker, monkeypatch
+    ):
+        monkeypatch.setenv("PRESENTATION_TOKEN_BUDGET", "1000")
+        presentation = await create_presentation(
+            session_maker, llm_input_tokens=900, llm_output_tokens=90
+        )
+        fake = FakeLLMClient(latency=0, failure_rate=1.0)
+        client = get_llm_client(fake=fake)
+
+        with token_usage_scope(presentation.id):
+            with pytest.raises(TokenBudgetExceededError) as error:
+                await client.generate("fake", MESSAGES)
+        assert error.value.status_code == 429
+
+        # Other presentations have budget left
+        with token_usage_scope(uuid.uuid4()):
+            assert await get_llm_client().generate("fake", MESSAGES)
+
+    @pytest.mark.asyncio
+    async def test_oversized_stream_fails_on_first_chunk(
+        self, session_maker, monkeypatch
+    ):
+        monkeypatch.setenv("LLM_MAX_INPUT_TOKENS", "5")
+        client = get_llm_client(fake=FakeLLMClient(latency=0, failure_rate=1.0))
+
+        with pytest.raises(TokenBudgetExceededError) as error:
+            [chunk async for chunk in client.stream("fake", MESSAGES)]
+        assert error.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_additional_context_is_trimmed_to_the_budget(
+        self, session_maker, monkeypatch
+    ):
+        monkeypatch.setenv("LLM_MAX_INPUT_TOKENS", "3000")
+        sent_messages = []
+        stream_structured = LLMClient.stream_structured
+
+        def record_messages(self, model, messages, *args, **kwargs):
+            sent_messages.extend(messages)
+            return stream_structured(self, model, messages, *args, **kwargs)
+
+        monkeypatch.setattr(LLMClient, "stream_structured", record_messages)
+        monkeypatch.setattr(generate_presentation_outlines, "LLMClient", get_llm_client)
+        monkeypatch.setattr(generate_presentation_outlines, "get_model", lambda: "fake")
+
+        chunks = [
+            chunk
+            async for chunk in generate_presentation_outlines.generate_ppt_outline(
+                "Quarterly growth", 3, "English", additional_context="word " * 10000
+            )
+        ]
+
+        assert not any(isinstance(chunk, HTTPException) for chunk in chunks)
+        user_prompt = sent_messages[1].content
+        assert "word " in user_prompt
+        assert user_prompt.count("word ") < 10000
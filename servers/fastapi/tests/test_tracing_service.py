@@ -0,0 +1,209 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import json
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+
+from api import middlewares
+from services.tracing_service import (
+    JsonLinesSpanExporter,
+    Tracer,
+    parse_traceparent,
+)
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+class FakeExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def shutdown(self):
+        pass
+
+
+def get_span(exporter: FakeExporter, name: str):
+    return next(span for span in exporter.spans if span.name == name)
+
+
+class TestTracer:
+    @pytest.mark.asyncio
+    async def test_context_propagates_into_tasks_and_threads(self):
+        exporter = FakeExporter()
+        tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+        @tracer.trace("slide")
+        async def generate_slide():
+            await asyncio.to_thread(lambda: tracer.set_attribute("thread", True))
+
+        with tracer.start_span("pipeline") as root:
+            await asyncio.gather(
+                asyncio.create_task(generate_slide()), generate_slide()
+            )
+
+        slides = [span for span in exporter.spans if span.name == "slide"]
+        assert len(slides) == 2
+        assert {span.parent_span_id for span in slides} == {root.span_id}
+        assert {span.trace_id for span in slides} == {root.trace_id}
+        assert all(span.attributes == {"thread": True} for span in slides)
+        assert root.parent_span_id is None
+
+    @pytest.mark.asyncio
+    async def test_async_generator_span_is_not_current_between_items(self):
+        exporter = FakeExporter()
+        tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+        @tracer.trace("outline")
+        async def stream_outline():
+            for chunk in ("a", "b"):
+                yield tracer.get_current_span().name
+
+        with tracer.start_span("request"):
+            chunks = []
+            async for chunk in stream_outline():
+                chunks.append(chunk)
+                assert tracer.get_current_span().name == "request"
+
+        assert chunks == ["outline", "outline"]
+        outline = get_span(exporter, "outline")
+        assert outline.parent_span_id == get_span(exporter, "request").span_id
+
+    def test_errors_are_recorded(self):
+        exporter = FakeExporter()
+        tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+        with pytest.raises(ValueError):
+            with tracer.start_span("export"):
+                raise ValueError("Next.js is down")
+
+        [span] = exporter.spans
+        assert span.status == "error"
+        assert span.status_message == "Next.js is down"
+        assert span.attributes["exception.type"] == "ValueError"
+
+    def test_sampling_is_decided_at_the_root(self):
+        exporter = FakeExporter()
+        tracer = Tracer(sample_rate=1e-9, exporter=exporter)
+
+        with tracer.start_span("request") as root:
+            with tracer.start_span("llm.generate") as child:
+                assert child.trace_id == root.trace_id
+                assert tracer.inject_headers()["traceparent"].endswith("-00")
+        assert exporter.spans == []
+
+        # A sampled upstream trace is recorded and continued
+        with tracer.start_span("request", traceparent=TRACEPARENT) as span:
+            assert span.trace_id == "0af7651916cd43dd8448eb211c80319c"
+            assert span.parent_span_id == "b7ad6b7169203331"
+        assert len(exporter.spans) == 1
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer(sample_rate=0.0, exporter=FakeExporter())
+        with tracer.start_span("request") as span:
+            assert span is None
+            assert tracer.inject_headers() == {}
+
+    def test_parse_traceparent(self):
+        assert parse_traceparent(TRACEPARENT) == (
+            "0af7651916cd43dd8448eb211c80319c",
+            "b7ad6b7169203331",
+            True,
+        )
+        assert parse_traceparent("00-xyz-b7ad6b7169203331-01") is None
+        assert parse_traceparent(f"00-{'0' * 32}-b7ad6b7169203331-01") is None
+
+
+def test_exporter_writes_json_lines(tmp_path):
+    exporter = JsonLinesSpanExporter(str(tmp_path))
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+    with tracer.start_span("presentation.export", {"export.format": "pdf"}):
+        with tracer.start_span("llm.generate"):
+            pass
+    exporter.shutdown()
+
+    with open(exporter.get_path()) as file:
+        spans = [json.loads(line) for line in file]
+    assert [span["name"] for span in spans] == ["llm.generate", "presentation.export"]
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert spans[1]["attributes"] == {"export.format": "pdf"}
+    assert spans[1]["status"] == {"code": "ok"}
+    assert spans[1]["endTimeUnixNano"] >= spans[1]["startTimeUnixNano"]
+
+
+def test_exporter_rotates_large_files_and_prunes_old_days(tmp_path):
+    exporter = JsonLinesSpanExporter(
+        str(tmp_path), max_file_bytes=200, retention_days=2
+    )
+    old_path = exporter.get_path(datetime.now(timezone.utc) - timedelta(days=3))
+    with open(old_path, "w") as file:
+        file.write("{}\n")
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+
+    for _ in range(2):
+        with tracer.start_span("llm.generate"):
+            pass
+        exporter.shutdown()
+
+    assert not os.path.exists(old_path)
+    assert os.path.exists(exporter.get_path() + ".1")
+    with open(exporter.get_path()) as file:
+        assert len(file.readlines()) == 1
+
+
+def make_traced_app(tracer: Tracer) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middlewares.TracingMiddleware)
+
+    @app.get("/api/v1/ppt/presentation/{id}")
+    async def get_presentation(id: str):
+        return {"traceparent": tracer.get_traceparent()}
+
+    return app
+
+
+def test_middleware_ignores_untrusted_sampled_flag(monkeypatch):
+    exporter = FakeExporter()
+    tracer = Tracer(sample_rate=1e-9, exporter=exporter)
+    monkeypatch.setattr(middlewares, "TRACER", tracer)
+    client = TestClient(make_traced_app(tracer))
+
+    response = client.get(
+        "/api/v1/ppt/presentation/1", headers={"traceparent": TRACEPARENT}
+    )
+    # The trace is continued, but not sampled
+    assert response.json()["traceparent"].startswith(
+        "00-0af7651916cd43dd8448eb211c80319c-"
+    )
+    assert response.json()["traceparent"].endswith("-00")
+    assert exporter.spans == []
+
+    tracer.trust_upstream_sampling = True
+    client.get("/api/v1/ppt/presentation/1", headers={"traceparent": TRACEPARENT})
+    assert len(exporter.spans) == 1
+
+
+def test_middleware_continues_incoming_trace(monkeypatch):
+    exporter = FakeExporter()
+    tracer = Tracer(sample_rate=1.0, exporter=exporter)
+    monkeypatch.setattr(middlewares, "TRACER", tracer)
+
+    client = TestClient(make_traced_app(tracer))
+    response = client.get(
+        "/api/v1/ppt/presentation/1?token=secret",
+        headers={"traceparent": TRACEPARENT},
+    )
+
+    [span] = exporter.spans
+    assert span.kind == "server"
+    assert span.name == "GET /api/v1/ppt/presentation/1"
+    assert span.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert span.attributes["http.response.status_code"] == 200
+    assert "secret" not in json.dumps(span.to_dict())
+    assert response.json()["traceparent"] == span.traceparent
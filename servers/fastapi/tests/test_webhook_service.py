@@ -0,0 +1,226 @@
+import asyncio
+from datetime import timedelta
+import hashlib
+import hmac
+
+from aiohttp import web
+import pytest
+from sqlalchemy import select
+
+from enums.webhook_event import WebhookEvent
+from models.sql.webhook_delivery import WebhookDeliveryModel
+from models.sql.webhook_subscription import WebhookSubscription
+from services.webhook_service import WebhookDeliveryWorker, WebhookService
+from utils.datetime_utils import get_current_utc_datetime
+
+EVENT = WebhookEvent.PRESENTATION_GENERATION_COMPLETED
+TABLES = [WebhookSubscription.__table__, WebhookDeliveryModel.__table__]
+
+
+async def subscribe(session_maker, url: str, secret=None) -> WebhookSubscription:
+    async with session_maker() as sql_session:
+        subscription = WebhookSubscription(url=url, secret=secret, event=EVENT.value)
+        sql_session.add(subscription)
+        await sql_session.commit()
+        return subscription
+
+
+async def get_deliveries(session_maker):
+    async with session_maker() as sql_session:
+        return list(await sql_session.scalars(select(WebhookDeliveryModel)))
+
+
+class TestWebhookService:
+    @pytest.mark.asyncio
+    async def test_delivery_is_claimed_once(self, session_maker):
+        await subscribe(session_maker, "http://receiver.test/a")
+        await subscribe(session_maker, "http://receiver.test/b")
+
+        async with session_maker() as sql_session:
+            assert await WebhookService.enqueue(sql_session, EVENT, {"id": 1}) == 2
+
+        async with session_maker() as sql_session:
+            claimed = await WebhookService.claim(sql_session, "worker-a", 10)
+            assert len(claimed) == 2
+            delivery, subscription = claimed[0]
+            assert delivery.status == "delivering"
+            assert delivery.attempts == 1
+            assert delivery.payload == {"id": 1}
+            assert subscription.url.startswith("http://receiver.test/")
+
+            assert await WebhookService.claim(sql_session, "worker-b", 10) == []
+
+    @pytest.mark.asyncio
+    async def test_expired_lease_is_reclaimed(self, session_maker):
+        await subscribe(session_maker, "http://receiver.test/a")
+        async with session_maker() as sql_session:
+            await WebhookService.enqueue(sql_session, EVENT, {"id": 1})
+            [(delivery, _)] = await WebhookService.claim(sql_session, "worker-a", 10)
+
+            delivery.available_at = get_current_utc_datetime() - timedelta(seconds=1)
+            await sql_session.commit()
+
+            [(reclaimed, _)] = await WebhookService.claim(sql_session, "worker-b", 10)
+            assert reclaimed.lease_owner == "worker-b"
+            assert reclaimed.attempts == 2
+
+            # The first worker can no longer finish the delivery
+            await WebhookService.finish(sql_session, delivery, "worker-a")
+            [delivery] = await get_deliveries(session_maker)
+            assert delivery.status == "delivering"
+
+    @pytest.mark.asyncio
+    async def test_retries_back_off_until_max_attempts(
+        self, session_maker, monkeypatch
+    ):
+        monkeypatch.setenv("WEBHOOK_MAX_ATTEMPTS", "2")
+        await subscribe(session_maker, "http://receiver.test/a")
+
+        async with session_maker() as sql_session:
+            await WebhookService.enqueue(sql_session, EVENT, {"id": 1})
+            [(delivery, _)] = await WebhookService.claim(sql_session, "worker-a", 10)
+            status = await WebhookService.finish(
+                sql_session, delivery, "worker-a", 503, "Receiver responded with 503", True
+            )
+            assert status == "pending"
+
+            # Not due again until the backoff has passed
+            assert await WebhookService.claim(sql_session, "worker-a", 10) == []
+            [delivery] = await get_deliveries(session_maker)
+            assert delivery.status == "pending"
+            assert delivery.last_error == "Receiver responded with 503"
+
+            delivery.available_at = get_current_utc_datetime()
+            sql_session.add(delivery)
+            await sql_session.commit()
+            [(delivery, _)] = await WebhookService.claim(sql_session, "worker-a", 10)
+            status = await WebhookService.finish(
+                sql_session, delivery, "worker-a", 503, "Receiver responded with 503", True
+            )
+            assert status == "failed"
+
+        [delivery] = await get_deliveries(session_maker)
+        assert delivery.available_at is None
+        assert delivery.last_status_code == 503
+        async with session_maker() as sql_session:
+            assert await WebhookService.get_backlog(sql_session) == {"failed": 1}
+
+    def test_retry_delay_grows_and_is_capped(self):
+        assert 4 <= WebhookService.get_retry_delay_seconds(1) <= 5
+        assert 32 <= WebhookService.get_retry_delay_seconds(4) <= 40
+        assert WebhookService.get_retry_delay_seconds(30) <= 3600
+
+
+class TestWebhookDeliveryWorker:
+    @pytest.mark.asyncio
+    async def test_deliveries_are_signed_and_limited_per_endpoint(
+        self, session_maker
+    ):
+        received = []
+        running = 0
+        max_running = 0
+
+        async def handle(request: web.Request):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            try:
+                await asyncio.sleep(0.05)
+                received.append((dict(request.headers), await request.read()))
+                return web.Response(status=204)
+            finally:
+                running -= 1
+
+        app = web.Application()
+        app.router.add_post("/hook", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            for _ in range(6):
+                await subscribe(
+                    session_maker, f"http://127.0.0.1:{port}/hook", secret="secret"
+                )
+            async with session_maker() as sql_session:
+                await WebhookService.enqueue(sql_session, EVENT, {"id": 1})
+
+            worker = WebhookDeliveryWorker(
+                concurrency=8,
+                endpoint_concurrency=2,
+                poll_interval=0.05,
+                session_maker=session_maker,
+            )
+            worker.start()
+            for _ in range(100):
+                if worker.metrics.delivered == 6:
+                    break
+                await asyncio.sleep(0.05)
+            await worker.stop()
+        finally:
+            await runner.cleanup()
+
+        assert worker.metrics.delivered == 6
+        assert max_running == 2
+
+        headers, body = received[0]
+        expected = hmac.new(
+            b"secret",
+            f"{headers['X-Webhook-Timestamp']}.".encode("utf-8") + body,
+            hashlib.sha256,
+        ).hexdigest()
+        assert headers["X-Webhook-Signature"] == f"sha256={expected}"
+        assert headers["X-Webhook-Event"] == EVENT.value
+        # The secret only leaves the server for legacy bearer subscriptions
+        assert "Authorization" not in headers
+
+        deliveries = await get_deliveries(session_maker)
+        assert {delivery.status for delivery in deliveries} == {"delivered"}
+        assert all(delivery.last_status_code == 204 for delivery in deliveries)
+
+    @pytest.mark.asyncio
+    async def test_legacy_subscriptions_also_get_the_bearer_token(
+        self, session_maker
+    ):
+        received = []
+
+        async def handle(request: web.Request):
+            received.append(dict(request.headers))
+            return web.Response(status=204)
+
+        app = web.Application()
+        app.router.add_post("/hook", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            async with session_maker() as sql_session:
+                sql_session.add(
+                    WebhookSubscription(
+                        url=f"http://127.0.0.1:{port}/hook",
+                        secret="secret",
+                        send_secret_as_bearer=True,
+                        event=EVENT.value,
+                    )
+                )
+                await sql_session.commit()
+                await WebhookService.enqueue(sql_session, EVENT, {"id": 1})
+
+            worker = WebhookDeliveryWorker(poll_interval=0.05, session_maker=session_maker)
+            worker.start()
+            for _ in range(100):
+                if worker.metrics.delivered == 1:
+                    break
+                await asyncio.sleep(0.05)
+            await worker.stop()
+        finally:
+            await runner.cleanup()
+
+        [headers] = received
+        assert headers["Authorization"] == "Bearer secret"
+        assert headers["X-Webhook-Signature"].startswith("sha256=")
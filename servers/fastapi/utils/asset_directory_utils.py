@@ -17,3 +17,18 @@ def get_uploads_directory():
     uploads_directory = os.path.join(get_app_data_directory_env(), "uploads")
     os.makedirs(uploads_directory, exist_ok=True)
     return uploads_directory
+
+def get_stream_logs_directory():
+    stream_logs_directory = os.path.join(get_app_data_directory_env(), "stream_logs")
+    os.makedirs(stream_logs_directory, exist_ok=True)
+    return stream_logs_directory
+
+def get_traces_directory():
+    traces_directory = os.path.join(get_app_data_directory_env(), "traces")
+    os.makedirs(traces_directory, exist_ok=True)
+    return traces_directory
+
+def get_profiles_directory():
+    profiles_directory = os.path.join(get_app_data_directory_env(), "profiles")
+    os.makedirs(profiles_directory, exist_ok=True)
+    return profiles_directory
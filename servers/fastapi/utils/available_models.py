@@ -1,9 +1,6 @@
-from anthropic import AsyncAnthropic
-from openai import AsyncOpenAI
-from google import genai
-
-
 async def list_available_openai_compatible_models(url: str, api_key: str) -> list[str]:
+    from openai import AsyncOpenAI
+
     print(f"Fetching models from: {url}")
     try:
         client = AsyncOpenAI(api_key=api_key, base_url=url, timeout=5.0)
@@ -16,6 +13,8 @@ async def list_available_openai_compatible_models(url: str, api_key: str) -> lis
 
 
 async def list_available_anthropic_models(api_key: str) -> list[str]:
+    from anthropic import AsyncAnthropic
+
     print("Fetching Anthropic models...")
     try:
         client = AsyncAnthropic(api_key=api_key, timeout=5.0)
@@ -26,6 +25,8 @@ async def list_available_anthropic_models(api_key: str) -> list[str]:
 
 
 async def list_available_google_models(api_key: str) -> list[str]:
+    from google import genai
+
     print("Fetching Google models...")
     try:
         # Google GenAI client might handle timeouts differently, checking docs or using default for now, 
@@ -1,8 +1,32 @@
 import os
-from utils.get_env import get_app_data_directory_env, get_database_url_env
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from utils.get_env import (
+    get_app_data_directory_env,
+    get_database_max_overflow_env,
+    get_database_pool_pre_ping_env,
+    get_database_pool_recycle_seconds_env,
+    get_database_pool_size_env,
+    get_database_statement_cache_size_env,
+    get_database_url_env,
+    get_sqlite_busy_timeout_ms_env,
+    get_sqlite_journal_mode_env,
+    get_sqlite_mmap_size_env,
+    get_sqlite_synchronous_env,
+)
+from utils.parsers import parse_bool_or_none
 from urllib.parse import urlsplit, urlunsplit, parse_qsl
 import ssl
 
+DEFAULT_SQLITE_JOURNAL_MODE = "WAL"
+DEFAULT_SQLITE_SYNCHRONOUS = "NORMAL"
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_SQLITE_BUSY_TIMEOUT_MS = 5000
+
+DEFAULT_DATABASE_POOL_SIZE = 10
+DEFAULT_DATABASE_MAX_OVERFLOW = 20
+DEFAULT_DATABASE_POOL_RECYCLE_SECONDS = 1800
+
 
 def get_database_url_and_connect_args() -> tuple[str, dict]:
     app_data_dir = get_app_data_directory_env() or "/tmp/presenton"
@@ -58,3 +82,63 @@ def get_database_url_and_connect_args() -> tuple[str, dict]:
 
     print(f"Final Database URL: {database_url}")
     return database_url, connect_args
+
+
+def get_engine_options(database_url: str) -> dict:
+    """
+    Pool settings for server databases. SQLite keeps SQLAlchemy's defaults
+    since its connections are cheap and tuned with pragmas instead.
+    """
+    if database_url.startswith("sqlite"):
+        return {}
+
+    max_overflow = get_database_max_overflow_env()
+    return {
+        "pool_size": get_database_pool_size_env() or DEFAULT_DATABASE_POOL_SIZE,
+        "max_overflow": (
+            DEFAULT_DATABASE_MAX_OVERFLOW if max_overflow is None else max_overflow
+        ),
+        "pool_recycle": get_database_pool_recycle_seconds_env()
+        or DEFAULT_DATABASE_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": parse_bool_or_none(get_database_pool_pre_ping_env())
+        is not False,
+    }
+
+
+def get_engine_connect_args(database_url: str) -> dict:
+    connect_args = {}
+    statement_cache_size = get_database_statement_cache_size_env()
+    if "postgresql+asyncpg" in database_url and statement_cache_size is not None:
+        # 0 disables prepared statement caching, needed behind pgbouncer in
+        # transaction pooling mode
+        connect_args["prepared_statement_cache_size"] = statement_cache_size
+        connect_args["statement_cache_size"] = statement_cache_size
+    return connect_args
+
+
+def get_sqlite_pragmas() -> list[tuple[str, str]]:
+    mmap_size = get_sqlite_mmap_size_env()
+    return [
+        ("journal_mode", get_sqlite_journal_mode_env() or DEFAULT_SQLITE_JOURNAL_MODE),
+        ("synchronous", get_sqlite_synchronous_env() or DEFAULT_SQLITE_SYNCHRONOUS),
+        ("mmap_size", str(DEFAULT_SQLITE_MMAP_SIZE if mmap_size is None else mmap_size)),
+        (
+            "busy_timeout",
+            str(get_sqlite_busy_timeout_ms_env() or DEFAULT_SQLITE_BUSY_TIMEOUT_MS),
+        ),
+    ]
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine):
+    """Sets the SQLite pragmas on every new connection of ``engine``."""
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = get_sqlite_pragmas()
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
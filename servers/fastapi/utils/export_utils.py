@@ -7,11 +7,14 @@ from pathvalidate import sanitize_filename
 
 from models.pptx_models import PptxPresentationModel
 from models.presentation_and_path import PresentationAndPath
+from services.metrics_service import PIPELINE_STAGE_SECONDS
 from services.pptx_presentation_creator import PptxPresentationCreator
+from services.tracing_service import TRACER
 from services.temp_file_service import TEMP_FILE_SERVICE
 from utils.asset_directory_utils import get_exports_directory
 
 
+@TRACER.trace("presentation.export")
 async def export_presentation(
     presentation_id: uuid.UUID,
     title: str,
@@ -20,8 +23,10 @@ async def export_presentation(
     api_key: Optional[str] = None,
     template_font: Optional[str] = None,
 ) -> PresentationAndPath:
+    TRACER.set_attribute("export.format", export_as)
     base_url = os.environ.get("NEXTJS_API_URL", "http://localhost:3000")
-    headers = {}
+    # Next.js continues the trace of the export
+    headers = TRACER.inject_headers()
     params = {}
     if auth_token:
         headers["Authorization"] = f"Bearer {auth_token}"
@@ -68,24 +73,25 @@ async def export_presentation(
             path=pptx_path,
         )
     else:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{base_url}/api/export-as-pdf",
-                headers=headers,
-                params=params,
-                json={
-                    "id": str(presentation_id),
-                    "title": sanitize_filename(title or str(uuid.uuid4())),
-                },
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    print(f"Failed to export PDF: {error_text}")
-                    raise HTTPException(
-                        status_code=500,
-                        detail=f"Failed to export PDF: {error_text}",
-                    )
-                response_json = await response.json()
+        with PIPELINE_STAGE_SECONDS.time(stage="pdf_export"):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    f"{base_url}/api/export-as-pdf",
+                    headers=headers,
+                    params=params,
+                    json={
+                        "id": str(presentation_id),
+                        "title": sanitize_filename(title or str(uuid.uuid4())),
+                    },
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        print(f"Failed to export PDF: {error_text}")
+                        raise HTTPException(
+                            status_code=500,
+                            detail=f"Failed to export PDF: {error_text}",
+                        )
+                    response_json = await response.json()
 
         return PresentationAndPath(
             presentation_id=presentation_id,
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import List
 from pydantic import Field
 from models.presentation_outline_model import (
@@ -7,6 +8,8 @@ from models.presentation_outline_model import (
 from models.presentation_structure_model import PresentationStructureModel
 
 
+# Building a pydantic model is costly, so classes are built once per slide count
+@lru_cache(maxsize=64)
 def get_presentation_outline_model_with_n_slides(n_slides: int):
     class SlideOutlineModelWithNSlides(SlideOutlineModel):
         content: str = Field(
@@ -25,6 +28,7 @@ def get_presentation_outline_model_with_n_slides(n_slides: int):
     return PresentationOutlineModelWithNSlides
 
 
+@lru_cache(maxsize=64)
 def get_presentation_structure_model_with_n_slides(n_slides: int):
     class PresentationStructureModelWithNSlides(PresentationStructureModel):
         slides: List[int] = Field(
@@ -147,3 +147,251 @@ def get_jwt_expires_minutes_env():
 
 def get_api_key_secret_env():
     return os.getenv("API_KEY_SECRET")
+
+
+# Durable generation queue
+def get_generation_queue_env():
+    return os.getenv("GENERATION_QUEUE")
+
+
+def get_generation_worker_concurrency_env():
+    value = os.getenv("GENERATION_WORKER_CONCURRENCY")
+    return int(value) if value else None
+
+
+def get_generation_lease_seconds_env():
+    value = os.getenv("GENERATION_LEASE_SECONDS")
+    return int(value) if value else None
+
+
+def get_generation_max_attempts_env():
+    value = os.getenv("GENERATION_MAX_ATTEMPTS")
+    return int(value) if value else None
+
+
+# Presentation stream fan-out (memory, postgres or sqlite)
+def get_stream_pubsub_backend_env():
+    return os.getenv("STREAM_PUBSUB_BACKEND")
+
+
+def get_stream_event_log_env():
+    return os.getenv("STREAM_EVENT_LOG")
+
+
+def get_stream_session_ttl_seconds_env():
+    value = os.getenv("STREAM_SESSION_TTL_SECONDS")
+    return int(value) if value else None
+
+
+def get_stream_session_max_bytes_env():
+    value = os.getenv("STREAM_SESSION_MAX_BYTES")
+    return int(value) if value else None
+
+
+def get_stream_sessions_max_bytes_env():
+    value = os.getenv("STREAM_SESSIONS_MAX_BYTES")
+    return int(value) if value else None
+
+
+# Set by server.py once startup tasks ran in the parent of the workers
+def get_startup_tasks_done_env():
+    return os.getenv("STARTUP_TASKS_DONE")
+
+
+def get_provider_check_ttl_seconds_env():
+    value = os.getenv("PROVIDER_CHECK_TTL_SECONDS")
+    return int(value) if value else None
+
+
+# SQL engine profiles
+def get_sqlite_journal_mode_env():
+    return os.getenv("SQLITE_JOURNAL_MODE")
+
+
+def get_sqlite_synchronous_env():
+    return os.getenv("SQLITE_SYNCHRONOUS")
+
+
+def get_sqlite_mmap_size_env():
+    value = os.getenv("SQLITE_MMAP_SIZE")
+    return int(value) if value else None
+
+
+def get_sqlite_busy_timeout_ms_env():
+    value = os.getenv("SQLITE_BUSY_TIMEOUT_MS")
+    return int(value) if value else None
+
+
+def get_sqlite_write_queue_env():
+    return os.getenv("SQLITE_WRITE_QUEUE")
+
+
+def get_database_pool_size_env():
+    value = os.getenv("DATABASE_POOL_SIZE")
+    return int(value) if value else None
+
+
+def get_database_max_overflow_env():
+    value = os.getenv("DATABASE_MAX_OVERFLOW")
+    return int(value) if value else None
+
+
+def get_database_pool_recycle_seconds_env():
+    value = os.getenv("DATABASE_POOL_RECYCLE_SECONDS")
+    return int(value) if value else None
+
+
+def get_database_pool_pre_ping_env():
+    return os.getenv("DATABASE_POOL_PRE_PING")
+
+
+def get_database_statement_cache_size_env():
+    value = os.getenv("DATABASE_STATEMENT_CACHE_SIZE")
+    return int(value) if value else None
+
+
+# Write-behind persistence of generated slides
+def get_slide_write_flush_interval_ms_env():
+    value = os.getenv("SLIDE_WRITE_FLUSH_INTERVAL_MS")
+    return int(value) if value else None
+
+
+def get_slide_write_batch_size_env():
+    value = os.getenv("SLIDE_WRITE_BATCH_SIZE")
+    return int(value) if value else None
+
+
+def get_slide_write_max_attempts_env():
+    value = os.getenv("SLIDE_WRITE_MAX_ATTEMPTS")
+    return int(value) if value else None
+
+
+# Authentication fast path
+def get_auth_cache_ttl_seconds_env():
+    value = os.getenv("AUTH_CACHE_TTL_SECONDS")
+    return int(value) if value else None
+
+
+def get_api_key_usage_flush_seconds_env():
+    value = os.getenv("API_KEY_USAGE_FLUSH_SECONDS")
+    return int(value) if value else None
+
+
+def get_template_layout_cache_ttl_seconds_env():
+    value = os.getenv("TEMPLATE_LAYOUT_CACHE_TTL_SECONDS")
+    return int(value) if value else None
+
+
+# Batched template import
+def get_template_import_concurrency_env():
+    value = os.getenv("TEMPLATE_IMPORT_CONCURRENCY")
+    return int(value) if value else None
+
+
+# Webhook delivery
+def get_webhook_timeout_seconds_env():
+    value = os.getenv("WEBHOOK_TIMEOUT_SECONDS")
+    return float(value) if value else None
+
+
+def get_webhook_max_attempts_env():
+    value = os.getenv("WEBHOOK_MAX_ATTEMPTS")
+    return int(value) if value else None
+
+
+def get_webhook_delivery_concurrency_env():
+    value = os.getenv("WEBHOOK_DELIVERY_CONCURRENCY")
+    return int(value) if value else None
+
+
+def get_webhook_endpoint_concurrency_env():
+    value = os.getenv("WEBHOOK_ENDPOINT_CONCURRENCY")
+    return int(value) if value else None
+
+
+# Tracing
+def get_trace_sample_rate_env():
+    value = os.getenv("TRACE_SAMPLE_RATE")
+    return float(value) if value else None
+
+
+def get_trace_export_directory_env():
+    return os.getenv("TRACE_EXPORT_DIRECTORY")
+
+
+def get_trace_trust_upstream_sampling_env():
+    return os.getenv("TRACE_TRUST_UPSTREAM_SAMPLING")
+
+
+def get_trace_export_max_bytes_env():
+    value = os.getenv("TRACE_EXPORT_MAX_BYTES")
+    return int(value) if value else None
+
+
+def get_trace_export_retention_days_env():
+    value = os.getenv("TRACE_EXPORT_RETENTION_DAYS")
+    return int(value) if value else None
+
+
+# Fake providers, for offline benchmarks
+def get_fake_llm_latency_seconds_env():
+    value = os.getenv("FAKE_LLM_LATENCY_SECONDS")
+    return float(value) if value else None
+
+
+def get_fake_llm_tokens_per_second_env():
+    value = os.getenv("FAKE_LLM_TOKENS_PER_SECOND")
+    return float(value) if value else None
+
+
+def get_fake_llm_failure_rate_env():
+    value = os.getenv("FAKE_LLM_FAILURE_RATE")
+    return float(value) if value else None
+
+
+def get_fake_image_latency_seconds_env():
+    value = os.getenv("FAKE_IMAGE_LATENCY_SECONDS")
+    return float(value) if value else None
+
+
+def get_fake_image_failure_rate_env():
+    value = os.getenv("FAKE_IMAGE_FAILURE_RATE")
+    return float(value) if value else None
+
+
+# Event loop stall detection
+def get_event_loop_stall_threshold_ms_env():
+    value = os.getenv("EVENT_LOOP_STALL_THRESHOLD_MS")
+    return float(value) if value else None
+
+
+def get_event_loop_stall_samples_env():
+    value = os.getenv("EVENT_LOOP_STALL_SAMPLES")
+    return int(value) if value else None
+
+
+# Sampling profiler
+def get_profiler_interval_ms_env():
+    value = os.getenv("PROFILER_INTERVAL_MS")
+    return float(value) if value else None
+
+
+def get_profiler_max_profiles_env():
+    value = os.getenv("PROFILER_MAX_PROFILES")
+    return int(value) if value else None
+
+
+# Token usage and budgets
+def get_token_usage_flush_seconds_env():
+    value = os.getenv("TOKEN_USAGE_FLUSH_SECONDS")
+    return float(value) if value else None
+
+
+def get_llm_max_input_tokens_env():
+    value = os.getenv("LLM_MAX_INPUT_TOKENS")
+    return int(value) if value else None
+
+
+def get_presentation_token_budget_env():
+    value = os.getenv("PRESENTATION_TOKEN_BUDGET")
+    return int(value) if value else None
@@ -1,6 +1,7 @@
 """
 Utility to resolve a template layout by name (slug).
 First checks the database for custom templates, then falls back to Next.js for system templates.
+Resolved layouts are cached in process, see TemplateLayoutCache.
 """
 
 import aiohttp
@@ -11,7 +12,9 @@ from urllib.parse import urlencode
 
 from fastapi import HTTPException
 from models.presentation_layout import PresentationLayoutModel
+from services.template_layout_cache import TEMPLATE_LAYOUT_CACHE
 from services.template_service import template_service
+from services.tracing_service import TRACER
 
 
 async def get_layout_by_name(
@@ -19,6 +22,25 @@ async def get_layout_by_name(
     ordered: Optional[bool] = None,
     auth_token: Optional[str] = None,
     api_key: Optional[str] = None,
+) -> PresentationLayoutModel:
+    """
+    Get a presentation layout by template slug, from the layout cache when
+    possible. See _resolve_layout_by_name for how a layout is resolved.
+    """
+    # Credentials only authorize the Next.js request, the layout is the same
+    return await TEMPLATE_LAYOUT_CACHE.get_or_load(
+        (layout_name, ordered),
+        lambda: _resolve_layout_by_name(
+            layout_name, ordered, auth_token=auth_token, api_key=api_key
+        ),
+    )
+
+
+async def _resolve_layout_by_name(
+    layout_name: str,
+    ordered: Optional[bool] = None,
+    auth_token: Optional[str] = None,
+    api_key: Optional[str] = None,
 ) -> PresentationLayoutModel:
     """
     Get a presentation layout by template slug.
@@ -102,7 +124,11 @@ async def _fetch_layout_from_nextjs(
     url = f"{base_url}/api/template?{urlencode(query_params)}"
     
     async with aiohttp.ClientSession() as session:
-        async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+        async with session.get(
+            url,
+            headers=TRACER.inject_headers(),
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as response:
             if response.status != 200:
                 error_text = await response.text()
                 raise HTTPException(
@@ -0,0 +1,89 @@
+import copy
+from typing import Any, List, Union
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def _parse_pointer(pointer: str) -> List[str]:
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"Invalid JSON pointer: {pointer}")
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def _get_list_index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit():
+        raise JsonPatchError(f"Invalid list index: {token}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"List index out of range: {token}")
+    return index
+
+
+def _get_child(container: Union[dict, list], token: str) -> Any:
+    if isinstance(container, dict):
+        if token not in container:
+            raise JsonPatchError(f"Path not found: {token}")
+        return container[token]
+    if isinstance(container, list):
+        return container[_get_list_index(container, token, allow_end=False)]
+    raise JsonPatchError(f"Cannot traverse into {type(container).__name__}")
+
+
+def _resolve_parent(document: Any, pointer: str):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("Operations on the document root are not supported")
+    parent = document
+    for token in tokens[:-1]:
+        parent = _get_child(parent, token)
+    return parent, tokens[-1]
+
+
+def apply_json_patch(document: Any, operations: List[dict]) -> Any:
+    """
+    Applies an RFC 6902 style patch with add, remove, replace and test
+    operations. The document is copied, so a failed patch leaves it unchanged.
+    """
+    document = copy.deepcopy(document)
+    for operation in operations:
+        op = operation.get("op")
+        path = operation.get("path", "")
+        parent, token = _resolve_parent(document, path)
+
+        if op == "test":
+            if _get_child(parent, token) != operation.get("value"):
+                raise JsonPatchError(f"Test failed at {path}")
+        elif op == "remove":
+            _get_child(parent, token)
+            if isinstance(parent, dict):
+                del parent[token]
+            else:
+                del parent[int(token)]
+        elif op in ("add", "replace"):
+            if "value" not in operation:
+                raise JsonPatchError(f"Missing value for {op} at {path}")
+            value = operation["value"]
+            if op == "replace":
+                _get_child(parent, token)
+            if isinstance(parent, dict):
+                parent[token] = value
+            elif isinstance(parent, list):
+                index = _get_list_index(parent, token, allow_end=op == "add")
+                if op == "add":
+                    parent.insert(index, value)
+                else:
+                    parent[index] = value
+            else:
+                raise JsonPatchError(f"Cannot set a value in {type(parent).__name__}")
+        else:
+            raise JsonPatchError(f"Unsupported operation: {op}")
+
+    return document
@@ -4,6 +4,8 @@ from typing import Optional
 from models.llm_message import LLMSystemMessage, LLMUserMessage
 from models.llm_tools import SearchWebTool
 from services.llm_client import LLMClient
+from services.metrics_service import PIPELINE_STAGE_SECONDS
+from services.token_usage_service import trim_to_token_budget
 from utils.get_dynamic_models import get_presentation_outline_model_with_n_slides
 from utils.llm_client_error_handler import handle_llm_client_exceptions
 from utils.llm_provider import get_model
@@ -82,6 +84,7 @@ def get_messages(
     ]
 
 
+@PIPELINE_STAGE_SECONDS.time(stage="outline")
 async def generate_ppt_outline(
     content: str,
     n_slides: int,
@@ -95,10 +98,34 @@ async def generate_ppt_outline(
 ):
     model = get_model()
     response_model = get_presentation_outline_model_with_n_slides(n_slides)
+    response_format = response_model.model_json_schema()
 
     client = LLMClient()
+    tools = (
+        [SearchWebTool] if (client.enable_web_grounding() and web_search) else None
+    )
 
     try:
+        if additional_context:
+            # Documents are cut to the token budget instead of failing the deck
+            reserved_tokens = client.estimate_input_tokens(
+                get_messages(
+                    content,
+                    n_slides,
+                    language,
+                    None,
+                    tone,
+                    verbosity,
+                    instructions,
+                    include_title_slide,
+                ),
+                response_format,
+                client.tool_calls_handler.parse_tools(tools),
+            )
+            additional_context = await trim_to_token_budget(
+                additional_context, reserved_tokens
+            )
+
         async for chunk in client.stream_structured(
             model,
             get_messages(
@@ -111,13 +138,9 @@ async def generate_ppt_outline(
                 instructions,
                 include_title_slide,
             ),
-            response_model.model_json_schema(),
+            response_format,
             strict=True,
-            tools=(
-                [SearchWebTool]
-                if (client.enable_web_grounding() and web_search)
-                else None
-            ),
+            tools=tools,
         ):
             yield chunk
     except Exception as e:
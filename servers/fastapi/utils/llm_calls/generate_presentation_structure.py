@@ -3,6 +3,7 @@ from models.llm_message import LLMSystemMessage, LLMUserMessage
 from models.presentation_layout import PresentationLayoutModel
 from models.presentation_outline_model import PresentationOutlineModel
 from services.llm_client import LLMClient
+from services.metrics_service import PIPELINE_STAGE_SECONDS
 from utils.llm_client_error_handler import handle_llm_client_exceptions
 from utils.llm_provider import get_model
 from utils.get_dynamic_models import get_presentation_structure_model_with_n_slides
@@ -95,6 +96,7 @@ def get_messages_for_slides_markdown(
     ]
 
 
+@PIPELINE_STAGE_SECONDS.time(stage="structure")
 async def generate_presentation_structure(
     presentation_outline: PresentationOutlineModel,
     presentation_layout: PresentationLayoutModel,
@@ -6,8 +6,11 @@ from models.llm_message import LLMSystemMessage, LLMUserMessage
 from models.presentation_layout import SlideLayoutModel
 from models.presentation_outline_model import SlideOutlineModel
 from services.llm_client import LLMClient
+from services.metrics_service import LLM_RETRIES, PIPELINE_STAGE_SECONDS
+from services.token_usage_service import TokenBudgetExceededError
 from utils.llm_client_error_handler import handle_llm_client_exceptions
 from utils.llm_provider import get_model
+from utils.schema_cache import SCHEMA_CACHE
 from utils.schema_utils import add_field_in_schema, remove_fields_from_schema
 from utils.custom_logger import setup_logger
 
@@ -103,21 +106,11 @@ def get_messages(
     ]
 
 
-async def get_slide_content_from_type_and_outline(
-    slide_layout: SlideLayoutModel,
-    outline: SlideOutlineModel,
-    language: str,
-    tone: Optional[str] = None,
-    verbosity: Optional[str] = None,
-    instructions: Optional[str] = None,
-):
-    client = LLMClient()
-    model = get_model()
-    
+def compile_slide_response_schema(schema: dict) -> dict:
     response_schema = remove_fields_from_schema(
-        slide_layout.json_schema, ["__image_url__", "__icon_url__"]
+        schema, ["__image_url__", "__icon_url__"]
     )
-    response_schema = add_field_in_schema(
+    return add_field_in_schema(
         response_schema,
         {
             "__speaker_note__": {
@@ -130,6 +123,30 @@ async def get_slide_content_from_type_and_outline(
         True,
     )
 
+
+def get_slide_response_schema(slide_layout: SlideLayoutModel) -> dict:
+    return SCHEMA_CACHE.get_or_compile(
+        slide_layout.json_schema,
+        "slide_content",
+        compile_slide_response_schema,
+        layout_id=slide_layout.id,
+    )
+
+
+@PIPELINE_STAGE_SECONDS.time(stage="slide_content")
+async def get_slide_content_from_type_and_outline(
+    slide_layout: SlideLayoutModel,
+    outline: SlideOutlineModel,
+    language: str,
+    tone: Optional[str] = None,
+    verbosity: Optional[str] = None,
+    instructions: Optional[str] = None,
+):
+    client = LLMClient()
+    model = get_model()
+    
+    response_schema = get_slide_response_schema(slide_layout)
+
     retries = 2
     for attempt in range(retries + 1):
         try:
@@ -161,6 +178,9 @@ async def get_slide_content_from_type_and_outline(
                     status_code=504,
                     detail="Slide generation timed out. The LLM took too long to respond.",
                 )
+        except TokenBudgetExceededError:
+            # Retrying wouldn't fit the budget either
+            raise
         except Exception as e:
             logger.warning(f"Error in slide generation (Attempt {attempt + 1}/{retries + 1}): {e}")
             if attempt == retries:
@@ -169,4 +189,5 @@ async def get_slide_content_from_type_and_outline(
             
         # Optional: wait a bit before retrying
         if attempt < retries:
+            LLM_RETRIES.inc(provider=client.llm_provider.value, model=model)
             await asyncio.sleep(1)
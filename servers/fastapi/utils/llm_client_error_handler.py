@@ -1,17 +1,29 @@
+import sys
 from fastapi import HTTPException
-from anthropic import APIError as AnthropicAPIError
-from openai import APIError as OpenAIAPIError
-from google.genai.errors import APIError as GoogleAPIError
 import traceback
 
+from services.token_usage_service import TokenBudgetExceededError
+
+
+def _get_sdk_api_error(module_name: str):
+    # An exception can only come from a provider SDK that has been imported
+    module = sys.modules.get(module_name)
+    return getattr(module, "APIError", None) if module else None
+
 
 def handle_llm_client_exceptions(e: Exception) -> HTTPException:
+    # Raised before any request, with its own status code
+    if isinstance(e, TokenBudgetExceededError):
+        return e
     traceback.print_exc()
-    if isinstance(e, OpenAIAPIError):
+    OpenAIAPIError = _get_sdk_api_error("openai")
+    GoogleAPIError = _get_sdk_api_error("google.genai.errors")
+    AnthropicAPIError = _get_sdk_api_error("anthropic")
+    if OpenAIAPIError and isinstance(e, OpenAIAPIError):
         return HTTPException(status_code=500, detail=f"OpenAI API error: {e.message}")
-    if isinstance(e, GoogleAPIError):
+    if GoogleAPIError and isinstance(e, GoogleAPIError):
         return HTTPException(status_code=500, detail=f"Google API error: {e.message}")
-    if isinstance(e, AnthropicAPIError):
+    if AnthropicAPIError and isinstance(e, AnthropicAPIError):
         return HTTPException(
             status_code=500, detail=f"Anthropic API error: {e.message}"
         )
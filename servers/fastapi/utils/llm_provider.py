@@ -2,6 +2,7 @@ from fastapi import HTTPException
 
 from constants.llm import (
     DEFAULT_ANTHROPIC_MODEL,
+    DEFAULT_FAKE_MODEL,
     DEFAULT_GOOGLE_MODEL,
     DEFAULT_OPENAI_MODEL,
 )
@@ -66,6 +67,8 @@ def get_model():
         return get_ollama_model_env()
     elif selected_llm == LLMProvider.CUSTOM:
         return get_custom_model_env()
+    elif selected_llm == LLMProvider.FAKE:
+        return DEFAULT_FAKE_MODEL
     else:
         raise HTTPException(
             status_code=500,
@@ -0,0 +1,77 @@
+from typing import List, Optional, Tuple
+
+import dirtyjson
+
+from models.presentation_outline_model import SlideOutlineModel
+
+
+class SlideOutlineStreamParser:
+    """
+    Incrementally extracts completed slide outlines from a streamed outline
+    response shaped like ``{"slides": [{"content": "..."}, ...]}``.
+
+    Each call to ``feed`` returns ``(index, outline)`` pairs for the slides whose
+    JSON object was closed by the new chunk, so slide generation can start
+    before the whole outline has been received.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._slides_depth: Optional[int] = None
+        self._slide_start: Optional[int] = None
+        self._n_slides = 0
+
+    def feed(self, chunk: str) -> List[Tuple[int, SlideOutlineModel]]:
+        self._text += chunk
+        slide_outlines = []
+
+        while self._position < len(self._text):
+            char = self._text[self._position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+
+            elif char == '"':
+                self._in_string = True
+
+            elif char in "{[":
+                if char == "{" and self._depth == self._slides_depth:
+                    self._slide_start = self._position
+                self._depth += 1
+                if char == "[" and self._slides_depth is None:
+                    self._slides_depth = self._depth
+
+            elif char in "}]":
+                self._depth -= 1
+                if (
+                    char == "}"
+                    and self._depth == self._slides_depth
+                    and self._slide_start is not None
+                ):
+                    slide_outline = self._parse_slide_outline(
+                        self._text[self._slide_start : self._position + 1]
+                    )
+                    if slide_outline:
+                        slide_outlines.append((self._n_slides, slide_outline))
+                    self._n_slides += 1
+                    self._slide_start = None
+
+            self._position += 1
+
+        return slide_outlines
+
+    def _parse_slide_outline(self, text: str) -> Optional[SlideOutlineModel]:
+        try:
+            return SlideOutlineModel(**dict(dirtyjson.loads(text)))
+        except Exception:
+            # Leave malformed slides to the full parse once the stream ends
+            return None
@@ -0,0 +1,79 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+import uuid
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, id: uuid.UUID) -> str:
+    value = f"{created_at.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def apply_keyset_pagination(
+    query, created_at_column, id_column, limit: int, cursor: Optional[str] = None
+):
+    """
+    Orders the query newest first on (created_at, id) and continues after the
+    cursor row, so a page costs an index range scan of limit rows no matter
+    how deep it is. One extra row is fetched to tell whether a next page
+    exists.
+    """
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(created_at_column, id_column) < tuple_(created_at, id)
+        )
+    return query.order_by(created_at_column.desc(), id_column.desc()).limit(
+        limit + 1
+    )
+
+
+def get_page(rows: Sequence[Any], limit: int, get_key) -> Tuple[List[Any], Optional[str]]:
+    """
+    Splits the limit + 1 rows of a keyset query into the page and the cursor
+    of the next page. get_key returns the (created_at, id) of a row.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*get_key(rows[-1]))
+
+
+def parse_fields(
+    fields: Optional[str], allowed_fields: Sequence[str], required_fields: Sequence[str]
+) -> List[str]:
+    """
+    Parses a comma separated field projection. All allowed fields are
+    returned when no projection is given.
+    """
+    if not fields:
+        return list(allowed_fields)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(allowed_fields)}",
+        )
+    return [
+        field
+        for field in allowed_fields
+        if field in requested or field in required_fields
+    ]
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+from copy import deepcopy
+import hashlib
+import json
+from typing import Callable, Optional, Tuple
+
+from utils.schema_utils import (
+    ensure_strict_json_schema,
+    flatten_json_schema,
+    remove_titles_from_schema,
+)
+
+SCHEMA_CACHE_MAX_SIZE = 512
+
+
+def get_schema_hash(schema: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(schema, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class SchemaCompilationCache:
+    """
+    LRU of JSON schemas already rewritten for a provider dialect, keyed by the
+    layout id, a hash of the source schema and the dialect. The same layout is
+    requested for many slides, so each rewrite runs once per layout instead of
+    once per slide. Compiled schemas are shared, callers must not mutate them.
+    """
+
+    def __init__(self, max_size: int = SCHEMA_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._schemas: "OrderedDict[Tuple[Optional[str], str, str], dict]" = (
+            OrderedDict()
+        )
+        self.n_compiles = 0
+
+    def get_or_compile(
+        self,
+        schema: dict,
+        dialect: str,
+        compile: Callable[[dict], dict],
+        layout_id: Optional[str] = None,
+    ) -> dict:
+        key = (layout_id, get_schema_hash(schema), dialect)
+        compiled = self._schemas.get(key)
+        if compiled is not None:
+            self._schemas.move_to_end(key)
+            return compiled
+
+        # Compilers get their own copy, some of them rewrite the schema in place
+        compiled = compile(deepcopy(schema))
+        self.n_compiles += 1
+        self._schemas[key] = compiled
+        if len(self._schemas) > self.max_size:
+            self._schemas.popitem(last=False)
+        return compiled
+
+    def clear(self):
+        self._schemas.clear()
+
+
+SCHEMA_CACHE = SchemaCompilationCache()
+
+
+def get_strict_json_schema(schema: dict) -> dict:
+    return SCHEMA_CACHE.get_or_compile(
+        schema,
+        "openai_strict",
+        lambda schema: ensure_strict_json_schema(schema, path=(), root=schema),
+    )
+
+
+def get_google_json_schema(schema: dict) -> dict:
+    return SCHEMA_CACHE.get_or_compile(
+        schema,
+        "google",
+        lambda schema: remove_titles_from_schema(flatten_json_schema(schema)),
+    )
@@ -1,8 +1,6 @@
 from copy import deepcopy
 from typing import Any, List
 
-from openai import NOT_GIVEN
-
 from utils.dict_utils import (
     get_dict_paths_with_key,
     get_dict_at_path,
@@ -175,7 +173,7 @@ def ensure_strict_json_schema(
     # strip `None` defaults as there's no meaningful distinction here
     # the schema will still be `nullable` and the model will default
     # to using `None` anyway
-    if json_schema.get("default", NOT_GIVEN) is None:
+    if "default" in json_schema and json_schema["default"] is None:
         json_schema.pop("default")
 
     # we can't use `$ref`s if there are also other properties defined, e.g.
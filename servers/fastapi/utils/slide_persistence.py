@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+import hashlib
+import json
+from typing import List
+import uuid
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import select
+
+from models.sql.slide import SlideModel
+
+# Columns written by the editor, presentation and id identify the row
+SLIDE_CONTENT_FIELDS = [
+    "layout_group",
+    "layout",
+    "index",
+    "content",
+    "html_content",
+    "speaker_note",
+    "properties",
+]
+
+
+@dataclass
+class SlideChanges:
+    inserted: List[uuid.UUID] = field(default_factory=list)
+    updated: List[uuid.UUID] = field(default_factory=list)
+    deleted: List[uuid.UUID] = field(default_factory=list)
+
+
+def get_slide_content_hash(slide: SlideModel) -> str:
+    values = {key: getattr(slide, key) for key in SLIDE_CONTENT_FIELDS}
+    serialized = json.dumps(values, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode()).hexdigest()
+
+
+async def save_presentation_slides(
+    sql_session: AsyncSession, presentation_id: uuid.UUID, slides: List[SlideModel]
+) -> SlideChanges:
+    """
+    Writes the slides of a presentation as a diff against the stored rows.
+    Slides are matched by id, and only new, changed or removed slides are
+    inserted, updated or deleted. The caller commits.
+    """
+    changes = SlideChanges()
+    stored_slides = {
+        slide.id: slide
+        for slide in await sql_session.scalars(
+            select(SlideModel).where(SlideModel.presentation == presentation_id)
+        )
+    }
+
+    for slide in slides:
+        stored_slide = stored_slides.pop(slide.id, None)
+        if stored_slide is None:
+            slide.presentation = presentation_id
+            sql_session.add(slide)
+            changes.inserted.append(slide.id)
+        elif get_slide_content_hash(stored_slide) != get_slide_content_hash(slide):
+            for key in SLIDE_CONTENT_FIELDS:
+                setattr(stored_slide, key, getattr(slide, key))
+            changes.updated.append(slide.id)
+
+    if stored_slides:
+        changes.deleted = list(stored_slides)
+        await sql_session.execute(
+            delete(SlideModel).where(SlideModel.id.in_(changes.deleted))
+        )
+
+    return changes
@@ -136,6 +136,22 @@ const startServers = async () => {
     console.error("FastAPI process failed to start:", err);
   });
 
+  if (process.env.GENERATION_QUEUE === "true") {
+    const generationWorkerProcess = spawn(
+      "python",
+      ["generation_worker.py"],
+      {
+        cwd: fastapiDir,
+        stdio: "inherit",
+        env: process.env,
+      }
+    );
+
+    generationWorkerProcess.on("error", (err) => {
+      console.error("Generation worker process failed to start:", err);
+    });
+  }
+
   const appmcpProcess = spawn(
     "python",
     ["mcp_server.py", "--port", appmcpPort.toString()],